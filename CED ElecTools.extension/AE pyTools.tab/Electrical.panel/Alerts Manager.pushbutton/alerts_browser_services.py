@@ -7,9 +7,11 @@ import Autodesk.Revit.DB.Electrical as DBE
 from pyrevit import DB
 
 from CEDElectrical.Application.dto.operation_request import OperationRequest
+from CEDElectrical.Application.services import alert_payload_cache
 from CEDElectrical.Application.services.operation_runner import build_default_runner
 from CEDElectrical.Domain import settings_manager
 from CEDElectrical.Model.alerts import get_alert_definition
+from Snippets import revit_helpers
 from Snippets.circuit_ui_actions import format_writeback_lock_reason
 from alerts_browser_view_models import AlertCircuitItem
 from alerts_browser_view_models import AlertRow
@@ -24,40 +26,12 @@ HIDABLE_ALERT_IDS = set([
 ])
 
 
-def _lookup_param_text(element, name):
-    param = element.LookupParameter(name)
-    if not param:
-        return None
-    value = param.AsString()
-    if value is None:
-        value = param.AsValueString()
-    return value
-
-
-def _read_alert_payload(circuit, alert_data_param):
-    raw = _lookup_param_text(circuit, alert_data_param)
-    if not raw:
-        return None
-    try:
-        return json.loads(raw)
-    except Exception:
-        return None
-
-
 def _payload_alert_records(payload):
-    if not isinstance(payload, dict):
-        return []
-    alerts = payload.get("alerts")
-    return alerts if isinstance(alerts, list) else []
+    return alert_payload_cache.payload_alert_records(payload)
 
 
 def _payload_hidden_ids(payload):
-    if not isinstance(payload, dict):
-        return set()
-    hidden = payload.get("hidden_definition_ids")
-    if not isinstance(hidden, list):
-        return set()
-    return set([x for x in hidden if x])
+    return alert_payload_cache.payload_hidden_ids(payload)
 
 
 def _alert_rows_from_payload(payload):
@@ -93,6 +67,12 @@ def _alert_rows_from_payload(payload):
     return rows
 
 
+def _row_loader(cache, circuit_id, raw_text):
+    def _load():
+        return _alert_rows_from_payload(cache.payload(circuit_id, raw_text))
+    return _load
+
+
 def _build_writeback_lock_map(doc, circuits, idval_fn, lock_repository):
     if doc is None or not getattr(doc, "IsWorkshared", False):
         return {}
@@ -120,9 +100,7 @@ def _build_writeback_lock_map(doc, circuits, idval_fn, lock_repository):
     return lock_map
 
 
-def build_snapshot(doc, alert_data_param, idval_fn, lock_repository):
-    if doc is None:
-        return {"doc_title": "-", "items": []}
+def _collect_sorted_circuits(doc):
     circuits = list(
         DB.FilteredElementCollector(doc)
         .OfClass(DBE.ElectricalSystem)
@@ -136,24 +114,188 @@ def build_snapshot(doc, alert_data_param, idval_fn, lock_repository):
             (getattr(c, "LoadName", "") or ""),
         )
     )
-    lock_map = _build_writeback_lock_map(doc, circuits, idval_fn, lock_repository)
-    items = []
-    for circuit in circuits:
-        rows = _alert_rows_from_payload(_read_alert_payload(circuit, alert_data_param))
-        if not rows:
-            continue
-        circuit_id = idval_fn(circuit.Id)
-        lock_row = lock_map.get(circuit_id)
-        blocked = lock_row is not None
-        reason = format_writeback_lock_reason(lock_row) if blocked else ""
-        items.append(AlertCircuitItem(circuit, circuit_id, rows, blocked=blocked, block_reason=reason))
-    return {
-        "doc_title": getattr(doc, "Title", "-") or "-",
-        "items": items,
-    }
+    return circuits
+
+
+def _estimate_alert_count(raw_text):
+    # Counting severity keys in the raw JSON orders panels without decoding.
+    return raw_text.count('"severity"') if raw_text else 0
+
+
+def _circuit_panel_name(circuit):
+    panel_name = "-"
+    if getattr(circuit, "BaseEquipment", None):
+        panel_name = getattr(circuit.BaseEquipment, "Name", panel_name) or panel_name
+    return panel_name
+
+
+def _item_hash(raw_text, lock_reason, circuit):
+    # Lock state and names are shown on the list item, so they change its hash too.
+    return alert_payload_cache.payload_hash(u"\n".join([
+        alert_payload_cache.payload_hash(raw_text),
+        lock_reason or u"",
+        _circuit_panel_name(circuit),
+        getattr(circuit, "CircuitNumber", "") or u"",
+        getattr(circuit, "LoadName", "") or u"",
+    ]))
+
+
+class AlertSnapshotStream(object):
+    """Builds the Alerts Manager snapshot one panel at a time.
+
+    ``begin`` reads each circuit's raw payload once and orders panels by
+    estimated alert count (most first) without hashing or decoding anything;
+    ``panel_nodes`` then lists the panels to load so the window can show them
+    before any panel is decoded. ``next_group`` fetches a single panel's
+    circuits again by id, so edits and deletions between ticks are seen,
+    and hashes and decodes them through the shared payload cache.
+    ``payload_hashes`` is complete once ``has_more`` is False. Each hash
+    covers the payload, lock state and panel/circuit names; with
+    ``previous_hashes`` only circuits whose hash changed are emitted, and
+    circuits whose payload disappeared are reported in ``removed_ids`` or
+    the group's ``cleared_ids``.
+    """
+
+    def __init__(self, doc, alert_data_param, idval_fn, lock_repository, previous_hashes=None):
+        self.doc = doc
+        self.alert_data_param = alert_data_param
+        self.idval_fn = idval_fn
+        self.lock_repository = lock_repository
+        self.changed_only = previous_hashes is not None
+        self._previous_hashes = dict(previous_hashes or {})
+        self.payload_hashes = {}
+        self.removed_ids = []
+        self.panel_nodes = []
+        self.panel_count = 0
+        self.panels_done = 0
+        self._groups = []
+        self._cache = alert_payload_cache.get_shared_cache()
+
+    @property
+    def doc_title(self):
+        if self.doc is None:
+            return "-"
+        return getattr(self.doc, "Title", "-") or "-"
+
+    def begin(self):
+        if self.doc is None:
+            return self
+        groups = {}
+        payload_ids = set()
+        for circuit in _collect_sorted_circuits(self.doc):
+            raw_text = alert_payload_cache.read_payload_text(circuit, self.alert_data_param)
+            if not raw_text:
+                continue
+            circuit_id = self.idval_fn(circuit.Id)
+            payload_ids.add(circuit_id)
+            panel_name = _circuit_panel_name(circuit)
+            group = groups.get(panel_name)
+            if group is None:
+                group = {"panel": panel_name, "circuit_ids": [], "estimate": 0}
+                groups[panel_name] = group
+            group["circuit_ids"].append(circuit_id)
+            group["estimate"] += _estimate_alert_count(raw_text)
+        if self.changed_only:
+            self.removed_ids = sorted(
+                [cid for cid in self._previous_hashes.keys() if cid not in payload_ids]
+            )
+        self._groups = sorted(groups.values(), key=lambda g: (-g["estimate"], g["panel"]))
+        self.panel_nodes = [
+            {"panel": g["panel"], "circuit_count": len(g["circuit_ids"]), "estimate": g["estimate"]}
+            for g in self._groups
+        ]
+        self.panel_count = len(self._groups)
+        return self
+
+    def has_more(self):
+        return bool(self._groups)
+
+    def _live_circuit(self, circuit_id):
+        try:
+            element = self.doc.GetElement(revit_helpers.elementid_from_value(circuit_id))
+        except Exception:
+            return None
+        if element is None or not getattr(element, "IsValidObject", True):
+            return None
+        return element
+
+    def next_group(self):
+        """Hash and decode the next panel; return its items plus ids that no longer have alerts."""
+        if not self._groups:
+            return {"panel": None, "items": [], "cleared_ids": []}
+        group = self._groups.pop(0)
+        self.panels_done += 1
+        live = []
+        cleared_ids = []
+        for circuit_id in group["circuit_ids"]:
+            circuit = self._live_circuit(circuit_id)
+            raw_text = alert_payload_cache.read_payload_text(circuit, self.alert_data_param) if circuit else None
+            if not raw_text:
+                cleared_ids.append(circuit_id)
+                continue
+            live.append((circuit, circuit_id, raw_text))
+        lock_map = _build_writeback_lock_map(
+            self.doc,
+            [entry[0] for entry in live],
+            self.idval_fn,
+            self.lock_repository,
+        )
+        items = []
+        for circuit, circuit_id, raw_text in live:
+            lock_row = lock_map.get(circuit_id)
+            blocked = lock_row is not None
+            reason = format_writeback_lock_reason(lock_row) if blocked else ""
+            digest = _item_hash(raw_text, reason, circuit)
+            self.payload_hashes[circuit_id] = digest
+            if self.changed_only and self._previous_hashes.get(circuit_id) == digest:
+                continue
+            summary = self._cache.summary(circuit_id, raw_text)
+            if not summary.has_alerts:
+                cleared_ids.append(circuit_id)
+                continue
+            items.append(
+                AlertCircuitItem(
+                    circuit,
+                    circuit_id,
+                    blocked=blocked,
+                    block_reason=reason,
+                    summary=summary,
+                    row_loader=_row_loader(self._cache, circuit_id, raw_text),
+                )
+            )
+        return {"panel": group["panel"], "items": items, "cleared_ids": cleared_ids}
+
+    def run_to_end(self):
+        """Drain the stream into a single snapshot dict."""
+        items = []
+        removed_ids = list(self.removed_ids)
+        while self.has_more():
+            group = self.next_group()
+            items.extend(group["items"])
+            removed_ids.extend(group["cleared_ids"])
+        return {
+            "doc_title": self.doc_title,
+            "items": items,
+            "removed_ids": removed_ids,
+            "payload_hashes": dict(self.payload_hashes),
+            "is_delta": self.changed_only,
+        }
+
+
+def build_snapshot(doc, alert_data_param, idval_fn, lock_repository, previous_hashes=None):
+    if doc is None:
+        return {"doc_title": "-", "items": []}
+    stream = AlertSnapshotStream(
+        doc,
+        alert_data_param,
+        idval_fn,
+        lock_repository,
+        previous_hashes=previous_hashes,
+    )
+    return stream.begin().run_to_end()
 
 
-def recalculate_and_snapshot(doc, circuit_id, alert_data_param, idval_fn, lock_repository):
+def recalculate_and_snapshot(doc, circuit_id, alert_data_param, idval_fn, lock_repository, previous_hashes=None):
     request = OperationRequest(
         operation_key="calculate_circuits",
         circuit_ids=[int(circuit_id)],
@@ -164,12 +306,20 @@ def recalculate_and_snapshot(doc, circuit_id, alert_data_param, idval_fn, lock_r
     operation_result = runner.run(request, doc) or {}
     return {
         "operation_result": operation_result,
-        "snapshot": build_snapshot(doc, alert_data_param, idval_fn, lock_repository),
+        "snapshot": build_snapshot(doc, alert_data_param, idval_fn, lock_repository, previous_hashes=previous_hashes),
         "circuit_id": int(circuit_id),
     }
 
 
-def update_hidden_alert_types_and_snapshot(doc, circuit_id, hidden_ids, alert_data_param, idval_fn, lock_repository):
+def update_hidden_alert_types_and_snapshot(
+    doc,
+    circuit_id,
+    hidden_ids,
+    alert_data_param,
+    idval_fn,
+    lock_repository,
+    previous_hashes=None,
+):
     request = OperationRequest(
         operation_key="set_hidden_alert_types",
         circuit_ids=[int(circuit_id)],
@@ -180,6 +330,6 @@ def update_hidden_alert_types_and_snapshot(doc, circuit_id, hidden_ids, alert_da
     operation_result = runner.run(request, doc) or {}
     return {
         "operation_result": operation_result,
-        "snapshot": build_snapshot(doc, alert_data_param, idval_fn, lock_repository),
+        "snapshot": build_snapshot(doc, alert_data_param, idval_fn, lock_repository, previous_hashes=previous_hashes),
         "circuit_id": int(circuit_id),
     }
@@ -13,7 +13,7 @@ class AlertRow(object):
 
 
 class AlertCircuitItem(object):
-    def __init__(self, circuit, circuit_id, rows, blocked=False, block_reason=""):
+    def __init__(self, circuit, circuit_id, rows=None, blocked=False, block_reason="", summary=None, row_loader=None):
         self.circuit = circuit
         self.circuit_id = int(circuit_id or 0)
         self.panel = "-"
@@ -22,12 +22,17 @@ class AlertCircuitItem(object):
         self.circuit_number = getattr(circuit, "CircuitNumber", "") or ""
         self.load_name = getattr(circuit, "LoadName", "") or ""
         self.panel_ckt_text = "{} / {}".format(self.panel or "-", self.circuit_number or "-")
-        self.rows = list(rows or [])
-        self.active_rows = [x for x in self.rows if not bool(getattr(x, "is_hidden", False))]
-        self.hidden_rows = [x for x in self.rows if bool(getattr(x, "is_hidden", False))]
-        self.total_count = len(self.rows)
-        self.active_count = len(self.active_rows)
-        self.hidden_count = len(self.hidden_rows)
+        # Rows are built by ``row_loader`` on first access; counts come from the
+        # cached payload summary so the circuit list never needs them.
+        self._rows = list(rows) if rows is not None else None
+        self._row_loader = row_loader
+        if summary is not None:
+            self.total_count = int(getattr(summary, "alert_count", 0) or 0)
+            self.hidden_count = int(getattr(summary, "hidden_count", 0) or 0)
+        else:
+            self.total_count = len(self.rows)
+            self.hidden_count = len(self.hidden_rows)
+        self.active_count = max(0, self.total_count - self.hidden_count)
         self.counts_text = "Alerts: {} | Active: {} | Hidden: {}".format(
             self.total_count,
             self.active_count,
@@ -35,3 +40,39 @@ class AlertCircuitItem(object):
         )
         self.recalc_blocked = bool(blocked)
         self.recalc_block_reason = str(block_reason or "")
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            loader = self._row_loader
+            self._rows = list(loader() or []) if loader is not None else []
+        return self._rows
+
+    @property
+    def active_rows(self):
+        return [x for x in self.rows if not bool(getattr(x, "is_hidden", False))]
+
+    @property
+    def hidden_rows(self):
+        return [x for x in self.rows if bool(getattr(x, "is_hidden", False))]
+
+
+class AlertPanelPlaceholder(object):
+    """List entry for a panel whose circuits have not been loaded yet."""
+
+    def __init__(self, panel, circuit_count=0, estimate=0):
+        self.circuit = None
+        self.circuit_id = 0
+        self.panel = str(panel or "-")
+        self.circuit_number = ""
+        self.load_name = "Loading {} circuit(s)...".format(int(circuit_count or 0))
+        self.panel_ckt_text = self.panel
+        self.total_count = 0
+        self.hidden_count = 0
+        self.active_count = 0
+        self.counts_text = "About {} alert(s)".format(int(estimate or 0))
+        self.recalc_blocked = True
+        self.recalc_block_reason = "Panel is still loading."
+        self.rows = []
+        self.active_rows = []
+        self.hidden_rows = []
@@ -77,9 +77,11 @@ from Snippets.circuit_ui_actions import (
     set_revit_selection,
 )
 from UIClasses import resource_loader
+from alerts_browser_services import AlertSnapshotStream
 from alerts_browser_services import build_snapshot
 from alerts_browser_services import recalculate_and_snapshot
 from alerts_browser_services import update_hidden_alert_types_and_snapshot
+from alerts_browser_view_models import AlertPanelPlaceholder
 
 UI_RESOURCES_ROOT = ui_pathing.resolve_ui_resources_root(LIB_ROOT)
 _LOCK_REPOSITORY = RevitCircuitRepository()
@@ -133,8 +135,18 @@ class AlertsBrowserExternalEventGateway(object):
     def raise_refresh(self, callback):
         return self._raise("refresh", callback=callback)
 
-    def raise_recalculate(self, circuit_id, callback):
-        return self._raise("recalculate", payload={"circuit_id": int(circuit_id)}, callback=callback)
+    def raise_stream_begin(self, callback, previous_hashes=None):
+        return self._raise("stream_begin", payload={"previous_hashes": previous_hashes}, callback=callback)
+
+    def raise_stream_next(self, stream, callback):
+        return self._raise("stream_next", payload={"stream": stream}, callback=callback)
+
+    def raise_recalculate(self, circuit_id, callback, previous_hashes=None):
+        payload = {
+            "circuit_id": int(circuit_id),
+            "previous_hashes": previous_hashes,
+        }
+        return self._raise("recalculate", payload=payload, callback=callback)
 
     def raise_select(self, mode, circuit_id, callback=None):
         payload = {
@@ -143,10 +155,11 @@ class AlertsBrowserExternalEventGateway(object):
         }
         return self._raise("select", payload=payload, callback=callback)
 
-    def raise_set_hidden(self, circuit_id, hidden_definition_ids, callback):
+    def raise_set_hidden(self, circuit_id, hidden_definition_ids, callback, previous_hashes=None):
         payload = {
             "circuit_id": int(circuit_id or 0),
             "hidden_definition_ids": list(hidden_definition_ids or []),
+            "previous_hashes": previous_hashes,
         }
         return self._raise("set_hidden", payload=payload, callback=callback)
 
@@ -175,13 +188,34 @@ class _AlertsBrowserExternalEventHandler(IExternalEventHandler):
             doc = uidoc.Document if uidoc else None
             if op_name == "refresh":
                 result = build_snapshot(doc, ALERT_DATA_PARAM, _idval, _LOCK_REPOSITORY)
+            elif op_name == "stream_begin":
+                stream = AlertSnapshotStream(
+                    doc,
+                    ALERT_DATA_PARAM,
+                    _idval,
+                    _LOCK_REPOSITORY,
+                    previous_hashes=payload.get("previous_hashes"),
+                )
+                result = {"stream": stream.begin()}
+            elif op_name == "stream_next":
+                stream = payload.get("stream")
+                if stream is None:
+                    raise Exception("No alert snapshot stream in progress.")
+                result = {"stream": stream, "group": stream.next_group()}
             elif op_name == "recalculate":
                 if doc is None:
                     raise Exception("No active document.")
                 circuit_id = int(payload.get("circuit_id") or 0)
                 if circuit_id <= 0:
                     raise Exception("No circuit selected.")
-                result = recalculate_and_snapshot(doc, circuit_id, ALERT_DATA_PARAM, _idval, _LOCK_REPOSITORY)
+                result = recalculate_and_snapshot(
+                    doc,
+                    circuit_id,
+                    ALERT_DATA_PARAM,
+                    _idval,
+                    _LOCK_REPOSITORY,
+                    previous_hashes=payload.get("previous_hashes"),
+                )
             elif op_name == "select":
                 if uidoc is None or doc is None:
                     raise Exception("No active document.")
@@ -210,6 +244,7 @@ class _AlertsBrowserExternalEventHandler(IExternalEventHandler):
                     ALERT_DATA_PARAM,
                     _idval,
                     _LOCK_REPOSITORY,
+                    previous_hashes=payload.get("previous_hashes"),
                 )
             else:
                 raise Exception("Unknown operation: {}".format(op_name))
@@ -237,6 +272,9 @@ class AlertsBrowserWindow(forms.WPFWindow):
         self._gateway = gateway
         self._items = []
         self._doc_title = "-"
+        self._payload_hashes = None
+        self._stream = None
+        self._placeholders = []
         forms.WPFWindow.__init__(self, xaml)
         # Use CLR Tag for cross-runtime singleton detection.
         try:
@@ -375,28 +413,60 @@ class AlertsBrowserWindow(forms.WPFWindow):
 
     def _visible_items(self):
         items = list(self._items or [])
-        if self._show_hidden_enabled():
-            return items
-        visible = []
-        for item in items:
-            active_count = int(getattr(item, "active_count", 0) or 0)
-            hidden_count = int(getattr(item, "hidden_count", 0) or 0)
-            if active_count <= 0 and hidden_count > 0:
+        if not self._show_hidden_enabled():
+            visible = []
+            for item in items:
+                active_count = int(getattr(item, "active_count", 0) or 0)
+                hidden_count = int(getattr(item, "hidden_count", 0) or 0)
+                if active_count <= 0 and hidden_count > 0:
+                    continue
+                visible.append(item)
+            items = visible
+        return items + list(self._placeholders or [])
+
+    def _seed_panel_placeholders(self, stream):
+        self._placeholders = [
+            AlertPanelPlaceholder(node.get("panel"), node.get("circuit_count"), node.get("estimate"))
+            for node in list(getattr(stream, "panel_nodes", None) or [])
+        ]
+
+    def _drop_panel_placeholder(self, panel):
+        self._placeholders = [x for x in list(self._placeholders or []) if x.panel != panel]
+
+    def _merge_items(self, items, removed_ids):
+        removed = set([int(x or 0) for x in list(removed_ids or [])])
+        incoming = {}
+        for item in list(items or []):
+            incoming[int(getattr(item, "circuit_id", 0) or 0)] = item
+        merged = []
+        for item in list(self._items or []):
+            cid = int(getattr(item, "circuit_id", 0) or 0)
+            if cid in removed:
                 continue
-            visible.append(item)
-        return visible
+            replacement = incoming.pop(cid, None)
+            merged.append(replacement if replacement is not None else item)
+        for item in list(items or []):
+            if int(getattr(item, "circuit_id", 0) or 0) in incoming:
+                merged.append(item)
+        return merged
 
     def _apply_snapshot(self, snapshot, preferred_circuit_id=None):
         data = dict(snapshot or {})
         doc_title = str(data.get("doc_title") or "-")
         self._doc_title = doc_title
-        items = list(data.get("items") or [])
+        if bool(data.get("is_delta")):
+            items = self._merge_items(data.get("items"), data.get("removed_ids"))
+        else:
+            items = list(data.get("items") or [])
+        if data.get("payload_hashes") is not None:
+            self._payload_hashes = dict(data.get("payload_hashes") or {})
         self._items = items
         visible_items = self._visible_items()
         if self._document_text is not None:
             self._document_text.Text = "Document: {}".format(doc_title)
         if self._count_text is not None:
-            self._count_text.Text = "{} circuits with alerts".format(len(visible_items))
+            loaded_count = len([x for x in visible_items if int(getattr(x, "circuit_id", 0) or 0) > 0])
+            self._count_text.Text = "{} circuits with alerts".format(loaded_count)
         if self._circuit_list is not None:
             self._circuit_list.ItemsSource = list(visible_items)
         selected = self._find_item_by_id(preferred_circuit_id)
@@ -411,6 +481,82 @@ class AlertsBrowserWindow(forms.WPFWindow):
                 pass
         self._set_selected(selected)
 
+    def start_stream(self, changed_only=False, stream=None):
+        """Queue an incremental load; ``changed_only`` diffs against the last snapshot hashes.
+
+        ``stream`` is an already begun AlertSnapshotStream (read while the
+        command still had API context), so its panels show before the first tick.
+        """
+        if self._gateway is None or self._stream is not None:
+            return False
+        if stream is not None:
+            self._handle_stream_result("stream_begin", {"stream": stream})
+            return True
+        previous_hashes = self._payload_hashes if (changed_only and self._payload_hashes is not None) else None
+        raised = self._gateway.raise_stream_begin(self._handle_external_complete, previous_hashes=previous_hashes)
+        if raised:
+            self._set_status("Checking for changed alerts..." if previous_hashes is not None else "Loading alerts...")
+        else:
+            self._set_status("Unable to queue alert loading.")
+        return raised
+
+    def _selected_circuit_id(self):
+        selected = self._selected_item()
+        return int(getattr(selected, "circuit_id", 0) or 0) if selected is not None else 0
+
+    def _continue_stream(self, stream):
+        if stream.has_more():
+            self._set_status(
+                "Loading alerts... {} of {} panels".format(stream.panels_done, stream.panel_count)
+            )
+            if self._gateway.raise_stream_next(stream, self._handle_external_complete):
+                return
+            self._set_status("Alert loading interrupted. Reopen Alerts Manager to continue.")
+            self._stream = None
+            self._placeholders = []
+            self._apply_snapshot(
+                {"doc_title": self._doc_title, "items": list(self._items or [])},
+                preferred_circuit_id=self._selected_circuit_id(),
+            )
+            return
+        self._stream = None
+        self._placeholders = []
+        self._payload_hashes = dict(stream.payload_hashes or {})
+        self._set_status("Loaded alerts for {} panels.".format(stream.panel_count))
+        self._update_refresh_state(self._selected_item())
+
+    def _handle_stream_result(self, op_name, result):
+        data = dict(result or {})
+        stream = data.get("stream")
+        if stream is None:
+            self._stream = None
+            return
+        self._stream = stream
+        if op_name == "stream_begin":
+            snapshot = {"doc_title": stream.doc_title, "items": []}
+            self._placeholders = []
+            if not stream.changed_only:
+                self._seed_panel_placeholders(stream)
+            else:
+                snapshot = {
+                    "doc_title": stream.doc_title,
+                    "items": [],
+                    "removed_ids": list(stream.removed_ids or []),
+                    "is_delta": True,
+                }
+            self._apply_snapshot(snapshot, preferred_circuit_id=self._selected_circuit_id())
+        else:
+            group = dict(data.get("group") or {})
+            self._drop_panel_placeholder(group.get("panel"))
+            snapshot = {
+                "doc_title": stream.doc_title,
+                "items": list(group.get("items") or []),
+                "removed_ids": list(group.get("cleared_ids") or []),
+                "is_delta": True,
+            }
+            self._apply_snapshot(snapshot, preferred_circuit_id=self._selected_circuit_id())
+        self._continue_stream(stream)
+
     def show_hidden_toggled(self, sender, args):
         selected = self._selected_item()
         preferred_id = int(getattr(selected, "circuit_id", 0) or 0) if selected is not None else 0
@@ -473,10 +619,15 @@ class AlertsBrowserWindow(forms.WPFWindow):
 
     def _handle_external_complete(self, status, op_name, result, error):
         if status == "error":
+            self._stream = None
+            self._placeholders = []
             self._set_status("Operation failed")
             forms.alert("Alerts Manager operation failed:\n\n{}".format(error), title=TITLE)
             self._update_refresh_state(self._selected_item())
             return
+        if op_name in ("stream_begin", "stream_next"):
+            self._handle_stream_result(op_name, result)
+            return
         if op_name == "refresh":
             self._apply_snapshot(result or {}, preferred_circuit_id=None)
             self._set_status("Refreshed alerts.")
@@ -618,6 +769,7 @@ class AlertsBrowserWindow(forms.WPFWindow):
             getattr(item, "circuit_id", 0),
             hidden_ids,
             callback=self._handle_external_complete,
+            previous_hashes=self._payload_hashes,
         )
         if not raised:
             self._set_status("Unable to queue hide/unhide update.")
@@ -640,6 +792,7 @@ class AlertsBrowserWindow(forms.WPFWindow):
         raised = self._gateway.raise_recalculate(
             getattr(selected, "circuit_id", 0),
             callback=self._handle_external_complete,
+            previous_hashes=self._payload_hashes,
         )
         if not raised:
             self._set_status("Unable to queue recalculate.")
@@ -704,6 +857,11 @@ def _focus_existing_window(existing):
         existing.Focus()
     except Exception:
         pass
+    try:
+        if hasattr(existing, "start_stream"):
+            existing.start_stream(changed_only=True)
+    except Exception as ex:
+        _LOGGER.debug("Alerts Manager changed-only refresh failed: %s", ex)
 
 
 def _show_or_focus_window():
@@ -712,7 +870,11 @@ def _show_or_focus_window():
         _focus_existing_window(existing)
         return
     theme_mode, accent_mode = _load_theme_state_from_config("light", "blue")
-    snapshot = build_snapshot(_active_doc(), ALERT_DATA_PARAM, _idval, _LOCK_REPOSITORY)
+    doc = _active_doc()
+    # Order the panels now, while the command has API context, so the window opens
+    # listing them; their circuits then stream in (most alerts first) via ExternalEvent.
+    stream = AlertSnapshotStream(doc, ALERT_DATA_PARAM, _idval, _LOCK_REPOSITORY).begin()
+    snapshot = {"doc_title": stream.doc_title, "items": []}
     gateway = AlertsBrowserExternalEventGateway(logger=_LOGGER)
     window = AlertsBrowserWindow(
         theme_mode=theme_mode,
@@ -725,6 +887,7 @@ def _show_or_focus_window():
         window.Activate()
     except Exception:
         pass
+    window.start_stream(stream=stream)
 
 
 _show_or_focus_window()
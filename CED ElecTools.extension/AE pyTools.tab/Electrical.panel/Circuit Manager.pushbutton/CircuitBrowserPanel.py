@@ -1,17 +1,19 @@
 ﻿# -*- coding: utf-8 -*-
 
 import imp
+import itertools
 import json
 import os
 
 import Autodesk.Revit.DB.Electrical as DBE
 import clr
 from Autodesk.Revit.DB.Events import (
+    DocumentChangedEventArgs,
     DocumentOpenedEventArgs,
     DocumentClosedEventArgs,
 )
 from Autodesk.Revit.UI import ExternalEvent, IExternalEventHandler
-from Autodesk.Revit.UI.Events import ViewActivatedEventArgs
+from Autodesk.Revit.UI.Events import IdlingEventArgs, ViewActivatedEventArgs
 from System import EventHandler, Action
 from System.Collections.Generic import List
 from System.Collections.ObjectModel import ObservableCollection
@@ -44,7 +46,12 @@ from Snippets import revit_helpers
 
 from CEDElectrical.Model.alerts import get_alert_definition
 from CEDElectrical.Model.CircuitBranch import CircuitBranch
+from CEDElectrical.Model.circuit_action_queue import CircuitActionQueue
 from CEDElectrical.Application.dto.operation_request import OperationRequest
+from CEDElectrical.Application.services import (
+    alert_payload_cache,
+    circuit_element_finder_view_finder,
+)
 from CEDElectrical.Application.services.operation_runner import build_default_runner
 from CEDElectrical.Domain import settings_manager
 from CEDElectrical.refdata.standard_ocp_table import BREAKER_FRAME_SWITCH_TABLE
@@ -61,7 +68,7 @@ from Snippets.circuit_ui_actions import (
 )
 from Snippets._elecutils import (
     get_all_panels,
-    get_compatible_panels,
+    get_common_compatible_panels,
     get_panel_dist_system,
     panel_has_schedule_view,
 )
@@ -143,6 +150,8 @@ CIRCUIT_TYPE_TAG_COMPACT_TEXT = {
 OCP_TABLE_KEYS = sorted([int(k) for k in BREAKER_FRAME_SWITCH_TABLE.keys()])
 _DOC_SENTINEL = object()
 DEFAULT_HIDDEN_TYPE_FILTERS = set(["SPARE", "SPACE"])
+# Above this many pending changed ids a full reload is cheaper than per-row rebuilds.
+INCREMENTAL_REFRESH_MAX_CHANGES = 250
 TYPE_FILTER_NO_SHADE_TAG = "__ced_type_filter_no_shade__"
 
 
@@ -243,6 +252,22 @@ def _parse_whole_amps(value):
     return rounded
 
 
+_STAGE_SEQUENCE = itertools.count(1)
+
+
+def _mark_staged(rows):
+    """Stamp ``rows`` with the next staging step so Apply keeps the user's order."""
+    step = next(_STAGE_SEQUENCE)
+    for row in list(rows or []):
+        row.stage_seq = step
+
+
+def _staged_rows(rows):
+    """Return enabled, changed rows in the order they were staged."""
+    staged = [row for row in list(rows or []) if row.is_enabled and row.is_changed]
+    return sorted(staged, key=lambda row: int(getattr(row, "stage_seq", 0) or 0))
+
+
 def _safe_float(value):
     try:
         return float(value)
@@ -545,32 +570,16 @@ def _lookup_schedule_notes_text(circuit):
     return fallback or ""
 
 
-def _read_alert_payload(circuit):
-    raw = _lookup_param_text(circuit, ALERT_DATA_PARAM)
-    if not raw:
-        return None
-    try:
-        return json.loads(raw)
-    except Exception:
-        return None
+def _read_alert_payload_text(circuit):
+    return _lookup_param_text(circuit, ALERT_DATA_PARAM)
 
 
 def _payload_alert_records(payload):
-    if not isinstance(payload, dict):
-        return []
-    alerts = payload.get("alerts")
-    if not isinstance(alerts, list):
-        return []
-    return alerts
+    return alert_payload_cache.payload_alert_records(payload)
 
 
 def _payload_hidden_ids(payload):
-    if not isinstance(payload, dict):
-        return set()
-    hidden = payload.get("hidden_definition_ids")
-    if not isinstance(hidden, list):
-        return set()
-    return set([x for x in hidden if x])
+    return alert_payload_cache.payload_hidden_ids(payload)
 
 
 def _alert_rows_from_payload(payload):
@@ -611,17 +620,11 @@ def _alert_rows_from_payload(payload):
     return rows
 
 
-def _alert_tooltip_from_payload(payload):
-    items = _payload_alert_records(payload)
-    if not items:
+def _alert_tooltip_from_summary(summary):
+    total = int(getattr(summary, "alert_count", 0) or 0)
+    if total <= 0:
         return "", "Collapsed", 0, 0
-    total = len(items)
-    hidden_count = 0
-    hidden_ids = _payload_hidden_ids(payload)
-    for item in items:
-        definition_id = (item or {}).get("definition_id") or (item or {}).get("id")
-        if definition_id and definition_id in hidden_ids:
-            hidden_count += 1
+    hidden_count = int(getattr(summary, "hidden_count", 0) or 0)
     return "Alert Count: {} | Hidden Count: {}".format(total, hidden_count), "Visible", total, hidden_count
 
 
@@ -642,10 +645,8 @@ def _build_sync_lock_tooltip(circuit_owner, device_owner):
     return "\n".join(lines)
 
 
-def _sync_lock_state_from_payload(payload):
-    if not isinstance(payload, dict):
-        return False, ""
-    sync_lock = payload.get("sync_lock")
+def _sync_lock_state_from_summary(summary):
+    sync_lock = getattr(summary, "sync_lock", None)
     if not isinstance(sync_lock, dict):
         return False, ""
     if not bool(sync_lock.get("blocked", False)):
@@ -669,6 +670,14 @@ def _sync_lock_state_from_row(row):
     return True, tooltip
 
 
+def _circuit_sort_key(circuit):
+    return (
+        (getattr(getattr(circuit, "BaseEquipment", None), "Name", "") or ""),
+        (getattr(circuit, "StartSlot", 0) or 0),
+        (getattr(circuit, "LoadName", "") or ""),
+    )
+
+
 def _derive_branch_type(circuit):
     if circuit.CircuitType == DBE.CircuitType.Space:
         return "SPACE"
@@ -691,11 +700,17 @@ class CircuitListItem(object):
         self.is_checked = False
 
         self.panel = "-"
+        self.panel_id = 0
         try:
             if circuit.BaseEquipment:
                 self.panel = getattr(circuit.BaseEquipment, "Name", self.panel) or self.panel
+                self.panel_id = int(_elid_value(circuit.BaseEquipment.Id) or 0)
         except Exception:
             pass
+        try:
+            self.sort_key = _circuit_sort_key(circuit)
+        except Exception:
+            self.sort_key = ("", 0, "")
 
         self.circuit_number = getattr(circuit, "CircuitNumber", "") or ""
         self.load_name = getattr(circuit, "LoadName", "") or ""
@@ -784,9 +799,12 @@ class CircuitListItem(object):
         self.neutral_badge_visibility = "Visible" if (neutral_qty or 0) > 0 else "Collapsed"
         self.ig_badge_visibility = "Visible" if (ig_qty or 0) > 0 else "Collapsed"
 
-        payload = _read_alert_payload(circuit)
-        self.alert_rows = _alert_rows_from_payload(payload)
-        self.alert_summary, self.alert_visibility, self.alert_count, self.hidden_alert_count = _alert_tooltip_from_payload(payload)
+        # Rows are only materialized when the alert badge is opened; the list
+        # itself renders from the shared cached summary.
+        self._alert_payload_text = _read_alert_payload_text(circuit)
+        self._alert_rows = None
+        summary = alert_payload_cache.get_shared_cache().summary(self.circuit_id, self._alert_payload_text)
+        self.alert_summary, self.alert_visibility, self.alert_count, self.hidden_alert_count = _alert_tooltip_from_summary(summary)
         self.alert_bg = "#F9C846"
         self.alert_border = "#BFA23A"
         self.alert_text_color = "#5E4A00"
@@ -795,7 +813,7 @@ class CircuitListItem(object):
             self.alert_border = "#8F7300"
             self.alert_text_color = "#6F5700"
 
-        sync_blocked, sync_tooltip = _sync_lock_state_from_payload(payload)
+        sync_blocked, sync_tooltip = _sync_lock_state_from_summary(summary)
         if not sync_blocked:
             sync_blocked, sync_tooltip = _sync_lock_state_from_row(session_sync_state)
         self.sync_blocked = bool(sync_blocked)
@@ -812,6 +830,13 @@ class CircuitListItem(object):
             conduit_wire,
         ).lower()
 
+    @property
+    def alert_rows(self):
+        if self._alert_rows is None:
+            payload = alert_payload_cache.get_shared_cache().payload(self.circuit_id, self._alert_payload_text)
+            self._alert_rows = _alert_rows_from_payload(payload)
+        return self._alert_rows
+
 
 class AlertRow(object):
     def __init__(self, severity, group, definition_id, message, is_hidden=False, can_hide=True):
@@ -1094,6 +1119,7 @@ class NeutralIGActionRow(object):
         self.new_size_changed = False
         self.new_wire_changed = False
         self.target_include = None
+        self.stage_seq = 0
         self.is_changed = False
         self.remarks = ""
         self.recompute_state()
@@ -1119,7 +1145,6 @@ class NeutralIGActionWindow(forms.WPFWindow):
         self._rows = list(rows or [])
         self._preview_callback = preview_callback
         self._apply_callback = apply_callback
-        self._mode = "add"
         self._is_syncing_checks = False
         self._suppress_check_events = False
         self._is_ready = False
@@ -1264,8 +1289,9 @@ class NeutralIGActionWindow(forms.WPFWindow):
             self._suppress_check_events = False
 
     def add_clicked(self, sender, args):
-        self._mode = "add"
+        staged = [row for row in self._rows if row.is_enabled and row.is_checked]
         self._preview_callback(self._rows, "add")
+        _mark_staged(staged)
         self._is_syncing_checks = True
         try:
             for row in self._rows:
@@ -1275,8 +1301,9 @@ class NeutralIGActionWindow(forms.WPFWindow):
         self._refresh_grid(refresh_items=False)
 
     def remove_clicked(self, sender, args):
-        self._mode = "remove"
+        staged = [row for row in self._rows if row.is_enabled and row.is_checked]
         self._preview_callback(self._rows, "remove")
+        _mark_staged(staged)
         self._is_syncing_checks = True
         try:
             for row in self._rows:
@@ -1301,11 +1328,12 @@ class NeutralIGActionWindow(forms.WPFWindow):
             row.new_size_changed = False
             row.new_wire_changed = False
             row.target_include = None
+            row.stage_seq = 0
             row.recompute_state()
         self._refresh_grid(refresh_items=False)
 
     def apply_clicked(self, sender, args):
-        if self._apply_callback(self._rows, self._mode):
+        if self._apply_callback(self._rows):
             self.Close()
 
     def cancel_clicked(self, sender, args):
@@ -1380,6 +1408,7 @@ class BreakerActionRow(object):
         self.new_rating_changed = False
         self.new_frame_changed = False
         self.new_frame_warning = False
+        self.stage_seq = 0
         self.is_changed = False
         self.rating_warning_brush = "#00FFFFFF"
         self.rating_warning_tooltip = ""
@@ -1683,7 +1712,9 @@ class BreakerActionWindow(forms.WPFWindow):
         allow_15a = bool(getattr(self._allow_15a_cb, "IsChecked", False))
         upsize_only = bool(getattr(self._upsize_only_cb, "IsChecked", False))
         max_load_percent = self._get_max_load_percent()
+        staged = [row for row in self._rows if row.is_enabled and row.is_checked]
         self._preview_apply_callback(self._rows, set_breaker, set_frame, allow_15a, upsize_only, max_load_percent)
+        _mark_staged(staged)
         self._is_syncing_checks = True
         try:
             for row in self._rows:
@@ -1707,6 +1738,7 @@ class BreakerActionWindow(forms.WPFWindow):
                 continue
             row.new_rating = row.current_rating
             row.new_frame = row.current_frame
+            row.stage_seq = 0
             row.recompute_state()
         self._refresh_grid(refresh_items=True)
 
@@ -1759,6 +1791,7 @@ class BreakerActionWindow(forms.WPFWindow):
             setattr(row, sort_path, formatted)
             if editor is not None:
                 editor.Text = formatted
+            _mark_staged([row])
             row.recompute_state()
             self._refresh_grid(refresh_items=True)
         except Exception:
@@ -1829,6 +1862,7 @@ class MarkExistingActionRow(object):
         self.preview_clear_conduit = False
         self.new_notes_changed = False
         self.new_wire_changed = False
+        self.stage_seq = 0
         self.is_changed = False
         self.remarks = ""
         self.recompute_state()
@@ -2071,6 +2105,7 @@ class MarkExistingActionWindow(forms.WPFWindow):
             self._sync_button_states()
             return
         self._preview_callback(target_rows, "existing", set_notes, clear_wire, clear_conduit)
+        _mark_staged(target_rows)
         for row in target_rows:
             row.is_checked = False
         self._refresh_grid(refresh_items=False)
@@ -2083,6 +2118,7 @@ class MarkExistingActionWindow(forms.WPFWindow):
             self._sync_button_states()
             return
         self._preview_callback(target_rows, "new", set_notes, False, False)
+        _mark_staged(target_rows)
         for row in target_rows:
             row.is_checked = False
         self._refresh_grid(refresh_items=False)
@@ -2102,6 +2138,7 @@ class MarkExistingActionWindow(forms.WPFWindow):
             row.preview_mode = "existing"
             row.preview_clear_wire = False
             row.preview_clear_conduit = False
+            row.stage_seq = 0
             row.is_checked = False
             row.recompute_state()
         self._refresh_grid(refresh_items=False)
@@ -2433,6 +2470,13 @@ class CircuitBrowserPanel(forms.WPFPanel):
         self._view_activated_handler = None
         self._doc_opened_handler = None
         self._doc_closed_handler = None
+        self._doc_changed_handler = None
+        self._idling_handler = None
+        self._pending_circuit_ids = set()
+        self._pending_equipment_ids = set()
+        self._pending_deleted_ids = set()
+        self._pending_full_reload = False
+        self._pending_untracked = False
 
         self.Loaded += self.panel_loaded
         self.Unloaded += self.panel_unloaded
@@ -2643,6 +2687,12 @@ class CircuitBrowserPanel(forms.WPFPanel):
             if self._view_activated_handler is None:
                 self._view_activated_handler = EventHandler[ViewActivatedEventArgs](self._on_view_activated)
                 uiapp.ViewActivated += self._view_activated_handler
+            if self._doc_changed_handler is None:
+                self._doc_changed_handler = EventHandler[DocumentChangedEventArgs](self._on_document_changed)
+                app.DocumentChanged += self._doc_changed_handler
+            if self._idling_handler is None:
+                self._idling_handler = EventHandler[IdlingEventArgs](self._on_idling)
+                uiapp.Idling += self._idling_handler
             self._events_attached = True
             return True
         except Exception as ex:
@@ -2674,6 +2724,24 @@ class CircuitBrowserPanel(forms.WPFPanel):
         except Exception:
             pass
         self._doc_closed_handler = None
+
+        try:
+            if app is not None and self._doc_changed_handler is not None:
+                app.DocumentChanged -= self._doc_changed_handler
+        except Exception:
+            pass
+        if self._doc_changed_handler is not None and self._loaded_doc_key is not None:
+            # Edits made while detached are not tracked; reconcile on the next idle tick.
+            self._pending_full_reload = True
+            self._pending_untracked = True
+        self._doc_changed_handler = None
+
+        try:
+            if uiapp is not None and self._idling_handler is not None:
+                uiapp.Idling -= self._idling_handler
+        except Exception:
+            pass
+        self._idling_handler = None
         self._events_attached = False
 
     def _on_document_opened(self, sender, args):
@@ -2718,8 +2786,172 @@ class CircuitBrowserPanel(forms.WPFPanel):
 
         self._set_doc_banner(doc)
 
+    def _has_pending_changes(self):
+        return bool(
+            self._pending_full_reload
+            or self._pending_circuit_ids
+            or self._pending_equipment_ids
+            or self._pending_deleted_ids
+        )
+
+    def _clear_pending_changes(self):
+        self._pending_circuit_ids = set()
+        self._pending_equipment_ids = set()
+        self._pending_deleted_ids = set()
+        self._pending_full_reload = False
+        self._pending_untracked = False
+
+    def _pending_change_count(self):
+        return (
+            len(self._pending_circuit_ids)
+            + len(self._pending_equipment_ids)
+            + len(self._pending_deleted_ids)
+        )
+
+    def _on_document_changed(self, sender, args):
+        circuit_element_finder_view_finder.note_document_changed(args)
+        if self._loaded_doc_key is None or self._pending_untracked:
+            return
+        try:
+            doc = args.GetDocument()
+        except Exception:
+            return
+        if self._doc_key(doc) != self._loaded_doc_key:
+            return
+        try:
+            circuit_filter = DB.ElementClassFilter(DBE.ElectricalSystem)
+            equipment_filter = DB.ElementCategoryFilter(DB.BuiltInCategory.OST_ElectricalEquipment)
+            for element_id in list(args.GetAddedElementIds(circuit_filter) or []):
+                self._pending_circuit_ids.add(int(_elid_value(element_id)))
+            for element_id in list(args.GetModifiedElementIds(circuit_filter) or []):
+                self._pending_circuit_ids.add(int(_elid_value(element_id)))
+            for element_id in list(args.GetModifiedElementIds(equipment_filter) or []):
+                self._pending_equipment_ids.add(int(_elid_value(element_id)))
+            # Deleted ids cannot be filtered by class; keep only rows the panel shows.
+            for element_id in list(args.GetDeletedElementIds() or []):
+                cid = int(_elid_value(element_id))
+                if cid in self._item_index:
+                    self._pending_deleted_ids.add(cid)
+        except Exception as ex:
+            self._logger.debug("Circuit Browser change tracking failed: %s", ex)
+            self._pending_full_reload = True
+            self._pending_untracked = True
+        if self._pending_change_count() > INCREMENTAL_REFRESH_MAX_CHANGES:
+            # Ids stay tracked so a targeted refresh that covers them can cancel the reload.
+            self._pending_full_reload = True
+
+    def _settle_pending_changes(self, refreshed_ids):
+        """Drop pending ids of rows a targeted refresh rebuilt; cancel the full reload once none remain."""
+        refreshed = set(refreshed_ids or [])
+        self._pending_circuit_ids -= refreshed
+        self._pending_deleted_ids -= refreshed
+        if self._pending_equipment_ids:
+            uncovered_panels = set()
+            for item in list(self._all_items or []):
+                if int(getattr(item, "circuit_id", 0) or 0) not in refreshed:
+                    uncovered_panels.add(int(getattr(item, "panel_id", 0) or 0))
+            self._pending_equipment_ids &= uncovered_panels
+        if self._pending_full_reload and not self._pending_untracked and not self._pending_change_count():
+            self._pending_full_reload = False
+
+    def _on_idling(self, sender, args):
+        if not self._has_pending_changes():
+            return
+        if not self._is_pane_visible():
+            return
+        doc = self._get_active_doc()
+        if doc is None or self._doc_key(doc) != self._loaded_doc_key:
+            return
+        try:
+            self._apply_pending_changes(doc)
+        except Exception as ex:
+            self._logger.warning("Circuit Browser incremental refresh failed: %s", ex)
+            self._clear_pending_changes()
+
+    def _apply_pending_changes(self, doc):
+        if self._pending_full_reload:
+            self._clear_pending_changes()
+            reselect_ids = self._collect_selected_row_ids()
+            self._safe_load_items(doc_override=doc)
+            self._reselect_rows_by_ids(reselect_ids)
+            return
+
+        changed_ids = set(self._pending_circuit_ids)
+        deleted_ids = set(self._pending_deleted_ids)
+        equipment_ids = set(self._pending_equipment_ids)
+        self._clear_pending_changes()
+        if equipment_ids:
+            for item in list(self._all_items or []):
+                if int(getattr(item, "panel_id", 0) or 0) in equipment_ids:
+                    changed_ids.add(int(item.circuit_id))
+        changed_ids -= deleted_ids
+        if not changed_ids and not deleted_ids:
+            return
+
+        reselect_ids = self._collect_selected_row_ids()
+        refreshed_items = []
+        refreshed_index = {}
+        rebuilt = 0
+        removed = 0
+        for item in list(self._all_items or []):
+            cid = int(getattr(item, "circuit_id", 0) or 0)
+            if cid <= 0:
+                continue
+            if cid in deleted_ids:
+                removed += 1
+                continue
+            if cid not in changed_ids:
+                refreshed_items.append(item)
+                refreshed_index[cid] = item
+                continue
+            changed_ids.discard(cid)
+            try:
+                live = doc.GetElement(_elid_from_value(cid))
+            except Exception:
+                live = None
+            if not isinstance(live, DBE.ElectricalSystem):
+                removed += 1
+                continue
+            replacement = CircuitListItem(live, session_sync_state=self._session_state_for_circuit(live))
+            replacement.is_checked = bool(getattr(item, "is_checked", False))
+            self._apply_type_tag_brush(replacement)
+            refreshed_items.append(replacement)
+            refreshed_index[cid] = replacement
+            rebuilt += 1
+
+        # Whatever is left in changed_ids was not in the list yet (newly added circuits).
+        added = 0
+        for cid in sorted(changed_ids):
+            try:
+                live = doc.GetElement(_elid_from_value(cid))
+            except Exception:
+                live = None
+            if not isinstance(live, DBE.ElectricalSystem):
+                continue
+            item = CircuitListItem(live, session_sync_state=self._session_state_for_circuit(live))
+            self._apply_type_tag_brush(item)
+            refreshed_items.append(item)
+            refreshed_index[cid] = item
+            added += 1
+
+        if not (rebuilt or removed or added):
+            return
+        refreshed_items.sort(key=lambda x: getattr(x, "sort_key", ("", 0, "")))
+        self._all_items = refreshed_items
+        self._item_index = refreshed_index
+        self._rebuild_filter_options()
+        self._refresh_list()
+        self._reselect_rows_by_ids(reselect_ids)
+        self._logger.debug(
+            "Circuit Browser incremental refresh: +%s / ~%s / -%s",
+            added,
+            rebuilt,
+            removed,
+        )
+
     def _safe_load_items(self, doc_override=_DOC_SENTINEL, fast=False):
         doc = self._get_active_doc() if doc_override is _DOC_SENTINEL else doc_override
+        self._clear_pending_changes()
         self._active_doc_key = self._doc_key(doc)
         self._set_doc_banner(doc)
         if doc is None:
@@ -3268,11 +3500,7 @@ class CircuitBrowserPanel(forms.WPFPanel):
             .WhereElementIsNotElementType()
             .ToElements()
         )
-        circuits.sort(key=lambda c: (
-            (getattr(getattr(c, "BaseEquipment", None), "Name", "") or ""),
-            (getattr(c, "StartSlot", 0) or 0),
-            (getattr(c, "LoadName", "") or "")
-        ))
+        circuits.sort(key=_circuit_sort_key)
         return circuits
 
     def _session_state_for_circuit(self, circuit):
@@ -4050,6 +4278,7 @@ class CircuitBrowserPanel(forms.WPFPanel):
             return
 
         updated = False
+        covered_ids = set()
         refreshed_items = []
         refreshed_index = {}
         for item in list(self._all_items or []):
@@ -4063,6 +4292,7 @@ class CircuitBrowserPanel(forms.WPFPanel):
                 refreshed_items.append(item)
                 refreshed_index[cid] = item
                 continue
+            covered_ids.add(cid)
             try:
                 live = doc.GetElement(_elid_from_value(cid))
             except Exception:
@@ -4083,6 +4313,7 @@ class CircuitBrowserPanel(forms.WPFPanel):
 
         self._all_items = refreshed_items
         self._item_index = refreshed_index
+        self._settle_pending_changes(covered_ids)
         self._rebuild_filter_options()
         self._refresh_list()
         self._reselect_rows_by_ids(reselect_ids or [])
@@ -4264,19 +4495,11 @@ class CircuitBrowserPanel(forms.WPFPanel):
             forms.alert("No panels found in this model.", title=TITLE)
             return
 
-        compatible_panels = []
-        for idx, circuit in enumerate(deduped_circuits):
-            circuit_panels = list(get_compatible_panels(circuit, all_panels, doc) or [])
-            if idx == 0:
-                compatible_panels = list(circuit_panels)
-                continue
-            allowed_ids = set([_elid_value(panel.Id) for panel in list(circuit_panels or [])])
-            compatible_panels = [
-                panel for panel in list(compatible_panels or [])
-                if _elid_value(panel.Id) in allowed_ids
-            ]
-            if not compatible_panels:
-                break
+        # Session index: kept current by session_cache_events, so no per-circuit panel rescans.
+        # Near-full panels stay listed: the move service offers partial and replace-defaults moves.
+        compatible_panels = get_common_compatible_panels(
+            deduped_circuits, all_panels, doc, refresh=False, require_capacity=False
+        )
 
         if not compatible_panels:
             forms.alert(
@@ -4494,6 +4717,21 @@ class CircuitBrowserPanel(forms.WPFPanel):
             return False
         return True
 
+    def _raise_circuit_actions(self, actions, options=None):
+        """Queue ``actions`` ({operation_key, circuit_ids, options}) as one write + recalculation."""
+        circuit_ids = []
+        for action in list(actions or []):
+            for cid in list(action.get("circuit_ids") or []):
+                if cid not in circuit_ids:
+                    circuit_ids.append(cid)
+        request_options = dict(options or {})
+        request_options["actions"] = list(actions or [])
+        return self._raise_action_operation(
+            "apply_circuit_actions_and_recalculate",
+            circuit_ids,
+            request_options,
+        )
+
     def _build_neutral_rows(self, targets):
         rows = []
         doc = self._get_active_doc()
@@ -4586,29 +4824,21 @@ class CircuitBrowserPanel(forms.WPFPanel):
                 row.target_include = 1 if int(new_qty or 0) > 0 else 0
             row.recompute_state()
 
-    def _apply_neutral_rows(self, rows, mode):
-        updates = []
-        for row in list(rows or []):
-            if not (row.is_enabled and row.is_changed):
-                continue
+    def _apply_neutral_rows(self, rows):
+        queue = CircuitActionQueue()
+        for row in _staged_rows(rows):
             include_value = getattr(row, "target_include", None)
             if include_value not in (0, 1):
                 continue
-            updates.append(
-                {
-                    "circuit_id": int(row.circuit_id or 0),
-                    "include": int(include_value),
-                }
+            queue.stage(
+                "set_neutral_and_recalculate",
+                {"circuit_id": row.circuit_id, "include": int(include_value)},
+                {"mode": "add" if include_value == 1 else "remove"},
             )
-        changed_ids = [x.get("circuit_id") for x in updates if int(x.get("circuit_id") or 0) > 0]
-        if not changed_ids:
+        if not len(queue):
             forms.alert("No circuits are marked for modification.", title=TITLE)
             return False
-        return self._raise_action_operation(
-            "set_neutral_and_recalculate",
-            changed_ids,
-            {"mode": mode, "updates": updates, "show_output": False},
-        )
+        return self._raise_circuit_actions(queue.actions(), {"show_output": False})
 
     def _build_ig_rows(self, targets):
         rows = []
@@ -4700,29 +4930,21 @@ class CircuitBrowserPanel(forms.WPFPanel):
                 row.target_include = 1 if int(new_qty or 0) > 0 else 0
             row.recompute_state()
 
-    def _apply_ig_rows(self, rows, mode):
-        updates = []
-        for row in list(rows or []):
-            if not (row.is_enabled and row.is_changed):
-                continue
+    def _apply_ig_rows(self, rows):
+        queue = CircuitActionQueue()
+        for row in _staged_rows(rows):
             include_value = getattr(row, "target_include", None)
             if include_value not in (0, 1):
                 continue
-            updates.append(
-                {
-                    "circuit_id": int(row.circuit_id or 0),
-                    "include": int(include_value),
-                }
+            queue.stage(
+                "set_ig_and_recalculate",
+                {"circuit_id": row.circuit_id, "include": int(include_value)},
+                {"mode": "add" if include_value == 1 else "remove"},
             )
-        changed_ids = [x.get("circuit_id") for x in updates if int(x.get("circuit_id") or 0) > 0]
-        if not changed_ids:
+        if not len(queue):
             forms.alert("No circuits are marked for modification.", title=TITLE)
             return False
-        return self._raise_action_operation(
-            "set_ig_and_recalculate",
-            changed_ids,
-            {"mode": mode, "updates": updates, "show_output": False},
-        )
+        return self._raise_circuit_actions(queue.actions(), {"show_output": False})
 
     def _build_breaker_rows(self, targets):
         rows = []
@@ -4842,11 +5064,9 @@ class CircuitBrowserPanel(forms.WPFPanel):
         upsize_only=False,
         max_load_percent=80,
     ):
-        updates = []
+        queue = CircuitActionQueue()
         invalid_rows = []
-        for row in rows:
-            if not (row.is_enabled and row.is_changed):
-                continue
+        for row in _staged_rows(rows):
             rating_val = _parse_whole_amps(row.new_rating) if row.new_rating_changed else None
             frame_val = _parse_whole_amps(row.new_frame) if row.new_frame_changed else None
             if row.new_rating_changed and rating_val is None:
@@ -4855,14 +5075,16 @@ class CircuitBrowserPanel(forms.WPFPanel):
             if row.new_frame_changed and frame_val is None:
                 invalid_rows.append(row.panel_ckt_text)
                 continue
-            updates.append(
+            queue.stage(
+                "autosize_breaker_and_recalculate",
                 {
                     "circuit_id": row.circuit_id,
                     "rating": float(rating_val) if rating_val is not None else None,
                     "frame": float(frame_val) if frame_val is not None else None,
                     "set_rating": bool(row.new_rating_changed),
                     "set_frame": bool(row.new_frame_changed),
-                }
+                },
+                {"allow_15a": bool(allow_15a)},
             )
 
         if invalid_rows:
@@ -4872,19 +5094,11 @@ class CircuitBrowserPanel(forms.WPFPanel):
             )
             return False
 
-        if not updates:
+        if not len(queue):
             forms.alert("No staged breaker/frame changes found.", title=TITLE)
             return False
 
-        return self._raise_action_operation(
-            "autosize_breaker_and_recalculate",
-            [x.get("circuit_id") for x in updates],
-            {
-                "updates": updates,
-                "show_output": False,
-                "allow_15a": bool(allow_15a),
-            },
-        )
+        return self._raise_circuit_actions(queue.actions(), {"show_output": False, "allow_15a": bool(allow_15a)})
 
     def _build_mark_existing_rows(self, targets):
         rows = []
@@ -4961,11 +5175,8 @@ class CircuitBrowserPanel(forms.WPFPanel):
             row.recompute_state()
 
     def _apply_mark_existing_rows(self, rows, mode, set_notes, clear_wire, clear_conduit):
-        updates = []
-        changed_ids = []
-        for row in list(rows or []):
-            if not (row.is_enabled and row.is_changed):
-                continue
+        queue = CircuitActionQueue()
+        for row in _staged_rows(rows):
             mode_text = str(getattr(row, "action_mode", "existing") or "existing").strip().lower()
             if mode_text not in ("existing", "new"):
                 mode_text = "existing"
@@ -4979,22 +5190,11 @@ class CircuitBrowserPanel(forms.WPFPanel):
             if mode_text == "new":
                 update["clear_wire"] = False
                 update["clear_conduit"] = False
-            cid = int(update.get("circuit_id") or 0)
-            if cid <= 0:
-                continue
-            updates.append(update)
-            changed_ids.append(cid)
-        if not changed_ids:
+            queue.stage("mark_existing_and_recalculate", update, {"mode": mode_text})
+        if not len(queue):
             forms.alert("No circuits are marked for modification.", title=TITLE)
             return False
-        return self._raise_action_operation(
-            "mark_existing_and_recalculate",
-            changed_ids,
-            {
-                "updates": updates,
-                "show_output": False,
-            },
-        )
+        return self._raise_circuit_actions(queue.actions(), {"show_output": False})
 
     def action_mark_existing_clicked(self, sender, args):
         targets = self._collect_action_targets()
@@ -1,8 +1,13 @@
 ﻿# -*- coding: utf-8 -*-
 """Service-layer execution for Add/Remove Spares and Spaces."""
 
+from System.Collections.Generic import List
 from pyrevit import DB, revit
 
+from CEDElectrical.Application.services.spare_space_planner import (
+    issue_plan_adds,
+    plan_panel_adds,
+)
 from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repository as ps_repo
 from CEDElectrical.Model.panel_schedule_enums import PanelSpecialKind as SpecialKind
 from CEDElectrical.Model.panel_schedule_enums import PanelUiActionType as UiActionType
@@ -101,12 +106,7 @@ def _get_panel_circuits(option, panel_circuit_index):
     return []
 
 
-def ordered_add_slots(option, panel_circuit_index=None):
-    if option is None:
-        return []
-    slot_order = list(ps_repo.get_option_slot_order(option, include_excess=False) or [])
-    if not slot_order:
-        return []
+def _occupied_slots(option, slot_order, panel_circuit_index=None):
     slot_set = set([int(x) for x in list(slot_order or []) if int(x) > 0])
     occupied = set()
     for circuit in list(_get_panel_circuits(option, panel_circuit_index) or []):
@@ -121,15 +121,7 @@ def ordered_add_slots(option, panel_circuit_index=None):
             sval = int(slot or 0)
             if sval > 0 and sval in slot_set:
                 occupied.add(sval)
-    slots = [int(slot) for slot in list(slot_order or []) if int(slot) > 0 and int(slot) not in occupied]
-    if not slots:
-        return []
-    schedule_type = option.get("schedule_type")
-    if schedule_type == ps_repo.PSTYPE_SWITCHBOARD:
-        return list(slots)
-    odds = [x for x in slots if int(x % 2) == 1]
-    evens = [x for x in slots if int(x % 2) == 0]
-    return odds + evens
+    return occupied
 
 
 def count_open_slots_fast(option, usage_by_panel):
@@ -200,60 +192,43 @@ def _removable_targets_for_option(doc, option, mode, panel_circuit_index):
     return list(targets)
 
 
-def _execute_add_for_option(manager, doc, option, mode, panel_circuit_index=None):
+def _execute_add_for_option(manager, doc, option, mode, panel_circuit_index=None, dry_run=False):
     panel_id = int(option.get("panel_id", 0) or 0)
-    slots = list(ordered_add_slots(option, panel_circuit_index=panel_circuit_index) or [])
-    if panel_id <= 0 or not slots:
-        return {"added_spares": 0, "added_spaces": 0, "added_slots": [], "switchboard_added_circuit_ids": []}
-
-    mode_key = UiMode.normalize_for_add(mode, default=UiMode.SPACE)
+    empty = {
+        "added_spares": 0,
+        "added_spaces": 0,
+        "runs": 0,
+        "added_slots": [],
+        "added_circuit_ids": [],
+        "switchboard_added_circuit_ids": [],
+    }
+    if panel_id <= 0:
+        return empty
+    slot_order = list(ps_repo.get_option_slot_order(option, include_excess=False) or [])
+    if not slot_order:
+        return empty
+    occupied = _occupied_slots(option, slot_order, panel_circuit_index=panel_circuit_index)
+    plan = plan_panel_adds(option, mode, occupied)
+    summary = plan.summary()
+    if bool(dry_run) or not plan.kinds:
+        empty.update({
+            "added_spares": int(summary.get("added_spares", 0)),
+            "added_spaces": int(summary.get("added_spaces", 0)),
+            "runs": int(summary.get("runs", 0)),
+        })
+        return empty
+
+    results = issue_plan_adds(manager, plan)
     is_switchboard = bool(option.get("schedule_type") == ps_repo.PSTYPE_SWITCHBOARD)
-    add_spares = 0
-    add_spaces = 0
-    added_slots = []
-    added_circuit_ids = []
-    switchboard_added_circuit_ids = []
-
-    if mode_key == UiMode.SPARE:
-        add_plan = [SpecialKind.SPARE] * len(slots)
-    elif mode_key == UiMode.SPACE:
-        add_plan = [SpecialKind.SPACE] * len(slots)
-    else:
-        spare_count = int((len(slots) + 1) / 2)
-        add_plan = ([SpecialKind.SPARE] * spare_count) + ([SpecialKind.SPACE] * (len(slots) - spare_count))
-
-    for slot, kind in zip(slots, add_plan):
-        if kind == SpecialKind.SPARE:
-            result = manager.add_spare_default(
-                panel_id=panel_id,
-                panel_slot=int(slot),
-                unlock=False,
-                apply_switchboard_default_poles=False,
-            )
-            add_spares += 1
-        else:
-            result = manager.add_space_default(
-                panel_id=panel_id,
-                panel_slot=int(slot),
-                unlock=False,
-                apply_switchboard_default_poles=False,
-            )
-            add_spaces += 1
-        added_slots.append(int(slot))
-        if is_switchboard:
-            circuit_id = int((result or {}).get("circuit_id", 0) or 0)
-            if circuit_id > 0:
-                switchboard_added_circuit_ids.append(int(circuit_id))
-        circuit_id = int((result or {}).get("circuit_id", 0) or 0)
-        if circuit_id > 0:
-            added_circuit_ids.append(int(circuit_id))
-
+    added_slots = [int(x.get("slot", 0) or 0) for x in results if int(x.get("slot", 0) or 0) > 0]
+    added_circuit_ids = [int(x.get("circuit_id", 0) or 0) for x in results if int(x.get("circuit_id", 0) or 0) > 0]
     return {
-        "added_spares": int(add_spares),
-        "added_spaces": int(add_spaces),
-        "added_slots": [int(x) for x in list(added_slots or []) if int(x) > 0],
-        "added_circuit_ids": [int(x) for x in list(added_circuit_ids or []) if int(x) > 0],
-        "switchboard_added_circuit_ids": [int(x) for x in list(switchboard_added_circuit_ids or []) if int(x) > 0],
+        "added_spares": int(summary.get("added_spares", 0)),
+        "added_spaces": int(summary.get("added_spaces", 0)),
+        "runs": int(summary.get("runs", 0)),
+        "added_slots": list(added_slots),
+        "added_circuit_ids": list(added_circuit_ids),
+        "switchboard_added_circuit_ids": list(added_circuit_ids) if is_switchboard else [],
     }
 
 
@@ -358,22 +333,27 @@ def _finalize_added_defaults(manager, doc, added_circuit_ids, fallback_unlock_re
     }
 
 
-def _execute_remove_for_option(manager, doc, option, mode, panel_circuit_index):
+def _execute_remove_for_option(manager, doc, option, mode, panel_circuit_index, dry_run=False):
     panel_id = int(option.get("panel_id", 0) or 0)
     if panel_id <= 0:
         return {"removed_spares": 0, "removed_spaces": 0}
     removed_spares = 0
     removed_spaces = 0
+    delete_ids = List[DB.ElementId]()
     targets = _removable_targets_for_option(doc, option, mode, panel_circuit_index)
     for _, kind, circuit_id in list(targets or []):
-        circuit = doc.GetElement(_elid_from_value(int(circuit_id)))
-        if circuit is None:
-            continue
-        doc.Delete(circuit.Id)
+        if not bool(dry_run):
+            circuit = doc.GetElement(_elid_from_value(int(circuit_id)))
+            if circuit is None:
+                continue
+            delete_ids.Add(circuit.Id)
         if kind == SpecialKind.SPARE:
             removed_spares += 1
         else:
             removed_spaces += 1
+    if delete_ids.Count > 0:
+        doc.Delete(delete_ids)
+        ps_repo.invalidate_slot_cell_map(option.get("schedule_view"))
     return {"removed_spares": int(removed_spares), "removed_spaces": int(removed_spaces)}
 
 
@@ -404,52 +384,50 @@ def execute_quick_action(doc, panel_options, action_type, mode):
         panel_option_lookup={int(x.get("panel_id", 0) or 0): x for x in list(options or [])},
     )
     panel_circuit_index = collect_panel_circuit_index(doc)
-    added_spares = 0
-    added_spaces = 0
-    removed_spares = 0
-    removed_spaces = 0
     touched = 0
     unlock_requests = []
     added_circuit_ids = []
     switchboard_added_circuit_ids = []
     finalize_summary = {"unlock_attempted": 0, "unlock_failed": 0, "pole_attempted": 0, "pole_failed": 0}
 
+    def _apply_option(option):
+        result = {}
+        if action_kind == UiActionType.ADD:
+            result = _execute_add_for_option(
+                manager,
+                doc,
+                option,
+                mode_key,
+                panel_circuit_index=panel_circuit_index,
+            )
+        else:
+            result = _execute_remove_for_option(
+                manager,
+                doc,
+                option,
+                mode_key,
+                panel_circuit_index=panel_circuit_index,
+            )
+        panel_id = int(option.get("panel_id", 0) or 0)
+        counts["added_spares"] += int(result.get("added_spares", 0) or 0)
+        counts["added_spaces"] += int(result.get("added_spaces", 0) or 0)
+        counts["removed_spares"] += int(result.get("removed_spares", 0) or 0)
+        counts["removed_spaces"] += int(result.get("removed_spaces", 0) or 0)
+        unlock_requests.extend([(int(panel_id), int(x)) for x in list(result.get("added_slots", []) or [])])
+        added_circuit_ids.extend([int(x) for x in list(result.get("added_circuit_ids", []) or []) if int(x) > 0])
+        switchboard_added_circuit_ids.extend(
+            [int(x) for x in list(result.get("switchboard_added_circuit_ids", []) or []) if int(x) > 0]
+        )
+
+    counts = {"added_spares": 0, "added_spaces": 0, "removed_spares": 0, "removed_spaces": 0}
     tx_group = DB.TransactionGroup(doc, "Quick Spare/Space")
     tx_group.Start()
     try:
-        with revit.Transaction("Quick Spare/Space - Apply", doc):
-            for option in list(options or []):
-                panel_id = int(option.get("panel_id", 0) or 0)
-                if panel_id <= 0:
-                    continue
-                touched += 1
-                if action_kind == UiActionType.ADD:
-                    result = _execute_add_for_option(
-                        manager,
-                        doc,
-                        option,
-                        mode_key,
-                        panel_circuit_index=panel_circuit_index,
-                    )
-                    added_spares += int(result.get("added_spares", 0) or 0)
-                    added_spaces += int(result.get("added_spaces", 0) or 0)
-                    unlock_requests.extend([(int(panel_id), int(x)) for x in list(result.get("added_slots", []) or [])])
-                    added_circuit_ids.extend(
-                        [int(x) for x in list(result.get("added_circuit_ids", []) or []) if int(x) > 0]
-                    )
-                    switchboard_added_circuit_ids.extend(
-                        [int(x) for x in list(result.get("switchboard_added_circuit_ids", []) or []) if int(x) > 0]
-                    )
-                else:
-                    result = _execute_remove_for_option(
-                        manager,
-                        doc,
-                        option,
-                        mode_key,
-                        panel_circuit_index=panel_circuit_index,
-                    )
-                    removed_spares += int(result.get("removed_spares", 0) or 0)
-                    removed_spaces += int(result.get("removed_spaces", 0) or 0)
+        # One transaction per panel keeps each panel's adds/deletes in a single regen.
+        for option in list(options or []):
+            touched += 1
+            with revit.Transaction("Quick Spare/Space - Apply", doc):
+                _apply_option(option)
         if action_kind == UiActionType.ADD and (unlock_requests or added_circuit_ids or switchboard_added_circuit_ids):
             with revit.Transaction("Quick Spare/Space - Finalize Added", doc):
                 finalize_summary = _finalize_added_defaults(
@@ -463,6 +441,10 @@ def execute_quick_action(doc, panel_options, action_type, mode):
     except Exception:
         tx_group.RollBack()
         raise
+    added_spares = counts["added_spares"]
+    added_spaces = counts["added_spaces"]
+    removed_spares = counts["removed_spares"]
+    removed_spaces = counts["removed_spaces"]
 
     return {
         "action_kind": action_kind,
@@ -475,7 +457,7 @@ def execute_quick_action(doc, panel_options, action_type, mode):
     }
 
 
-def execute_staged_actions(doc, staged_actions, option_lookup):
+def execute_staged_actions(doc, staged_actions, option_lookup, dry_run=False):
     manager = PanelScheduleManager(doc, panel_option_lookup=option_lookup)
     need_panel_scan = any(
         UiActionType.normalize(x.get("action_type", ""), default="") in (UiActionType.ADD, UiActionType.REMOVE)
@@ -487,42 +469,69 @@ def execute_staged_actions(doc, staged_actions, option_lookup):
     switchboard_added_circuit_ids = []
     finalize_summary = {"unlock_attempted": 0, "unlock_failed": 0, "pole_attempted": 0, "pole_failed": 0}
 
+    # Group actions by panel (keeping their staged order) so each panel applies in one transaction.
+    actions_by_panel = {}
+    panel_order = []
+    for action in list(staged_actions or []):
+        panel_id = int(action.get("panel_id", 0) or 0)
+        if option_lookup.get(int(panel_id)) is None:
+            continue
+        if panel_id not in actions_by_panel:
+            actions_by_panel[panel_id] = []
+            panel_order.append(panel_id)
+        actions_by_panel[panel_id].append(action)
+    counts = {"added_spares": 0, "added_spaces": 0, "removed_spares": 0, "removed_spaces": 0}
+
+    def _apply_panel(panel_id):
+        option = option_lookup.get(int(panel_id))
+        for action in actions_by_panel.get(panel_id, []):
+            kind = UiActionType.normalize(action.get("action_type", ""), default="")
+            mode = str(action.get("mode", "") or "")
+            if kind == UiActionType.ADD:
+                result = _execute_add_for_option(
+                    manager,
+                    doc,
+                    option,
+                    mode,
+                    panel_circuit_index=panel_circuit_index,
+                    dry_run=dry_run,
+                )
+                unlock_requests.extend(
+                    [(int(panel_id), int(x)) for x in list(result.get("added_slots", []) or [])]
+                )
+                added_circuit_ids.extend(
+                    [int(x) for x in list(result.get("added_circuit_ids", []) or []) if int(x) > 0]
+                )
+                switchboard_added_circuit_ids.extend(
+                    [int(x) for x in list(result.get("switchboard_added_circuit_ids", []) or []) if int(x) > 0]
+                )
+            elif kind == UiActionType.REMOVE:
+                result = _execute_remove_for_option(
+                    manager,
+                    doc,
+                    option,
+                    mode,
+                    panel_circuit_index=panel_circuit_index,
+                    dry_run=dry_run,
+                )
+            else:
+                continue
+            for key in counts.keys():
+                counts[key] += int(result.get(key, 0) or 0)
+
+    if bool(dry_run):
+        for panel_id in panel_order:
+            _apply_panel(panel_id)
+        result = dict(counts)
+        result.update({"finalize_summary": dict(finalize_summary), "dry_run": True})
+        return result
+
     tx_group = DB.TransactionGroup(doc, "Add/Remove Spares and Spaces")
     tx_group.Start()
     try:
-        with revit.Transaction("Add/Remove Spares and Spaces - Apply", doc):
-            for action in list(staged_actions or []):
-                panel_id = int(action.get("panel_id", 0) or 0)
-                option = option_lookup.get(int(panel_id))
-                if option is None:
-                    continue
-                kind = UiActionType.normalize(action.get("action_type", ""), default="")
-                mode = str(action.get("mode", "") or "")
-                if kind == UiActionType.ADD:
-                    result = _execute_add_for_option(
-                        manager,
-                        doc,
-                        option,
-                        mode,
-                        panel_circuit_index=panel_circuit_index,
-                    )
-                    unlock_requests.extend(
-                        [(int(panel_id), int(x)) for x in list(result.get("added_slots", []) or [])]
-                    )
-                    added_circuit_ids.extend(
-                        [int(x) for x in list(result.get("added_circuit_ids", []) or []) if int(x) > 0]
-                    )
-                    switchboard_added_circuit_ids.extend(
-                        [int(x) for x in list(result.get("switchboard_added_circuit_ids", []) or []) if int(x) > 0]
-                    )
-                elif kind == UiActionType.REMOVE:
-                    _execute_remove_for_option(
-                        manager,
-                        doc,
-                        option,
-                        mode,
-                        panel_circuit_index=panel_circuit_index,
-                    )
+        for panel_id in panel_order:
+            with revit.Transaction("Add/Remove Spares and Spaces - Apply", doc):
+                _apply_panel(panel_id)
         if unlock_requests or added_circuit_ids or switchboard_added_circuit_ids:
             with revit.Transaction("Add/Remove Spares and Spaces - Finalize Added", doc):
                 finalize_summary = _finalize_added_defaults(
@@ -537,7 +546,6 @@ def execute_staged_actions(doc, staged_actions, option_lookup):
         tx_group.RollBack()
         raise
 
-    return {
-        "finalize_summary": dict(finalize_summary or {}),
-    }
-
+    result = dict(counts)
+    result.update({"finalize_summary": dict(finalize_summary or {}), "dry_run": False})
+    return result
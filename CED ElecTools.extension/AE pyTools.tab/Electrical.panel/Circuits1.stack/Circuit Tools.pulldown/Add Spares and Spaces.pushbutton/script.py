@@ -320,6 +320,7 @@ class AddRemoveSparesSpacesWindow(forms.WPFWindow):
         self.StageAddButton = self.FindName("StageAddButton")
         self.StageRemoveButton = self.FindName("StageRemoveButton")
         self.ResetSelectedButton = self.FindName("ResetSelectedButton")
+        self.ReportButton = self.FindName("ReportButton")
         self.ApplyButton = self.FindName("ApplyButton")
 
     def _set_status(self, text):
@@ -458,6 +459,8 @@ class AddRemoveSparesSpacesWindow(forms.WPFWindow):
             self.StageRemoveButton.IsEnabled = bool(has_targets)
         if self.ResetSelectedButton is not None:
             self.ResetSelectedButton.IsEnabled = bool(has_selected)
+        if self.ReportButton is not None:
+            self.ReportButton.IsEnabled = staged > 0
         if self.ApplyButton is not None:
             self.ApplyButton.IsEnabled = staged > 0
 
@@ -600,6 +603,42 @@ class AddRemoveSparesSpacesWindow(forms.WPFWindow):
         self._rebuild_action_column()
         self._set_status("Reset staged action for {0} row(s).".format(int(count)))
 
+    def _staged_in_order(self):
+        """Return staged actions in panel list order."""
+        staged = []
+        for item in list(self._items or []):
+            action = (self._staged_actions_by_panel or {}).get(int(item.panel_id))
+            if action:
+                staged.append(action)
+        return staged
+
+    def report_clicked(self, sender, args):
+        """Report what the staged actions would add/remove without touching the model."""
+        if not self._staged_actions_by_panel:
+            self._set_status("No staged actions to report.")
+            return
+
+        doc = self._active_doc()
+        if doc is None:
+            self._set_status("No active Revit document.")
+            return
+
+        try:
+            result = execute_staged_actions(doc, self._staged_in_order(), self._panel_option_lookup(), dry_run=True)
+        except Exception as ex:
+            forms.alert("Report failed.\n\n{0}".format(str(ex)), title=TITLE)
+            self._set_status("Report failed.")
+            return
+        message = "Staged panels: {0}\nWould add Spare: {1}, Space: {2}\nWould remove Spare: {3}, Space: {4}".format(
+            len(list(self._staged_actions_by_panel.keys())),
+            int(result.get("added_spares", 0) or 0),
+            int(result.get("added_spaces", 0) or 0),
+            int(result.get("removed_spares", 0) or 0),
+            int(result.get("removed_spaces", 0) or 0),
+        )
+        forms.alert(message, title=TITLE)
+        self._set_status("Report only: no changes were made.")
+
     def apply_clicked(self, sender, args):
         """Apply staged actions in sequence order."""
         if not self._staged_actions_by_panel:
@@ -612,11 +651,7 @@ class AddRemoveSparesSpacesWindow(forms.WPFWindow):
             return
 
         option_lookup = self._panel_option_lookup()
-        staged = []
-        for item in list(self._items or []):
-            action = (self._staged_actions_by_panel or {}).get(int(item.panel_id))
-            if action:
-                staged.append(action)
+        staged = self._staged_in_order()
         try:
             result = execute_staged_actions(doc, staged, option_lookup)
             finalize_summary = dict(result.get("finalize_summary") or {})
@@ -37,6 +37,7 @@ from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repos
 from CEDElectrical.Application.dto.operation_request import OperationRequest
 from CEDElectrical.Application.services.operation_registry import OperationRegistry
 from CEDElectrical.Application.services.operation_runner import OperationRunner
+from CEDElectrical.Application.services import panel_compatibility_index
 from CEDElectrical.Application.operations.panel_schedule_actions import (
     PanelScheduleAddSpareOperation,
     PanelScheduleAddSpaceOperation,
@@ -49,6 +50,7 @@ from CEDElectrical.Application.operations.panel_schedule_actions import (
 from CEDElectrical.Model.panel_schedule_enums import PanelScheduleOperationKey as OpKey
 from CEDElectrical.Model.panel_schedule_enums import PanelSpecialKind as SpecialKind
 from CEDElectrical.Model.panel_schedule_enums import PanelStagedAction as StagedAction
+from CEDElectrical.Model.panel_state_model import PanelRowIndex, PanelStateModel, clone_rows, compile_placements
 from Snippets import revit_helpers
 from UIClasses import resource_loader
 
@@ -297,7 +299,9 @@ class BatchSwapWindow(forms.WPFWindow):
         self._panel_options = []
         self._panel_option_by_id = {}
         self._template_items_by_panel = {}
-        self._working_rows_by_panel = {}
+        self._panel_state = PanelStateModel()
+        self._compat_index = None
+        self._staged_capacity = None
         self._all_panels_cache = []
         self._all_circuits_cache = []
         self._known_panel_ids = set()
@@ -313,8 +317,6 @@ class BatchSwapWindow(forms.WPFWindow):
         self._right_preview_slots = set()
         self._preview_signature = None
         self._preview_moving_keys = set()
-        self._slot_cells_cache = {}
-        self._layout_context_cache = {}
         self._operation_history = []
         self._operation_seq = 0
         self._panel_schedule_runner = _build_panel_schedule_operation_runner()
@@ -480,26 +482,15 @@ class BatchSwapWindow(forms.WPFWindow):
 
     def _clone_rows(self, rows):
         """Return mutable clones of row dictionaries."""
-        clones = []
-        for row in list(rows or []):
-            data = dict(row or {})
-            data["covered_slots"] = [int(x) for x in list(data.get("covered_slots") or []) if int(x) > 0]
-            data["slot_cells"] = list(data.get("slot_cells") or [])
-            clones.append(data)
-        return clones
+        return clone_rows(rows)
 
     def _snapshot_panels(self, panel_ids):
         """Capture row snapshots for operation undo."""
-        snapshots = {}
-        for panel_id in list(panel_ids or []):
-            pid = int(panel_id or 0)
-            if pid <= 0:
-                continue
-            rows = self._working_rows_by_panel.get(pid)
-            if rows is None:
-                continue
-            snapshots[pid] = self._clone_rows(rows)
-        return snapshots
+        return self._panel_state.snapshot([int(x or 0) for x in list(panel_ids or []) if int(x or 0) > 0])
+
+    def _row_index(self, rows, option):
+        """Return a slot/row-key index over working rows for one staging pass."""
+        return PanelRowIndex(rows, lambda row: ps_repo.get_row_covered_slots(row, option=option))
 
     def _slot_display_column_lookup(self, option):
         """Return map of slot->display column for one panel option."""
@@ -562,14 +553,18 @@ class BatchSwapWindow(forms.WPFWindow):
         """Refresh panel/circuit caches used for row construction."""
         doc = doc or self._active_doc()
         self._template_items_by_panel = {}
-        self._slot_cells_cache = {}
-        self._layout_context_cache = {}
+        ps_repo.invalidate_slot_cell_map()
+        ps_repo.invalidate_panel_snapshot()
         if doc is None:
             self._all_panels_cache = []
             self._all_circuits_cache = []
             self._known_panel_ids = set()
+            self._compat_index = None
+            self._staged_capacity = None
             return
         self._all_panels_cache = list(ps_repo.get_all_panels(doc))
+        self._compat_index = panel_compatibility_index.get_compatibility_index(doc, panels=self._all_panels_cache)
+        self._staged_capacity = panel_compatibility_index.StagedCapacity(self._compat_index)
         self._known_panel_ids = set()
         for panel in list(self._all_panels_cache or []):
             try:
@@ -926,7 +921,7 @@ class BatchSwapWindow(forms.WPFWindow):
         panel_id = int(option.get("panel_id", 0) or 0)
         if panel_id <= 0:
             return []
-        cached = self._working_rows_by_panel.get(panel_id)
+        cached = self._panel_state.rows(panel_id)
         if cached is not None:
             return cached
         doc = self._active_doc()
@@ -938,8 +933,11 @@ class BatchSwapWindow(forms.WPFWindow):
             panel_id_set=self._known_panel_ids,
             all_circuits=self._all_circuits_cache,
         )
-        self._working_rows_by_panel[panel_id] = self._clone_rows(loaded)
-        return self._working_rows_by_panel[panel_id]
+        return self._panel_state.load(
+            panel_id,
+            loaded,
+            slot_order=ps_repo.get_option_slot_order(option, include_excess=False),
+        )
 
     def _reload_from_selected_panels(self):
         """Rebind active panel selections to working row state."""
@@ -1013,23 +1011,17 @@ class BatchSwapWindow(forms.WPFWindow):
     def _recompute_transferability(self):
         """Recompute cross-panel compatibility and row display metadata."""
         staged_ids = self._collect_staged_circuit_ids()
-        for row in self._left_rows:
-            row["is_editable"] = bool(self._is_row_editable(row))
-            if bool(row.get("is_excess_slot", False)):
-                ok, reason = False, "Exceeds equipment slot capacity."
-            elif not bool(row.get("is_editable", True)):
-                ok, reason = False, "Owned by {0}".format(str(row.get("edited_by", "") or "another user"))
-            elif str(row.get("kind", "")).lower() in ("spare", "space"):
-                ok, reason = True, ""
-            else:
-                ok, reason = ps_repo.evaluate_transferability(row, self._right_option)
-            row["transferable"] = bool(ok)
-            row["transfer_reason"] = reason
-            row["is_staged"] = bool(int(row.get("circuit_id", 0) or 0) in staged_ids and str(row.get("kind", "")).lower() != "empty")
-            row["meta_text"] = self._row_meta_text(row)
-            row["indicator_text"] = self._row_indicator_text(row)
+        self._recompute_side_transferability(self._left_rows, self._right_option, staged_ids)
+        self._recompute_side_transferability(self._right_rows, self._left_option, staged_ids)
+
+    def _recompute_side_transferability(self, rows, target_option, staged_ids):
+        """Refresh transfer flags for one side from the staged panel model."""
+        target_panel_id = int((target_option or {}).get("panel_id", 0) or 0)
+
+        def _evaluate(row):
+            return ps_repo.evaluate_transferability(row, target_option, compatibility_index=self._compat_index)
 
-        for row in self._right_rows:
+        for row in rows:
             row["is_editable"] = bool(self._is_row_editable(row))
             if bool(row.get("is_excess_slot", False)):
                 ok, reason = False, "Exceeds equipment slot capacity."
@@ -1038,7 +1030,12 @@ class BatchSwapWindow(forms.WPFWindow):
             elif str(row.get("kind", "")).lower() in ("spare", "space"):
                 ok, reason = True, ""
             else:
-                ok, reason = ps_repo.evaluate_transferability(row, self._left_option)
+                ok, reason = self._panel_state.transferability(row, target_panel_id, _evaluate)
+                # Capacity moves with every staged operation, so it is checked outside the cache.
+                if ok and self._staged_capacity is not None:
+                    poles = int(max(1, row.get("poles", 1) or 1))
+                    if not self._staged_capacity.has_capacity(target_panel_id, poles):
+                        ok, reason = False, "Target panel has no free slots for a {0}-pole circuit.".format(poles)
             row["transferable"] = bool(ok)
             row["transfer_reason"] = reason
             row["is_staged"] = bool(int(row.get("circuit_id", 0) or 0) in staged_ids and str(row.get("kind", "")).lower() != "empty")
@@ -1427,8 +1424,26 @@ class BatchSwapWindow(forms.WPFWindow):
             "message": "",
         }
         self._operation_history.append(operation)
+        self._stage_operation_capacity(operation)
         self._renumber_operations()
 
+    def _stage_operation_capacity(self, operation, undo=False):
+        """Stage (or unstage) the cross-panel circuit moves of one operation on this window's capacity overlay."""
+        if self._staged_capacity is None:
+            return
+        for placement in list(operation.get("placements") or []):
+            if placement.get("action") != StagedAction.MOVE:
+                continue
+            if str(placement.get("kind", "") or "").lower() != "circuit":
+                continue
+            from_panel_id = int(placement.get("from_panel_id", 0) or 0)
+            to_panel_id = int(placement.get("to_panel_id", 0) or 0)
+            poles = int(max(1, placement.get("poles", 1) or 1))
+            if undo:
+                self._staged_capacity.unstage_move(poles, to_panel_id, from_panel_id=from_panel_id)
+            else:
+                self._staged_capacity.stage_move(poles, to_panel_id, from_panel_id=from_panel_id)
+
     def _renumber_operations(self):
         """Ensure sequence numbering is continuous after list edits."""
         for idx, operation in enumerate(list(self._operation_history or []), 1):
@@ -1709,7 +1724,7 @@ class BatchSwapWindow(forms.WPFWindow):
             return
 
         self._template_items_by_panel[int(panel_id)] = []
-        self._working_rows_by_panel.pop(int(panel_id), None)
+        self._panel_state.discard(int(panel_id))
         self._refresh_model_caches(doc)
         self._reload_from_selected_panels()
         self._set_status(
@@ -1756,9 +1771,8 @@ class BatchSwapWindow(forms.WPFWindow):
             self._operation_history.remove(op)
         except Exception:
             pass
-        before = dict(op.get("before") or {})
-        for panel_id, rows in before.items():
-            self._working_rows_by_panel[int(panel_id)] = self._clone_rows(rows)
+        self._panel_state.restore(op.get("before") or {})
+        self._stage_operation_capacity(op, undo=True)
         self._renumber_operations()
         self._reload_from_selected_panels()
         self._set_status("Undid operation #{0}.".format(int(op.get("seq", 0))))
@@ -1771,8 +1785,9 @@ class BatchSwapWindow(forms.WPFWindow):
             return
         self._operation_history = [op for op in self._operation_history if str(op.get("status", "pending")).lower() != "pending"]
         self._renumber_operations()
-        self._working_rows_by_panel = {}
-        self._refresh_model_caches()
+        self._panel_state.reset()
+        if self._staged_capacity is not None:
+            self._staged_capacity.clear()
         self._reload_from_selected_panels()
         self._rebuild_change_log()
         self._set_status("Undid {0} pending staged sequence(s).".format(int(pending_count)))
@@ -1787,7 +1802,7 @@ class BatchSwapWindow(forms.WPFWindow):
             return
         self._operation_history = []
         self._renumber_operations()
-        self._working_rows_by_panel = {}
+        self._panel_state.clear()
         self._refresh_model_caches()
         self._reload_from_selected_panels()
         self._rebuild_change_log()
@@ -1821,105 +1836,14 @@ class BatchSwapWindow(forms.WPFWindow):
 
     def _slot_cells(self, schedule_view, slot):
         """Return row/col cells for a schedule slot."""
-        cache_key = self._schedule_slot_cache_key(schedule_view, slot)
-        if cache_key is not None and cache_key in self._slot_cells_cache:
-            return list(self._slot_cells_cache.get(cache_key) or [])
         slot_value = int(slot or 0)
-        if slot_value <= 0:
+        if slot_value <= 0 or schedule_view is None:
             return []
         try:
-            cells = list(ps_repo.get_cells_by_slot_number(schedule_view, slot_value) or [])
-        except Exception:
-            cells = []
-        ordered = self._order_cells_for_slot(schedule_view, slot_value, cells)
-        if cache_key is not None:
-            self._slot_cells_cache[cache_key] = list(ordered)
-        return ordered
-
-    def _schedule_slot_cache_key(self, schedule_view, slot):
-        """Return cache key tuple for slot-cell lookup."""
-        if schedule_view is None:
-            return None
-        try:
-            sid = int(ps_repo._idval(schedule_view.Id))
-        except Exception:
-            sid = 0
-        slot_value = int(slot or 0)
-        if sid <= 0 or slot_value <= 0:
-            return None
-        return (sid, slot_value)
-
-    def _layout_context(self, schedule_view):
-        """Return cached layout context and preferred move columns for one schedule."""
-        if schedule_view is None:
-            return {"max_slot": 0, "sort_mode": "panelboard", "preferred_cols": {}}
-        try:
-            sid = int(ps_repo._idval(schedule_view.Id))
-        except Exception:
-            sid = 0
-        if sid > 0 and sid in self._layout_context_cache:
-            return dict(self._layout_context_cache.get(sid) or {})
-        max_slot = 0
-        try:
-            table = schedule_view.GetTableData()
-            max_slot = int(getattr(table, "NumberOfSlots", 0) or 0)
+            slot_map = ps_repo.get_slot_cell_map(schedule_view)
+            return list(slot_map.ordered_cells(slot_value) or []) if slot_map is not None else []
         except Exception:
-            max_slot = 0
-        sort_mode = ps_repo.classify_schedule_layout(schedule_view)
-        col_counts = {1: {}, 2: {}}
-        if max_slot > 0:
-            for slot in range(1, int(max_slot) + 1):
-                display_col = int(ps_repo.get_slot_display_column(slot, max_slot, sort_mode) or 1)
-                for row, col in list(ps_repo.get_cells_by_slot_number(schedule_view, slot) or []):
-                    try:
-                        cid = int(self._cell_circuit_id(schedule_view, row, col))
-                    except Exception:
-                        cid = 0
-                    if cid <= 0:
-                        continue
-                    bucket = col_counts.setdefault(display_col, {})
-                    bucket[int(col)] = int(bucket.get(int(col), 0) or 0) + 1
-        preferred_cols = {}
-        for display_col, bucket in col_counts.items():
-            ordered = [pair[0] for pair in sorted(bucket.items(), key=lambda x: (-int(x[1]), int(x[0])))]
-            preferred_cols[int(display_col)] = [int(x) for x in ordered]
-        context = {
-            "max_slot": int(max_slot),
-            "sort_mode": sort_mode,
-            "preferred_cols": preferred_cols,
-        }
-        if sid > 0:
-            self._layout_context_cache[sid] = dict(context)
-        return context
-
-    def _order_cells_for_slot(self, schedule_view, slot, cells):
-        """Order slot cells by preferred columns derived from existing circuits."""
-        seen = set()
-        ordered = []
-        for pair in list(cells or []):
-            if not pair or len(pair) < 2:
-                continue
-            key = (int(pair[0]), int(pair[1]))
-            if key in seen:
-                continue
-            seen.add(key)
-            ordered.append(key)
-        if not ordered:
             return []
-        context = self._layout_context(schedule_view)
-        max_slot = int(context.get("max_slot", 0) or 0)
-        sort_mode = context.get("sort_mode", "panelboard")
-        display_col = int(ps_repo.get_slot_display_column(int(slot or 0), max_slot, sort_mode) or 1)
-        preferred_cols = list((context.get("preferred_cols") or {}).get(display_col) or [])
-        priority = {}
-        for idx, col in enumerate(preferred_cols):
-            try:
-                priority[int(col)] = int(idx)
-            except Exception:
-                continue
-        fallback_rank = 999999
-        ordered.sort(key=lambda pair: (int(priority.get(int(pair[1]), fallback_rank)), int(pair[1]), int(pair[0])))
-        return ordered
 
     def _cell_circuit_id(self, schedule_view, row, col):
         """Return circuit id at one schedule cell, or 0."""
@@ -2520,153 +2444,132 @@ class BatchSwapWindow(forms.WPFWindow):
         )
         return self._panel_schedule_runner.run(request, doc)
 
-    def _apply_sequence_operation(self, doc, operation):
-        """Apply one staged sequence operation inside its own transaction group."""
-        seq = int(operation.get("seq", 0) or 0)
-        seq_tg = DB.TransactionGroup(doc, "Batch Swap Sequence #{0}".format(seq))
-        seq_tg.Start()
-        try:
-            temp_id_map = {}
-            for idx, placement in enumerate(list(operation.get("placements") or []), 1):
-                action_name = StagedAction.normalize(placement.get("action", ""))
-                effective = dict(placement)
-                original_circuit_id = int(placement.get("circuit_id", 0) or 0)
-                if original_circuit_id < 0 and original_circuit_id in temp_id_map:
-                    effective["circuit_id"] = int(temp_id_map.get(original_circuit_id))
-                linked_id = int(placement.get("for_circuit_id", 0) or 0)
-                if linked_id < 0 and linked_id in temp_id_map:
-                    effective["for_circuit_id"] = int(temp_id_map.get(linked_id))
-                if action_name == StagedAction.MOVE and int(effective.get("circuit_id", 0) or 0) <= 0:
-                    raise Exception(
-                        "Move action for staged special could not resolve runtime circuit id (temp id: {0}).".format(
-                            int(original_circuit_id)
-                        )
-                    )
-                LOGGER.info(
-                    "Apply sequence #%s step=%s action=%s ckt=%s from=%s[%s] to=%s[%s] condition=%s",
-                    int(seq),
-                    int(idx),
-                    str(effective.get("action", "") or ""),
-                    int(effective.get("circuit_id", 0) or 0),
-                    str(effective.get("from_panel_name", "") or ""),
-                    ",".join([str(x) for x in list(effective.get("old_covered_slots") or [])]) or "-",
-                    str(effective.get("to_panel_name", "") or ""),
-                    ",".join([str(x) for x in list(effective.get("new_covered_slots") or [])]) or "-",
-                    str(effective.get("target_condition", "") or ""),
+    def _apply_compiled_step(self, doc, index, step, temp_id_map):
+        """Apply one compiled placement, resolving staged temp ids from earlier adds."""
+        placement = step.get("placement") or {}
+        seqs = ",".join([str(x) for x in list(step.get("seqs") or [])]) or "-"
+        action_name = StagedAction.normalize(placement.get("action", ""))
+        effective = dict(placement)
+        original_circuit_id = int(placement.get("circuit_id", 0) or 0)
+        if original_circuit_id < 0 and original_circuit_id in temp_id_map:
+            effective["circuit_id"] = int(temp_id_map.get(original_circuit_id))
+        linked_id = int(placement.get("for_circuit_id", 0) or 0)
+        if linked_id < 0 and linked_id in temp_id_map:
+            effective["for_circuit_id"] = int(temp_id_map.get(linked_id))
+        if action_name == StagedAction.MOVE and int(effective.get("circuit_id", 0) or 0) <= 0:
+            raise Exception(
+                "Move action for staged special could not resolve runtime circuit id (temp id: {0}).".format(
+                    int(original_circuit_id)
                 )
-                def _tx_action():
-                    return self._apply_placement(doc, effective)
+            )
+        LOGGER.info(
+            "Apply step=%s seqs=%s action=%s ckt=%s from=%s[%s] to=%s[%s] condition=%s",
+            int(index),
+            seqs,
+            str(effective.get("action", "") or ""),
+            int(effective.get("circuit_id", 0) or 0),
+            str(effective.get("from_panel_name", "") or ""),
+            ",".join([str(x) for x in list(effective.get("old_covered_slots") or [])]) or "-",
+            str(effective.get("to_panel_name", "") or ""),
+            ",".join([str(x) for x in list(effective.get("new_covered_slots") or [])]) or "-",
+            str(effective.get("target_condition", "") or ""),
+        )
 
-                tx_result = self._run_transaction(
-                    doc,
-                    "Batch Swap Seq #{0} - Step {1}".format(int(seq), int(idx)),
-                    _tx_action,
-                )
-                if is_add_action(action_name) and int(original_circuit_id) < 0:
+        def _tx_action():
+            return self._apply_placement(doc, effective)
+
+        tx_result = self._run_transaction(
+            doc,
+            "Batch Swap Step {0} (#{1})".format(int(index), seqs),
+            _tx_action,
+        )
+        if is_add_action(action_name) and int(original_circuit_id) < 0:
+            resolved_id = 0
+            if isinstance(tx_result, dict):
+                try:
+                    resolved_id = int(tx_result.get("circuit_id", 0) or 0)
+                except Exception:
                     resolved_id = 0
-                    if isinstance(tx_result, dict):
-                        try:
-                            resolved_id = int(tx_result.get("circuit_id", 0) or 0)
-                        except Exception:
-                            resolved_id = 0
-                    if resolved_id > 0:
-                        temp_id_map[int(original_circuit_id)] = int(resolved_id)
-
-            seq_tg.Assimilate()
-            return []
-        except Exception as ex:
-            LOGGER.warning("Apply sequence #{0} failed and rolled back: {1}".format(int(seq), str(ex)))
-            try:
-                seq_tg.RollBack()
-            except Exception:
-                pass
-            raise
+            if resolved_id > 0:
+                temp_id_map[int(original_circuit_id)] = int(resolved_id)
 
     def _apply_pending_operations(self):
-        """Apply all pending operations in sequence order."""
+        """Compile pending operations into one ordered plan and apply it in a single transaction group."""
         pending = sorted(list(self._iter_pending_operations()), key=lambda x: int(x.get("seq", 0)))
         if not pending:
             self._set_status("No pending staged actions to apply.")
             return
-        LOGGER.info("Apply requested. pending_sequences=%s", len(pending))
 
         doc = self._active_doc()
         if doc is None:
             self._set_status("No active Revit document.")
             return
 
-        outer_tg = DB.TransactionGroup(doc, "Batch Swap Circuits - Apply")
-        success_count = 0
-        failed_seq = 0
-        failed_msg = ""
-        executed_failure = False
+        steps, compiled = compile_placements(pending)
+        staged_count = sum([len(list(op.get("placements") or [])) for op in pending])
+        LOGGER.info(
+            "Apply requested. pending_sequences=%s staged_placements=%s steps=%s compiled=%s",
+            len(pending),
+            int(staged_count),
+            len(steps),
+            bool(compiled),
+        )
 
+        tx_group = DB.TransactionGroup(doc, "Batch Swap Circuits - Apply")
+        failed_seqs = []
+        failed_msg = ""
         try:
-            outer_tg.Start()
-            for operation in pending:
-                seq = int(operation.get("seq", 0) or 0)
+            tx_group.Start()
+            temp_id_map = {}
+            for idx, step in enumerate(steps, 1):
                 try:
-                    seq_warnings = self._apply_sequence_operation(doc, operation) or []
-                    if seq_warnings:
-                        self._set_operation_status(operation, "warning", "Applied with warnings: {0}".format(" | ".join([str(x) for x in seq_warnings])))
-                    else:
-                        self._set_operation_status(operation, "completed", "")
-                    success_count += 1
+                    self._apply_compiled_step(doc, idx, step, temp_id_map)
                 except Exception as ex:
-                    failed_seq = int(seq)
-                    failed_msg = str(ex or "Sequence failed.")
-                    LOGGER.warning("Apply failed at sequence #{0}: {1}".format(int(failed_seq), failed_msg))
-                    self._set_operation_status(operation, "failed", failed_msg)
-                    executed_failure = True
-                    break
-
-            if executed_failure:
-                mark_remaining = False
-                for operation in pending:
-                    seq = int(operation.get("seq", 0) or 0)
-                    if seq == failed_seq:
-                        mark_remaining = True
-                        continue
-                    if mark_remaining and str(operation.get("status", "pending")).lower() == "pending":
-                        self._set_operation_status(operation, "failed", "Not executed after failure at sequence #{0}.".format(failed_seq))
-
-            if success_count > 0:
-                outer_tg.Assimilate()
-            else:
-                outer_tg.RollBack()
+                    failed_seqs = [int(x) for x in list(step.get("seqs") or [])]
+                    failed_msg = str(ex or "Step failed.")
+                    raise
+            tx_group.Assimilate()
         except Exception as ex:
             try:
-                outer_tg.RollBack()
+                tx_group.RollBack()
             except Exception:
                 pass
+            if not failed_msg:
+                forms.alert(
+                    "Apply failed unexpectedly.\n\n{0}".format(str(ex)),
+                    title=TITLE,
+                )
+                self._rebuild_change_log()
+                return
+            LOGGER.warning("Apply failed at sequence(s) {0} and was rolled back: {1}".format(failed_seqs, failed_msg))
+            for operation in pending:
+                if int(operation.get("seq", 0) or 0) in failed_seqs:
+                    self._set_operation_status(operation, "failed", failed_msg)
+                else:
+                    self._set_operation_status(operation, "failed", "Not applied; batch rolled back.")
+            self._panel_state.clear()
+            self._refresh_model_caches(doc)
+            self._reload_from_selected_panels()
+            self._rebuild_change_log()
             forms.alert(
-                "Apply failed unexpectedly.\n\n{0}".format(str(ex)),
+                "Apply failed at sequence #{0}; no changes were made.\n\n{1}".format(
+                    ", #".join([str(x) for x in failed_seqs]) or "?",
+                    failed_msg,
+                ),
                 title=TITLE,
             )
-            self._rebuild_change_log()
+            self._set_status("Apply rolled back. Failure at sequence #{0}.".format(", #".join([str(x) for x in failed_seqs]) or "?"))
             return
 
-        self._working_rows_by_panel = {}
+        for operation in pending:
+            self._set_operation_status(operation, "completed", "")
+        self._panel_state.clear()
         self._refresh_model_caches(doc)
         self._reload_from_selected_panels()
         self._rebuild_change_log()
-
-        if executed_failure:
-            forms.alert(
-                "Apply stopped at sequence #{0}.\n\nSuccessfully applied: {1}\nFailure: {2}".format(
-                    int(failed_seq),
-                    int(success_count),
-                    failed_msg or "Unknown error.",
-                ),
-                title=TITLE,
-            )
-            self._set_status(
-                "Apply stopped at sequence #{0}. Applied {1} sequence(s).".format(
-                    int(failed_seq), int(success_count)
-                )
-            )
-        else:
-            self._set_status("Apply completed. Applied {0} sequence(s).".format(int(success_count)))
+        self._set_status(
+            "Apply completed. Applied {0} sequence(s) in {1} step(s).".format(int(len(pending)), int(len(steps)))
+        )
 
     def _stage_add_special(self, kind):
         """Stage adding spare/space rows into selected empty slots."""
@@ -2707,6 +2610,7 @@ class BatchSwapWindow(forms.WPFWindow):
         before = self._snapshot_panels(touched_panels)
         placements = []
         rejected = 0
+        indexes = {}
 
         for rows, option, row in sorted(targets, key=lambda x: (int(x[1].get("panel_id", 0) or 0), int(x[2].get("slot", 0) or 0))):
             is_data_panel = False
@@ -2730,10 +2634,13 @@ class BatchSwapWindow(forms.WPFWindow):
             if not covered:
                 rejected += 1
                 continue
-            occupancy = self._slot_occupancy(rows, option)
+            index = indexes.get(id(rows))
+            if index is None:
+                index = self._row_index(rows, option)
+                indexes[id(rows)] = index
             valid = True
             for slot in covered:
-                occ = occupancy.get(int(slot))
+                occ = index.at(slot)
                 if occ is None or str(occ.get("kind", "")) != "empty":
                     valid = False
                     break
@@ -2742,10 +2649,7 @@ class BatchSwapWindow(forms.WPFWindow):
                 continue
 
             for occ_slot in covered:
-                for existing in list(rows):
-                    if str(existing.get("kind", "")) == "empty" and int(existing.get("slot", 0) or 0) == int(occ_slot):
-                        self._remove_row_by_key(rows, existing.get("row_key"))
-                        break
+                index.remove(index.at(occ_slot))
 
             staged = self._build_staged_special_row(option, slot_value, kind_value, spare_rating=spare_rating)
             staged["poles"] = int(poles)
@@ -2753,7 +2657,7 @@ class BatchSwapWindow(forms.WPFWindow):
             staged["span"] = int(max(1, len(covered)))
             staged["covered_slots"] = [int(x) for x in covered]
             staged["circuit_number"] = ps_repo.predict_circuit_number(option, slot_value, poles=poles)
-            rows.append(staged)
+            index.add(staged)
             placements.append(
                 {
                     "action": StagedAction.ADD_SPARE if kind_value == SpecialKind.SPARE else StagedAction.ADD_SPACE,
@@ -2784,7 +2688,7 @@ class BatchSwapWindow(forms.WPFWindow):
             if item is None:
                 continue
             option = getattr(item, "option", None)
-            rows = self._working_rows_by_panel.get(int(panel_id))
+            rows = self._panel_state.rows(int(panel_id))
             if option is not None and rows is not None:
                 self._normalize_rows(rows, option)
 
@@ -2829,17 +2733,22 @@ class BatchSwapWindow(forms.WPFWindow):
         touched_panels = set([int(option.get("panel_id", 0) or 0) for _, option, _ in targets])
         before = self._snapshot_panels(touched_panels)
         placements = []
+        indexes = {}
 
         for rows, option, row in targets:
             kind = str(row.get("kind", "") or "").lower()
             covered = ps_repo.get_row_covered_slots(row, option=option)
             if not covered:
                 covered = [int(row.get("slot", 0) or 0)]
-            self._remove_row_by_key(rows, row.get("row_key"))
+            index = indexes.get(id(rows))
+            if index is None:
+                index = self._row_index(rows, option)
+                indexes[id(rows)] = index
+            index.remove(row)
             for slot_value in covered:
                 if int(slot_value or 0) <= 0:
                     continue
-                rows.append(ps_repo.build_empty_row(option, int(slot_value)))
+                index.add(ps_repo.build_empty_row(option, int(slot_value)))
             placements.append(
                 {
                     "action": StagedAction.REMOVE_SPARE if kind == SpecialKind.SPARE else StagedAction.REMOVE_SPACE,
@@ -2869,7 +2778,7 @@ class BatchSwapWindow(forms.WPFWindow):
             if item is None:
                 continue
             option = getattr(item, "option", None)
-            rows = self._working_rows_by_panel.get(int(panel_id))
+            rows = self._panel_state.rows(int(panel_id))
             if option is not None and rows is not None:
                 self._normalize_rows(rows, option)
 
@@ -3240,20 +3149,11 @@ class BatchSwapWindow(forms.WPFWindow):
         else:
             self._set_status("Staged {0} circuit(s).".format(moved))
 
-    def _remove_row_by_key(self, rows, row_key):
-        """Remove first row with matching row key."""
-        target_key = str(row_key or "")
-        for idx, row in enumerate(list(rows or [])):
-            if str(row.get("row_key", "")) == target_key:
-                try:
-                    rows.pop(idx)
-                except Exception:
-                    pass
-                return True
-        return False
-
     def _next_slot_after(self, option, slot):
         """Return next slot in panel display order."""
+        panel_id = int((option or {}).get("panel_id", 0) or 0)
+        if self._panel_state.has_panel(panel_id):
+            return self._panel_state.next_slot_after(panel_id, slot)
         slot_order = ps_repo.get_option_slot_order(option, include_excess=False)
         current = int(slot or 0)
         if current not in slot_order:
@@ -3274,11 +3174,21 @@ class BatchSwapWindow(forms.WPFWindow):
             return bool(row.get("is_space_removable", False))
         return False
 
-    def _clear_target_range(self, target_rows, covered_slots, allow_discard, target_option):
+    def _clear_target_range(self, target_rows, covered_slots, allow_discard, target_option, index=None):
         """Clear overlapping rows in target slot range when allowed."""
         target_slots = set([int(x) for x in list(covered_slots or []) if int(x) > 0])
         if not target_slots:
             return []
+        if index is not None:
+            removed = []
+            for row in index.rows_in_slots(target_slots):
+                kind = str(row.get("kind", "empty"))
+                if kind == "empty":
+                    index.remove(row)
+                elif self._can_discard_row(row, allow_discard):
+                    removed.append(copy.copy(row))
+                    index.remove(row)
+            return removed
         kept = []
         removed = []
         for row in list(target_rows or []):
@@ -3310,9 +3220,10 @@ class BatchSwapWindow(forms.WPFWindow):
                 occupancy[int(covered)] = row
         return occupancy
 
-    def _target_condition_label(self, target_rows, target_option, covered_slots):
+    def _target_condition_label(self, target_rows, target_option, covered_slots, occupancy=None):
         """Return summary label for current target occupancy in covered slots."""
-        occupancy = self._slot_occupancy(target_rows, target_option)
+        if occupancy is None:
+            occupancy = self._slot_occupancy(target_rows, target_option)
         kinds = []
         for slot in [int(x) for x in list(covered_slots or []) if int(x) > 0]:
             row = occupancy.get(int(slot))
@@ -3342,10 +3253,12 @@ class BatchSwapWindow(forms.WPFWindow):
         preferred_slot=0,
         absolute_only=False,
         temporary_row_keys=None,
+        occupancy=None,
     ):
         """Find first slot where moving row can fit."""
         slot_order = ps_repo.get_option_slot_order(target_option, include_excess=False)
-        occupancy = self._slot_occupancy(target_rows, target_option)
+        if occupancy is None:
+            occupancy = self._slot_occupancy(target_rows, target_option)
 
         preferred = int(preferred_slot or 0)
         ordered_starts = list(slot_order)
@@ -3453,12 +3366,15 @@ class BatchSwapWindow(forms.WPFWindow):
         if record_history:
             before_snapshots = self._snapshot_panels([source_panel_id, target_panel_id])
 
+        source_index = self._row_index(source_rows, source_option)
+        if source_rows is target_rows:
+            target_index = source_index
+        else:
+            target_index = self._row_index(target_rows, target_option)
+
         moving_rows = []
-        source_map = {}
-        for row in list(source_rows or []):
-            source_map[str(row.get("row_key", ""))] = row
         for key in list(moving_keys or []):
-            row = source_map.get(str(key))
+            row = source_index.by_key(key)
             if row is None:
                 continue
             if not self._is_movable_row(row):
@@ -3487,7 +3403,7 @@ class BatchSwapWindow(forms.WPFWindow):
                 "considered": int(len(list(moving_keys or []))),
             }
 
-        if bool(all_or_nothing):
+        if bool(all_or_nothing) and record_history:
             source_probe = self._clone_rows(source_rows)
             if source_rows is target_rows:
                 target_probe = source_probe
@@ -3530,6 +3446,7 @@ class BatchSwapWindow(forms.WPFWindow):
                 preferred_slot=next_preferred_slot,
                 absolute_only=absolute_only,
                 temporary_row_keys=moving_key_set if same_panel else None,
+                occupancy=target_index.occupancy(),
             )
             if fit_slot is None:
                 rejected_count += 1
@@ -3540,11 +3457,11 @@ class BatchSwapWindow(forms.WPFWindow):
             if not old_covered:
                 old_covered = [old_slot] if old_slot > 0 else []
 
-            self._remove_row_by_key(source_rows, moving.get("row_key"))
+            source_index.remove_key(moving.get("row_key"))
             for free_slot in old_covered:
                 if int(free_slot or 0) <= 0:
                     continue
-                source_rows.append(ps_repo.build_empty_row(source_option, free_slot))
+                source_index.add(ps_repo.build_empty_row(source_option, free_slot))
 
             target_covered = ps_repo.get_slot_span_slots_for_option(
                 target_option,
@@ -3556,6 +3473,7 @@ class BatchSwapWindow(forms.WPFWindow):
                 target_rows=target_rows,
                 target_option=target_option,
                 covered_slots=target_covered,
+                occupancy=target_index.occupancy(),
             )
 
             removed_rows = self._clear_target_range(
@@ -3563,6 +3481,7 @@ class BatchSwapWindow(forms.WPFWindow):
                 covered_slots=target_covered,
                 allow_discard=allow_discard,
                 target_option=target_option,
+                index=target_index,
             )
             for removed in list(removed_rows or []):
                 removed_kind = str(removed.get("kind", "") or "").strip().lower()
@@ -3615,7 +3534,7 @@ class BatchSwapWindow(forms.WPFWindow):
                 int(placed.get("circuit_id", 0)),
                 moved_count + 1,
             )
-            target_rows.append(placed)
+            target_index.add(placed)
             moved_count += 1
             next_preferred_slot = self._next_slot_after(target_option, placed["covered_slots"][-1])
 
@@ -3649,6 +3568,14 @@ class BatchSwapWindow(forms.WPFWindow):
             self._normalize_rows(target_rows, target_option)
 
         total_rejected = rejected_count + max(0, (len(moving_keys or []) - len(moving_rows)))
+        if bool(all_or_nothing) and not record_history and moved_count < len(moving_rows):
+            # Probe/preview pass on throwaway rows: report all-or-nothing without a second staging run.
+            return {
+                "moved": 0,
+                "rejected": int(len(moving_rows)),
+                "placements": [],
+                "considered": int(len(moving_rows)),
+            }
         result = {
             "moved": moved_count,
             "rejected": total_rejected,
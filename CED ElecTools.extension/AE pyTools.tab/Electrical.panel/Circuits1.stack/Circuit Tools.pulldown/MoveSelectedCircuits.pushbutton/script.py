@@ -9,7 +9,7 @@ from CEDElectrical.Application.dto.operation_request import OperationRequest
 from CEDElectrical.Application.services.operation_runner import build_default_runner
 from Snippets import revit_helpers
 # Import reusable utilities
-from Snippets._elecutils import get_panel_dist_system, get_compatible_panels, \
+from Snippets._elecutils import get_panel_dist_system, get_common_compatible_panels, \
     get_all_panels, panel_has_schedule_view
 
 # Get the current document
@@ -270,17 +270,10 @@ def main():
     selected_circuits = get_circuits_from_selection()
     all_panels = get_all_panels(doc)
 
-    compatible_panels = []
-    for idx, circuit in enumerate(selected_circuits):
-        circuit_panels = list(get_compatible_panels(circuit, all_panels, doc) or [])
-        if idx == 0:
-            compatible_panels = circuit_panels
-        else:
-            allowed_ids = set([_idval(p.Id) for p in list(circuit_panels or [])])
-            compatible_panels = [
-                panel for panel in list(compatible_panels or [])
-                if _idval(panel.Id) in allowed_ids
-            ]
+    # Near-full panels stay listed: the move service offers partial and replace-defaults moves.
+    compatible_panels = get_common_compatible_panels(
+        selected_circuits, all_panels, doc, refresh=False, require_capacity=False
+    )
 
     if not compatible_panels:
         forms.alert(
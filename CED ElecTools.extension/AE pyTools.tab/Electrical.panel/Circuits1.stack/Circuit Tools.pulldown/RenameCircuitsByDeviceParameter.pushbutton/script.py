@@ -1014,6 +1014,79 @@ def _circuit_ref(circuit):
     return "{} / {} ({})".format(panel_name, circuit_number, output.linkify(circuit.Id))
 
 
+PLAN_RENAME = "rename"
+PLAN_UNCHANGED = "unchanged"
+PLAN_EMPTY = "empty"
+
+
+def _build_rename_plan(target_ids, rows_by_id, names_by_id):
+    """Return one entry per target circuit with its current and proposed name and the planned action."""
+    plan = []
+    seen = set()
+    for cid in target_ids:
+        row = rows_by_id.get(cid)
+        if not row or cid in seen:
+            continue
+        seen.add(cid)
+        circuit = row["circuit"]
+        current = _safe_text(circuit.LoadName)
+        proposed = _safe_text(names_by_id.get(cid))
+        if not proposed:
+            status = PLAN_EMPTY
+        elif proposed == current:
+            status = PLAN_UNCHANGED
+        else:
+            status = PLAN_RENAME
+        plan.append({
+            "circuit_id": cid,
+            "circuit": circuit,
+            "current": current,
+            "proposed": proposed,
+            "status": status,
+        })
+    return plan
+
+
+def _find_duplicate_names(plan):
+    """Return [(panel name, load name, circuits)] where the planned names collide on one panel.
+
+    Panel siblings outside the selection keep their current names and are
+    read once per panel.
+    """
+    final_by_id = {}
+    panels = OrderedDict()
+    for entry in plan:
+        name = entry["proposed"] if entry["status"] == PLAN_RENAME else entry["current"]
+        final_by_id[entry["circuit_id"]] = name
+        try:
+            panel = entry["circuit"].BaseEquipment
+        except Exception:
+            panel = None
+        if panel is not None:
+            panels.setdefault(_elid_value(panel.Id), panel)
+
+    duplicates = []
+    for panel in panels.values():
+        try:
+            siblings = list(panel.MEPModel.GetAssignedElectricalSystems() or [])
+        except Exception:
+            siblings = []
+        by_name = OrderedDict()
+        for circuit in siblings:
+            if not _is_valid_circuit(circuit):
+                continue
+            cid = _elid_value(circuit.Id)
+            name = final_by_id.get(cid, _safe_text(circuit.LoadName))
+            if not name:
+                continue
+            by_name.setdefault(name.upper(), (name, []))[1].append(circuit)
+        panel_name = _safe_text(panel.Name) or "No Panel"
+        for name, circuits in by_name.values():
+            if len(circuits) > 1 and any(_elid_value(c.Id) in final_by_id for c in circuits):
+                duplicates.append((panel_name, name, circuits))
+    return duplicates
+
+
 def main():
     selected_elements = _get_selected_elements()
     circuit_map = _build_circuit_map(selected_elements)
@@ -1033,39 +1106,40 @@ def main():
     if not target_ids:
         forms.alert("No circuits selected for rename.", exitscript=True)
 
+    plan = _build_rename_plan(target_ids, rows_by_id, names_by_id)
+    duplicates = _find_duplicate_names(plan)
+
     results = []
     renamed_count = 0
     skipped_count = 0
     unchanged_count = 0
 
-    with revit.Transaction("Rename Circuits by Device Parameter"):
-        for cid in target_ids:
-            row = rows_by_id.get(cid)
-            if not row:
-                continue
-
-            circuit = row["circuit"]
-            previous_name = _safe_text(circuit.LoadName)
-            new_name = _safe_text(names_by_id.get(cid))
-
-            if not new_name:
-                skipped_count += 1
-                results.append([_circuit_ref(circuit), previous_name or "-", "-", "Skipped: Resulting name is empty."])
-                continue
-
-            if new_name == previous_name:
-                unchanged_count += 1
-                results.append([_circuit_ref(circuit), previous_name or "-", new_name, "No Change"])
-                continue
-
-            set_error = _set_circuit_name(circuit, new_name)
-            if set_error:
-                skipped_count += 1
-                results.append([_circuit_ref(circuit), previous_name or "-", new_name, "Skipped: {}".format(set_error)])
-                continue
-
-            renamed_count += 1
-            results.append([_circuit_ref(circuit), previous_name or "-", new_name, "Renamed"])
+    changes = [entry for entry in plan if entry["status"] == PLAN_RENAME]
+    for entry in plan:
+        if entry["status"] == PLAN_EMPTY:
+            skipped_count += 1
+            results.append([_circuit_ref(entry["circuit"]), entry["current"] or "-", "-", "Skipped: Resulting name is empty."])
+        elif entry["status"] == PLAN_UNCHANGED:
+            unchanged_count += 1
+            results.append([_circuit_ref(entry["circuit"]), entry["current"] or "-", entry["proposed"], "No Change"])
+
+    # Only real changes are written, so the transaction touches as few elements as possible.
+    if changes:
+        with revit.Transaction("Rename Circuits by Device Parameter"):
+            for entry in changes:
+                circuit = entry["circuit"]
+                set_error = _set_circuit_name(circuit, entry["proposed"])
+                if set_error:
+                    skipped_count += 1
+                    results.append([
+                        _circuit_ref(circuit),
+                        entry["current"] or "-",
+                        entry["proposed"],
+                        "Skipped: {}".format(set_error),
+                    ])
+                    continue
+                renamed_count += 1
+                results.append([_circuit_ref(circuit), entry["current"] or "-", entry["proposed"], "Renamed"])
 
     output.print_md("### Rename Circuits by Device Parameter")
     output.print_md(
@@ -1074,10 +1148,16 @@ def main():
         )
     )
     output.print_table(results, ["Circuit", "Previous Name", "New Name", "Status"])
+    if duplicates:
+        output.print_md("#### Duplicate Load Names")
+        output.print_table(
+            [[panel_name, name, ", ".join([_circuit_ref(c) for c in circuits])] for panel_name, name, circuits in duplicates],
+            ["Panel", "Load Name", "Circuits"],
+        )
 
     forms.alert(
-        "Processed {} circuit(s).\nRenamed: {}\nSkipped: {}\nNo Change: {}".format(
-            len(target_ids), renamed_count, skipped_count, unchanged_count
+        "Processed {} circuit(s).\nRenamed: {}\nSkipped: {}\nNo Change: {}\nDuplicate Names: {}".format(
+            len(target_ids), renamed_count, skipped_count, unchanged_count, len(duplicates)
         ),
         title="Rename Circuits by Device Parameter",
         exitscript=False
@@ -20,6 +20,8 @@ def _idval(item):
 # 0) Constants
 # -----------------------------------------------------------------------------
 FILTER_PREFIX = "PanelChecker - {0} - {1}"  # part_type, panel_name
+PANEL_FILTER_NAME = "Panel Checker - {0}"  # panel label
+PANEL_FILTER_NAME_PREFIX = "Panel Checker - "
 LEGEND_VIEW_NAME = "PanelChecker Legend"
 FILLED_REGION_TYPE_NAME = "PanelChecker - Solid Fill"
 VIEW_TEMPLATE_NAME = "E_PanelChecker View"
@@ -286,24 +288,32 @@ def enforce_template_controls_only_filters(template_view):
         logger.debug("Failed to restrict template controls: {}".format(ex))
 
 
-def apply_filters_to_template(view_template, filter_override_data):
-    try:
-        current_filters = list(view_template.GetFilters())
-        for f_id in current_filters:
-            filt = doc.GetElement(f_id)
-            if not filt or not filt.Name.startswith("PanelChecker -"):
-                view_template.RemoveFilter(f_id)
-    except Exception as ex:
-        logger.debug("Failed to clear old filters: {0}".format(ex))
+def apply_filters_to_views(target_views, filter_override_data):
+    """Apply all filter overrides to every target view in one pass.
 
-    for pfe, ogs in filter_override_data:
+    Each view's applied filters are read once; filters that are not part of
+    this run are removed, and only missing filters are added.
+    """
+    wanted_ids = set([_idval(pfe.Id) for pfe, _ in filter_override_data])
+    for view in target_views:
+        applied_ids = set()
         try:
-            if not view_template.IsFilterApplied(pfe.Id):
-                view_template.AddFilter(pfe.Id)
-            view_template.SetFilterOverrides(pfe.Id, ogs)
-            view_template.SetFilterVisibility(pfe.Id, True)
+            for f_id in list(view.GetFilters()):
+                if _idval(f_id) in wanted_ids:
+                    applied_ids.add(_idval(f_id))
+                else:
+                    view.RemoveFilter(f_id)
         except Exception as ex:
-            logger.debug("Failed to apply filter '{0}' to template: {1}".format(pfe.Name, ex))
+            logger.debug("Failed to clear old filters: {0}".format(ex))
+
+        for pfe, ogs in filter_override_data:
+            try:
+                if _idval(pfe.Id) not in applied_ids:
+                    view.AddFilter(pfe.Id)
+                view.SetFilterOverrides(pfe.Id, ogs)
+                view.SetFilterVisibility(pfe.Id, True)
+            except Exception as ex:
+                logger.debug("Failed to apply filter '{0}' to view '{1}': {2}".format(pfe.Name, view.Name, ex))
 
 
 def activate_temp_view_mode(view, template):
@@ -469,29 +479,68 @@ def create_or_update_legend_drafting_view(legend_view, color_map, template, fr_t
             logger.debug("Failed to create text note for {}: {}".format(panel_name, ex))
 
 
-def create_or_update_panel_filter_logical_or(panel_name):
+def build_filter_index(doc):
+    """Return {name: ParameterFilterElement} from one collector pass."""
+    index = {}
+    for pfe in DB.FilteredElementCollector(doc).OfClass(DB.ParameterFilterElement):
+        try:
+            index[pfe.Name] = pfe
+        except Exception:
+            continue
+    return index
+
+
+def get_filter_category_ids(doc):
+    """Return [(BuiltInCategory, BuiltInParameter, category ElementId)] for the filtered categories."""
+    resolved = []
+    for bic, bip in POWER_FIXTURE_EQUIP.items():
+        try:
+            cat = doc.Settings.Categories.get_Item(bic)
+        except Exception as ex:
+            logger.debug("Failed to resolve category {0}: {1}".format(bic.ToString(), ex))
+            continue
+        if cat:
+            resolved.append((bic, bip, cat.Id))
+    return resolved
+
+
+def panel_filter_name(panel_name):
+    filter_label = "No Panel" if panel_name == NO_PANEL_FLAG else panel_name
+    return PANEL_FILTER_NAME.format(filter_label)
+
+
+def _filter_categories_match(pfe, cat_ids):
+    try:
+        current = set([_idval(x) for x in pfe.GetCategories()])
+    except Exception:
+        return False
+    return current == set([_idval(x) for x in cat_ids])
+
+
+def create_or_update_panel_filter_logical_or(panel_name, filter_index, category_info, reuse_existing=False):
     """Creates or updates a ParameterFilterElement with a Logical OR of per-category ElementParameterFilters.
        Special handling: if panel_name == "__NO_PANEL__", then:
          - Electrical Equipment: Supply From == ""
          - Fixtures/Devices: Panel == ""
          - Detail Items: Comments == "__NO PANEL__"
+       filter_index (name -> filter) is updated with created filters. With reuse_existing,
+       an existing filter over the same categories is returned untouched.
     """
     is_no_panel = (panel_name == NO_PANEL_FLAG)
     filter_label = "No Panel" if is_no_panel else panel_name
-    filter_name = "Panel Checker - {0}".format(filter_label)
+    filter_name = panel_filter_name(panel_name)
     logger.debug("Building filter: {0}".format(filter_name))
 
+    existing = filter_index.get(filter_name)
+    cat_ids = [cat_id for _, _, cat_id in category_info]
+    if existing and reuse_existing and _filter_categories_match(existing, cat_ids):
+        logger.debug("Reusing existing filter: {0}".format(filter_name))
+        return existing
+
     or_filters = []
-    cat_ids = []
 
-    for bic, bip in POWER_FIXTURE_EQUIP.items():
+    for bic, bip, cat_id in category_info:
         try:
-            cat = doc.Settings.Categories.get_Item(bic)
-            if not cat:
-                continue
-            cat_id = cat.Id
-            cat_ids.append(cat_id)
-
             # --- Special case handling ---
             if is_no_panel:
                 if bic == DB.BuiltInCategory.OST_ElectricalEquipment:
@@ -531,13 +580,6 @@ def create_or_update_panel_filter_logical_or(panel_name):
         logger.debug("Failed to create LogicalOrFilter for panel '{0}': {1}".format(filter_label, ex))
         return None
 
-    # Reuse or create filter element
-    existing = None
-    for pfe in DB.FilteredElementCollector(doc).OfClass(DB.ParameterFilterElement):
-        if pfe.Name == filter_name:
-            existing = pfe
-            break
-
     try:
         if existing:
             existing.SetCategories(List[DB.ElementId](cat_ids))
@@ -547,6 +589,7 @@ def create_or_update_panel_filter_logical_or(panel_name):
         else:
             new_pfe = DB.ParameterFilterElement.Create(doc, filter_name, List[DB.ElementId](cat_ids))
             new_pfe.SetElementFilter(final_filter)
+            filter_index[filter_name] = new_pfe
             logger.debug("Created new filter: {0}".format(filter_name))
             return new_pfe
     except Exception as ex:
@@ -579,6 +622,19 @@ def main():
     include_set.add(NO_PANEL_FLAG)
     solid_id = get_solid_fill_pattern_id(doc)
 
+    # One collector pass for filters and categories, shared by every panel below
+    filter_index = build_filter_index(doc)
+    category_info = get_filter_category_ids(doc)
+    wanted_names = set([panel_filter_name(pn) for pn in all_panels] + [panel_filter_name(NO_PANEL_FLAG)])
+    existing_names = set([name for name in filter_index.keys() if name.startswith(PANEL_FILTER_NAME_PREFIX)])
+    reuse_existing = False
+    if existing_names and wanted_names.issubset(existing_names):
+        reuse_existing = bool(forms.alert(
+            "Panel Checker filters already exist for every panel.\n\n"
+            "Reuse them and only update colors?",
+            yes=True, no=True
+        ))
+
     template = None
     legend_view = None
     color_map = {}
@@ -596,7 +652,9 @@ def main():
                 rgb = RED
                 use_halftone = False
                 color_map[NO_PANEL_FLAG] = rgb
-                pfe = create_or_update_panel_filter_logical_or(NO_PANEL_FLAG)
+                pfe = create_or_update_panel_filter_logical_or(
+                    NO_PANEL_FLAG, filter_index, category_info, reuse_existing=reuse_existing
+                )
                 if pfe:
                     ogs = build_overrides(rgb, use_halftone, solid_id, lineweight=8)
                     filter_override_data.append((pfe, ogs))
@@ -612,7 +670,9 @@ def main():
                     use_halftone = True
 
                 color_map[pn] = rgb
-                pfe = create_or_update_panel_filter_logical_or(pn)
+                pfe = create_or_update_panel_filter_logical_or(
+                    pn, filter_index, category_info, reuse_existing=reuse_existing
+                )
                 if pfe:
                     ogs = build_overrides(rgb, use_halftone, solid_id)
                     filter_override_data.append((pfe, ogs))
@@ -624,7 +684,7 @@ def main():
             template = get_or_create_view_template(VIEW_TEMPLATE_NAME, active_view)
             if template:
                 enforce_template_controls_only_filters(template)
-                apply_filters_to_template(template, filter_override_data)
+                apply_filters_to_views([template], filter_override_data)
             tx2.Commit()
 
         with DB.Transaction(doc, "Legend Creation") as tx21:
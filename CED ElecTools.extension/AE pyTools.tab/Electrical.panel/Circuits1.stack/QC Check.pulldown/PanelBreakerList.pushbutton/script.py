@@ -6,6 +6,7 @@ from collections import defaultdict
 from pyrevit import revit, DB
 from pyrevit import script
 
+from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repository as ps_repo
 from Snippets import revit_helpers
 
 get_id_value = revit_helpers.get_elementid_value
@@ -21,20 +22,6 @@ output.set_width(800)
 #design option filter
 option_filter = DB.ElementDesignOptionFilter(DB.ElementId.InvalidElementId)
 
-# Collect all electrical circuits
-circuits = DB.FilteredElementCollector(doc) \
-    .OfCategory(DB.BuiltInCategory.OST_ElectricalCircuit) \
-    .WhereElementIsNotElementType() \
-    .WherePasses(option_filter) \
-    .ToElements()
-
-# Collect all internal circuits (spares and spaces)
-internal_circuits = DB.FilteredElementCollector(doc) \
-    .OfCategory(DB.BuiltInCategory.OST_ElectricalInternalCircuits) \
-    .WhereElementIsNotElementType() \
-    .WherePasses(option_filter) \
-    .ToElements()
-
 # Collect all Electrical Panels
 elec_equip = DB.FilteredElementCollector(doc) \
     .OfCategory(DB.BuiltInCategory.OST_ElectricalEquipment) \
@@ -42,33 +29,38 @@ elec_equip = DB.FilteredElementCollector(doc) \
     .WherePasses(option_filter) \
     .ToElements()
 
-# Combine both sets of circuits
-all_circuits = list(circuits)
-all_circuits.extend(internal_circuits)
+# Ids of circuits (including spares and spaces) that pass the design option filter
+option_circuit_ids = set()
+for circuit_category in (DB.BuiltInCategory.OST_ElectricalCircuit, DB.BuiltInCategory.OST_ElectricalInternalCircuits):
+    circuit_ids = DB.FilteredElementCollector(doc) \
+        .OfCategory(circuit_category) \
+        .WhereElementIsNotElementType() \
+        .WherePasses(option_filter) \
+        .ToElementIds()
+    option_circuit_ids.update(get_id_value(x) for x in circuit_ids)
 
 # Dictionary to store panel information
 panel_dict = defaultdict(lambda: {'circuits': defaultdict(int), 'spares': defaultdict(int), 'spaces': defaultdict(int)})
 
-# Process each electrical system
-for system in all_circuits:
-    if isinstance(system, DB.Electrical.ElectricalSystem):
-        panel = system.get_Parameter(DB.BuiltInParameter.RBS_ELEC_CIRCUIT_PANEL_PARAM).AsString()
-        if panel:
-            poles = system.get_Parameter(DB.BuiltInParameter.RBS_ELEC_NUMBER_OF_POLES).AsInteger()
-            amps = system.get_Parameter(DB.BuiltInParameter.RBS_ELEC_CIRCUIT_RATING_PARAM).AsDouble()
-            notes = system.get_Parameter(DB.BuiltInParameter.RBS_ELEC_CIRCUIT_NOTES_PARAM).AsString() or ""
-
-            # Accessing the CircuitType enum
-            circuit_type = system.CircuitType
-
-            # Categorize the circuit based on its type and increment the count
-            key = (poles, int(amps), notes)
-            if circuit_type == DB.Electrical.CircuitType.Spare:
-                panel_dict[panel]['spares'][key] += 1
-            elif circuit_type == DB.Electrical.CircuitType.Space:
-                panel_dict[panel]['spaces'][key] += 1
-            else:
-                panel_dict[panel]['circuits'][key] += 1
+# Read each panel's circuits (including spares and spaces) once through the shared panel snapshot
+for equip in elec_equip:
+    snapshot = ps_repo.get_panel_snapshot(doc, equip)
+    if snapshot is None:
+        continue
+    name_param = equip.get_Parameter(DB.BuiltInParameter.RBS_ELEC_PANEL_NAME)
+    panel = name_param.AsString() if name_param else None
+    if not panel:
+        continue
+    for circuit in snapshot.circuits:
+        if circuit.circuit_id not in option_circuit_ids:
+            continue
+        key = (int(circuit.poles or 0), int(circuit.rating or 0), circuit.schedule_notes_text or "")
+        if circuit.kind == "spare":
+            panel_dict[panel]['spares'][key] += 1
+        elif circuit.kind == "space":
+            panel_dict[panel]['spaces'][key] += 1
+        else:
+            panel_dict[panel]['circuits'][key] += 1
 
 
 # Function to get parameter information by name
@@ -1,5 +1,10 @@
 ﻿# -*- coding: utf-8 -*-
 # IRONPYTHON 2.7 COMPATIBLE (no f-strings, no .format usage)
+import hashlib
+
+from Autodesk.Revit.DB.ExtensibleStorage import AccessLevel
+from Autodesk.Revit.DB.ExtensibleStorage import Entity, Schema, SchemaBuilder
+from System import Guid, String
 from pyrevit import revit, DB, script, forms
 
 from Snippets import revit_helpers
@@ -29,6 +34,12 @@ DETAIL_PARAM_CKT_NUMBER = "CKT_Circuit Number_CEDT"
 DETAIL_PARAM_CKT_LOAD_NAME = "CKT_Load Name_CEDT"
 DETAIL_PARAM_PANEL_NAME = "Panel Name_CEDT"
 
+# Each synced detail item stores a hash of the source values it was last synced from,
+# so unchanged items are skipped on the next run (Shift+Click forces a full sync).
+FINGERPRINT_SCHEMA_GUID = Guid("b3e0c6a4-71d2-4f6b-9a1e-5c2d8f4e7a19")
+FINGERPRINT_SCHEMA_NAME = "CED_SyncOneLine_Fingerprint"
+FINGERPRINT_FIELD = "SourceHash"
+
 DEVICE_CATEGORY_IDS = [
     DB.ElementId(DB.BuiltInCategory.OST_ElectricalFixtures),
     DB.ElementId(DB.BuiltInCategory.OST_ElectricalEquipment),
@@ -236,38 +247,13 @@ def _ensure_drafting_view(doc):
     return active_view
 
 
-def collect_all_circuits(doc, option_filter):
-    circuits = []
-
-    ckt_collector = DB.FilteredElementCollector(doc) \
-        .OfClass(DB.Electrical.ElectricalSystem) \
-        .WherePasses(option_filter) \
-        .ToElements()
-
-    for ckt in ckt_collector:
-
-        panel_name = get_model_param_value(
-            ckt, DB.BuiltInParameter.RBS_ELEC_CIRCUIT_PANEL_PARAM
-        )
-        cnum = get_model_param_value(
-            ckt, DB.BuiltInParameter.RBS_ELEC_CIRCUIT_NUMBER
-        )
-
-        if not panel_name or not cnum:
-            continue
-
-        circuits.append({
-            "panel_name": str(panel_name),
-            "ckt_number": str(cnum),
-            "element": ckt,
-            "id": str(_idval(ckt.Id))
-        })
-
-    return circuits
-
-
-def build_circuits_by_panel(resolved_panels, circuits):
+def build_circuits_by_panel(resolved_panels):
+    """
+    Reads circuit values once per circuit of each resolved panel.
+    Returns ({panel_id: {circuit_number: values}}, {circuit_id: ElectricalSystem}).
+    """
     result = {}
+    circuit_elements = {}
 
     for panel_name, pdata in resolved_panels.items():
         pid = pdata["panel_id"]
@@ -293,8 +279,9 @@ def build_circuits_by_panel(resolved_panels, circuits):
 
             cdata["circuit_id"] = str(_idval(sys.Id))
             result[pid][str(cnum)] = cdata
+            circuit_elements[cdata["circuit_id"]] = sys
 
-    return result
+    return result, circuit_elements
 
 
 def _collect_circuits(doc, option_filter):
@@ -314,12 +301,14 @@ def _collect_circuits(doc, option_filter):
             circuited_panel_names.add(str(pval))
 
         if pval and cnum:
+            # Only what the report needs; full circuit values are read per resolved panel.
             key = (str(pval), str(cnum))
-            cdata = {}
-            for detail_param_name, bip in CIRCUIT_VALUE_MAP.items():
-                cdata[detail_param_name] = get_model_param_value(ckt, bip)
-            cdata["circuit_id"] = str(_idval(ckt.Id))
-            circuit_map[key] = cdata
+            circuit_map[key] = {
+                DETAIL_PARAM_CKT_LOAD_NAME: get_model_param_value(
+                    ckt, DB.BuiltInParameter.RBS_ELEC_CIRCUIT_NAME
+                ),
+                "circuit_id": str(_idval(ckt.Id)),
+            }
 
     return ckt_collector, circuit_map, circuited_panel_names
 
@@ -528,114 +517,165 @@ def _get_supplied_panel_id_from_circuit(circuit):
     return None
 
 
-def reconcile_panel_identity_from_circuit(
-        ditem,
-        resolved_panels,
-        circuits_by_panel,
-        auto_panel_updates,
-        auto_panel_warnings
-):
-    # -------------------------
-    # Guardrail 1: must have all 3 params
-    # -------------------------
-    pname_val = get_detail_param_value(ditem, DETAIL_PARAM_PANEL_NAME)
-    cpanel_val = get_detail_param_value(ditem, DETAIL_PARAM_CKT_PANEL)
-    cnum_val = get_detail_param_value(ditem, DETAIL_PARAM_CKT_NUMBER)
-
-    if not (pname_val and cpanel_val and cnum_val):
-        return False
-
-    identity_name = str(pname_val)
-    circuit_panel_name = str(cpanel_val)
-    ckt_number = str(cnum_val)
-
-    # -------------------------
-    # Guardrail 2: identity panel must be resolved
-    # -------------------------
-    identity_pdata = resolved_panels.get(identity_name)
-    if not identity_pdata:
-        return False
-
-    current_panel_id = identity_pdata.get("panel_id")
-    if not current_panel_id:
-        return False
-
-    # -------------------------
-    # Guardrail 3: resolve circuit via circuit's panel
-    # -------------------------
-    circuit_panel_pdata = resolved_panels.get(circuit_panel_name)
-    if not circuit_panel_pdata:
-        return False
-
-    owner_panel_id = circuit_panel_pdata.get("panel_id")
-    if not owner_panel_id:
-        return False
-
-    cdict = circuits_by_panel.get(owner_panel_id, {}).get(ckt_number)
-    if not cdict:
-        return False
-
-    cid = cdict.get("circuit_id")
-    if not cid:
-        return False
+class SyncIndex(object):
+    """
+    Per-run lookups keyed by panel name, panel id and circuit id, built once
+    so each detail item resolves its panel/circuit without scanning lists.
+    """
 
+    def __init__(self, resolved_panels, panel_map_by_id, circuits_by_panel, circuit_elements):
+        self.resolved_panels = resolved_panels
+        self.circuits_by_panel = circuits_by_panel
+        self.circuit_elements = circuit_elements
+        self.panel_name_by_id = {}
+        self.panel_values_by_id = {}
+        self._supplied_panel_ids = {}
+        self._spare_or_space = {}
+
+        for panel_name, pdata in resolved_panels.items():
+            pid = pdata.get("panel_id")
+            self.panel_name_by_id[pid] = panel_name
+            source = panel_map_by_id.get(pid) or {}
+            values = {}
+            for detail_param_name in PANEL_VALUE_MAP.keys():
+                values[detail_param_name] = source.get(detail_param_name)
+            self.panel_values_by_id[pid] = values
+
+    def panel_id(self, panel_name):
+        pdata = self.resolved_panels.get(panel_name) if panel_name else None
+        if not pdata:
+            return None
+        return pdata.get("panel_id") or None
+
+    def circuit_values(self, circuit_panel_name, ckt_number):
+        owner_panel_id = self.panel_id(circuit_panel_name)
+        if not owner_panel_id or not ckt_number:
+            return None
+        return self.circuits_by_panel.get(owner_panel_id, {}).get(ckt_number)
+
+    def supplied_panel_id(self, circuit_id):
+        """Panel id supplied by a (non spare/space) circuit, cached per circuit."""
+        if circuit_id in self._supplied_panel_ids:
+            return self._supplied_panel_ids[circuit_id]
+        found = None
+        circuit_elem = self.circuit_elements.get(circuit_id)
+        if circuit_elem and not _is_spare_or_space_circuit(circuit_elem):
+            found = _get_supplied_panel_id_from_circuit(circuit_elem)
+        self._supplied_panel_ids[circuit_id] = found
+        return found
+
+
+def _get_fingerprint_schema():
+    schema = Schema.Lookup(FINGERPRINT_SCHEMA_GUID)
+    if schema is not None:
+        return schema
+    sb = SchemaBuilder(FINGERPRINT_SCHEMA_GUID)
+    sb.SetSchemaName(FINGERPRINT_SCHEMA_NAME)
+    sb.SetReadAccessLevel(AccessLevel.Public)
+    sb.SetWriteAccessLevel(AccessLevel.Public)
+    sb.AddSimpleField(FINGERPRINT_FIELD, String)
+    return sb.Finish()
+
+
+def read_sync_fingerprint(ditem, schema):
     try:
-        circuit_elem = revit.doc.GetElement(_idfrom(cid))
-    except:
-        return False
-
-    if not circuit_elem:
-        return False
-
-    # -------------------------
-    # âœ… NEW GUARDRAIL: ignore Spare / Space circuits
-    # -------------------------
-    if _is_spare_or_space_circuit(circuit_elem):
-        return False
-
-    # -------------------------
-    # Guardrail 4: resolve supplied panel
-    # -------------------------
-    supplied_panel_id = _get_supplied_panel_id_from_circuit(circuit_elem)
-    if not supplied_panel_id:
-        return False
-
-    supplied_panel_name = None
-    supplied_panel_elem = None
+        entity = ditem.GetEntity(schema)
+        if not entity or not entity.IsValid():
+            return None
+        return entity.Get[String](schema.GetField(FINGERPRINT_FIELD)) or None
+    except Exception:
+        return None
 
-    for name, pdata in resolved_panels.items():
-        if pdata.get("panel_id") == supplied_panel_id:
-            supplied_panel_name = name
-            supplied_panel_elem = pdata.get("panel")
-            break
 
-    if not supplied_panel_name or not supplied_panel_elem:
-        return False
+def write_sync_fingerprint(ditem, schema, fingerprint):
+    try:
+        entity = Entity(schema)
+        entity.Set[String](schema.GetField(FINGERPRINT_FIELD), fingerprint or "")
+        ditem.SetEntity(entity)
+    except Exception as e:
+        logger.debug("write_sync_fingerprint: failed on " + str(ditem.Id) + ": " + str(e))
 
-    # -------------------------
-    # Already correct
-    # -------------------------
-    if supplied_panel_id == current_panel_id:
-        return False
 
-    # -------------------------
-    # APPLY CORRECTION
-    # -------------------------
-    set_detail_param_value(ditem, DETAIL_PARAM_PANEL_NAME, supplied_panel_name)
+def _hash_values(parts):
+    lines = []
+    for key, values in parts:
+        if isinstance(values, dict):
+            for name in sorted(values.keys()):
+                lines.append(key + ":" + str(name) + "=" + repr(values.get(name)))
+        else:
+            lines.append(key + "=" + repr(values))
+    return hashlib.md5("\n".join(lines).encode("utf-8")).hexdigest()
 
-    for detail_param_name, bip in PANEL_VALUE_MAP.items():
-        set_detail_param_value(
-            ditem,
-            detail_param_name,
-            get_model_param_value(supplied_panel_elem, bip)
-        )
 
-    auto_panel_updates.setdefault(
-        "The following Equipment Symbols were updated automatically based on new supply circuit number.",
-        set()
-    ).add(str(_idval(ditem.Id)))
+def plan_detail_sync(identity, sync_index):
+    """
+    Resolve what a detail item should receive, from the per-run indexes only.
+    identity is (panel name, circuit panel name, circuit number) as text or None.
+    Returns a dict with the panel/circuit values to write and the source fingerprint,
+    or None when the item maps to nothing in the model (orphaned).
+    """
+    pname, cpanel, cnum = identity
+    panel_id = sync_index.panel_id(pname)
+    cdict = sync_index.circuit_values(cpanel, cnum) if (cpanel and cnum) else None
+    if not panel_id and not cdict:
+        return None
 
-    return True
+    # Reconcile panel identity from the circuit that feeds the equipment symbol.
+    reconciled_name = None
+    if pname and panel_id and cdict and cdict.get("circuit_id"):
+        supplied_id = sync_index.supplied_panel_id(cdict.get("circuit_id"))
+        supplied_name = sync_index.panel_name_by_id.get(supplied_id) if supplied_id else None
+        if supplied_name and supplied_id != panel_id:
+            reconciled_name = supplied_name
+            panel_id = supplied_id
+
+    final_name = reconciled_name or pname
+    panel_values = sync_index.panel_values_by_id.get(panel_id) if panel_id else None
+    return {
+        "panel_name": final_name,
+        "panel_values": panel_values,
+        "circuit_values": cdict,
+        "reconciled": bool(reconciled_name),
+        "fingerprint": _hash_values([
+            ("identity", (final_name, cpanel, cnum)),
+            ("panel", panel_values or {}),
+            ("circuit", cdict or {}),
+        ]),
+    }
+
+
+def detail_sync_fingerprint(ditem, plan):
+    """
+    Source fingerprint combined with the item's current values of the parameters
+    the plan writes, so manual edits on the detail item also trigger a resync.
+    """
+    names = set((plan.get("circuit_values") or {}).keys())
+    names.update((plan.get("panel_values") or {}).keys())
+    detail_values = {}
+    for name in names:
+        detail_values[name] = get_detail_param_value(ditem, name)
+    return _hash_values([
+        ("source", plan["fingerprint"]),
+        ("detail", detail_values),
+    ])
+
+
+def apply_detail_sync(ditem, plan, auto_panel_updates):
+    if plan.get("circuit_values"):
+        for detail_pname, ckt_val in plan["circuit_values"].items():
+            set_detail_param_value(ditem, detail_pname, ckt_val)
+
+    if plan.get("panel_values") is not None:
+        if plan.get("reconciled"):
+            set_detail_param_value(ditem, DETAIL_PARAM_PANEL_NAME, plan.get("panel_name"))
+        for detail_param_name, value in plan["panel_values"].items():
+            set_detail_param_value(ditem, detail_param_name, value)
+
+    if plan.get("reconciled"):
+        auto_panel_updates.setdefault(
+            "The following Equipment Symbols were updated automatically based on new supply circuit number.",
+            set()
+        ).add(str(_idval(ditem.Id)))
 
 
 def _collect_detail_items(doc, option_filter, active_view):
@@ -652,6 +692,17 @@ def _collect_detail_items(doc, option_filter, active_view):
     return detail_items
 
 
+def _read_identity(ditem):
+    pname_val = get_detail_param_value(ditem, DETAIL_PARAM_PANEL_NAME)
+    cpanel_val = get_detail_param_value(ditem, DETAIL_PARAM_CKT_PANEL)
+    cnum_val = get_detail_param_value(ditem, DETAIL_PARAM_CKT_NUMBER)
+    return (
+        str(pname_val) if pname_val else None,
+        str(cpanel_val) if cpanel_val else None,
+        str(cnum_val) if cnum_val else None,
+    )
+
+
 def _get_circuit_sort_key(circuit_label):
     """
     Returns an integer circuit number if possible, otherwise a high fallback
@@ -669,7 +720,7 @@ def _get_circuit_sort_key(circuit_label):
 
 
 def _build_output_summary(detail_items, circuit_map, panel_map, panel_map_by_id, resolved_panels, failed_panels,
-                          auto_panel_updates, auto_panel_warnings):
+                          auto_panel_updates, auto_panel_warnings, identities=None):
     equipment_rows = {}
     circuit_rows = {}
     unmapped_details = []
@@ -678,9 +729,10 @@ def _build_output_summary(detail_items, circuit_map, panel_map, panel_map_by_id,
     for ditem in detail_items:
         detail_id = str(_idval(ditem.Id))
 
-        pname_val = get_detail_param_value(ditem, DETAIL_PARAM_PANEL_NAME)
-        cpanel_val = get_detail_param_value(ditem, DETAIL_PARAM_CKT_PANEL)
-        cnum_val = get_detail_param_value(ditem, DETAIL_PARAM_CKT_NUMBER)
+        if identities is not None and detail_id in identities:
+            pname_val, cpanel_val, cnum_val = identities[detail_id]
+        else:
+            pname_val, cpanel_val, cnum_val = _read_identity(ditem)
 
         had_mapping = False
 
@@ -755,11 +807,22 @@ def _build_output_summary(detail_items, circuit_map, panel_map, panel_map_by_id,
     return equipment_rows, circuit_rows, unmapped_details, unmapped_panels, auto_panel_updates, auto_panel_warnings
 
 
+def _format_sync_counts(sync_counts):
+    return (
+        "Added: " + str(sync_counts.get("added", 0)) +
+        " | Updated: " + str(sync_counts.get("updated", 0)) +
+        " | Unchanged: " + str(sync_counts.get("unchanged", 0)) +
+        " | Orphaned: " + str(sync_counts.get("orphaned", 0))
+    )
+
+
 def _render_summary(equipment_rows, circuit_rows, unmapped_details, unmapped_panels, failed_panels,
-                    auto_panel_updates, auto_panel_warnings):
+                    auto_panel_updates, auto_panel_warnings, sync_counts=None):
     output = script.get_output()
     output.close_others()
     output.print_md("## Sync One Line Results")
+    if sync_counts:
+        output.print_md(_format_sync_counts(sync_counts))
 
     headers = ["Element", "Category", "Name", "Detail Items", "Detail Count"]
 
@@ -920,75 +983,46 @@ def main():
     # Resolve duplicate panels ONCE
     resolved_panels, failed_panels = resolve_panels(panel_map, circuited_panel_names)
 
-    # Build circuits scoped to resolved panels
-    all_circuits = collect_all_circuits(doc, option_filter)
-    circuits_by_panel = build_circuits_by_panel(resolved_panels, all_circuits)
+    # Build circuits scoped to resolved panels, then id-keyed lookups for the run
+    circuits_by_panel, circuit_elements = build_circuits_by_panel(resolved_panels)
+    sync_index = SyncIndex(resolved_panels, panel_map_by_id, circuits_by_panel, circuit_elements)
+
+    force_full_sync = bool(__shiftclick__)
+    fingerprint_schema = _get_fingerprint_schema()
+    sync_counts = {"added": 0, "updated": 0, "orphaned": 0, "unchanged": 0}
+    identities = {}
 
     # Apply ALL model changes (ONE TRANSACTION)
     t = DB.Transaction(doc, "Sync Circuits/Panels to Detail Items")
     t.Start()
 
-    update_count = 0
-
     for ditem in detail_items:
-        logger.debug("Detail item " + str(ditem.Id) + ":")
-
-        cpanel_val = get_detail_param_value(ditem, DETAIL_PARAM_CKT_PANEL)
-        cnum_val = get_detail_param_value(ditem, DETAIL_PARAM_CKT_NUMBER)
-        pname_val = get_detail_param_value(ditem, DETAIL_PARAM_PANEL_NAME)
-
-        changed = False
+        detail_id = str(_idval(ditem.Id))
+        identity = _read_identity(ditem)
+        identities[detail_id] = identity
+        if not (identity[0] or (identity[1] and identity[2])):
+            continue
 
-        panel_identity_name = None
-        circuit_panel_name = None
+        plan = plan_detail_sync(identity, sync_index)
+        if plan is None:
+            sync_counts["orphaned"] += 1
+            continue
 
-        if pname_val:
-            panel_identity_name = str(pname_val)
-
-        if cpanel_val:
-            circuit_panel_name = str(cpanel_val)
-
-        # -------------------------
-        # PANEL SYNC (identity-based)
-        # -------------------------
-        if panel_identity_name and panel_identity_name in resolved_panels:
-            pdata = resolved_panels[panel_identity_name]
-            panel_elem = pdata["panel"]
-
-            for detail_param_name, bip in PANEL_VALUE_MAP.items():
-                set_detail_param_value(
-                    ditem,
-                    detail_param_name,
-                    get_model_param_value(panel_elem, bip)
-                )
-            changed = True
-        # -------------------------
-        # CIRCUIT SYNC (ownership-based)
-        # -------------------------
-        if circuit_panel_name and cnum_val:
-            cpdata = resolved_panels.get(circuit_panel_name)
-            if cpdata:
-                cp_id = cpdata["panel_id"]
-                cdict = circuits_by_panel.get(cp_id, {}).get(str(cnum_val))
-                if cdict:
-                    for detail_pname, ckt_val in cdict.items():
-                        set_detail_param_value(ditem, detail_pname, ckt_val)
-                    changed = True
-
-        did_reconcile = reconcile_panel_identity_from_circuit(
-            ditem,
-            resolved_panels,
-            circuits_by_panel,
-            auto_panel_updates,
-            auto_panel_warnings
-        )
+        stored = read_sync_fingerprint(ditem, fingerprint_schema)
+        if stored == detail_sync_fingerprint(ditem, plan) and not force_full_sync:
+            sync_counts["unchanged"] += 1
+            continue
 
-        if changed or did_reconcile:
-            update_count += 1
+        logger.debug("Detail item " + detail_id + ": syncing")
+        apply_detail_sync(ditem, plan, auto_panel_updates)
+        write_sync_fingerprint(ditem, fingerprint_schema, detail_sync_fingerprint(ditem, plan))
+        if plan.get("reconciled"):
+            identities[detail_id] = (plan.get("panel_name"), identity[1], identity[2])
+        sync_counts["updated" if stored else "added"] += 1
 
     t.Commit()
 
-    logger.info("Sync finished. Updated " + str(update_count) + " detail item(s).")
+    logger.info("Sync finished. " + _format_sync_counts(sync_counts))
 
     # Reporting (NO TRANSACTION)
     equipment_rows, circuit_rows, unmapped_details, unmapped_panels, auto_panel_updates, auto_panel_warnings = _build_output_summary(
@@ -999,11 +1033,12 @@ def main():
         resolved_panels,
         failed_panels,
         auto_panel_updates,
-        auto_panel_warnings
+        auto_panel_warnings,
+        identities=identities
     )
 
     choice = forms.alert(
-        "Data sync complete.\n\nPrint output report?",
+        "Data sync complete.\n" + _format_sync_counts(sync_counts) + "\n\nPrint output report?",
         ok=False,
         yes=True,
         no=True
@@ -1017,7 +1052,8 @@ def main():
             unmapped_panels,
             failed_panels,
             auto_panel_updates,
-            auto_panel_warnings
+            auto_panel_warnings,
+            sync_counts=sync_counts
         )
 
 
@@ -54,6 +54,8 @@ LINK_SOURCE_MODE = "link"
 MAPPING_CONFIG_SECTION = "let_there_be_light_mapping"
 SKIP_MAPPING_LABEL = "<Skip Mapping>"
 DUPLICATE_TOLERANCE_FT = 0.02
+FUZZY_MATCH_TOP_K = 25
+FUZZY_TOKEN_WEIGHT = 0.03
 CSV_MARKER_START = "LUMINAIRE-"
 CSV_MARKER_END = "_Symbol"
 
@@ -83,6 +85,8 @@ if not LIB_ROOT or not os.path.isdir(LIB_ROOT):
 
 from UIClasses import load_theme_state_from_config
 from UIClasses.ui_bases import CEDWindowBase, TEXTBOX_MODE_SELECT_ALL_ON_FIRST_CLICK
+from LogicClasses.fuzzy_index import FuzzyIndex
+from LogicClasses.spatial_hash import SpatialHash
 from Snippets import revit_helpers
 
 
@@ -973,7 +977,12 @@ class FixtureMatcher(object):
         self.by_type = defaultdict(list)
         self.by_type_mark = defaultdict(list)
         self.by_label = defaultdict(list)
+        self.fuzzy_index = FuzzyIndex()
+        self.mark_positions = defaultdict(list)
         for option in self.options:
+            position = self.fuzzy_index.add(option, option.search_text_norm, option.tokens)
+            if option.type_mark_norm:
+                self.mark_positions[option.type_mark_norm].append(position)
             if option.family_norm or option.type_norm:
                 self.by_family_type["{}|{}".format(option.family_norm, option.type_norm)].append(option)
             if option.type_norm:
@@ -989,18 +998,26 @@ class FixtureMatcher(object):
             source_norm = "{}{}".format(row.family_norm, row.type_norm)
         source_tokens = set(row.source_tokens or [])
 
-        best_score = 0.0
-        best_option = None
-        for option in self.options:
+        def _score(option):
             base_ratio = SequenceMatcher(None, source_norm, option.search_text_norm).ratio()
             token_overlap = 0.0
             if source_tokens and option.tokens:
                 overlap = float(len(source_tokens.intersection(option.tokens)))
-                token_overlap = overlap * 0.03
-            score = base_ratio + token_overlap
-            if score > best_score:
-                best_score = score
-                best_option = option
+                token_overlap = overlap * FUZZY_TOKEN_WEIGHT
+            return base_ratio + token_overlap
+
+        # Options whose type mark shows up in the source always reach the scorer.
+        required = []
+        for mark in source_tokens | set([row.fixture_code_norm or ""]):
+            required.extend(self.mark_positions.get(mark, []))
+        best_option, best_score = self.fuzzy_index.best(
+            source_norm,
+            _score,
+            tokens=source_tokens,
+            top_k=FUZZY_MATCH_TOP_K,
+            token_weight=FUZZY_TOKEN_WEIGHT,
+            required=required,
+        )
         if best_option is not None and best_score >= 0.60:
             return best_option.label
         return ""
@@ -1100,17 +1117,9 @@ class PlacementEngine(object):
         if changed:
             self.doc.Regenerate()
 
-    def _duplicate_key(self, symbol_id, point):
-        tol = float(DUPLICATE_TOLERANCE_FT)
-        return (
-            int(symbol_id),
-            int(round(float(point.X) / tol)),
-            int(round(float(point.Y) / tol)),
-            int(round(float(point.Z) / tol)),
-        )
-
     def _build_existing_index(self, symbol_ids):
-        index = set()
+        """Existing fixtures of ``symbol_ids`` in a spatial hash keyed by symbol id."""
+        index = SpatialHash(DUPLICATE_TOLERANCE_FT)
         if not symbol_ids:
             return index
 
@@ -1133,7 +1142,7 @@ class PlacementEngine(object):
             loc_point = _as_location_point(instance)
             if loc_point is None:
                 continue
-            index.add(self._duplicate_key(symbol_id, loc_point.Point))
+            index.add(symbol_id, loc_point.Point, _idval(instance.Id))
         return index
 
     def _resolve_target_point(self, data, target_level, csv_divisor):
@@ -1267,7 +1276,7 @@ class PlacementEngine(object):
             if sid > 0:
                 symbol_ids.add(sid)
 
-        existing_index = set()
+        existing_index = SpatialHash(DUPLICATE_TOLERANCE_FT)
         if skip_duplicates:
             existing_index = self._build_existing_index(symbol_ids)
 
@@ -1300,8 +1309,7 @@ class PlacementEngine(object):
                     continue
 
                 symbol_id = _idval(getattr(symbol, "Id", None))
-                dup_key = self._duplicate_key(symbol_id, point)
-                if skip_duplicates and dup_key in existing_index:
+                if skip_duplicates and existing_index.contains(symbol_id, point):
                     report.skipped_duplicates += 1
                     continue
 
@@ -1320,7 +1328,8 @@ class PlacementEngine(object):
                         ElementTransformUtils.RotateElement(self.doc, instance.Id, axis, float(data.rotation))
                     report.placed += 1
                     if skip_duplicates:
-                        existing_index.add(dup_key)
+                        # Index where the fixture landed, not the requested point.
+                        existing_index.add(symbol_id, axis_origin, _idval(instance.Id))
                 except InvalidOperationException as ex:
                     report.add_error("Placement failed for '{}': {}".format(data.source_id, ex))
                 except Exception as ex:
@@ -2801,6 +2810,8 @@ class LightMappingWindow(CEDWindowBase):
         self._save_mapping_state()
 
         skip_duplicates = False
+        if self.SkipDuplicatesCheck is not None:
+            skip_duplicates = bool(self.SkipDuplicatesCheck.IsChecked)
         report = self._placement_engine.place(
             placements=self._source_result.placements,
             fixture_symbol_by_source=payload["fixture_symbol_map"],
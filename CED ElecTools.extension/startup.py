@@ -89,5 +89,23 @@ def _register_circuit_manager_panel():
         logger.warning("Failed to register Circuit Manager panel: %s", exc)
 
 
+def _register_session_cache_events():
+    logger = script.get_logger()
+    try:
+        uiapp = __revit__
+    except Exception:
+        uiapp = None
+    if uiapp is None:
+        return
+    try:
+        from CEDElectrical.Application.services import session_cache_events
+    except Exception as exc:
+        logger.warning("Failed to load session cache events: %s", exc)
+        return
+    if session_cache_events.register(uiapp):
+        logger.info("Session cache document handlers registered.")
+
+
 _seed_runtime_paths()
 _register_circuit_manager_panel()
+_register_session_cache_events()
@@ -0,0 +1,143 @@
+﻿# -*- coding: utf-8 -*-
+"""Apply an ordered batch of circuit actions, then run one calculate pass."""
+
+from pyrevit import DB
+
+from CEDElectrical.Application.dto.operation_request import OperationRequest
+from CEDElectrical.Application.services.circuit_action_context import CircuitActionContext
+from CEDElectrical.Model.circuit_action_queue import dependent_circuit_ids
+
+
+class ApplyCircuitActionsAndRecalculateOperation(object):
+    """Applies heterogeneous circuit actions in one transaction with a single recalculation.
+
+    ``request.options['actions']`` is an ordered list of
+    ``{'operation_key', 'circuit_ids', 'options'}`` entries. Each key must name
+    a registered operation exposing ``apply_changes`` (breaker autosize,
+    neutral/IG include flags, mark new/existing). Circuits are read once for
+    the whole batch and the union of changed circuits is recalculated once.
+    When an action touches circuits an earlier action already changed, the
+    document is regenerated and those circuits are re-read before it runs.
+    """
+
+    key = 'apply_circuit_actions_and_recalculate'
+
+    def __init__(self, registry, calculate_operation):
+        self._registry = registry
+        self._calculate_operation = calculate_operation
+
+    def execute(self, request, doc):
+        actions = self._resolve_actions(request.options.get('actions'))
+        if not actions:
+            return {'status': 'cancelled', 'reason': 'no_actions'}
+
+        context = CircuitActionContext(doc)
+        if not context.get_circuits(self._action_circuit_ids(actions)):
+            return {'status': 'cancelled', 'reason': 'no_circuits'}
+
+        # Parameter loading runs its own transaction, so it must happen first.
+        self._calculate_operation.ensure_parameters(doc)
+
+        changed_ids = []
+        changed_set = set()
+        locked_rows = []
+        locked_set = set()
+        summaries = []
+        allow_15a = bool(request.options.get('allow_15a', False))
+        tx = DB.Transaction(doc, 'Circuit Actions + Calculate Circuits')
+        tx.Start()
+        try:
+            for operation, action in actions:
+                dependent = dependent_circuit_ids(self._touched_ids(action), changed_set)
+                if dependent:
+                    doc.Regenerate()
+                    context.refresh(dependent)
+                applied = operation.apply_changes(context, action['circuit_ids'], action['options'])
+                for cid in list(applied.get('changed_ids') or []):
+                    if cid not in changed_set:
+                        changed_set.add(cid)
+                        changed_ids.append(cid)
+                for row in list(applied.get('locked_rows') or []):
+                    cid = row.get('circuit_id')
+                    if cid not in locked_set:
+                        locked_set.add(cid)
+                        locked_rows.append(row)
+                if operation.key == 'autosize_breaker_and_recalculate':
+                    allow_15a = allow_15a or bool(action['options'].get('allow_15a', False))
+                summaries.append({
+                    'operation_key': operation.key,
+                    'changed': len(applied.get('changed_ids') or []),
+                    'reason': applied.get('reason'),
+                })
+
+            if not changed_ids:
+                tx.RollBack()
+                return {
+                    'status': 'cancelled',
+                    'reason': 'no_changes',
+                    'locked_rows': locked_rows,
+                    'runtime_alert_rows': [],
+                    'actions': summaries,
+                }
+
+            # The calculation reads values derived from the parameters just written.
+            doc.Regenerate()
+            calc_options = {
+                'show_output': bool(request.options.get('show_output', False)),
+                'use_existing_transaction': True,
+            }
+            if allow_15a:
+                calc_options['min_breaker_size_override'] = 15
+            calc_request = OperationRequest(
+                operation_key='calculate_circuits',
+                circuit_ids=changed_ids,
+                source=request.source,
+                options=calc_options,
+            )
+            calc_result = self._calculate_operation.execute(calc_request, doc) or {}
+            tx.Commit()
+        except Exception:
+            try:
+                if tx.HasStarted() and not tx.HasEnded():
+                    tx.RollBack()
+            except Exception:
+                pass
+            raise
+
+        if locked_rows:
+            existing = list(calc_result.get('locked_rows') or [])
+            existing_ids = set([row.get('circuit_id') for row in existing])
+            calc_result['locked_rows'] = existing + [row for row in locked_rows if row.get('circuit_id') not in existing_ids]
+        calc_result['actions'] = summaries
+        return calc_result
+
+    def _resolve_actions(self, raw_actions):
+        """Return ``[(operation, action)]`` in request order; unknown keys raise ``ValueError``."""
+        actions = []
+        for raw in list(raw_actions or []):
+            if not isinstance(raw, dict):
+                continue
+            key = raw.get('operation_key')
+            if not key or key == self.key:
+                continue
+            operation = self._registry.get(key)
+            if operation is None or not hasattr(operation, 'apply_changes'):
+                raise ValueError('Unsupported circuit action: {}'.format(key))
+            actions.append((operation, {
+                'circuit_ids': list(raw.get('circuit_ids') or []),
+                'options': dict(raw.get('options') or {}),
+            }))
+        return actions
+
+    def _action_circuit_ids(self, actions):
+        ids = []
+        for _, action in actions:
+            ids.extend(self._touched_ids(action))
+        return ids
+
+    def _touched_ids(self, action):
+        ids = list(action['circuit_ids'])
+        for row in list(action['options'].get('updates') or []):
+            if isinstance(row, dict) and row.get('circuit_id') is not None:
+                ids.append(row.get('circuit_id'))
+        return ids
@@ -1,12 +1,10 @@
 ﻿# -*- coding: utf-8 -*-
 """Apply breaker/frame updates and run calculate operation."""
 
-import Autodesk.Revit.DB.Electrical as DBE
 from pyrevit import DB
 
 from CEDElectrical.Application.dto.operation_request import OperationRequest
-from CEDElectrical.Domain import settings_manager
-from CEDElectrical.Model.CircuitBranch import CircuitBranch
+from CEDElectrical.Application.services.circuit_action_context import CircuitActionContext
 from Snippets import revit_helpers
 
 
@@ -14,10 +12,6 @@ def _elid_value(item):
     return revit_helpers.get_elementid_value(item)
 
 
-def _elid_from_value(value):
-    return revit_helpers.elementid_from_value(value)
-
-
 class AutosizeBreakerAndRecalculateOperation(object):
     """Writes selected breaker/frame values then recalculates circuits."""
 
@@ -29,57 +23,20 @@ class AutosizeBreakerAndRecalculateOperation(object):
         self._calculate_operation = calculate_operation
 
     def execute(self, request, doc):
-        updates = list(request.options.get('updates') or [])
-        if not updates:
+        by_id = self._build_updates_map(request.options.get('updates'))
+        if not by_id:
             return {'status': 'cancelled', 'reason': 'no_updates'}
 
-        by_id = {}
-        for row in updates:
-            try:
-                cid = int(row.get('circuit_id'))
-            except Exception:
-                continue
-            by_id[cid] = row
-
-        circuits = []
-        for cid in by_id.keys():
-            try:
-                el = doc.GetElement(_elid_from_value(cid))
-            except Exception:
-                el = None
-            if isinstance(el, DBE.ElectricalSystem):
-                circuits.append(el)
-        if not circuits:
+        context = CircuitActionContext(doc)
+        if not context.get_circuits(by_id.keys()):
             return {'status': 'cancelled', 'reason': 'no_circuits'}
 
-        changed_ids = []
-        locked_rows = []
         tg = DB.TransactionGroup(doc, 'Auto Size Breaker/Frame + Calculate Circuits')
         tg.Start()
         tx = DB.Transaction(doc, 'Auto Size Breaker/Frame')
         tx.Start()
         try:
-            for circuit in circuits:
-                branch_type = self._branch_type(circuit)
-                if branch_type not in self._ALLOWED_TYPES:
-                    continue
-                if self._is_locked(doc, circuit.Id):
-                    locked_rows.append(self._locked_row(circuit, doc))
-                    continue
-
-                spec = by_id.get(_elid_value(circuit.Id)) or {}
-                set_rating = bool(spec.get('set_rating', True))
-                set_frame = bool(spec.get('set_frame', True))
-                if not (set_rating or set_frame):
-                    continue
-
-                did_change = False
-                if set_rating:
-                    did_change = self._set_numeric(circuit, 'Rating', 'RBS_ELEC_CIRCUIT_RATING_PARAM', spec.get('rating')) or did_change
-                if set_frame:
-                    did_change = self._set_numeric(circuit, 'Frame', 'RBS_ELEC_CIRCUIT_FRAME_PARAM', spec.get('frame')) or did_change
-                if did_change:
-                    changed_ids.append(_elid_value(circuit.Id))
+            applied = self.apply_changes(context, request.circuit_ids, request.options)
             tx.Commit()
         except Exception:
             tx.RollBack()
@@ -89,6 +46,8 @@ class AutosizeBreakerAndRecalculateOperation(object):
                 pass
             raise
 
+        changed_ids = applied['changed_ids']
+        locked_rows = applied['locked_rows']
         if not changed_ids:
             try:
                 tg.RollBack()
@@ -129,21 +88,55 @@ class AutosizeBreakerAndRecalculateOperation(object):
             calc_result['locked_rows'] = existing + locked_rows
         return calc_result
 
-    def _branch_type(self, circuit):
-        try:
-            settings = settings_manager.load_circuit_settings(circuit.Document)
-            branch = CircuitBranch(circuit, settings=settings)
-            return (branch.branch_type or '').upper()
-        except Exception:
-            return ''
+    def apply_changes(self, context, circuit_ids, options):
+        """Write breaker/frame values inside the caller's open transaction.
+
+        Targets come from ``options['updates']``; ``circuit_ids`` is not used.
+        Returns ``{'reason', 'changed_ids', 'locked_rows'}``.
+        """
+        result = {'reason': None, 'changed_ids': [], 'locked_rows': []}
+        by_id = self._build_updates_map((options or {}).get('updates'))
+        if not by_id:
+            result['reason'] = 'no_updates'
+            return result
+        circuits = context.get_circuits(by_id.keys())
+        if not circuits:
+            result['reason'] = 'no_circuits'
+            return result
 
-    def _is_locked(self, doc, eid):
-        if not getattr(doc, 'IsWorkshared', False):
-            return False
-        try:
-            return DB.WorksharingUtils.GetCheckoutStatus(doc, eid) == DB.CheckoutStatus.OwnedByOtherUser
-        except Exception:
-            return False
+        for circuit in circuits:
+            if context.branch_type(circuit) not in self._ALLOWED_TYPES:
+                continue
+            if context.is_locked(circuit):
+                result['locked_rows'].append(self._locked_row(circuit, context.doc))
+                continue
+
+            spec = by_id.get(_elid_value(circuit.Id)) or {}
+            set_rating = bool(spec.get('set_rating', True))
+            set_frame = bool(spec.get('set_frame', True))
+            if not (set_rating or set_frame):
+                continue
+
+            did_change = False
+            if set_rating:
+                did_change = self._set_numeric(circuit, 'Rating', 'RBS_ELEC_CIRCUIT_RATING_PARAM', spec.get('rating')) or did_change
+            if set_frame:
+                did_change = self._set_numeric(circuit, 'Frame', 'RBS_ELEC_CIRCUIT_FRAME_PARAM', spec.get('frame')) or did_change
+            if did_change:
+                result['changed_ids'].append(_elid_value(circuit.Id))
+        if not result['changed_ids']:
+            result['reason'] = 'no_changes'
+        return result
+
+    def _build_updates_map(self, updates):
+        by_id = {}
+        for row in list(updates or []):
+            try:
+                cid = int(row.get('circuit_id'))
+            except Exception:
+                continue
+            by_id[cid] = row
+        return by_id
 
     def _set_numeric(self, circuit, prop_name, bip_name, value):
         try:
@@ -30,8 +30,8 @@ class CalculateCircuitsOperation(object):
         self.alert_store = alert_store
         self.logger = script.get_logger()
 
-    def execute(self, request, doc):
-        """Run calculation workflow for target circuits in the active document."""
+    def ensure_parameters(self, doc):
+        """Load missing electrical shared parameters; runs its own transaction."""
         param_bootstrap = settings_manager.ensure_electrical_parameters_for_calculate(doc, logger=self.logger)
         status = str((param_bootstrap or {}).get('status') or '').lower()
         if status == 'loaded':
@@ -49,6 +49,16 @@ class CalculateCircuitsOperation(object):
                 )
             )
 
+    def execute(self, request, doc):
+        """Run calculation workflow for target circuits in the active document.
+
+        With ``use_existing_transaction`` the caller owns an open transaction
+        and has already called ``ensure_parameters``; writes go into it.
+        """
+        use_existing_tx = bool(request.options.get('use_existing_transaction', False))
+        if not use_existing_tx:
+            self.ensure_parameters(doc)
+
         settings = settings_manager.load_circuit_settings(doc)
         min_breaker_size_override = request.options.get('min_breaker_size_override')
         if min_breaker_size_override is not None:
@@ -107,15 +117,16 @@ class CalculateCircuitsOperation(object):
         total_fixtures = 0
         total_equipment = 0
 
-        use_existing_group = bool(request.options.get('use_existing_transaction_group', False))
+        use_existing_group = bool(request.options.get('use_existing_transaction_group', False)) or use_existing_tx
         tg = None
         if not use_existing_group:
             tg = DB.TransactionGroup(doc, 'Calculate Circuits')
             tg.Start()
-        tx = DB.Transaction(doc, 'Write Shared Parameters')
+        tx = None if use_existing_tx else DB.Transaction(doc, 'Write Shared Parameters')
 
         try:
-            tx.Start()
+            if tx is not None:
+                tx.Start()
             for branch in branches:
                 param_values = self._collect_shared_param_values(branch)
                 self.writer.write_circuit_parameters(branch.circuit, param_values)
@@ -131,12 +142,14 @@ class CalculateCircuitsOperation(object):
 
             self._write_locked_sync_payloads(doc, locked_rows)
 
-            tx.Commit()
+            if tx is not None:
+                tx.Commit()
             if tg is not None:
                 tg.Assimilate()
         except Exception as ex:
             try:
-                tx.RollBack()
+                if tx is not None:
+                    tx.RollBack()
             except Exception:
                 pass
             try:
@@ -1,10 +1,10 @@
 ﻿# -*- coding: utf-8 -*-
 """Mark circuits as existing, then run calculate operation."""
 
-import Autodesk.Revit.DB.Electrical as DBE
 from pyrevit import DB
 
 from CEDElectrical.Application.dto.operation_request import OperationRequest
+from CEDElectrical.Application.services.circuit_action_context import CircuitActionContext
 from Snippets import revit_helpers
 
 
@@ -12,10 +12,6 @@ def _elid_value(item):
     return revit_helpers.get_elementid_value(item)
 
 
-def _elid_from_value(value):
-    return revit_helpers.elementid_from_value(value)
-
-
 class MarkExistingAndRecalculateOperation(object):
     """Sets override/notes/clear flags then recalculates affected circuits."""
 
@@ -25,81 +21,17 @@ class MarkExistingAndRecalculateOperation(object):
         self._calculate_operation = calculate_operation
 
     def execute(self, request, doc):
-        circuits = self._get_target_circuits(doc, request.circuit_ids)
+        context = CircuitActionContext(doc)
+        circuits = context.get_circuits(request.circuit_ids)
         if not circuits:
             return {'status': 'cancelled', 'reason': 'no_circuits'}
 
-        updates_by_id = {}
-        raw_updates = list(request.options.get('updates') or [])
-        for raw in raw_updates:
-            if not isinstance(raw, dict):
-                continue
-            try:
-                cid = int(raw.get('circuit_id') or 0)
-            except Exception:
-                cid = 0
-            if cid <= 0:
-                continue
-            mode_val = str(raw.get('mode', 'existing') or 'existing').strip().lower()
-            if mode_val not in ('existing', 'new'):
-                mode_val = 'existing'
-            updates_by_id[cid] = {
-                'mode': mode_val,
-                'set_notes': bool(raw.get('set_notes', True)),
-                'clear_wire': bool(raw.get('clear_wire', False)),
-                'clear_conduit': bool(raw.get('clear_conduit', False)),
-            }
-
-        mode = str(request.options.get('mode', 'existing') or 'existing').strip().lower()
-        if mode not in ('existing', 'new'):
-            mode = 'existing'
-        set_notes = bool(request.options.get('set_notes', True))
-        clear_wire = bool(request.options.get('clear_wire', False))
-        clear_conduit = bool(request.options.get('clear_conduit', False))
-
-        changed_ids = []
-        locked_rows = []
         tg = DB.TransactionGroup(doc, 'Mark New/Existing + Calculate Circuits')
         tg.Start()
         tx = DB.Transaction(doc, 'Mark New/Existing Circuit Data')
         tx.Start()
         try:
-            for circuit in circuits:
-                if self._is_locked(doc, circuit.Id):
-                    locked_rows.append(self._locked_row(circuit, doc))
-                    continue
-
-                circuit_id = _elid_value(circuit.Id)
-                per = updates_by_id.get(circuit_id)
-                circuit_mode = per.get('mode') if per else mode
-                if circuit_mode not in ('existing', 'new'):
-                    circuit_mode = 'existing'
-                circuit_set_notes = bool(per.get('set_notes', set_notes)) if per else bool(set_notes)
-                circuit_clear_wire = bool(per.get('clear_wire', clear_wire)) if per else bool(clear_wire)
-                circuit_clear_conduit = bool(per.get('clear_conduit', clear_conduit)) if per else bool(clear_conduit)
-                if circuit_mode == 'new':
-                    circuit_clear_wire = False
-                    circuit_clear_conduit = False
-
-                notes_text = '' if circuit_mode == 'new' else 'EX'
-                user_override_value = 0 if circuit_mode == 'new' else 1
-                did_change = False
-                did_change = self._set_int_param(circuit, 'CKT_User Override_CED', user_override_value) or did_change
-
-                if circuit_set_notes:
-                    did_change = self._set_schedule_notes(circuit, notes_text) or did_change
-                    did_change = self._set_str_param(circuit, 'CKT_Schedule Notes_CEDT', notes_text) or did_change
-
-                if circuit_mode == 'existing' and circuit_clear_wire:
-                    did_change = self._set_str_param(circuit, 'CKT_Wire Hot Size_CEDT', '-') or did_change
-                    did_change = self._set_str_param(circuit, 'Wire Hot Size_CEDT', '-') or did_change
-
-                if circuit_mode == 'existing' and circuit_clear_conduit:
-                    did_change = self._set_str_param(circuit, 'Conduit Size_CEDT', '-') or did_change
-
-                if did_change:
-                    changed_ids.append(circuit_id)
-
+            applied = self.apply_changes(context, request.circuit_ids, request.options)
             tx.Commit()
         except Exception:
             tx.RollBack()
@@ -109,6 +41,8 @@ class MarkExistingAndRecalculateOperation(object):
                 pass
             raise
 
+        changed_ids = applied['changed_ids']
+        locked_rows = applied['locked_rows']
         if not changed_ids:
             try:
                 tg.RollBack()
@@ -145,16 +79,84 @@ class MarkExistingAndRecalculateOperation(object):
             calc_result['locked_rows'] = existing + locked_rows
         return calc_result
 
-    def _get_target_circuits(self, doc, circuit_ids):
-        circuits = []
-        for raw_id in list(circuit_ids or []):
+    def apply_changes(self, context, circuit_ids, options):
+        """Write override/notes/clear values inside the caller's open transaction.
+
+        Returns ``{'reason', 'changed_ids', 'locked_rows'}``.
+        """
+        result = {'reason': None, 'changed_ids': [], 'locked_rows': []}
+        circuits = context.get_circuits(circuit_ids)
+        if not circuits:
+            result['reason'] = 'no_circuits'
+            return result
+        options = dict(options or {})
+
+        updates_by_id = {}
+        raw_updates = list(options.get('updates') or [])
+        for raw in raw_updates:
+            if not isinstance(raw, dict):
+                continue
             try:
-                el = doc.GetElement(_elid_from_value(raw_id))
+                cid = int(raw.get('circuit_id') or 0)
             except Exception:
-                el = None
-            if isinstance(el, DBE.ElectricalSystem):
-                circuits.append(el)
-        return circuits
+                cid = 0
+            if cid <= 0:
+                continue
+            mode_val = str(raw.get('mode', 'existing') or 'existing').strip().lower()
+            if mode_val not in ('existing', 'new'):
+                mode_val = 'existing'
+            updates_by_id[cid] = {
+                'mode': mode_val,
+                'set_notes': bool(raw.get('set_notes', True)),
+                'clear_wire': bool(raw.get('clear_wire', False)),
+                'clear_conduit': bool(raw.get('clear_conduit', False)),
+            }
+
+        mode = str(options.get('mode', 'existing') or 'existing').strip().lower()
+        if mode not in ('existing', 'new'):
+            mode = 'existing'
+        set_notes = bool(options.get('set_notes', True))
+        clear_wire = bool(options.get('clear_wire', False))
+        clear_conduit = bool(options.get('clear_conduit', False))
+
+        for circuit in circuits:
+            if context.is_locked(circuit):
+                result['locked_rows'].append(self._locked_row(circuit, context.doc))
+                continue
+
+            circuit_id = _elid_value(circuit.Id)
+            per = updates_by_id.get(circuit_id)
+            circuit_mode = per.get('mode') if per else mode
+            if circuit_mode not in ('existing', 'new'):
+                circuit_mode = 'existing'
+            circuit_set_notes = bool(per.get('set_notes', set_notes)) if per else bool(set_notes)
+            circuit_clear_wire = bool(per.get('clear_wire', clear_wire)) if per else bool(clear_wire)
+            circuit_clear_conduit = bool(per.get('clear_conduit', clear_conduit)) if per else bool(clear_conduit)
+            if circuit_mode == 'new':
+                circuit_clear_wire = False
+                circuit_clear_conduit = False
+
+            notes_text = '' if circuit_mode == 'new' else 'EX'
+            user_override_value = 0 if circuit_mode == 'new' else 1
+            did_change = False
+            did_change = self._set_int_param(circuit, 'CKT_User Override_CED', user_override_value) or did_change
+
+            if circuit_set_notes:
+                did_change = self._set_schedule_notes(circuit, notes_text) or did_change
+                did_change = self._set_str_param(circuit, 'CKT_Schedule Notes_CEDT', notes_text) or did_change
+
+            if circuit_mode == 'existing' and circuit_clear_wire:
+                did_change = self._set_str_param(circuit, 'CKT_Wire Hot Size_CEDT', '-') or did_change
+                did_change = self._set_str_param(circuit, 'Wire Hot Size_CEDT', '-') or did_change
+
+            if circuit_mode == 'existing' and circuit_clear_conduit:
+                did_change = self._set_str_param(circuit, 'Conduit Size_CEDT', '-') or did_change
+
+            if did_change:
+                result['changed_ids'].append(circuit_id)
+        if not result['changed_ids']:
+            result['reason'] = 'no_changes'
+        return result
 
     def _set_schedule_notes(self, circuit, value):
         try:
@@ -210,14 +212,6 @@ class MarkExistingAndRecalculateOperation(object):
         except Exception:
             return False
 
-    def _is_locked(self, doc, eid):
-        if not getattr(doc, 'IsWorkshared', False):
-            return False
-        try:
-            return DB.WorksharingUtils.GetCheckoutStatus(doc, eid) == DB.CheckoutStatus.OwnedByOtherUser
-        except Exception:
-            return False
-
     def _locked_row(self, circuit, doc):
         panel = ''
         try:
@@ -1,12 +1,10 @@
 ﻿# -*- coding: utf-8 -*-
 """Set include flags on circuits, then run calculate operation."""
 
-import Autodesk.Revit.DB.Electrical as DBE
 from pyrevit import DB
 
 from CEDElectrical.Application.dto.operation_request import OperationRequest
-from CEDElectrical.Domain import settings_manager
-from CEDElectrical.Model.CircuitBranch import CircuitBranch
+from CEDElectrical.Application.services.circuit_action_context import CircuitActionContext
 from Snippets import revit_helpers
 
 
@@ -14,10 +12,6 @@ def _elid_value(item):
     return revit_helpers.get_elementid_value(item)
 
 
-def _elid_from_value(value):
-    return revit_helpers.elementid_from_value(value)
-
-
 class SetIncludeAndRecalculateOperation(object):
     """Applies include-neutral/include-IG flags and recalculates affected circuits."""
 
@@ -29,74 +23,17 @@ class SetIncludeAndRecalculateOperation(object):
         self._calculate_operation = calculate_operation
 
     def execute(self, request, doc):
-        circuits = self._get_target_circuits(doc, request.circuit_ids)
+        context = CircuitActionContext(doc)
+        circuits = context.get_circuits(request.circuit_ids)
         if not circuits:
             return {'status': 'cancelled', 'reason': 'no_circuits'}
 
-        updates_by_id = self._build_updates_map(request.options.get('updates'))
-        mode = str(request.options.get('mode') or '').lower()
-        include_value = None
-        if mode in ('add', 'remove'):
-            include_value = 1 if mode == 'add' else 0
-        if include_value is None and not updates_by_id:
-            return {'status': 'cancelled', 'reason': 'invalid_mode'}
-
-        target_ids = []
-        target_id_set = set()
-        locked_rows = []
         tg = DB.TransactionGroup(doc, '{} + Calculate Circuits'.format(self._mode_name))
         tg.Start()
         tx = DB.Transaction(doc, 'Update Circuit Include Flags ({})'.format(self._mode_name))
         tx.Start()
         try:
-            for circuit in circuits:
-                blocked_reason = self._block_reason(circuit)
-                if blocked_reason:
-                    continue
-
-                if self._is_locked(doc, circuit.Id):
-                    locked_rows.append(self._locked_row(circuit, doc))
-                    continue
-
-                param = None
-                try:
-                    param = circuit.LookupParameter(self._include_param_name)
-                except Exception:
-                    param = None
-                if not param or param.StorageType != DB.StorageType.Integer:
-                    continue
-
-                circuit_id = _elid_value(circuit.Id)
-                requested_include = updates_by_id.get(circuit_id, include_value)
-                if requested_include not in (0, 1):
-                    continue
-
-                current = None
-                try:
-                    current = param.AsInteger()
-                except Exception:
-                    current = None
-                include_matches = current == requested_include
-                explicit_update = circuit_id in updates_by_id
-                applied_or_confirmed = False
-
-                if include_matches:
-                    applied_or_confirmed = True
-                else:
-                    try:
-                        param.Set(requested_include)
-                        applied_or_confirmed = True
-                    except Exception:
-                        continue
-
-                if not applied_or_confirmed:
-                    continue
-
-                if explicit_update or (not include_matches):
-                    if circuit_id not in target_id_set:
-                        target_id_set.add(circuit_id)
-                        target_ids.append(circuit_id)
-
+            applied = self.apply_changes(context, request.circuit_ids, request.options)
             tx.Commit()
         except Exception:
             tx.RollBack()
@@ -106,6 +43,14 @@ class SetIncludeAndRecalculateOperation(object):
                 pass
             raise
 
+        if applied.get('reason') == 'invalid_mode':
+            try:
+                tg.RollBack()
+            except Exception:
+                pass
+            return {'status': 'cancelled', 'reason': 'invalid_mode'}
+        target_ids = applied['changed_ids']
+        locked_rows = applied['locked_rows']
         if not target_ids:
             try:
                 tg.RollBack()
@@ -141,16 +86,74 @@ class SetIncludeAndRecalculateOperation(object):
             calc_result['locked_rows'] = existing + locked_rows
         return calc_result
 
-    def _get_target_circuits(self, doc, circuit_ids):
-        circuits = []
-        for raw_id in list(circuit_ids or []):
+    def apply_changes(self, context, circuit_ids, options):
+        """Write include flags inside the caller's open transaction.
+
+        Returns ``{'reason', 'changed_ids', 'locked_rows'}``; ``reason`` is set
+        when nothing could be applied.
+        """
+        result = {'reason': None, 'changed_ids': [], 'locked_rows': []}
+        circuits = context.get_circuits(circuit_ids)
+        if not circuits:
+            result['reason'] = 'no_circuits'
+            return result
+
+        options = dict(options or {})
+        updates_by_id = self._build_updates_map(options.get('updates'))
+        mode = str(options.get('mode') or '').lower()
+        include_value = None
+        if mode in ('add', 'remove'):
+            include_value = 1 if mode == 'add' else 0
+        if include_value is None and not updates_by_id:
+            result['reason'] = 'invalid_mode'
+            return result
+
+        doc = context.doc
+        target_ids = result['changed_ids']
+        target_id_set = set()
+        for circuit in circuits:
+            blocked_reason = self._block_reason(circuit, context)
+            if blocked_reason:
+                continue
+
+            if context.is_locked(circuit):
+                result['locked_rows'].append(self._locked_row(circuit, doc))
+                continue
+
+            param = None
             try:
-                el = doc.GetElement(_elid_from_value(raw_id))
+                param = circuit.LookupParameter(self._include_param_name)
             except Exception:
-                el = None
-            if isinstance(el, DBE.ElectricalSystem):
-                circuits.append(el)
-        return circuits
+                param = None
+            if not param or param.StorageType != DB.StorageType.Integer:
+                continue
+
+            circuit_id = _elid_value(circuit.Id)
+            requested_include = updates_by_id.get(circuit_id, include_value)
+            if requested_include not in (0, 1):
+                continue
+
+            current = None
+            try:
+                current = param.AsInteger()
+            except Exception:
+                current = None
+            include_matches = current == requested_include
+            explicit_update = circuit_id in updates_by_id
+
+            if not include_matches:
+                try:
+                    param.Set(requested_include)
+                except Exception:
+                    continue
+
+            if explicit_update or (not include_matches):
+                if circuit_id not in target_id_set:
+                    target_id_set.add(circuit_id)
+                    target_ids.append(circuit_id)
+        if not target_ids:
+            result['reason'] = 'no_changes'
+        return result
 
     def _build_updates_map(self, updates):
         mapping = {}
@@ -171,10 +174,9 @@ class SetIncludeAndRecalculateOperation(object):
             mapping[cid] = include_value
         return mapping
 
-    def _block_reason(self, circuit):
-        try:
-            branch = CircuitBranch(circuit, settings=settings_manager.load_circuit_settings(circuit.Document))
-        except Exception:
+    def _block_reason(self, circuit, context):
+        branch = context.branch(circuit)
+        if branch is None:
             return 'invalid_circuit'
 
         branch_type = (branch.branch_type or '').upper()
@@ -201,14 +203,6 @@ class SetIncludeAndRecalculateOperation(object):
                 return 'ig_blocked_ground_clear'
         return None
 
-    def _is_locked(self, doc, eid):
-        if not getattr(doc, 'IsWorkshared', False):
-            return False
-        try:
-            return DB.WorksharingUtils.GetCheckoutStatus(doc, eid) == DB.CheckoutStatus.OwnedByOtherUser
-        except Exception:
-            return False
-
     def _locked_row(self, circuit, doc):
         panel = ''
         try:
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Shared decode cache for circuit alert payloads.
+
+Circuit Manager and Alerts Manager both read the ``Circuit Data_CED`` JSON
+blob on every refresh. Entries are keyed by (element id, payload hash) so an
+unchanged payload is decoded at most once per session, and callers that only
+need badge counts read the cached ``AlertPayloadSummary`` instead of
+rebuilding alert rows.
+
+Decoded payloads returned from the cache are shared: treat them as read-only.
+"""
+
+import hashlib
+import json
+
+DEFAULT_MAX_ENTRIES = 20000
+
+
+def payload_hash(raw_text):
+    """Return a stable digest for a raw payload string (empty string for no payload)."""
+    if not raw_text:
+        return ""
+    try:
+        data = raw_text.encode("utf-8")
+    except Exception:
+        data = str(raw_text)
+    return hashlib.md5(data).hexdigest()
+
+
+def read_payload_text(element, parameter_name):
+    """Read the raw alert payload string from an element parameter."""
+    try:
+        param = element.LookupParameter(parameter_name)
+    except Exception:
+        return None
+    if not param:
+        return None
+    try:
+        value = param.AsString()
+        if value is None:
+            value = param.AsValueString()
+        return value
+    except Exception:
+        return None
+
+
+def payload_alert_records(payload):
+    if not isinstance(payload, dict):
+        return []
+    alerts = payload.get("alerts")
+    return alerts if isinstance(alerts, list) else []
+
+
+def payload_hidden_ids(payload):
+    if not isinstance(payload, dict):
+        return set()
+    hidden = payload.get("hidden_definition_ids")
+    if not isinstance(hidden, list):
+        return set()
+    return set([x for x in hidden if x])
+
+
+class AlertPayloadSummary(object):
+    """Cheap per-payload view used for badges, filters and panel counts."""
+
+    def __init__(self, alert_count=0, hidden_count=0, severity_counts=None, sync_lock=None):
+        self.alert_count = int(alert_count or 0)
+        self.hidden_count = int(hidden_count or 0)
+        self.active_count = max(0, self.alert_count - self.hidden_count)
+        self.severity_counts = dict(severity_counts or {})
+        self.sync_lock = sync_lock if isinstance(sync_lock, dict) else None
+
+    @property
+    def has_alerts(self):
+        return self.alert_count > 0
+
+    @property
+    def all_hidden(self):
+        return self.alert_count > 0 and self.hidden_count == self.alert_count
+
+    @classmethod
+    def from_payload(cls, payload):
+        hidden_ids = payload_hidden_ids(payload)
+        alert_count = 0
+        hidden_count = 0
+        severity_counts = {}
+        for item in payload_alert_records(payload):
+            if not isinstance(item, dict):
+                continue
+            alert_count += 1
+            severity = str(item.get("severity") or "NONE").upper()
+            severity_counts[severity] = severity_counts.get(severity, 0) + 1
+            definition_id = item.get("definition_id") or item.get("id")
+            if definition_id and definition_id in hidden_ids:
+                hidden_count += 1
+        sync_lock = payload.get("sync_lock") if isinstance(payload, dict) else None
+        return cls(alert_count, hidden_count, severity_counts, sync_lock)
+
+
+EMPTY_SUMMARY = AlertPayloadSummary()
+
+
+class AlertPayloadEntry(object):
+    """Decoded payload plus its summary for one (element id, payload hash)."""
+
+    def __init__(self, element_id, digest, payload):
+        self.element_id = int(element_id or 0)
+        self.payload_hash = digest
+        self.payload = payload
+        self.summary = AlertPayloadSummary.from_payload(payload) if payload is not None else EMPTY_SUMMARY
+
+
+class AlertPayloadCache(object):
+    """Session cache of decoded alert payloads keyed by (element id, payload hash)."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = int(max_entries or DEFAULT_MAX_ENTRIES)
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entry(self, element_id, raw_text):
+        """Return the cached entry for this payload, decoding it only on a miss."""
+        if not raw_text:
+            return None
+        key = int(element_id or 0)
+        digest = payload_hash(raw_text)
+        cached = self._entries.get(key)
+        if cached is not None and cached.payload_hash == digest:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        try:
+            payload = json.loads(raw_text)
+        except Exception:
+            payload = None
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            self._entries.clear()
+        created = AlertPayloadEntry(key, digest, payload)
+        self._entries[key] = created
+        return created
+
+    def summary(self, element_id, raw_text):
+        found = self.entry(element_id, raw_text)
+        return found.summary if found is not None else EMPTY_SUMMARY
+
+    def payload(self, element_id, raw_text):
+        found = self.entry(element_id, raw_text)
+        return found.payload if found is not None else None
+
+    def stored_hash(self, element_id):
+        """Return the hash of the last payload seen for an element, or ``None``."""
+        cached = self._entries.get(int(element_id or 0))
+        return cached.payload_hash if cached is not None else None
+
+    def discard(self, element_id):
+        self._entries.pop(int(element_id or 0), None)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_SHARED_CACHE = AlertPayloadCache()
+
+
+def get_shared_cache():
+    """Return the process-wide cache shared by Circuit Manager and Alerts Manager."""
+    return _SHARED_CACHE
+
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Circuit state read once per run and shared by circuit actions."""
+
+import Autodesk.Revit.DB.Electrical as DBE
+from pyrevit import DB
+
+from CEDElectrical.Domain import settings_manager
+from CEDElectrical.Model.CircuitBranch import CircuitBranch
+from Snippets import revit_helpers
+
+
+def _elid_value(item):
+    return revit_helpers.get_elementid_value(item)
+
+
+def _elid_from_value(value):
+    return revit_helpers.elementid_from_value(value)
+
+
+class CircuitActionContext(object):
+    """Caches circuits, settings, branch facts and lock state for one batch of actions."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._settings = None
+        self._circuits = {}
+        self._branches = {}
+        self._locked = {}
+
+    @property
+    def settings(self):
+        if self._settings is None:
+            self._settings = settings_manager.load_circuit_settings(self.doc)
+        return self._settings
+
+    def get_circuits(self, circuit_ids):
+        """Return ElectricalSystems for ``circuit_ids`` in order, reading each id once."""
+        circuits = []
+        for raw_id in list(circuit_ids or []):
+            try:
+                cid = int(raw_id)
+            except Exception:
+                continue
+            if cid not in self._circuits:
+                try:
+                    el = self.doc.GetElement(_elid_from_value(cid))
+                except Exception:
+                    el = None
+                self._circuits[cid] = el if isinstance(el, DBE.ElectricalSystem) else None
+            circuit = self._circuits[cid]
+            if circuit is not None:
+                circuits.append(circuit)
+        return circuits
+
+    def branch(self, circuit):
+        """Return a cached ``CircuitBranch`` for ``circuit`` or ``None`` when it cannot be built."""
+        cid = _elid_value(circuit.Id)
+        if cid not in self._branches:
+            try:
+                self._branches[cid] = CircuitBranch(circuit, settings=self.settings)
+            except Exception:
+                self._branches[cid] = None
+        return self._branches[cid]
+
+    def refresh(self, circuit_ids):
+        """Drop cached branch facts for ``circuit_ids`` so the next read sees values written since."""
+        for raw_id in list(circuit_ids or []):
+            try:
+                self._branches.pop(int(raw_id), None)
+            except Exception:
+                continue
+
+    def branch_type(self, circuit):
+        branch = self.branch(circuit)
+        if branch is None:
+            return ''
+        return (branch.branch_type or '').upper()
+
+    def is_locked(self, circuit):
+        cid = _elid_value(circuit.Id)
+        if cid not in self._locked:
+            locked = False
+            if getattr(self.doc, 'IsWorkshared', False):
+                try:
+                    locked = DB.WorksharingUtils.GetCheckoutStatus(self.doc, circuit.Id) == DB.CheckoutStatus.OwnedByOtherUser
+                except Exception:
+                    locked = False
+            self._locked[cid] = bool(locked)
+        return self._locked[cid]
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 """View lookup and dedicated-view creation for Circuit Element Finder."""
 
+import time
+
 from pyrevit import DB
 
+from CEDElectrical.Domain.circuit_element_finder_bounds import get_combined_bounding_box
 from Snippets import revit_helpers
 
 try:
@@ -14,6 +17,9 @@ except Exception:
 DEDICATED_VIEW_NAME = "_circuitElementFinder"
 DEDICATED_3D_VIEW_NAME = "_circuitElementFinder_3D"
 EXCLUDED_DISCIPLINE_NAMES = set(["mechanical", "plumbing"])
+PLAN_VIEW_TYPES = (DB.ViewType.FloorPlan, DB.ViewType.EngineeringPlan)
+PLAN_VIEW_SEARCH_BUDGET_SECONDS = 3.0
+CROP_CONTAINMENT_TOLERANCE = 0.01
 
 
 def _id_value(item):
@@ -202,24 +208,257 @@ def _get_view_family_type_id(doc, view_family):
     return DB.ElementId.InvalidElementId
 
 
+def _crop_rectangle(view):
+    """Return the model XY rectangle ``(min_x, min_y, max_x, max_y)`` of an active crop box, else ``None``."""
+    try:
+        if not bool(view.CropBoxActive):
+            return None
+        box = view.CropBox
+    except Exception:
+        return None
+    if box is None or box.Min is None or box.Max is None:
+        return None
+    try:
+        transform = box.Transform
+    except Exception:
+        transform = None
+    xs = []
+    ys = []
+    for x in (box.Min.X, box.Max.X):
+        for y in (box.Min.Y, box.Max.Y):
+            point = DB.XYZ(x, y, box.Min.Z)
+            if transform is not None:
+                try:
+                    point = transform.OfPoint(point)
+                except Exception:
+                    pass
+            xs.append(float(point.X))
+            ys.append(float(point.Y))
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+class PlanViewEntry(object):
+    """Cached lookup facts for one plan view."""
+
+    def __init__(self, view):
+        self.view = view
+        self.view_id = _id_value(getattr(view, "Id", None))
+        self.name = _to_name(getattr(view, "Name", ""))
+        self.discipline_score = _discipline_priority(view)
+        try:
+            gen_level = getattr(view, "GenLevel", None)
+            self.level_id = _id_value(getattr(gen_level, "Id", None)) if gen_level is not None else -1
+        except Exception:
+            self.level_id = -1
+        self.refresh_crop()
+
+    def refresh_crop(self):
+        """Re-read the crop rectangle (crop edits are not always seen as DocumentChanged events)."""
+        self.rect = _crop_rectangle(self.view)
+        if self.rect is None:
+            self.area = float("inf")
+        else:
+            self.area = (self.rect[2] - self.rect[0]) * (self.rect[3] - self.rect[1])
+
+    def contains(self, rect):
+        """Return True when ``rect`` lies inside the crop (uncropped views contain everything)."""
+        if self.rect is None or rect is None:
+            return True
+        tol = CROP_CONTAINMENT_TOLERANCE
+        return (
+            rect[0] >= self.rect[0] - tol
+            and rect[1] >= self.rect[1] - tol
+            and rect[2] <= self.rect[2] + tol
+            and rect[3] <= self.rect[3] + tol
+        )
+
+
+class PlanViewIndex(object):
+    """Non-template plan views of one document keyed by level, with crop rectangles.
+
+    The index is read once per document; view edits (added, changed or
+    deleted plan views) mark it stale and the next query rebuilds it. Each
+    query also compares the current ``ViewPlan`` id set with the one the
+    index was built from, so views added or deleted while no pane forwards
+    DocumentChanged events still trigger a rebuild.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._entries = {}
+        self._by_level = {}
+        self._view_ids = None
+        self._stale = True
+
+    @property
+    def is_stale(self):
+        return bool(self._stale)
+
+    def invalidate(self):
+        self._stale = True
+
+    def _current_view_ids(self):
+        """Return the ``ViewPlan`` id set (cheap: ids only, no element expansion)."""
+        collector = DB.FilteredElementCollector(self.doc).OfClass(DB.ViewPlan).ToElementIds()
+        return frozenset(_id_value(x) for x in list(collector or []))
+
+    def _ensure(self):
+        view_ids = self._current_view_ids()
+        if self._stale or view_ids != self._view_ids:
+            self._build(view_ids)
+
+    def _build(self, view_ids=None):
+        self._entries = {}
+        self._by_level = {}
+        self._view_ids = view_ids if view_ids is not None else self._current_view_ids()
+        collector = DB.FilteredElementCollector(self.doc).OfClass(DB.ViewPlan).ToElements()
+        for view in list(collector or []):
+            try:
+                if bool(getattr(view, "IsTemplate", False)):
+                    continue
+            except Exception:
+                continue
+            if getattr(view, "ViewType", None) not in PLAN_VIEW_TYPES:
+                continue
+            if _is_excluded_discipline(view):
+                continue
+            entry = PlanViewEntry(view)
+            if entry.view_id <= 0:
+                continue
+            self._entries[entry.view_id] = entry
+            self._by_level.setdefault(entry.level_id, []).append(entry)
+        self._stale = False
+
+    def note_document_changed(self, args):
+        """Invalidate from a DocumentChanged event; return True when plan views were touched."""
+        try:
+            view_filter = DB.ElementClassFilter(DB.ViewPlan)
+            touched = list(args.GetAddedElementIds(view_filter) or [])
+            touched += list(args.GetModifiedElementIds(view_filter) or [])
+            deleted = [_id_value(x) for x in list(args.GetDeletedElementIds() or [])]
+        except Exception:
+            self.invalidate()
+            return True
+        if touched or any(x in self._entries for x in deleted):
+            self.invalidate()
+            return True
+        return False
+
+    def candidates(self, rect=None, preferred_level_id=None):
+        """Return ``(candidates, others)`` in try order.
+
+        Candidates are views whose crop contains ``rect``; they are ordered by
+        discipline, preferred level, then ascending crop area so the tightest
+        view is confirmed first. Views that fail the crop test are returned
+        in the same order as a fallback.
+        """
+        self._ensure()
+        preferred = _id_value(preferred_level_id)
+        found = []
+        others = []
+        for level_id, entries in self._by_level.items():
+            level_score = 0 if preferred > 0 and level_id == preferred else 1
+            for entry in entries:
+                key = (entry.discipline_score, level_score, entry.area, entry.name)
+                if entry.contains(rect):
+                    found.append((key, entry))
+                else:
+                    others.append((key, entry))
+        found.sort(key=lambda x: x[0])
+        others.sort(key=lambda x: x[0])
+        return [x[1] for x in found], [x[1] for x in others]
+
+
+_PLAN_VIEW_INDEXES = {}
+
+
+def get_plan_view_index(doc, refresh=False):
+    """Return the session plan view index for ``doc``, building it on first use or after invalidation."""
+    key = revit_helpers.get_document_key(doc)
+    index = _PLAN_VIEW_INDEXES.get(key)
+    if index is None or not revit_helpers.is_valid_object(index.doc):
+        index = PlanViewIndex(doc)
+        _PLAN_VIEW_INDEXES[key] = index
+    elif bool(refresh):
+        index.invalidate()
+    return index
+
+
+def invalidate_plan_view_index(doc=None):
+    if doc is None:
+        for index in _PLAN_VIEW_INDEXES.values():
+            index.invalidate()
+        return
+    index = _PLAN_VIEW_INDEXES.get(revit_helpers.get_document_key(doc))
+    if index is not None:
+        index.invalidate()
+
+
+def note_document_changed(args):
+    """Forward a DocumentChanged event to the plan view index of the changed document."""
+    try:
+        index = _PLAN_VIEW_INDEXES.get(revit_helpers.get_document_key(args.GetDocument()))
+    except Exception:
+        index = None
+    if index is None:
+        return False
+    return index.note_document_changed(args)
+
+
+def _selection_rectangle(doc, selected_element_ids=None):
+    ids = [x for x in list(selected_element_ids or []) if isinstance(x, DB.ElementId)]
+    if not ids:
+        return None
+    box = get_combined_bounding_box(doc, ids, view=None)
+    if box is None:
+        return None
+    return float(box.Min.X), float(box.Min.Y), float(box.Max.X), float(box.Max.Y)
+
+
 def find_existing_plan_view(
     doc,
     preferred_level_id=None,
     required_category_ids=None,
     selected_element_ids=None,
     require_all_visible=True,
+    time_budget=PLAN_VIEW_SEARCH_BUDGET_SECONDS,
 ):
-    preferred_level = _id_value(preferred_level_id)
-    candidates = []
-    collector = DB.FilteredElementCollector(doc).OfClass(DB.ViewPlan).ToElements()
-    for view in list(collector or []):
+    """Return the best existing plan view showing the selection, or ``None``.
+
+    Views come from the session ``PlanViewIndex``: those whose crop contains
+    the selection bounding box are confirmed first (tightest crop first),
+    then the rest. Element visibility is only checked for views reached
+    within ``time_budget`` seconds; the best view confirmed so far is
+    returned when the budget runs out. The crop of each crop candidate is
+    re-read before it is checked; one that no longer contains the selection
+    moves to the back of the queue.
+    """
+    index = get_plan_view_index(doc)
+    rect = _selection_rectangle(doc, selected_element_ids)
+    candidates, others = index.candidates(rect, preferred_level_id=preferred_level_id)
+    queue = candidates + others
+    candidate_ids = set([entry.view_id for entry in candidates])
+    started = time.time()
+    partial = None
+    position = 0
+    while position < len(queue):
+        entry = queue[position]
+        position += 1
+        if time_budget is not None and (time.time() - started) > float(time_budget):
+            break
+        view = entry.view
         try:
-            if bool(getattr(view, "IsTemplate", False)):
+            if not view.IsValidObject:
+                index.invalidate()
                 continue
         except Exception:
             continue
-        if _is_excluded_discipline(view):
-            continue
+        if entry.view_id in candidate_ids:
+            candidate_ids.discard(entry.view_id)
+            entry.refresh_crop()
+            if not entry.contains(rect):
+                queue.append(entry)
+                continue
         if not _has_visible_required_categories(view, required_category_ids):
             continue
         ok_visible, visible_count, total_count = _has_required_visible_elements(
@@ -230,23 +469,14 @@ def find_existing_plan_view(
         )
         if not ok_visible:
             continue
-        view_type = getattr(view, "ViewType", None)
-        if view_type not in (DB.ViewType.FloorPlan, DB.ViewType.EngineeringPlan):
-            continue
-        score = 1
-        try:
-            gen_level = getattr(view, "GenLevel", None)
-            if gen_level is not None and _id_value(getattr(gen_level, "Id", None)) == preferred_level:
-                score = 0
-        except Exception:
-            pass
-        discipline_score = _discipline_priority(view)
-        coverage_score = 0 if total_count > 0 and visible_count == total_count else 1
-        candidates.append((discipline_score, coverage_score, score, _to_name(getattr(view, "Name", "")), view))
-    if not candidates:
-        return None
-    candidates.sort(key=lambda x: (x[0], x[1], x[2], x[3]))
-    return candidates[0][4]
+        if total_count <= 0 or visible_count == total_count:
+            # A partly visible view from a preferred discipline still ranks first.
+            if partial is not None and partial.discipline_score < entry.discipline_score:
+                return partial.view
+            return view
+        if partial is None:
+            partial = entry
+    return partial.view if partial is not None else None
 
 
 def find_existing_3d_view(
@@ -6,6 +6,7 @@ from Autodesk.Revit.DB import Transaction, BuiltInParameter
 from pyrevit import script, forms, DB
 
 from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repository as ps_repo
+from CEDElectrical.Model.panel_move_planner import STRATEGY_BACKTRACK, SlotOccupancy, plan_moves
 from CEDElectrical.Model.panel_schedule_manager import PanelScheduleManager
 from Snippets import revit_helpers
 
@@ -55,7 +56,7 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
             pass
         return "N/A"
 
-    def _run_select_panel_moves(allow_partial=False, sort_by_poles=False, phase="primary"):
+    def _run_select_panel_moves(plan=None, allow_partial=False, phase="primary"):
         def _resolve_start_slot_on_target(circuit, hint_slot=0):
             slot_hint = int(hint_slot or 0)
             if slot_hint > 0 and target_option is not None and bool(ps_repo.is_slot_valid_for_option(target_option, slot_hint)):
@@ -131,45 +132,33 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
             except Exception:
                 return False
 
-        planner_available = None
-        planner_slot_order = []
-        if target_option is not None:
-            planner_slot_order = [int(x) for x in list(ps_repo.get_option_slot_order(target_option, include_excess=False) or []) if int(x) > 0]
-            planner_available = set([int(x) for x in list(_collect_empty_slots(target_option) or []) if int(x) > 0])
-
-        def _plan_next_span(circuit):
-            if planner_available is None or not planner_slot_order:
-                return 0, []
-            pole_count = int(max(1, _get_circuit_poles(circuit)))
-            for start in list(planner_slot_order or []):
-                covered = list(
-                    ps_repo.get_slot_span_slots_for_option(
-                        target_option,
-                        start_slot=int(start),
-                        pole_count=int(pole_count),
-                        require_valid=True,
-                    )
-                    or []
-                )
-                covered = [int(x) for x in list(covered or []) if int(x) > 0]
-                if not covered:
-                    continue
-                if all(int(slot) in planner_available for slot in list(covered or [])):
-                    return int(start), list(covered)
-            return 0, []
+        def _place_on_planned_span(circuit, planned_start):
+            # Backtracked plans can differ from SelectPanel's first-fit slot.
+            if plan is None or plan.strategy != STRATEGY_BACKTRACK or int(planned_start) <= 0:
+                return
+            current_start = int(ps_repo.get_circuit_start_slot(circuit) or 0)
+            if current_start == int(planned_start):
+                return
+            psm.move_circuit_in_panel(target_panel_id, _panel_id(circuit), int(planned_start))
 
         move_list = list(circuits or [])
-        if bool(sort_by_poles):
-            move_list = sorted(move_list, key=lambda c: int(_get_circuit_poles(c)), reverse=True)
+        planned_out = []
+        if plan is not None:
+            by_id = dict((_panel_id(c), c) for c in move_list)
+            move_list = [by_id[key] for key in list(plan.order) if key in by_id]
+            planned_out = [by_id[item[0]] for item in list(plan.unplaced) if item[0] in by_id]
+            if planned_out and not bool(allow_partial):
+                raise Exception(plan.summary())
         phase_name = _safe_text(phase, "primary")
         target_id = _panel_id(target_panel)
         try:
             logger.info(
-                "[MoveSelectedCircuits] SelectPanel phase=%s start requested=%s allow_partial=%s sort_by_poles=%s regenerate=%s",
+                "[MoveSelectedCircuits] SelectPanel phase=%s start requested=%s planned_out=%s allow_partial=%s strategy=%s regenerate=%s",
                 phase_name,
-                int(len(move_list)),
+                int(len(move_list) + len(planned_out)),
+                int(len(planned_out)),
                 bool(allow_partial),
-                bool(sort_by_poles),
+                _safe_text(getattr(plan, "strategy", None), "none"),
                 False,
             )
         except Exception:
@@ -185,19 +174,22 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
             })
         data_rows = []
         failed_rows = []
+        for ckt in planned_out:
+            failed_rows.append([
+                output.linkify(ckt.Id),
+                "{} / {}".format(_safe_panel_name(ckt), _safe_circuit_number(ckt)),
+                _safe_text(plan.reason(_panel_id(ckt)), "Insufficient valid slot capacity on target panel for this circuit."),
+            ])
         for snap in snapshots:
             try:
-                _, planned_span = _plan_next_span(snap["circuit"])
-                if planner_available is not None and not planned_span:
-                    raise Exception(
-                        "Insufficient valid slot capacity on target panel for this circuit."
-                    )
                 result = snap["circuit"].SelectPanel(target_panel)
                 if isinstance(result, bool) and not result:
                     raise Exception("SelectPanel returned False.")
                 base_after = getattr(snap["circuit"], "BaseEquipment", None)
                 if int(_panel_id(base_after)) != int(target_id):
                     raise Exception("SelectPanel did not place circuit on target panel.")
+                if plan is not None:
+                    _place_on_planned_span(snap["circuit"], plan.assignment(_panel_id(snap["circuit"]))[0])
                 is_valid, start_slot, covered_slots = _validate_target_assignment(snap["circuit"])
                 if not bool(is_valid) and (int(start_slot) <= 0 or not list(covered_slots or [])):
                     prior_start = int(start_slot or 0)
@@ -224,9 +216,6 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
                             ",".join([str(int(x)) for x in list(covered_slots or [])]) or "-",
                         )
                     )
-                if planner_available is not None:
-                    for slot in list(planned_span or []):
-                        planner_available.discard(int(slot))
             except Exception as ex:
                 if not bool(allow_partial):
                     raise
@@ -249,11 +238,16 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
             prev_circuit = "{} / {}".format(snap["old_panel"], snap["old_circuit_number"])
             new_circuit = "{} / {}".format(_safe_text(getattr(target_panel, "Name", None), "N/A"), new_circuit_number)
             data_rows.append([output.linkify(snap["circuit"].Id), prev_circuit, new_circuit])
+        # Cached panel snapshots only drop on commit; later reads in this transaction must re-read.
+        ps_repo.invalidate_panel_snapshot(target_panel)
+        for snap in snapshots:
+            if snap.get("old_panel_element") is not None:
+                ps_repo.invalidate_panel_snapshot(snap["old_panel_element"])
         try:
             logger.info(
                 "[MoveSelectedCircuits] SelectPanel phase=%s done requested=%s moved=%s failed=%s regenerate=%s",
                 phase_name,
-                int(len(snapshots)),
+                int(len(snapshots) + len(planned_out)),
                 int(len(data_rows)),
                 int(len(failed_rows)),
                 False,
@@ -545,38 +539,38 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
             needing.append(circuit)
         return needing
 
-    def _fit_count(option, free_slots, pole_counts):
+    def _build_move_plan(option, free_slots, phase="primary"):
         if option is None:
-            return 0
+            return None
         slot_order = list(ps_repo.get_option_slot_order(option, include_excess=False) or [])
         if not slot_order:
-            return 0
-        available = set([int(x) for x in list(free_slots or []) if int(x) > 0])
-        moved = 0
-        for poles in list(pole_counts or []):
-            pole_count = int(max(1, poles or 1))
-            placed = False
-            for start in slot_order:
-                covered = ps_repo.get_slot_span_slots_for_option(
-                    option,
-                    start_slot=int(start),
-                    pole_count=int(pole_count),
-                    require_valid=True,
-                )
-                if not covered:
-                    continue
-                if all(int(slot) in available for slot in list(covered or [])):
-                    for slot in covered:
-                        try:
-                            available.remove(int(slot))
-                        except Exception:
-                            pass
-                    moved += 1
-                    placed = True
-                    break
-            if not placed:
-                break
-        return int(moved)
+            return None
+
+        def _span(start, poles):
+            return ps_repo.get_slot_span_slots_for_option(
+                option,
+                start_slot=int(start),
+                pole_count=int(poles),
+                require_valid=True,
+            )
+
+        occupancy = SlotOccupancy(slot_order, free_slots, _span)
+        requests = [(_panel_id(c), int(max(1, _get_circuit_poles(c)))) for c in _circuits_requiring_new_slots()]
+        plan = plan_moves(requests, occupancy)
+        try:
+            logger.info(
+                "[MoveSelectedCircuits] Move plan phase=%s strategy=%s requested=%s placed=%s free_slots=%s required_slots=%s elapsed_ms=%.1f",
+                _safe_text(phase, "primary"),
+                plan.strategy,
+                int(len(requests)),
+                int(plan.placed_count),
+                int(plan.free_slot_count),
+                int(plan.required_slot_count),
+                float(plan.elapsed_ms),
+            )
+        except Exception:
+            pass
+        return plan
 
     def _accept_partial_prompt(moved_count, total_count):
         return forms.alert(
@@ -602,10 +596,8 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
                     removable_slots.add(sval)
         return removable_slots
 
-    def _capacity_plan(schedule_view, default_entries):
-        moving = _circuits_requiring_new_slots()
-        pole_counts = sorted([int(max(1, _get_circuit_poles(c))) for c in list(moving or [])], reverse=True)
-        required = int(len(pole_counts))
+    def _capacity_plan(schedule_view, default_entries, baseline_plan=None):
+        required = int(len(_circuits_requiring_new_slots()))
         option = target_option
         if option is None and schedule_view is not None:
             option = _get_target_option(target_panel, schedule_view)
@@ -613,14 +605,21 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
         if option is not None:
             empty_slots = set([int(x) for x in list(_collect_empty_slots(option) or []) if int(x) > 0])
         removable_slots = _collect_removable_slots(default_entries)
-        fit_without = int(_fit_count(option, empty_slots, pole_counts)) if required > 0 else 0
-        fit_with = int(_fit_count(option, empty_slots.union(removable_slots), pole_counts)) if required > 0 else 0
+        plan_without = None
+        plan_with = None
+        if required > 0:
+            plan_without = baseline_plan if option is target_option and baseline_plan is not None else _build_move_plan(option, empty_slots, phase="capacity")
+            plan_with = _build_move_plan(option, empty_slots.union(removable_slots), phase="capacity-with-defaults") if removable_slots else plan_without
+        fit_without = int(plan_without.placed_count) if plan_without is not None else 0
+        fit_with = int(plan_with.placed_count) if plan_with is not None else 0
         is_switchboard = bool(
             option is not None
             and option.get("schedule_type") == ps_repo.PSTYPE_SWITCHBOARD
         )
         return {
             "option": option,
+            "plan_without": plan_without,
+            "plan_with": plan_with,
             "required": int(required),
             "fit_without": int(fit_without),
             "fit_with": int(fit_with),
@@ -656,12 +655,11 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
                     removable_slots.add(sval)
         if not removable_slots:
             return False
-        pole_counts = sorted([_get_circuit_poles(c) for c in moving], reverse=True)
-        required = int(len(pole_counts))
-        if required <= 0:
-            return False
-        fit_without = _fit_count(option, empty_slots, pole_counts)
-        fit_with = _fit_count(option, empty_slots.union(removable_slots), pole_counts)
+        required = int(len(moving))
+        plan_without = _build_move_plan(option, empty_slots, phase="capacity")
+        plan_with = _build_move_plan(option, empty_slots.union(removable_slots), phase="capacity-with-defaults")
+        fit_without = int(plan_without.placed_count) if plan_without is not None else 0
+        fit_with = int(plan_with.placed_count) if plan_with is not None else 0
         if fit_without >= required:
             return False
         return bool(fit_with > fit_without)
@@ -812,39 +810,51 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
             "partial": False,
             "fallback_used": False,
         }
+    # Solve placement for the whole batch before any transaction opens.
+    primary_plan = _build_move_plan(target_option, _collect_empty_slots(target_option), phase="primary")
     tx_group = DB.TransactionGroup(doc, "Move Selected Circuits")
     tx_group.Start()
     try:
         first_error = ""
 
-        initial_tx = Transaction(doc, "Move Circuits to New Panel")
-        initial_tx.Start()
-        try:
-            data, failed = _run_select_panel_moves(allow_partial=False, sort_by_poles=False, phase="primary")
-            initial_tx.Commit()
-            tx_group.Assimilate()
-            return {
-                "moved": data,
-                "failed": failed,
-                "skipped": list(skipped_rows),
-                "partial": False,
-                "fallback_used": False,
-            }
-        except Exception as ex:
-            first_error = _safe_text(ex, "Move failed.")
+        if primary_plan is not None and not primary_plan.feasible:
+            first_error = primary_plan.summary()
             try:
                 logger.info(
-                    "[MoveSelectedCircuits] Primary move failed; evaluating fallback. error=%s",
+                    "[MoveSelectedCircuits] Move plan infeasible; evaluating fallback without a primary attempt. report=%s",
                     _safe_text(first_error, "Move failed."),
                 )
             except Exception:
                 pass
+        else:
+            initial_tx = Transaction(doc, "Move Circuits to New Panel")
+            initial_tx.Start()
             try:
-                initial_tx.RollBack()
-            except Exception:
-                pass
+                data, failed = _run_select_panel_moves(plan=primary_plan, allow_partial=False, phase="primary")
+                initial_tx.Commit()
+                tx_group.Assimilate()
+                return {
+                    "moved": data,
+                    "failed": failed,
+                    "skipped": list(skipped_rows),
+                    "partial": False,
+                    "fallback_used": False,
+                }
+            except Exception as ex:
+                first_error = _safe_text(ex, "Move failed.")
+                try:
+                    logger.info(
+                        "[MoveSelectedCircuits] Primary move failed; evaluating fallback. error=%s",
+                        _safe_text(first_error, "Move failed."),
+                    )
+                except Exception:
+                    pass
+                try:
+                    initial_tx.RollBack()
+                except Exception:
+                    pass
 
-        def _run_partial_move_batch(phase_name):
+        def _run_partial_move_batch(phase_name, plan):
             partial_tx = Transaction(doc, "Move Circuits to New Panel")
             partial_tx.Start()
             try:
@@ -857,8 +867,8 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
                 except Exception:
                     pass
                 data_rows, failed_rows = _run_select_panel_moves(
+                    plan=plan,
                     allow_partial=True,
-                    sort_by_poles=True,
                     phase=phase_name,
                 )
                 partial_tx.Commit()
@@ -879,7 +889,7 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
                     pass
                 raise
 
-        capacity = _capacity_plan(schedule_view, default_entries)
+        capacity = _capacity_plan(schedule_view, default_entries, baseline_plan=primary_plan)
         required = int(capacity.get("required", 0) or 0)
         fit_without = int(capacity.get("fit_without", 0) or 0)
         fit_with = int(capacity.get("fit_with", 0) or 0)
@@ -929,7 +939,7 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
             )
             if not proceed_partial:
                 raise Exception(first_error)
-            data, failed = _run_partial_move_batch("partial-no-replace")
+            data, failed = _run_partial_move_batch("partial-no-replace", capacity.get("plan_without"))
             if failed:
                 moved_count = int(len(data or []))
                 total_count = int(moved_count + len(failed or []))
@@ -973,7 +983,7 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
                     no=True,
                 )
                 if proceed_partial:
-                    data, failed = _run_partial_move_batch("partial-no-replace")
+                    data, failed = _run_partial_move_batch("partial-no-replace", capacity.get("plan_without"))
                     if failed:
                         moved_count = int(len(data or []))
                         total_count = int(moved_count + len(failed or []))
@@ -1025,7 +1035,7 @@ def move_circuits_to_panel(circuits, target_panel, doc, output):
                 logger.info("[MoveSelectedCircuits] Fallback move batch start regenerate=%s", False)
             except Exception:
                 pass
-            data, failed = _run_select_panel_moves(allow_partial=True, sort_by_poles=True, phase="fallback")
+            data, failed = _run_select_panel_moves(plan=capacity.get("plan_with"), allow_partial=True, phase="fallback")
             move_tx.Commit()
             try:
                 logger.info(
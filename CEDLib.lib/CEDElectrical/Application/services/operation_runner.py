@@ -1,6 +1,9 @@
 ﻿# -*- coding: utf-8 -*-
 """Operation runner and default service wiring."""
 
+from CEDElectrical.Application.operations.apply_circuit_actions_and_recalculate_operation import (
+    ApplyCircuitActionsAndRecalculateOperation,
+)
 from CEDElectrical.Application.operations.autosize_breaker_and_recalculate_operation import (
     AutosizeBreakerAndRecalculateOperation,
 )
@@ -71,4 +74,5 @@ def build_default_runner(alert_parameter_name='Circuit Data_CED'):
     registry.register(AutosizeBreakerAndRecalculateOperation(calculate_operation=calc_operation))
     registry.register(MarkExistingAndRecalculateOperation(calculate_operation=calc_operation))
     registry.register(MoveSelectedCircuitsOperation(calculate_operation=calc_operation))
+    registry.register(ApplyCircuitActionsAndRecalculateOperation(registry, calculate_operation=calc_operation))
     return OperationRunner(registry)
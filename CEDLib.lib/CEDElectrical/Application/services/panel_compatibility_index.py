@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+"""Session index of panels grouped by distribution system for circuit transfer lookups.
+
+Panels are read once: distribution profile, branch circuit options and
+device slot capacity. Panels that share (distribution system, voltage, phase)
+form one group, and a (poles, voltage) signature table maps a circuit straight
+to the panels that accept it. Lookups return panels in the order they were given.
+
+Free slots are the device slot capacity minus the slots held by regular
+circuits (spares and spaces can be replaced by a move). Used slots are read
+lazily from the shared panel snapshots. Moves a tool window stages but has
+not applied live on that window's ``StagedCapacity`` overlay, never on the
+shared index, so other tools only see committed capacity.
+
+Equipment or distribution system edits invalidate the index; circuit edits
+only mark the used-slot counts for a recount. ``session_cache_events`` feeds
+DocumentChanged to ``note_document_changed`` for the whole Revit session.
+"""
+
+import Autodesk.Revit.DB.Electrical as DBE
+from pyrevit import DB
+
+from CEDElectrical.Infrastructure.Revit.repositories import distribution_equipment_repository as de_repo
+from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repository as ps_repo
+from Snippets import revit_helpers
+
+DEFAULT_TOLERANCE = 1.0
+
+
+def _idval(item):
+    return int(revit_helpers.get_elementid_value(item))
+
+
+def _voltage_key(voltage):
+    return int(round(float(voltage)))
+
+
+def _phase_label(phase):
+    try:
+        if phase == DBE.ElectricalPhase.SinglePhase:
+            return "1PH"
+        if phase == DBE.ElectricalPhase.ThreePhase:
+            return "3PH"
+    except Exception:
+        pass
+    return "-"
+
+
+def _branch_signatures(model):
+    """Return [(poles, voltage or None)] accepted by a distribution equipment model."""
+    signatures = []
+    for item in list(getattr(model, "branch_circuit_options", None) or []):
+        try:
+            poles = int(item.get("poles", 0) or 0)
+        except Exception:
+            poles = 0
+        if poles <= 0:
+            continue
+        voltage = item.get("voltage")
+        try:
+            voltage = float(voltage) if voltage is not None else None
+        except Exception:
+            voltage = None
+        signatures.append((poles, voltage))
+    return signatures
+
+
+def _panel_slot_capacity(panel, model):
+    """Return the equipment slot capacity of a panel (0 when unknown)."""
+    try:
+        limits = ps_repo.get_option_slot_limits(
+            {
+                "panel": panel,
+                "schedule_type": ps_repo.get_expected_panel_schedule_type(panel),
+                "equipment_model": model,
+            }
+        )
+        return int(limits.get("device_slot_capacity", 0) or 0)
+    except Exception:
+        return 0
+
+
+class PanelCompatibilityEntry(object):
+    """Cached compatibility facts for one panel."""
+
+    def __init__(self, panel, profile, signatures, slot_capacity=0):
+        self.panel = panel
+        self.panel_id = _idval(getattr(panel, "Id", None))
+        self.profile = dict(profile or {})
+        self.signatures = list(signatures or [])
+        self.slot_capacity = int(slot_capacity or 0)
+        self.used_slots = None
+        self.group_key = (
+            self.profile.get("dist_system_name") or "",
+            _phase_label(self.profile.get("phase")),
+            _voltage_key(self.profile["ll_voltage"]) if self.profile.get("ll_voltage") is not None else None,
+            _voltage_key(self.profile["lg_voltage"]) if self.profile.get("lg_voltage") is not None else None,
+        )
+
+
+def _base_panel_id(circuit):
+    try:
+        base = circuit.BaseEquipment
+    except Exception:
+        base = None
+    return _idval(base.Id) if base is not None else 0
+
+
+class PanelCompatibilityIndex(object):
+    """Panels grouped by (distribution system, phase, voltages) with a (poles, voltage) lookup."""
+
+    def __init__(self, doc, panels=None, tolerance=DEFAULT_TOLERANCE):
+        self.doc = doc
+        self.tolerance = float(tolerance)
+        self._panels = list(panels) if panels is not None else None
+        self._entries = {}
+        self._order = []
+        self._groups = {}
+        self._by_signature = {}
+        self._by_poles = {}
+        self._stale = True
+
+    # ------------------------------------------------------------------
+    # Build / invalidation
+    # ------------------------------------------------------------------
+    @property
+    def is_stale(self):
+        return bool(self._stale)
+
+    def invalidate(self):
+        self._stale = True
+
+    def invalidate_usage(self):
+        """Recount used slots on the next capacity lookup."""
+        for entry in self._entries.values():
+            entry.used_slots = None
+
+    def set_panels(self, panels):
+        """Use ``panels`` as the indexed set; rebuild only when the panel ids differ."""
+        new_ids = [_idval(getattr(p, "Id", None)) for p in list(panels or [])]
+        old_ids = [_idval(getattr(p, "Id", None)) for p in list(self._panels or [])]
+        self._panels = list(panels or [])
+        if set(new_ids) != set(old_ids):
+            self.invalidate()
+        elif new_ids != old_ids and not self._stale:
+            self._order = []
+            for panel_id in new_ids:
+                if panel_id in self._entries and panel_id not in self._order:
+                    self._order.append(panel_id)
+
+    def _ensure(self):
+        if self._stale:
+            self._build()
+
+    def _build(self):
+        panels = self._panels
+        if panels is None:
+            panels = list(ps_repo.get_all_panels(self.doc) or [])
+        self._entries = {}
+        self._order = []
+        self._groups = {}
+        self._by_signature = {}
+        self._by_poles = {}
+        for panel in list(panels or []):
+            try:
+                model = de_repo.build_distribution_equipment(self.doc, panel, schedule_view=None)
+            except Exception:
+                model = None
+            entry = PanelCompatibilityEntry(
+                panel,
+                ps_repo.get_panel_distribution_profile(self.doc, panel),
+                _branch_signatures(model),
+                slot_capacity=_panel_slot_capacity(panel, model),
+            )
+            if entry.panel_id <= 0 or entry.panel_id in self._entries:
+                continue
+            self._entries[entry.panel_id] = entry
+            self._order.append(entry.panel_id)
+            self._groups.setdefault(entry.group_key, []).append(entry.panel_id)
+            for poles, voltage in entry.signatures:
+                self._by_poles.setdefault(poles, set()).add(entry.panel_id)
+                if voltage is not None:
+                    self._by_signature.setdefault((poles, _voltage_key(voltage)), set()).add(entry.panel_id)
+        self._stale = False
+
+    def _ordered_panels(self, ids):
+        """Return the panels for ``ids`` in the order the index was given them."""
+        return [self._entries[x].panel for x in self._order if x in ids]
+
+    def note_document_changed(self, args):
+        """Invalidate from a DocumentChanged event; return True when the index was affected."""
+        try:
+            structural = list(args.GetAddedElementIds(DB.ElementCategoryFilter(DB.BuiltInCategory.OST_ElectricalEquipment)) or [])
+            structural += list(args.GetModifiedElementIds(DB.ElementCategoryFilter(DB.BuiltInCategory.OST_ElectricalEquipment)) or [])
+            structural += list(args.GetModifiedElementIds(DB.ElementClassFilter(DBE.DistributionSysType)) or [])
+            circuits = list(args.GetAddedElementIds(DB.ElementClassFilter(DBE.ElectricalSystem)) or [])
+            circuits += list(args.GetModifiedElementIds(DB.ElementClassFilter(DBE.ElectricalSystem)) or [])
+            deleted = [_idval(x) for x in list(args.GetDeletedElementIds() or [])]
+        except Exception:
+            self.invalidate()
+            return True
+        if structural or any(x in self._entries for x in deleted):
+            self.invalidate()
+            return True
+        if circuits or deleted:
+            self.invalidate_usage()
+            return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def entry(self, panel_id):
+        self._ensure()
+        return self._entries.get(int(panel_id or 0))
+
+    def groups(self):
+        """Return {(dist system, phase, L-L, L-G): [panel ids]}."""
+        self._ensure()
+        return dict((key, list(ids)) for key, ids in self._groups.items())
+
+    def compatible_panel_ids(self, poles, voltage=None):
+        """Return ids of panels with a branch option for ``poles`` at ``voltage`` (any voltage when None)."""
+        self._ensure()
+        pole_count = int(max(1, poles or 1))
+        if voltage is None:
+            return set(self._by_poles.get(pole_count) or [])
+        key = _voltage_key(voltage)
+        span = int(self.tolerance) + 1
+        found = set()
+        for probe in range(key - span, key + span + 1):
+            for panel_id in list(self._by_signature.get((pole_count, probe)) or []):
+                entry = self._entries[panel_id]
+                if any(
+                    p == pole_count and v is not None and abs(float(v) - float(voltage)) <= self.tolerance
+                    for p, v in entry.signatures
+                ):
+                    found.add(panel_id)
+        # Branch options without a voltage accept any voltage for that pole count.
+        for panel_id in list(self._by_poles.get(pole_count) or []):
+            if panel_id not in found and any(p == pole_count and v is None for p, v in self._entries[panel_id].signatures):
+                found.add(panel_id)
+        return found
+
+    def compatible_panels(self, circuit):
+        """Return panels that accept ``circuit`` (same rule as ``get_compatible_panels``)."""
+        voltage, poles = ps_repo.get_circuit_voltage_poles(circuit)
+        if poles is None:
+            return []
+        ids = self.compatible_panel_ids(poles, voltage)
+        return self._ordered_panels(ids)
+
+    def common_compatible_panels(self, circuits, require_capacity=False):
+        """Return panels compatible with every circuit, in the order the panels were given.
+
+        With ``require_capacity`` a panel must also have free slots for the
+        circuits that are not already on it.
+        """
+        common = None
+        incoming = []
+        for circuit in list(circuits or []):
+            voltage, poles = ps_repo.get_circuit_voltage_poles(circuit)
+            ids = self.compatible_panel_ids(poles, voltage) if poles is not None else set()
+            common = ids if common is None else common.intersection(ids)
+            if not common:
+                return []
+            incoming.append((_base_panel_id(circuit), int(max(1, poles or 1))))
+        if not common:
+            return []
+        if require_capacity:
+            common = set(
+                [
+                    panel_id
+                    for panel_id in common
+                    if self.has_capacity(panel_id, sum([p for base_id, p in incoming if base_id != panel_id]))
+                ]
+            )
+        return self._ordered_panels(common)
+
+    # ------------------------------------------------------------------
+    # Capacity
+    # ------------------------------------------------------------------
+    def _used_slots(self, entry):
+        if entry.used_slots is None:
+            used = 0
+            snapshot = ps_repo.get_panel_snapshot(self.doc, entry.panel)
+            for item in list(getattr(snapshot, "circuits", None) or []):
+                if item.kind == "circuit":
+                    used += int(max(1, item.poles or 1))
+            entry.used_slots = used
+        return entry.used_slots
+
+    def free_slots(self, panel_id):
+        """Return free slots, or ``None`` when the panel reports no capacity."""
+        found = self.entry(panel_id)
+        if found is None or found.slot_capacity <= 0:
+            return None
+        return int(found.slot_capacity - self._used_slots(found))
+
+    def has_capacity(self, panel_id, poles):
+        if int(poles or 0) <= 0:
+            return True
+        free = self.free_slots(panel_id)
+        return free is None or free >= int(poles)
+
+
+class StagedCapacity(object):
+    """One window's staged moves layered over the shared index until they are applied or discarded."""
+
+    def __init__(self, index):
+        self.index = index
+        self._staged = {}
+
+    def free_slots(self, panel_id):
+        """Return free slots after staged moves, or ``None`` when the panel reports no capacity."""
+        free = self.index.free_slots(panel_id)
+        if free is None:
+            return None
+        return int(free - self._staged.get(int(panel_id or 0), 0))
+
+    def has_capacity(self, panel_id, poles):
+        if int(poles or 0) <= 0:
+            return True
+        free = self.free_slots(panel_id)
+        return free is None or free >= int(poles)
+
+    def stage_move(self, poles, to_panel_id, from_panel_id=None):
+        """Record a staged move so later capacity checks see it without a recount."""
+        slots = int(max(1, poles or 1))
+        to_id = int(to_panel_id or 0)
+        from_id = int(from_panel_id or 0)
+        if to_id == from_id:
+            return
+        if to_id > 0:
+            self._staged[to_id] = self._staged.get(to_id, 0) + slots
+        if from_id > 0:
+            self._staged[from_id] = self._staged.get(from_id, 0) - slots
+
+    def unstage_move(self, poles, to_panel_id, from_panel_id=None):
+        self.stage_move(poles, from_panel_id, from_panel_id=to_panel_id)
+
+    def clear(self):
+        """Drop all staged moves (after they were applied or discarded)."""
+        self._staged = {}
+
+
+_INDEXES = {}
+
+
+def get_compatibility_index(doc, panels=None, refresh=False):
+    """Return the session index for ``doc``, building it on first use or after invalidation."""
+    key = revit_helpers.get_document_key(doc)
+    index = _INDEXES.get(key)
+    if index is None or bool(refresh) or not revit_helpers.is_valid_object(index.doc):
+        index = PanelCompatibilityIndex(doc, panels=panels)
+        _INDEXES[key] = index
+    elif panels is not None:
+        index.set_panels(panels)
+    return index
+
+
+def invalidate_compatibility_index(doc=None):
+    if doc is None:
+        for index in _INDEXES.values():
+            index.invalidate()
+        return
+    index = _INDEXES.get(revit_helpers.get_document_key(doc))
+    if index is not None:
+        index.invalidate()
+
+
+def note_document_changed(args):
+    """Forward a DocumentChanged event to the index of the changed document."""
+    try:
+        index = _INDEXES.get(revit_helpers.get_document_key(args.GetDocument()))
+    except Exception:
+        index = None
+    if index is None:
+        return False
+    return index.note_document_changed(args)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Application-level DocumentChanged/DocumentClosing hooks for the session caches.
+
+The caches forwarded to here live for the whole Revit session, so they must
+see every model edit, not only the edits made while the Circuit Manager pane
+or a tool window is open, and drop what they hold for a document once it
+closes. ``register`` is called from the extension startup; a pyRevit reload
+replaces the previous handlers instead of stacking a second set.
+"""
+
+from pyrevit import script
+
+from CEDElectrical.Application.services import panel_compatibility_index
+from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repository as ps_repo
+
+try:
+    from LogicClasses import placement_engine
+except Exception:  # pragma: no cover - placement engine unavailable
+    placement_engine = None
+
+try:
+    from Autodesk.Revit.DB.Events import DocumentChangedEventArgs, DocumentClosingEventArgs
+except Exception:
+    DocumentChangedEventArgs = None
+    DocumentClosingEventArgs = None
+
+try:
+    from System import EventHandler
+except Exception:
+    EventHandler = None
+
+_REGISTRY_ATTR = "_ced_session_cache_handlers"
+_FALLBACK_REGISTRY = {}
+
+
+def _document_changed_forwards():
+    forwards = [
+        panel_compatibility_index.note_document_changed,
+        ps_repo.note_slot_cell_map_changes,
+        ps_repo.note_panel_snapshot_changes,
+    ]
+    if placement_engine is not None:
+        forwards.append(placement_engine.note_sibling_index_changes)
+    return forwards
+
+
+def _document_closing_prunes():
+    prunes = [ps_repo.prune_slot_cell_maps, ps_repo.prune_panel_snapshots]
+    if placement_engine is not None:
+        prunes.append(placement_engine.invalidate_sibling_index)
+    return prunes
+
+
+def note_document_changed(args):
+    """Forward one DocumentChanged event to every session cache."""
+    logger = script.get_logger()
+    for forward in _document_changed_forwards():
+        try:
+            forward(args)
+        except Exception as exc:
+            logger.debug("Session cache invalidation failed: %s", exc)
+
+
+def note_document_closing(doc):
+    """Drop every session cache entry held for ``doc``."""
+    logger = script.get_logger()
+    for prune in _document_closing_prunes():
+        try:
+            prune(doc)
+        except Exception as exc:
+            logger.debug("Session cache pruning failed: %s", exc)
+
+
+def _on_document_changed(sender, args):
+    note_document_changed(args)
+
+
+def _on_document_closing(sender, args):
+    note_document_closing(getattr(args, "Document", None))
+
+
+def _handler_registry(app):
+    registry = getattr(app, _REGISTRY_ATTR, None)
+    if registry is None:
+        registry = {}
+        try:
+            setattr(app, _REGISTRY_ATTR, registry)
+        except Exception:
+            return _FALLBACK_REGISTRY
+    return registry
+
+
+def register(uiapp):
+    """Subscribe the session caches to DocumentChanged and DocumentClosing; return True when subscribed."""
+    logger = script.get_logger()
+    if EventHandler is None or DocumentChangedEventArgs is None:
+        logger.warning("Session cache handlers not registered: Revit event types missing.")
+        return False
+    try:
+        app = uiapp.Application
+    except Exception:
+        app = None
+    if app is None:
+        return False
+    registry = _handler_registry(app)
+    previous_changed = registry.pop("document_changed", None)
+    previous_closing = registry.pop("document_closing", None)
+    try:
+        if previous_changed is not None:
+            app.DocumentChanged -= previous_changed
+        if previous_closing is not None:
+            app.DocumentClosing -= previous_closing
+    except Exception:
+        pass
+    try:
+        changed = EventHandler[DocumentChangedEventArgs](_on_document_changed)
+        app.DocumentChanged += changed
+        registry["document_changed"] = changed
+        closing = EventHandler[DocumentClosingEventArgs](_on_document_closing)
+        app.DocumentClosing += closing
+        registry["document_closing"] = closing
+    except Exception as exc:
+        logger.warning("Session cache handlers not registered: %s", exc)
+        ps_repo.enable_panel_snapshot_cache(bool(registry.get("document_changed")))
+        return bool(registry.get("document_changed"))
+    ps_repo.enable_panel_snapshot_cache(True)
+    return True
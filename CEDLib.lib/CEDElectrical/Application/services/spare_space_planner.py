@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Bulk SPARE/SPACE planning over maximal free-slot runs, with one slot-map read per panel."""
+
+from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repository as ps_repo
+from CEDElectrical.Model.panel_schedule_enums import PanelSpecialKind as SpecialKind
+from CEDElectrical.Model.panel_schedule_enums import PanelUiMode as UiMode
+
+
+def free_slot_runs(slot_order, occupied, column_of=None):
+    """Split ``slot_order`` into maximal runs of free slots.
+
+    A run ends at an occupied slot or, when ``column_of`` is given, where the
+    display column changes.
+    """
+    taken = set([int(x) for x in list(occupied or []) if int(x) > 0])
+    runs = []
+    current = []
+    current_col = None
+    for slot in list(slot_order or []):
+        slot_value = int(slot or 0)
+        if slot_value <= 0:
+            continue
+        col = column_of(slot_value) if column_of is not None else None
+        if slot_value in taken or (current and col != current_col):
+            if current:
+                runs.append(current)
+            current = []
+        if slot_value in taken:
+            continue
+        current.append(slot_value)
+        current_col = col
+    if current:
+        runs.append(current)
+    return runs
+
+
+def assign_kinds(slots, mode):
+    """Return slot -> kind for ``slots`` in fill order; BOTH puts spares on the first half."""
+    ordered = [int(x) for x in list(slots or []) if int(x) > 0]
+    mode_key = UiMode.normalize_for_add(mode, default=UiMode.SPACE)
+    if mode_key == UiMode.SPARE:
+        return dict((slot, SpecialKind.SPARE) for slot in ordered)
+    if mode_key == UiMode.SPACE:
+        return dict((slot, SpecialKind.SPACE) for slot in ordered)
+    spare_count = int((len(ordered) + 1) / 2)
+    kinds = {}
+    for idx, slot in enumerate(ordered):
+        kinds[slot] = SpecialKind.SPARE if idx < spare_count else SpecialKind.SPACE
+    return kinds
+
+
+class SpareSpacePlan(object):
+    """Planned SPARE/SPACE adds for one panel, grouped into free-slot runs."""
+
+    def __init__(self, panel_id, runs, kinds):
+        self.panel_id = int(panel_id or 0)
+        self.runs = [list(run) for run in list(runs or [])]
+        self.kinds = dict(kinds or {})
+
+    @property
+    def adds(self):
+        """Return ``[(slot, kind)]`` run by run, in slot order."""
+        items = []
+        for run in self.runs:
+            for slot in run:
+                kind = self.kinds.get(int(slot))
+                if kind is not None:
+                    items.append((int(slot), kind))
+        return items
+
+    @property
+    def spare_count(self):
+        return int(len([x for x in self.kinds.values() if x == SpecialKind.SPARE]))
+
+    @property
+    def space_count(self):
+        return int(len([x for x in self.kinds.values() if x == SpecialKind.SPACE]))
+
+    def summary(self):
+        """Return planned (dry-run) counts for this panel."""
+        return {
+            "panel_id": self.panel_id,
+            "runs": int(len(self.runs)),
+            "slots": int(len(self.kinds)),
+            "added_spares": self.spare_count,
+            "added_spaces": self.space_count,
+        }
+
+
+def plan_panel_adds(option, mode, occupied_slots):
+    """Plan adds for every free valid slot of ``option``; kinds follow the legacy fill order."""
+    panel_id = int((option or {}).get("panel_id", 0) or 0)
+    slot_order = [int(x) for x in list(ps_repo.get_option_slot_order(option, include_excess=False) or []) if int(x) > 0]
+    occupied = set([int(x) for x in list(occupied_slots or []) if int(x) > 0])
+    max_slot = int((option or {}).get("max_slot", 0) or 0)
+    sort_mode = (option or {}).get("sort_mode", ps_repo.SORT_MODE_PANELBOARD_ACROSS)
+
+    def _column(slot):
+        return ps_repo.get_slot_display_column(slot, max_slot, sort_mode)
+
+    runs = free_slot_runs(slot_order, occupied, column_of=_column)
+    free = [slot for slot in slot_order if slot not in occupied]
+    if (option or {}).get("schedule_type") != ps_repo.PSTYPE_SWITCHBOARD:
+        free = [x for x in free if int(x % 2) == 1] + [x for x in free if int(x % 2) == 0]
+    return SpareSpacePlan(panel_id, runs, assign_kinds(free, mode))
+
+
+def issue_plan_adds(manager, plan):
+    """Add every planned slot, run by run, through one ``PanelScheduleManager.add_specials_default`` call.
+
+    The manager validates each slot and pole span and reads the panel's slot
+    map once for the whole plan; slots stay locked as the legacy tool left
+    them and the caller unlocks them when finalizing. Returns the manager's
+    ``{panel_id, slot, circuit_id}`` results in plan order. The first add that
+    fails raises.
+    """
+    adds = plan.adds
+    if not adds:
+        return []
+    return list(
+        manager.add_specials_default(
+            plan.panel_id,
+            adds,
+            unlock=False,
+            apply_switchboard_default_poles=False,
+        )
+        or []
+    )
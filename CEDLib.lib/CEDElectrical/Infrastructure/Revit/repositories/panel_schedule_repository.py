@@ -752,133 +752,351 @@ def prompt_pick_panel_schedules(doc, title="Choose panel schedules", multiselect
     return [x.view for x in picked if hasattr(x, "view")]
 
 
-def get_cells_by_slot_number(schedule_view, slot, body=None):
-    """Return raw API cell coordinates for a slot from PanelScheduleView.GetCellsBySlotNumber."""
-    if schedule_view is None:
-        return []
-    target_slot = int(slot or 0)
-    if target_slot <= 0:
-        return []
-    getter = getattr(schedule_view, "GetCellsBySlotNumber", None)
-    if getter is None:
-        return []
+_SLOT_CELL_BINDING_MODES = ("out_ref", "tuple", "pairs", "prealloc")
+_SLOT_CELL_MAPS = {}
 
-    def _filter_cells(pairs):
-        filtered = []
-        for pair in list(pairs or []):
-            if not pair or len(pair) < 2:
-                continue
-            row = int(pair[0])
-            col = int(pair[1])
-            try:
-                slot_no = int(schedule_view.GetSlotNumberByCell(int(row), int(col)) or 0)
-            except Exception:
-                slot_no = 0
-            if int(slot_no) != int(target_slot):
-                continue
-            filtered.append((int(row), int(col)))
-        return sorted(set(filtered))
 
-    # Pattern A: out-ref (most reliable across pythonnet bindings)
+def _pairs_from_arrays(row_arr, col_arr):
+    pairs = []
+    for idx in range(int(min(len(row_arr), len(col_arr)))):
+        pairs.append((int(row_arr[idx]), int(col_arr[idx])))
+    return pairs
+
+
+def _pair_from_item(item):
+    for names in (("Row", "Column"), ("RowNumber", "ColumnNumber"), ("Item1", "Item2")):
+        try:
+            return int(getattr(item, names[0])), int(getattr(item, names[1]))
+        except Exception:
+            continue
     try:
-        row_ref = clr.Reference[IList[int]]()
-        col_ref = clr.Reference[IList[int]]()
-        getter(int(target_slot), row_ref, col_ref)
-        row_arr = list(row_ref.Value or [])
-        col_arr = list(col_ref.Value or [])
-        pair_count = int(min(len(row_arr), len(col_arr)))
-        pairs = []
-        for idx in range(pair_count):
-            pairs.append((int(row_arr[idx]), int(col_arr[idx])))
-        filtered = _filter_cells(pairs)
-        if filtered:
-            return filtered
+        return int(item[0]), int(item[1])
     except Exception:
-        pass
+        return None
+
 
-    # Pattern B: tuple-return overload
+def _read_slot_cells_raw(getter, slot, mode):
+    """Return unfiltered (row, col) pairs from GetCellsBySlotNumber for one binding mode."""
     try:
-        direct = getter(int(target_slot))
+        if mode == "out_ref":
+            # Most reliable across pythonnet bindings.
+            row_ref = clr.Reference[IList[int]]()
+            col_ref = clr.Reference[IList[int]]()
+            getter(int(slot), row_ref, col_ref)
+            return _pairs_from_arrays(list(row_ref.Value or []), list(col_ref.Value or []))
+        if mode == "prealloc":
+            row_arr = List[int]()
+            col_arr = List[int]()
+            getter(int(slot), row_arr, col_arr)
+            return _pairs_from_arrays(list(row_arr), list(col_arr))
+        direct = getter(int(slot))
     except Exception:
-        direct = None
-    tuple_pairs = []
-    if isinstance(direct, tuple) and len(direct) >= 2:
+        return []
+    if mode == "tuple":
+        if not (isinstance(direct, tuple) and len(direct) >= 2):
+            return []
         try:
-            row_arr = list(direct[0] or [])
-            col_arr = list(direct[1] or [])
-            pair_count = int(min(len(row_arr), len(col_arr)))
-            for idx in range(pair_count):
-                tuple_pairs.append((int(row_arr[idx]), int(col_arr[idx])))
+            return _pairs_from_arrays(list(direct[0] or []), list(direct[1] or []))
         except Exception:
-            tuple_pairs = []
-    if tuple_pairs:
-        filtered = _filter_cells(tuple_pairs)
-        if filtered:
-            return filtered
-
-    # Pattern C: enumerable of row/col pair objects
+            return []
+    # Enumerable of row/col pair objects.
+    try:
+        items = list(direct or [])
+    except Exception:
+        return []
     pairs = []
-    for item in list(direct or []):
-        row = None
-        col = None
-        for pair in (("Row", "Column"), ("RowNumber", "ColumnNumber"), ("Item1", "Item2")):
-            try:
-                row = int(getattr(item, pair[0]))
-                col = int(getattr(item, pair[1]))
-                break
-            except Exception:
-                row = None
-                col = None
-        if row is None or col is None:
+    for item in items:
+        pair = _pair_from_item(item)
+        if pair is not None:
+            pairs.append(pair)
+    return pairs
+
+
+def get_schedule_view_change_token(schedule_view):
+    """Return a cheap token that changes when the slot/cell structure of a schedule view can change."""
+    if schedule_view is None:
+        return None
+    try:
+        table = schedule_view.GetTableData()
+        body = table.GetSectionData(DB.SectionType.Body)
+        token = [
+            int(getattr(table, "NumberOfSlots", 0) or 0),
+            int(getattr(body, "NumberOfRows", 0) or 0) if body is not None else 0,
+            int(getattr(body, "NumberOfColumns", 0) or 0) if body is not None else 0,
+        ]
+    except Exception:
+        return None
+    try:
+        token.append(int(_idval(schedule_view.GetTemplate())))
+    except Exception:
+        token.append(0)
+    return tuple(token)
+
+
+class SlotCellMap(object):
+    """Slot/cell lookup for one PanelScheduleView built from a single body scan.
+
+    The cell-to-slot table only changes with the schedule structure, which is
+    what the change token tracks. Circuit-dependent data (the preferred
+    columns used to order multi-cell slots) is kept apart and dropped by
+    ``invalidate`` after schedule mutations.
+    """
+
+    def __init__(self, schedule_view, change_token=None):
+        self.schedule_view = schedule_view
+        self.change_token = change_token if change_token is not None else get_schedule_view_change_token(schedule_view)
+        self.max_slot = 0
+        self.binding_mode = None
+        self._slot_by_cell = {}
+        self._scanned_cells = {}
+        self._api_cells = {}
+        self._ordered_cells = {}
+        self._sort_mode = None
+        self._preferred_cols = None
+        self._scan()
+
+    def _scan(self):
+        view = self.schedule_view
+        if view is None:
+            return
+        try:
+            table = view.GetTableData()
+            body = table.GetSectionData(DB.SectionType.Body)
+            self.max_slot = int(getattr(table, "NumberOfSlots", 0) or 0)
+            row_count = int(body.NumberOfRows) if body is not None else 0
+            col_count = int(body.NumberOfColumns) if body is not None else 0
+        except Exception:
+            return
+        for row in range(row_count):
+            for col in range(col_count):
+                try:
+                    slot = int(view.GetSlotNumberByCell(row, col) or 0)
+                except Exception:
+                    slot = 0
+                self._slot_by_cell[(row, col)] = slot
+                if slot > 0:
+                    self._scanned_cells.setdefault(slot, []).append((row, col))
+
+    def _slot_at(self, row, col):
+        key = (int(row), int(col))
+        if key not in self._slot_by_cell:
             try:
-                row = int(item[0])
-                col = int(item[1])
+                self._slot_by_cell[key] = int(self.schedule_view.GetSlotNumberByCell(key[0], key[1]) or 0)
             except Exception:
+                self._slot_by_cell[key] = 0
+        return self._slot_by_cell[key]
+
+    def _filter_cells(self, pairs, slot):
+        filtered = set()
+        for row, col in list(pairs or []):
+            if self._slot_at(row, col) == int(slot):
+                filtered.add((int(row), int(col)))
+        return sorted(filtered)
+
+    def _read_slot(self, slot):
+        getter = getattr(self.schedule_view, "GetCellsBySlotNumber", None)
+        if getter is None:
+            return []
+        modes = list(_SLOT_CELL_BINDING_MODES)
+        if self.binding_mode in modes:
+            modes.remove(self.binding_mode)
+            modes.insert(0, self.binding_mode)
+        for mode in modes:
+            filtered = self._filter_cells(_read_slot_cells_raw(getter, slot, mode), slot)
+            if filtered:
+                self.binding_mode = mode
+                return filtered
+        return []
+
+    def cells(self, slot):
+        """Return sorted GetCellsBySlotNumber cells for a slot, filtered to cells that map back to it."""
+        slot_value = int(slot or 0)
+        if slot_value <= 0:
+            return []
+        cached = self._api_cells.get(slot_value)
+        if cached is None:
+            cached = self._read_slot(slot_value)
+            self._api_cells[slot_value] = cached
+        return list(cached)
+
+    def scanned_cells(self, slot):
+        """Return every body cell whose slot number is ``slot``."""
+        return sorted(set(self._scanned_cells.get(int(slot or 0)) or []))
+
+    def scanned_slot_map(self, max_slot=None):
+        """Return slot -> body cells from the scan, limited to ``max_slot`` when given."""
+        limit = int(max_slot or self.max_slot or 0)
+        slot_map = {}
+        for slot in list(self._scanned_cells.keys()):
+            if limit > 0 and slot > limit:
+                continue
+            slot_map[int(slot)] = self.scanned_cells(slot)
+        return slot_map
+
+    @property
+    def sort_mode(self):
+        if self._sort_mode is None:
+            self._sort_mode = classify_schedule_layout(self.schedule_view)
+        return self._sort_mode
+
+    def _cell_circuit_id(self, row, col):
+        try:
+            cid = self.schedule_view.GetCircuitIdByCell(int(row), int(col))
+        except Exception:
+            return 0
+        if cid is None or cid == DB.ElementId.InvalidElementId:
+            return 0
+        return int(_idval(cid))
+
+    def preferred_columns(self):
+        """Return display column -> body columns ranked by how many circuits occupy them."""
+        if self._preferred_cols is not None:
+            return self._preferred_cols
+        col_counts = {1: {}, 2: {}}
+        for slot in range(1, int(self.max_slot) + 1):
+            display_col = int(get_slot_display_column(slot, self.max_slot, self.sort_mode) or 1)
+            for row, col in self.cells(slot):
+                if self._cell_circuit_id(row, col) <= 0:
+                    continue
+                bucket = col_counts.setdefault(display_col, {})
+                bucket[int(col)] = int(bucket.get(int(col), 0) or 0) + 1
+        preferred_cols = {}
+        for display_col, bucket in col_counts.items():
+            ordered = [pair[0] for pair in sorted(bucket.items(), key=lambda x: (-int(x[1]), int(x[0])))]
+            preferred_cols[int(display_col)] = [int(x) for x in ordered]
+        self._preferred_cols = preferred_cols
+        return preferred_cols
+
+    def ordered_cells(self, slot):
+        """Return slot cells ordered by the columns existing circuits already use."""
+        slot_value = int(slot or 0)
+        if slot_value <= 0:
+            return []
+        cached = self._ordered_cells.get(slot_value)
+        if cached is not None:
+            return list(cached)
+        ordered = self.cells(slot_value)
+        if len(ordered) > 1:
+            display_col = int(get_slot_display_column(slot_value, self.max_slot, self.sort_mode) or 1)
+            priority = {}
+            for idx, col in enumerate(self.preferred_columns().get(display_col) or []):
+                priority[int(col)] = int(idx)
+            fallback_rank = 999999
+            ordered.sort(key=lambda pair: (int(priority.get(int(pair[1]), fallback_rank)), int(pair[1]), int(pair[0])))
+        self._ordered_cells[slot_value] = list(ordered)
+        return ordered
+
+    def invalidate(self, slots=None):
+        """Drop cached API cells and circuit-dependent ordering, or re-read only the given slots."""
+        if slots is None:
+            for cells in list(self._api_cells.values()):
+                for cell in list(cells or []):
+                    self._slot_by_cell.pop(cell, None)
+            self._api_cells = {}
+            self._preferred_cols = None
+            self._ordered_cells = {}
+            return
+        for slot in list(slots or []):
+            slot_value = int(slot or 0)
+            if slot_value <= 0:
                 continue
-        pairs.append((int(row), int(col)))
-    if pairs:
-        filtered = _filter_cells(pairs)
-        if filtered:
-            return filtered
+            for cell in list(self._api_cells.pop(slot_value, None) or []):
+                self._slot_by_cell.pop(cell, None)
+            self._ordered_cells.pop(slot_value, None)
+
+
+def _slot_cell_map_key(schedule_view):
+    try:
+        sid = int(_idval(schedule_view.Id))
+    except Exception:
+        sid = 0
+    if sid <= 0:
+        return None
+    return (revit_helpers.get_document_key(getattr(schedule_view, "Document", None)), sid)
+
+
+def get_slot_cell_map(schedule_view, refresh=False):
+    """Return the shared SlotCellMap for a schedule view, rebuilding it when its change token moved."""
+    if schedule_view is None:
+        return None
+    key = _slot_cell_map_key(schedule_view)
+    token = get_schedule_view_change_token(schedule_view)
+    cached = _SLOT_CELL_MAPS.get(key) if key is not None else None
+    if cached is not None and not bool(refresh) and cached.change_token == token:
+        cached.schedule_view = schedule_view
+        return cached
+    built = SlotCellMap(schedule_view, change_token=token)
+    if key is not None:
+        _SLOT_CELL_MAPS[key] = built
+    return built
+
+
+def invalidate_slot_cell_map(schedule_view=None, slots=None):
+    """Invalidate shared slot-cell data after schedule mutations (all views when no view is given)."""
+    if schedule_view is None:
+        for cached in list(_SLOT_CELL_MAPS.values()):
+            cached.invalidate()
+        return
+    key = _slot_cell_map_key(schedule_view)
+    cached = _SLOT_CELL_MAPS.get(key) if key is not None else None
+    if cached is not None:
+        cached.invalidate(slots=slots)
+
+
+def prune_slot_cell_maps(doc=None):
+    """Drop maps of ``doc`` (a closing document), or every map whose schedule view is no longer valid."""
+    if doc is not None:
+        doc_key = revit_helpers.get_document_key(doc)
+        for key in [x for x in list(_SLOT_CELL_MAPS.keys()) if x[0] == doc_key]:
+            _SLOT_CELL_MAPS.pop(key, None)
+        return
+    for key, cached in list(_SLOT_CELL_MAPS.items()):
+        try:
+            valid = bool(cached.schedule_view.IsValidObject)
+        except Exception:
+            valid = False
+        if not valid:
+            _SLOT_CELL_MAPS.pop(key, None)
+
 
-    # Pattern D: preallocated lists (last fallback)
+def note_slot_cell_map_changes(args):
+    """Drop maps of schedule views deleted in a DocumentChanged event."""
+    if not _SLOT_CELL_MAPS:
+        return
     try:
-        row_arr = List[int]()
-        col_arr = List[int]()
-        getter(int(target_slot), row_arr, col_arr)
-        pair_count = int(min(len(row_arr), len(col_arr)))
-        pairs = []
-        for idx in range(pair_count):
-            pairs.append((int(row_arr[idx]), int(col_arr[idx])))
-        return _filter_cells(pairs)
+        doc_key = revit_helpers.get_document_key(args.GetDocument())
+        deleted = set([int(_idval(x)) for x in list(args.GetDeletedElementIds() or [])])
     except Exception:
+        prune_slot_cell_maps()
+        return
+    for key in [x for x in list(_SLOT_CELL_MAPS.keys()) if x[0] == doc_key and x[1] in deleted]:
+        _SLOT_CELL_MAPS.pop(key, None)
+
+
+def get_cells_by_slot_number(schedule_view, slot, body=None):
+    """Return raw API cell coordinates for a slot from PanelScheduleView.GetCellsBySlotNumber."""
+    if schedule_view is None:
+        return []
+    target_slot = int(slot or 0)
+    if target_slot <= 0:
+        return []
+    slot_map = get_slot_cell_map(schedule_view)
+    if slot_map is None:
         return []
+    return slot_map.cells(target_slot)
 
 
 def _build_slot_cell_map(schedule_view, body, max_slot):
     """Return map of slot number to body cells by scanning table once."""
-    slot_map = {}
     if schedule_view is None or body is None:
-        return slot_map
+        return {}
     max_slot_value = int(max_slot or 0)
     if max_slot_value <= 0:
-        return slot_map
-
-    for row in range(body.NumberOfRows):
-        for col in range(body.NumberOfColumns):
-            try:
-                slot = int(schedule_view.GetSlotNumberByCell(row, col) or 0)
-            except Exception:
-                slot = 0
-            if slot <= 0 or slot > max_slot_value:
-                continue
-            if slot not in slot_map:
-                slot_map[slot] = []
-            slot_map[slot].append((row, col))
-
-    for slot in list(slot_map.keys()):
-        slot_map[slot] = sorted(set(slot_map[slot]))
-    return slot_map
+        return {}
+    slot_map = get_slot_cell_map(schedule_view)
+    if slot_map is None:
+        return {}
+    return slot_map.scanned_slot_map(max_slot_value)
 
 
 def is_slot_grouped(schedule_view, slot, body=None):
@@ -1763,11 +1981,194 @@ def _kind_from_circuit(circuit):
     return "circuit"
 
 
-def _build_circuit_row(option, circuit, doc=None, panel_id_set=None):
+_PANEL_SNAPSHOTS = {}
+_PANEL_SNAPSHOT_CACHE_ENABLED = False
+
+
+def _read_circuit_rating(circuit):
+    try:
+        return float(getattr(circuit, "Rating", None))
+    except Exception:
+        pass
+    try:
+        param = circuit.get_Parameter(DB.BuiltInParameter.RBS_ELEC_CIRCUIT_RATING_PARAM)
+        if param and param.HasValue:
+            return float(param.AsDouble())
+    except Exception:
+        pass
+    return None
+
+
+class CircuitSnapshot(object):
+    """Schedule-facing circuit values read once: slot, poles, voltage, rating, names and notes."""
+
+    def __init__(self, circuit):
+        self.circuit = circuit
+        self.circuit_id = int(_idval(circuit.Id))
+        self.kind = _kind_from_circuit(circuit)
+        self.start_slot = int(get_circuit_start_slot(circuit) or 0)
+        self.voltage, self.poles = get_circuit_voltage_poles(circuit)
+        self.rating = _read_circuit_rating(circuit)
+        self.load_name = _to_text(getattr(circuit, "LoadName", ""), "").strip()
+        self.circuit_number = _to_text(getattr(circuit, "CircuitNumber", ""), "").strip()
+        try:
+            notes_param = circuit.get_Parameter(DB.BuiltInParameter.RBS_ELEC_CIRCUIT_NOTES_PARAM)
+            self.schedule_notes_text = _to_text(
+                revit_helpers.get_parameter_value(notes_param, default=""),
+                "",
+            ).strip()
+        except Exception:
+            self.schedule_notes_text = ""
+
+
+def _assigned_circuits(panel):
+    """Return circuits fed by ``panel`` from one GetAssignedElectricalSystems call, or None."""
+    try:
+        systems = panel.MEPModel.GetAssignedElectricalSystems()
+    except Exception:
+        return None
+    if systems is None:
+        return None
+    return [x for x in list(systems) if isinstance(x, DBE.ElectricalSystem)]
+
+
+class PanelSnapshot(object):
+    """Every circuit assigned to one panel, read in a single pass and indexed by id and start slot.
+
+    A cached snapshot is served until a DocumentChanged event touches the
+    panel or one of its circuits (``note_panel_snapshot_changes``), or a
+    mutation inside an open transaction drops it with
+    ``invalidate_panel_snapshot``.
+    """
+
+    def __init__(self, panel, circuit_snaps):
+        self.panel = panel
+        self.panel_id = int(_idval(panel.Id))
+        self.circuits = list(circuit_snaps or [])
+        self._by_id = dict((x.circuit_id, x) for x in self.circuits)
+        self._by_slot = {}
+        for item in self.circuits:
+            if item.start_slot > 0:
+                self._by_slot[item.start_slot] = item
+
+    def get(self, circuit_id):
+        return self._by_id.get(int(circuit_id or 0))
+
+    def at_slot(self, slot):
+        return self._by_slot.get(int(slot or 0))
+
+
+def _panel_snapshot_key(doc, panel_id):
+    return (revit_helpers.get_document_key(doc), int(panel_id or 0))
+
+
+def enable_panel_snapshot_cache(enabled=True):
+    """Serve cached panel snapshots only while DocumentChanged is forwarded to ``note_panel_snapshot_changes``."""
+    global _PANEL_SNAPSHOT_CACHE_ENABLED
+    _PANEL_SNAPSHOT_CACHE_ENABLED = bool(enabled)
+    if not _PANEL_SNAPSHOT_CACHE_ENABLED:
+        _PANEL_SNAPSHOTS.clear()
+
+
+def get_panel_snapshot(doc, panel, refresh=False):
+    """Return the shared PanelSnapshot for a panel, reading its circuits only when no cached one is valid.
+
+    Returns None when the panel has no MEP model to read assigned circuits
+    from. Without the session DocumentChanged handlers every call reads
+    fresh, since nothing would drop a stale snapshot.
+    """
+    if panel is None:
+        return None
+    key = _panel_snapshot_key(doc, _idval(panel.Id))
+    cached = _PANEL_SNAPSHOTS.get(key)
+    if cached is not None and not bool(refresh) and _PANEL_SNAPSHOT_CACHE_ENABLED:
+        cached.panel = panel
+        return cached
+    circuits = _assigned_circuits(panel)
+    if circuits is None:
+        _PANEL_SNAPSHOTS.pop(key, None)
+        return None
+    built = PanelSnapshot(panel, [CircuitSnapshot(x) for x in circuits])
+    if _PANEL_SNAPSHOT_CACHE_ENABLED:
+        _PANEL_SNAPSHOTS[key] = built
+    return built
+
+
+def invalidate_panel_snapshot(panel=None, schedule_view=None):
+    """Drop cached snapshots for a panel (element, id or the panel of ``schedule_view``), or all of them."""
+    panel_id = 0
+    if panel is not None:
+        panel_id = int(panel) if isinstance(panel, int) else int(_idval(getattr(panel, "Id", panel)) or 0)
+    elif schedule_view is not None:
+        try:
+            panel_id = int(_idval(schedule_view.GetPanel()) or 0)
+        except Exception:
+            panel_id = 0
+    if panel_id <= 0:
+        _PANEL_SNAPSHOTS.clear()
+        return
+    for key in [x for x in list(_PANEL_SNAPSHOTS.keys()) if x[1] == panel_id]:
+        _PANEL_SNAPSHOTS.pop(key, None)
+
+
+def prune_panel_snapshots(doc=None):
+    """Drop snapshots of ``doc`` (a closing document), or all of them."""
+    if doc is None:
+        _PANEL_SNAPSHOTS.clear()
+        return
+    doc_key = revit_helpers.get_document_key(doc)
+    for key in [x for x in list(_PANEL_SNAPSHOTS.keys()) if x[0] == doc_key]:
+        _PANEL_SNAPSHOTS.pop(key, None)
+
+
+def note_panel_snapshot_changes(args):
+    """Drop snapshots of panels touched by a DocumentChanged event.
+
+    A snapshot goes when its panel or one of its circuits was modified or
+    deleted, or when an added or modified circuit it does not hold now
+    reports the panel as its base equipment.
+    """
+    if not _PANEL_SNAPSHOTS:
+        return
+    try:
+        doc = args.GetDocument()
+        doc_key = revit_helpers.get_document_key(doc)
+        touched = set([int(_idval(x)) for x in list(args.GetDeletedElementIds() or [])])
+        touched.update([int(_idval(x)) for x in list(args.GetModifiedElementIds() or [])])
+        circuit_filter = DB.ElementClassFilter(DBE.ElectricalSystem)
+        circuit_ids = list(args.GetAddedElementIds(circuit_filter) or [])
+        circuit_ids += list(args.GetModifiedElementIds(circuit_filter) or [])
+    except Exception:
+        prune_panel_snapshots()
+        return
+    held = {}
+    for key, snapshot in list(_PANEL_SNAPSHOTS.items()):
+        if key[0] != doc_key:
+            continue
+        if snapshot.panel_id in touched or any(x in touched for x in snapshot._by_id):
+            _PANEL_SNAPSHOTS.pop(key, None)
+            continue
+        held[snapshot.panel_id] = snapshot
+    if not held:
+        return
+    for circuit_id in circuit_ids:
+        if not any(int(_idval(circuit_id)) in x._by_id for x in held.values()):
+            try:
+                base = doc.GetElement(circuit_id).BaseEquipment
+                base_id = int(_idval(base.Id)) if base is not None else 0
+            except Exception:
+                base_id = 0
+            if base_id in held:
+                _PANEL_SNAPSHOTS.pop(_panel_snapshot_key(doc, base_id), None)
+                held.pop(base_id, None)
+
+
+def _build_circuit_row(option, circuit, doc=None, panel_id_set=None, snapshot=None):
     """Build a normalized row dictionary for a circuit-like item."""
-    slot = get_circuit_start_slot(circuit)
-    voltage, poles = get_circuit_voltage_poles(circuit)
-    kind = _kind_from_circuit(circuit)
+    snap = snapshot if snapshot is not None else CircuitSnapshot(circuit)
+    slot = snap.start_slot
+    voltage, poles = snap.voltage, snap.poles
+    kind = snap.kind
     poles_value = int(max(1, poles or 1))
 
     covered_slots = get_slot_span_slots(
@@ -1779,19 +2180,11 @@ def _build_circuit_row(option, circuit, doc=None, panel_id_set=None):
     if not covered_slots:
         covered_slots = [int(slot)] if int(slot or 0) > 0 else []
 
-    load_name = _to_text(getattr(circuit, "LoadName", ""), "").strip()
-    circuit_number = _to_text(getattr(circuit, "CircuitNumber", ""), "").strip()
+    load_name = snap.load_name
+    circuit_number = snap.circuit_number
     if not circuit_number:
         circuit_number = predict_circuit_number(option, slot, poles=poles_value)
-    schedule_notes_text = ""
-    try:
-        notes_param = circuit.get_Parameter(DB.BuiltInParameter.RBS_ELEC_CIRCUIT_NOTES_PARAM)
-        schedule_notes_text = _to_text(
-            revit_helpers.get_parameter_value(notes_param, default=""),
-            "",
-        ).strip()
-    except Exception:
-        schedule_notes_text = ""
+    schedule_notes_text = snap.schedule_notes_text
     voltage_text = "-"
     if voltage is not None:
         try:
@@ -1799,14 +2192,10 @@ def _build_circuit_row(option, circuit, doc=None, panel_id_set=None):
         except Exception:
             voltage_text = _to_text(voltage, "-")
 
-    rating_value = None
+    rating_value = snap.rating
     rating_text = "-"
-    try:
-        rating_value = float(getattr(circuit, "Rating", None))
+    if rating_value is not None:
         rating_text = "{0:.0f}A".format(rating_value)
-    except Exception:
-        rating_value = None
-        rating_text = "-"
 
     start_slot = int(covered_slots[0]) if covered_slots else int(slot or 0)
     row_key = "panel:{0}|slot:{1}|ckt:{2}".format(
@@ -1911,8 +2300,8 @@ def get_row_covered_slots(row, option=None):
     ) or [slot_value]
 
 
-def _collect_slot_metadata(doc, option):
-    """Return slot metadata map for a schedule option."""
+def _collect_slot_metadata(doc, option, snapshot=None):
+    """Return slot metadata map for a schedule option; ``snapshot`` resolves circuits without element reads."""
     view = option.get("schedule_view")
     if view is None:
         return {}
@@ -1942,10 +2331,12 @@ def _collect_slot_metadata(doc, option):
         row, col = cells[0]
         circuit = None
         circuit_id = DB.ElementId.InvalidElementId
+        circuit_snap = None
         try:
             circuit_id = view.GetCircuitIdByCell(row, col)
             if circuit_id and circuit_id != DB.ElementId.InvalidElementId:
-                circuit = doc.GetElement(circuit_id)
+                circuit_snap = snapshot.get(_idval(circuit_id)) if snapshot is not None else None
+                circuit = circuit_snap.circuit if circuit_snap is not None else doc.GetElement(circuit_id)
         except Exception:
             circuit = None
 
@@ -1963,7 +2354,7 @@ def _collect_slot_metadata(doc, option):
 
         kind = "empty"
         if isinstance(circuit, DBE.ElectricalSystem):
-            kind = _kind_from_circuit(circuit)
+            kind = circuit_snap.kind if circuit_snap is not None else _kind_from_circuit(circuit)
             if kind == "spare":
                 is_spare = True
             if kind == "space":
@@ -2029,7 +2420,11 @@ def _collect_slot_metadata(doc, option):
 
 
 def build_panel_rows(doc, option, panel_id_set=None, all_circuits=None):
-    """Build normalized panel rows for UI planning (no transactions)."""
+    """Build normalized panel rows for UI planning (no transactions).
+
+    Circuits come from the shared PanelSnapshot; ``all_circuits`` is only
+    scanned when the panel has no MEP model to read them from.
+    """
     panel = option.get("panel")
     max_slot = int(option.get("max_slot") or 0)
     sort_mode = option.get("sort_mode") or SORT_MODE_PANELBOARD_ACROSS
@@ -2040,7 +2435,8 @@ def build_panel_rows(doc, option, panel_id_set=None, all_circuits=None):
     valid_slot_set = set([int(x) for x in list(get_option_valid_slots(option) or []) if int(x) > 0])
     if not valid_slot_set and max_slot > 0:
         valid_slot_set = set(range(1, int(max_slot) + 1))
-    metadata_map = _collect_slot_metadata(doc, option)
+    snapshot = get_panel_snapshot(doc, panel)
+    metadata_map = _collect_slot_metadata(doc, option, snapshot=snapshot)
     known_panel_ids = set()
     for candidate_id in list(panel_id_set or []):
         try:
@@ -2057,21 +2453,34 @@ def build_panel_rows(doc, option, panel_id_set=None, all_circuits=None):
                 continue
 
     circuit_by_slot = {}
-    circuits = list(all_circuits) if all_circuits is not None else list(
-        DB.FilteredElementCollector(doc).OfClass(DBE.ElectricalSystem).WhereElementIsNotElementType().ToElements()
-    )
-    for circuit in circuits:
-        try:
-            base = getattr(circuit, "BaseEquipment", None)
-            if base is None or panel is None or _idval(base.Id) != option.get("panel_id", 0):
+    if snapshot is not None:
+        circuit_snaps = list(snapshot.circuits)
+    else:
+        circuit_snaps = []
+        circuits = list(all_circuits) if all_circuits is not None else list(
+            DB.FilteredElementCollector(doc).OfClass(DBE.ElectricalSystem).WhereElementIsNotElementType().ToElements()
+        )
+        for circuit in circuits:
+            try:
+                base = getattr(circuit, "BaseEquipment", None)
+                if base is None or panel is None or _idval(base.Id) != option.get("panel_id", 0):
+                    continue
+            except Exception:
                 continue
-        except Exception:
-            continue
-
-        slot = get_circuit_start_slot(circuit)
+            circuit_snaps.append(CircuitSnapshot(circuit))
+    for circuit_snap in circuit_snaps:
+        slot = circuit_snap.start_slot
         if slot <= 0:
             continue
-        row = _build_circuit_row(option, circuit, doc=doc, panel_id_set=known_panel_ids)
+        # Slot metadata already resolved the edit owner for scheduled circuits.
+        meta_has_owner = int(slot) in metadata_map
+        row = _build_circuit_row(
+            option,
+            circuit_snap.circuit,
+            doc=None if meta_has_owner else doc,
+            panel_id_set=known_panel_ids,
+            snapshot=circuit_snap,
+        )
         circuit_by_slot[int(slot)] = row
 
     rows = []
@@ -2118,8 +2527,12 @@ def build_panel_rows(doc, option, panel_id_set=None, all_circuits=None):
     return rows
 
 
-def evaluate_transferability(row, target_option, tolerance=1.0):
-    """Return (is_transferable, reason) for moving a circuit row to target panel."""
+def evaluate_transferability(row, target_option, tolerance=1.0, compatibility_index=None):
+    """Return (is_transferable, reason) for moving a circuit row to target panel.
+
+    With a ``PanelCompatibilityIndex`` the target profile and branch options
+    come from the index entry instead of the option's equipment model.
+    """
     if not row:
         return False, "Invalid row."
     if not bool(row.get("is_valid_slot", True)):
@@ -2135,7 +2548,13 @@ def evaluate_transferability(row, target_option, tolerance=1.0):
         if target_panel_id in fed_ids:
             return False, "Circuit feeds the target panel/switchboard."
 
-    target_profile = (target_option or {}).get("profile") or {}
+    index_entry = None
+    if compatibility_index is not None and target_panel_id > 0:
+        index_entry = compatibility_index.entry(target_panel_id)
+    if index_entry is not None:
+        target_profile = index_entry.profile
+    else:
+        target_profile = (target_option or {}).get("profile") or {}
     poles = int(row.get("poles") or 1)
     voltage = row.get("voltage")
     if voltage is None:
@@ -2152,7 +2571,9 @@ def evaluate_transferability(row, target_option, tolerance=1.0):
 
     target_model = (target_option or {}).get("equipment_model")
     branch_options = []
-    if target_model is not None:
+    if index_entry is not None:
+        branch_options = [{"poles": p, "voltage": v} for p, v in index_entry.signatures]
+    elif target_model is not None:
         try:
             branch_options = list(getattr(target_model, "branch_circuit_options", None) or [])
         except Exception:
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Ordered queue of staged circuit actions sent as one composite operation."""
+
+
+def _circuit_id(value):
+    try:
+        return int(value or 0)
+    except Exception:
+        return 0
+
+
+class CircuitActionQueue(object):
+    """Collects per-circuit updates in staging order and groups them into actions.
+
+    Each ``stage`` call records one circuit update for an operation key and its
+    shared options. Re-staging a circuit for the same key replaces its earlier
+    entry and moves it to the end of the queue, so the queue always reflects
+    the last state the user chose; one circuit may still be queued under
+    several keys. ``actions`` merges consecutive entries with the same key and
+    options into one ``{'operation_key', 'circuit_ids', 'options'}`` action,
+    keeping the order the user staged them in.
+    """
+
+    def __init__(self):
+        self._entries = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stage(self, operation_key, update, options=None):
+        """Queue ``update`` (a dict with ``circuit_id``) for ``operation_key``; return True when queued."""
+        item = dict(update or {})
+        cid = _circuit_id(item.get("circuit_id"))
+        if not operation_key or cid <= 0:
+            return False
+        item["circuit_id"] = cid
+        self.unstage(cid, operation_key)
+        self._entries.append((operation_key, dict(options or {}), item))
+        return True
+
+    def unstage(self, circuit_id, operation_key=None):
+        """Drop queued entries for ``circuit_id``; all keys unless ``operation_key`` is given."""
+        cid = _circuit_id(circuit_id)
+        self._entries = [
+            entry
+            for entry in self._entries
+            if entry[2]["circuit_id"] != cid or (operation_key and entry[0] != operation_key)
+        ]
+
+    def circuit_ids(self):
+        ids = []
+        for entry in self._entries:
+            if entry[2]["circuit_id"] not in ids:
+                ids.append(entry[2]["circuit_id"])
+        return ids
+
+    def actions(self):
+        """Return the queued entries as ordered composite actions."""
+        actions = []
+        for operation_key, options, update in self._entries:
+            last = actions[-1] if actions else None
+            if last is None or last["operation_key"] != operation_key or last["_shared"] != options:
+                last = {
+                    "operation_key": operation_key,
+                    "circuit_ids": [],
+                    "options": dict(options, updates=[]),
+                    "_shared": options,
+                }
+                actions.append(last)
+            last["circuit_ids"].append(update["circuit_id"])
+            last["options"]["updates"].append(dict(update))
+        for action in actions:
+            action.pop("_shared", None)
+        return actions
+
+
+def dependent_circuit_ids(circuit_ids, changed_ids):
+    """Return ids in ``circuit_ids`` already changed by an earlier action, in order."""
+    changed = set(changed_ids or [])
+    dependent = []
+    for raw in list(circuit_ids or []):
+        cid = _circuit_id(raw)
+        if cid in changed and cid not in dependent:
+            dependent.append(cid)
+    return dependent
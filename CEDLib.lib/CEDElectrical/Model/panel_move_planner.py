@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""Whole-batch slot planner for moving circuits onto one target panel."""
+
+import time
+
+DEFAULT_NODE_LIMIT = 20000
+
+STRATEGY_FIRST_FIT = "first_fit"
+STRATEGY_BACKTRACK = "backtrack"
+STRATEGY_PARTIAL = "partial"
+
+
+class SlotOccupancy(object):
+    """Free valid slots on a target panel plus candidate spans per pole count.
+
+    ``span_fn(start_slot, poles)`` returns the covered slots for a start slot,
+    or an empty list when the span leaves the valid slot range. Spans are
+    computed once per pole count and shared by every copy of the occupancy.
+    """
+
+    def __init__(self, slot_order, free_slots, span_fn, _spans=None):
+        self.slot_order = [int(x) for x in list(slot_order or []) if int(x) > 0]
+        self.free = set([int(x) for x in list(free_slots or []) if int(x) > 0])
+        self._span_fn = span_fn
+        self._spans = _spans if _spans is not None else {}
+
+    def copy(self, free_slots=None):
+        free = self.free if free_slots is None else free_slots
+        return SlotOccupancy(self.slot_order, free, self._span_fn, _spans=self._spans)
+
+    def spans(self, poles):
+        """Return ``[(start_slot, covered_slots)]`` for every valid span of ``poles``."""
+        pole_count = int(max(1, poles or 1))
+        cached = self._spans.get(pole_count)
+        if cached is None:
+            cached = []
+            for start in self.slot_order:
+                covered = tuple([int(x) for x in list(self._span_fn(int(start), pole_count) or []) if int(x) > 0])
+                if covered:
+                    cached.append((int(start), covered))
+            self._spans[pole_count] = cached
+        return cached
+
+    def is_free(self, covered):
+        free = self.free
+        for slot in covered:
+            if slot not in free:
+                return False
+        return True
+
+    def take(self, covered):
+        self.free.difference_update(covered)
+
+    def release(self, covered):
+        self.free.update(covered)
+
+    def first_fit(self, poles):
+        for start, covered in self.spans(poles):
+            if self.is_free(covered):
+                return start, covered
+        return 0, ()
+
+
+class MovePlan(object):
+    """Slot assignments for a batch in apply order, or a report of what cannot fit."""
+
+    def __init__(self, requests):
+        self.requests = list(requests)
+        self.assignments = {}
+        self.order = []
+        self.unplaced = []
+        self.strategy = ""
+        self.search_exhausted = False
+        self.elapsed_ms = 0.0
+        self.free_slot_count = 0
+        self.required_slot_count = 0
+
+    @property
+    def feasible(self):
+        return not self.unplaced
+
+    @property
+    def placed_count(self):
+        return int(len(self.order))
+
+    def assignment(self, key):
+        """Return ``(start_slot, covered_slots)`` for a planned key, or ``(0, [])``."""
+        found = self.assignments.get(key)
+        if found is None:
+            return 0, []
+        return int(found[0]), list(found[1])
+
+    def reason(self, key):
+        for item_key, _, reason in self.unplaced:
+            if item_key == key:
+                return reason
+        return ""
+
+    def summary(self):
+        """Return a one-paragraph infeasibility report (empty when the plan is complete)."""
+        if self.feasible:
+            return ""
+        total = int(len(self.requests))
+        lines = [
+            "Target panel cannot fit {0} of {1} selected circuit(s): {2} slot(s) required, {3} free.".format(
+                int(len(self.unplaced)),
+                total,
+                int(self.required_slot_count),
+                int(self.free_slot_count),
+            )
+        ]
+        by_poles = {}
+        for _, poles in self.requests:
+            by_poles.setdefault(int(poles), [0, 0])[0] += 1
+        for key in self.order:
+            for item_key, poles in self.requests:
+                if item_key == key:
+                    by_poles[int(poles)][1] += 1
+                    break
+        for poles in sorted(by_poles.keys(), reverse=True):
+            requested, placed = by_poles[poles]
+            if placed < requested:
+                lines.append("{0}-pole: {1} of {2} placed.".format(int(poles), int(placed), int(requested)))
+        if self.search_exhausted:
+            lines.append("Search limit reached before a complete plan was found.")
+        return " ".join(lines)
+
+
+def _normalize_requests(requests):
+    """Return ``[(key, poles)]`` by descending pole count, in selection order within a pole count."""
+    normalized = []
+    for index, (key, poles) in enumerate(list(requests or [])):
+        normalized.append((int(max(1, poles or 1)), index, key))
+    normalized.sort(key=lambda x: (-x[0], x[1]))
+    return [(key, poles) for poles, _, key in normalized]
+
+
+def _first_fit(ordered, occupancy):
+    placed = {}
+    for key, poles in ordered:
+        start, covered = occupancy.first_fit(poles)
+        if not covered:
+            continue
+        occupancy.take(covered)
+        placed[key] = (start, covered)
+    return placed
+
+
+def _backtrack(ordered, occupancy, node_limit):
+    """Return key -> span for a complete assignment, ``None`` when infeasible, or ``False`` when the budget ran out."""
+    count = len(ordered)
+    remaining = [0] * (count + 1)
+    for idx in range(count - 1, -1, -1):
+        remaining[idx] = remaining[idx + 1] + int(ordered[idx][1])
+    chosen = [None] * count
+    budget = [int(node_limit)]
+
+    def _place(idx, min_index):
+        if idx >= count:
+            return True
+        if remaining[idx] > len(occupancy.free):
+            return False
+        poles = int(ordered[idx][1])
+        spans = occupancy.spans(poles)
+        same_next = bool(idx + 1 < count and int(ordered[idx + 1][1]) == poles)
+        for span_idx in range(int(min_index), len(spans)):
+            budget[0] -= 1
+            if budget[0] < 0:
+                return False
+            start, covered = spans[span_idx]
+            if not occupancy.is_free(covered):
+                continue
+            occupancy.take(covered)
+            chosen[idx] = (start, covered)
+            # Circuits with equal pole counts are interchangeable; keep their spans ascending.
+            if _place(idx + 1, span_idx + 1 if same_next else 0):
+                return True
+            occupancy.release(covered)
+            if budget[0] < 0:
+                return False
+        return False
+
+    if _place(0, 0):
+        return dict((ordered[idx][0], chosen[idx]) for idx in range(count))
+    if budget[0] < 0:
+        return False
+    return None
+
+
+def _unplaced_reason(poles, occupancy, exhausted):
+    spans = occupancy.spans(poles)
+    if not spans:
+        return "Target panel has no valid {0}-pole span.".format(int(poles))
+    if not any(occupancy.is_free(covered) for _, covered in spans):
+        return "No free {0}-pole span on target panel.".format(int(poles))
+    reason = "Free {0}-pole spans are needed by other selected circuits.".format(int(poles))
+    if exhausted:
+        reason = "{0} (search limit reached)".format(reason)
+    return reason
+
+
+def plan_moves(requests, occupancy, node_limit=DEFAULT_NODE_LIMIT):
+    """Plan slots for ``requests`` (``[(key, poles)]``) against ``occupancy`` before any transaction.
+
+    Circuits are ordered by descending pole count, keeping the caller's
+    (selection) order among circuits with the same pole count; ``plan.order``
+    is that apply order. First-fit in that order mirrors how ``SelectPanel``
+    fills a panel and is tried first; when it
+    leaves circuits over, a bounded backtracking search looks for a complete
+    assignment. Without one, the first-fit result is kept as the best
+    partial plan and every circuit left over gets a reason. ``occupancy`` is
+    not modified.
+    """
+    started = time.time()
+    ordered = _normalize_requests(requests)
+    plan = MovePlan(ordered)
+    plan.free_slot_count = int(len(occupancy.free))
+    plan.required_slot_count = int(sum([int(poles) for _, poles in ordered]))
+
+    placed = _first_fit(ordered, occupancy.copy(set(occupancy.free)))
+    plan.strategy = STRATEGY_FIRST_FIT
+    if len(placed) < len(ordered):
+        found = None
+        if plan.required_slot_count <= plan.free_slot_count:
+            found = _backtrack(ordered, occupancy.copy(set(occupancy.free)), node_limit)
+        if found:
+            placed = found
+            plan.strategy = STRATEGY_BACKTRACK
+        else:
+            plan.strategy = STRATEGY_PARTIAL
+            plan.search_exhausted = bool(found is False)
+
+    for key, poles in ordered:
+        span = placed.get(key)
+        if span is None:
+            plan.unplaced.append((key, int(poles), _unplaced_reason(poles, occupancy, plan.search_exhausted)))
+            continue
+        plan.assignments[key] = (int(span[0]), tuple(span[1]))
+        plan.order.append(key)
+    plan.elapsed_ms = (time.time() - started) * 1000.0
+    return plan
@@ -19,8 +19,6 @@ class PanelScheduleManager(object):
         self.distribution_bus = distribution_bus
         self.logger = logger or script.get_logger()
         self._panel_option_lookup = dict(panel_option_lookup or {})
-        self._slot_cells_cache = {}
-        self._layout_context_cache = {}
 
     # -------------------------------------------------------------------------
     # Public metadata surface
@@ -258,6 +256,101 @@ class PanelScheduleManager(object):
             restrict_data_to_space=False,
         )
 
+    def add_specials_default(self, panel_id, adds, unlock=True, apply_switchboard_default_poles=True):
+        """Add ``[(slot, kind)]`` SPARE/SPACE rows with add/remove-tool defaults from one slot-map read.
+
+        Every slot is validated like ``add_spare_default``/``add_space_default``
+        and its cells are read from the slot map before the first add. Added
+        circuits are resolved from those same cells, and the schedule cache is
+        invalidated once after the last add. Returns ``{panel_id, slot,
+        circuit_id}`` per add, in ``adds`` order.
+        """
+        panel_id_value = int(panel_id or 0)
+        option = self._option_for_panel_id(panel_id_value)
+        if option is None:
+            raise Exception("Missing panel option for add operation.")
+        schedule_view = option.get("schedule_view")
+        if schedule_view is None:
+            raise Exception("Panel has no schedule view.")
+        is_switchboard = bool(option.get("schedule_type") == ps_repo.PSTYPE_SWITCHBOARD)
+        poles = 3 if is_switchboard else 1
+        slot_map = ps_repo.get_slot_cell_map(schedule_view)
+
+        planned = []
+        for slot, kind in list(adds or []):
+            slot_value = int(slot or 0)
+            kind_key = SpecialKind.normalize(kind, None)
+            if kind_key is None:
+                raise Exception("Unsupported special kind: {0}".format(kind))
+            if slot_value <= 0:
+                raise Exception("Invalid slot for add operation.")
+            if not bool(ps_repo.is_slot_valid_for_option(option, int(slot_value))):
+                raise Exception(
+                    "Target slot {0} exceeds equipment-supported slot capacity for this panel.".format(
+                        int(slot_value)
+                    )
+                )
+            span = ps_repo.get_slot_span_slots_for_option(
+                option,
+                start_slot=int(slot_value),
+                pole_count=int(poles),
+                require_valid=True,
+            )
+            if not span:
+                raise Exception(
+                    "Target slot {0} / pole span exceeds equipment-supported slot capacity.".format(int(slot_value))
+                )
+            cells = list(slot_map.cells(slot_value) or []) if slot_map is not None else []
+            planned.append((slot_value, kind_key, cells, span))
+
+        if not planned:
+            return []
+        if bool(unlock):
+            self._unlock_slots_with_snapshot(
+                schedule_view,
+                [int(x) for item in planned for x in list(item[3] or []) if int(x) > 0],
+            )
+        for slot_value, kind_key, cells, _ in planned:
+            self._add_special_to_slot(schedule_view, slot_value, kind_key, cells=cells)
+
+        occupants = {}
+        for slot_value, _, cells, _ in planned:
+            occupants[slot_value] = self._circuit_from_cells(schedule_view, cells)
+        added_slots = [item[0] for item in planned]
+        self._invalidate_schedule_cache(schedule_view, slots=added_slots)
+        missing = [x for x in added_slots if not isinstance(occupants.get(x), DBE.ElectricalSystem)]
+        if missing:
+            # Fallback only when the immediate lookup fails after the adds.
+            self.doc.Regenerate()
+            self._invalidate_schedule_cache(schedule_view, slots=missing)
+            for slot_value in missing:
+                occupants[slot_value] = self._get_circuit_at_slot(schedule_view, slot_value)
+
+        results = []
+        for slot_value, kind_key, _, _ in planned:
+            occupant = occupants.get(slot_value)
+            if not isinstance(occupant, DBE.ElectricalSystem):
+                raise Exception("Added {0} could not be resolved at slot {1}.".format(str(kind_key).upper(), int(slot_value)))
+            if bool(apply_switchboard_default_poles and is_switchboard):
+                self._set_circuit_poles(occupant, 3)
+            if bool(unlock):
+                covered_slots = self._covered_slots_for_circuit(
+                    option,
+                    occupant,
+                    fallback_slot=int(slot_value),
+                    fallback_poles=int(poles),
+                )
+                for covered in [int(x) for x in list(covered_slots or []) if int(x) > 0]:
+                    self._set_slot_locked(schedule_view, int(covered), False)
+            results.append(
+                {
+                    "panel_id": panel_id_value,
+                    "slot": int(slot_value),
+                    "circuit_id": int(self._idval(occupant.Id)),
+                }
+            )
+        return results
+
     def set_circuit_poles(self, circuit_id, poles):
         """Set poles on one circuit by id when writable."""
         circuit = self._element_by_id_value(circuit_id)
@@ -285,9 +378,13 @@ class PanelScheduleManager(object):
         panel = target_option.get("panel")
         if panel is None:
             raise Exception("Target panel element is unavailable.")
+        source_panel = getattr(circuit, "BaseEquipment", None)
         self._select_panel_for_circuit(circuit, panel)
         self.doc.Regenerate()
         self._invalidate_schedule_cache(target_option.get("schedule_view"))
+        ps_repo.invalidate_panel_snapshot(panel)
+        if source_panel is not None:
+            ps_repo.invalidate_panel_snapshot(source_panel)
         return int(ps_repo.get_circuit_start_slot(circuit) or 0)
 
     def move_circuit_in_panel(self, panel_id, circuit_id, target_slot):
@@ -533,120 +630,23 @@ class PanelScheduleManager(object):
         except Exception:
             return None
 
-    def _schedule_id_value(self, schedule_view):
-        if schedule_view is None:
-            return 0
-        try:
-            return int(self._idval(getattr(schedule_view, "Id", None)))
-        except Exception:
-            return 0
-
     def _invalidate_schedule_cache(self, schedule_view=None, slots=None):
-        """Clear cached slot-cell/layout mapping after schedule mutations."""
-        if schedule_view is None:
-            self._slot_cells_cache = {}
-            self._layout_context_cache = {}
-            return
-        sid = self._schedule_id_value(schedule_view)
-        if sid <= 0:
-            self._slot_cells_cache = {}
-            self._layout_context_cache = {}
-            return
-        if slots is None:
-            self._layout_context_cache.pop(int(sid), None)
-            stale_keys = [key for key in list(self._slot_cells_cache.keys()) if int(key[0]) == int(sid)]
-            for key in stale_keys:
-                self._slot_cells_cache.pop(key, None)
-            return
-        for slot in list(slots or []):
-            slot_value = int(slot or 0)
-            if slot_value <= 0:
-                continue
-            self._slot_cells_cache.pop((int(sid), int(slot_value)), None)
+        """Clear cached slot-cell/layout mapping and the panel snapshot after schedule mutations."""
+        ps_repo.invalidate_slot_cell_map(schedule_view, slots=slots)
+        if schedule_view is not None:
+            ps_repo.invalidate_panel_snapshot(schedule_view=schedule_view)
 
     def _slot_cells(self, schedule_view, slot, refresh=False):
-        cache_key = self._schedule_slot_cache_key(schedule_view, slot)
-        if (not bool(refresh)) and cache_key is not None and cache_key in self._slot_cells_cache:
-            return list(self._slot_cells_cache.get(cache_key) or [])
         slot_value = int(slot or 0)
-        if slot_value <= 0:
+        if slot_value <= 0 or schedule_view is None:
             return []
         if bool(refresh):
             self._invalidate_schedule_cache(schedule_view, slots=[int(slot_value)])
         try:
-            cells = list(ps_repo.get_cells_by_slot_number(schedule_view, slot_value) or [])
-        except Exception:
-            cells = []
-        ordered = self._order_cells_for_slot(schedule_view, slot_value, cells)
-        if cache_key is not None:
-            self._slot_cells_cache[cache_key] = list(ordered)
-        return ordered
-
-    def _schedule_slot_cache_key(self, schedule_view, slot):
-        if schedule_view is None:
-            return None
-        sid = int(self._idval(getattr(schedule_view, "Id", None)))
-        slot_value = int(slot or 0)
-        if sid <= 0 or slot_value <= 0:
-            return None
-        return (sid, slot_value)
-
-    def _layout_context(self, schedule_view):
-        if schedule_view is None:
-            return {"max_slot": 0, "sort_mode": "panelboard", "preferred_cols": {}}
-        sid = int(self._idval(getattr(schedule_view, "Id", None)))
-        if sid > 0 and sid in self._layout_context_cache:
-            return dict(self._layout_context_cache.get(sid) or {})
-        max_slot = 0
-        try:
-            table = schedule_view.GetTableData()
-            max_slot = int(getattr(table, "NumberOfSlots", 0) or 0)
+            slot_map = ps_repo.get_slot_cell_map(schedule_view)
+            return list(slot_map.ordered_cells(slot_value) or []) if slot_map is not None else []
         except Exception:
-            max_slot = 0
-        sort_mode = ps_repo.classify_schedule_layout(schedule_view)
-        col_counts = {1: {}, 2: {}}
-        if max_slot > 0:
-            for slot in range(1, int(max_slot) + 1):
-                display_col = int(ps_repo.get_slot_display_column(slot, max_slot, sort_mode) or 1)
-                for row, col in list(ps_repo.get_cells_by_slot_number(schedule_view, slot) or []):
-                    cid = int(self._cell_circuit_id(schedule_view, row, col))
-                    if cid <= 0:
-                        continue
-                    bucket = col_counts.setdefault(display_col, {})
-                    bucket[int(col)] = int(bucket.get(int(col), 0) or 0) + 1
-        preferred_cols = {}
-        for display_col, bucket in col_counts.items():
-            ordered = [pair[0] for pair in sorted(bucket.items(), key=lambda x: (-int(x[1]), int(x[0])))]
-            preferred_cols[int(display_col)] = [int(x) for x in ordered]
-        context = {"max_slot": int(max_slot), "sort_mode": sort_mode, "preferred_cols": preferred_cols}
-        if sid > 0:
-            self._layout_context_cache[sid] = dict(context)
-        return context
-
-    def _order_cells_for_slot(self, schedule_view, slot, cells):
-        seen = set()
-        ordered = []
-        for pair in list(cells or []):
-            if not pair or len(pair) < 2:
-                continue
-            key = (int(pair[0]), int(pair[1]))
-            if key in seen:
-                continue
-            seen.add(key)
-            ordered.append(key)
-        if not ordered:
             return []
-        context = self._layout_context(schedule_view)
-        max_slot = int(context.get("max_slot", 0) or 0)
-        sort_mode = context.get("sort_mode", "panelboard")
-        display_col = int(ps_repo.get_slot_display_column(int(slot or 0), max_slot, sort_mode) or 1)
-        preferred_cols = list((context.get("preferred_cols") or {}).get(display_col) or [])
-        priority = {}
-        for idx, col in enumerate(preferred_cols):
-            priority[int(col)] = int(idx)
-        fallback_rank = 999999
-        ordered.sort(key=lambda pair: (int(priority.get(int(pair[1]), fallback_rank)), int(pair[1]), int(pair[0])))
-        return ordered
 
     def _slot_cells_for_add(self, schedule_view, slot):
         """Return native slot cells for AddSpare/AddSpace calls."""
@@ -767,37 +767,37 @@ class PanelScheduleManager(object):
             if bool(was_locked):
                 self._set_slot_locked(schedule_view, int(slot), True)
 
-    def _get_circuit_at_slot(self, schedule_view, slot):
-        def _resolve_from_cells(cells):
-            for row, col in list(cells or []):
-                getter = getattr(schedule_view, "GetCircuitByCell", None)
-                if getter is not None:
-                    try:
-                        circuit = getter(int(row), int(col))
-                        if isinstance(circuit, DBE.ElectricalSystem):
-                            return circuit
-                    except Exception:
-                        pass
-                getter_id = getattr(schedule_view, "GetCircuitIdByCell", None)
-                if getter_id is not None:
-                    try:
-                        cid = getter_id(int(row), int(col))
-                        if cid is None or cid == DB.ElementId.InvalidElementId:
-                            continue
-                        circuit = self.doc.GetElement(cid)
-                        if isinstance(circuit, DBE.ElectricalSystem):
-                            return circuit
-                    except Exception:
-                        pass
-            return None
+    def _circuit_from_cells(self, schedule_view, cells):
+        for row, col in list(cells or []):
+            getter = getattr(schedule_view, "GetCircuitByCell", None)
+            if getter is not None:
+                try:
+                    circuit = getter(int(row), int(col))
+                    if isinstance(circuit, DBE.ElectricalSystem):
+                        return circuit
+                except Exception:
+                    pass
+            getter_id = getattr(schedule_view, "GetCircuitIdByCell", None)
+            if getter_id is not None:
+                try:
+                    cid = getter_id(int(row), int(col))
+                    if cid is None or cid == DB.ElementId.InvalidElementId:
+                        continue
+                    circuit = self.doc.GetElement(cid)
+                    if isinstance(circuit, DBE.ElectricalSystem):
+                        return circuit
+                except Exception:
+                    pass
+        return None
 
+    def _get_circuit_at_slot(self, schedule_view, slot):
         cached_cells = self._slot_cells(schedule_view, slot, refresh=False)
-        resolved = _resolve_from_cells(cached_cells)
+        resolved = self._circuit_from_cells(schedule_view, cached_cells)
         if isinstance(resolved, DBE.ElectricalSystem):
             return resolved
         # Retry once from fresh API cells in case cached row/col map is stale.
         fresh_cells = self._slot_cells(schedule_view, slot, refresh=True)
-        return _resolve_from_cells(fresh_cells)
+        return self._circuit_from_cells(schedule_view, fresh_cells)
 
     def _find_circuit_slots_in_schedule(self, schedule_view, circuit_id):
         target_id = int(circuit_id or 0)
@@ -1159,7 +1159,7 @@ class PanelScheduleManager(object):
         except Exception:
             pass
 
-    def _add_special_to_slot(self, schedule_view, slot, kind):
+    def _add_special_to_slot(self, schedule_view, slot, kind, cells=None):
         action = SpecialKind.normalize(kind, None)
         if action is None:
             raise Exception("Unsupported special kind: {0}".format(kind))
@@ -1168,7 +1168,8 @@ class PanelScheduleManager(object):
         if method is None:
             raise Exception("{0} is unavailable.".format(method_name))
 
-        cells = list(self._slot_cells_for_add(schedule_view, slot))
+        if cells is None:
+            cells = list(self._slot_cells_for_add(schedule_view, slot))
         errors = []
         for row, col in list(cells or []):
             try:
@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""In-memory panel state used to stage batch circuit moves without querying Revit."""
+
+from .panel_schedule_enums import PanelStagedAction as StagedAction
+
+
+def clone_rows(rows):
+    """Return mutable clones of row dictionaries."""
+    clones = []
+    for row in list(rows or []):
+        data = dict(row or {})
+        data["covered_slots"] = [int(x) for x in list(data.get("covered_slots") or []) if int(x) > 0]
+        data["slot_cells"] = list(data.get("slot_cells") or [])
+        clones.append(data)
+    return clones
+
+
+class PanelRowIndex(object):
+    """Slot and row-key index over one list of panel rows.
+
+    The index is built once and then kept current through ``add`` and
+    ``remove`` so staging a move costs the pole span, not the panel size.
+    Callers that rewrite rows in place must call ``rebuild``.
+    """
+
+    def __init__(self, rows, covered_slots_fn):
+        self.rows = rows
+        self._covered_slots_fn = covered_slots_fn
+        self._by_slot = {}
+        self._by_key = {}
+        self.rebuild()
+
+    def covered_slots(self, row):
+        covered = [int(x) for x in list(self._covered_slots_fn(row) or []) if int(x) > 0]
+        if not covered:
+            slot_value = int(row.get("slot", 0) or 0)
+            covered = [slot_value] if slot_value > 0 else []
+        return covered
+
+    def rebuild(self):
+        self._by_slot = {}
+        self._by_key = {}
+        for row in list(self.rows or []):
+            self._index(row)
+
+    def _index(self, row):
+        self._by_key[str(row.get("row_key", "") or "")] = row
+        is_empty = str(row.get("kind", "empty") or "empty") == "empty"
+        for slot in self.covered_slots(row):
+            current = self._by_slot.get(int(slot))
+            if is_empty and current is not None and str(current.get("kind", "empty") or "empty") != "empty":
+                continue
+            self._by_slot[int(slot)] = row
+
+    def occupancy(self):
+        """Return slot -> row map (read-only)."""
+        return self._by_slot
+
+    def at(self, slot):
+        return self._by_slot.get(int(slot or 0))
+
+    def by_key(self, row_key):
+        return self._by_key.get(str(row_key or ""))
+
+    def add(self, row):
+        self.rows.append(row)
+        self._index(row)
+
+    def remove(self, row):
+        """Remove one row by identity; return True when it was present."""
+        if row is None:
+            return False
+        key = str(row.get("row_key", "") or "")
+        if self._by_key.get(key) is row:
+            self._by_key.pop(key, None)
+        for slot in self.covered_slots(row):
+            if self._by_slot.get(int(slot)) is row:
+                self._by_slot.pop(int(slot), None)
+        for idx, existing in enumerate(self.rows):
+            if existing is row:
+                self.rows.pop(idx)
+                return True
+        return False
+
+    def remove_key(self, row_key):
+        return self.remove(self.by_key(row_key))
+
+    def rows_in_slots(self, slots):
+        """Return distinct rows covering any of ``slots``, in slot order."""
+        found = []
+        seen = set()
+        for slot in sorted(set([int(x) for x in list(slots or []) if int(x) > 0])):
+            row = self._by_slot.get(slot)
+            if row is None or id(row) in seen:
+                continue
+            seen.add(id(row))
+            found.append(row)
+        return found
+
+
+class PanelState(object):
+    """Working rows for one panel plus the baseline they were loaded from."""
+
+    def __init__(self, panel_id, rows, slot_order=None):
+        self.panel_id = int(panel_id or 0)
+        self.rows = clone_rows(rows)
+        self.baseline = clone_rows(rows)
+        self.slot_order = [int(x) for x in list(slot_order or [])]
+        self._slot_position = dict((slot, idx) for idx, slot in enumerate(self.slot_order))
+
+    def next_slot_after(self, slot):
+        """Return the next slot in display order, or 0."""
+        idx = self._slot_position.get(int(slot or 0))
+        if idx is None or idx + 1 >= len(self.slot_order):
+            return 0
+        return int(self.slot_order[idx + 1])
+
+    def reset(self):
+        self.rows = clone_rows(self.baseline)
+
+
+class PanelStateModel(object):
+    """Staged state for every panel involved in a batch swap session.
+
+    Rows (slots, pole spans, spares/spaces, ratings) are loaded from Revit
+    once per panel. Staging, undo and transferability then work on this
+    model only; Revit is touched again when the plan is applied.
+    """
+
+    def __init__(self):
+        self._panels = {}
+        self._transfer_cache = {}
+
+    def has_panel(self, panel_id):
+        return int(panel_id or 0) in self._panels
+
+    def load(self, panel_id, rows, slot_order=None):
+        """Register freshly loaded rows for a panel and return its working row list."""
+        state = PanelState(panel_id, rows, slot_order=slot_order)
+        self._panels[state.panel_id] = state
+        return state.rows
+
+    def state(self, panel_id):
+        return self._panels.get(int(panel_id or 0))
+
+    def rows(self, panel_id):
+        state = self.state(panel_id)
+        return state.rows if state is not None else None
+
+    def discard(self, panel_id):
+        self._panels.pop(int(panel_id or 0), None)
+        self._transfer_cache = {}
+
+    def clear(self):
+        self._panels = {}
+        self._transfer_cache = {}
+
+    def next_slot_after(self, panel_id, slot):
+        state = self.state(panel_id)
+        return state.next_slot_after(slot) if state is not None else 0
+
+    def snapshot(self, panel_ids):
+        """Return row clones for undo, keyed by panel id."""
+        snapshots = {}
+        for panel_id in list(panel_ids or []):
+            state = self.state(panel_id)
+            if state is not None:
+                snapshots[state.panel_id] = clone_rows(state.rows)
+        return snapshots
+
+    def restore(self, snapshots):
+        for panel_id, rows in dict(snapshots or {}).items():
+            state = self.state(panel_id)
+            if state is not None:
+                state.rows = clone_rows(rows)
+
+    def reset(self):
+        """Return every panel to the rows it was loaded with."""
+        for state in self._panels.values():
+            state.reset()
+
+    def transferability(self, row, target_panel_id, evaluate):
+        """Return cached ``evaluate(row)`` for a circuit row against a target panel."""
+        key = (
+            int(row.get("circuit_id", 0) or 0),
+            int(target_panel_id or 0),
+            int(row.get("poles", 1) or 1),
+            bool(row.get("is_valid_slot", True)),
+        )
+        cached = self._transfer_cache.get(key)
+        if cached is None:
+            cached = evaluate(row)
+            self._transfer_cache[key] = cached
+        return cached
+
+
+def _slot_keys(panel_id, slots):
+    return [(int(panel_id or 0), int(x)) for x in list(slots or []) if int(x or 0) > 0]
+
+
+def _is_move(action):
+    return action == StagedAction.MOVE
+
+
+def _is_add(action):
+    return bool(StagedAction.is_add_spare(action) or StagedAction.is_add_space(action))
+
+
+def _is_remove(action):
+    return bool(StagedAction.is_remove_spare(action) or StagedAction.is_remove_space(action))
+
+
+class _PlanStep(object):
+    """One circuit's staged hops, applied either as a single net placement or hop by hop."""
+
+    def __init__(self, hops):
+        self.hops = list(hops)
+
+    @property
+    def order(self):
+        return self.hops[-1][0]
+
+    @property
+    def seqs(self):
+        seqs = []
+        for _, seq, _ in self.hops:
+            if int(seq) not in seqs:
+                seqs.append(int(seq))
+        return seqs
+
+    def placement(self):
+        """Return the net placement for all hops, or None when they cancel out."""
+        first = self.hops[0][2]
+        last = self.hops[-1][2]
+        if len(self.hops) == 1:
+            return dict(first)
+        first_action = StagedAction.normalize(first.get("action", ""))
+        last_action = StagedAction.normalize(last.get("action", ""))
+        if _is_remove(last_action):
+            if _is_add(first_action):
+                return None
+            merged = dict(last)
+        else:
+            merged = dict(first)
+            for key in ("to_panel_id", "to_panel_name", "new_slot", "new_covered_slots", "target_condition", "circuit_number"):
+                if key in last:
+                    merged[key] = last.get(key)
+        if not _is_add(first_action):
+            for key in ("from_panel_id", "from_panel_name", "old_slot", "old_covered_slots"):
+                merged[key] = first.get(key)
+        if _is_move(StagedAction.normalize(merged.get("action", ""))):
+            merged["same_panel"] = bool(
+                int(merged.get("from_panel_id", 0) or 0) == int(merged.get("to_panel_id", 0) or 0)
+            )
+        return merged
+
+    def is_noop(self):
+        merged = self.placement()
+        if merged is None:
+            return True
+        if not _is_move(StagedAction.normalize(merged.get("action", ""))) or not merged.get("same_panel"):
+            return False
+        old_slots = sorted([int(x) for x in list(merged.get("old_covered_slots") or [])])
+        new_slots = sorted([int(x) for x in list(merged.get("new_covered_slots") or [])])
+        return bool(old_slots) and old_slots == new_slots
+
+    def events(self):
+        """Return (slot key, time, rank) tuples: vacate the origin first, occupy the final target last."""
+        found = []
+        if self.placement() is None:
+            return found
+        first_time, _, first = self.hops[0]
+        last_time, _, last = self.hops[-1]
+        first_action = StagedAction.normalize(first.get("action", ""))
+        last_action = StagedAction.normalize(last.get("action", ""))
+        if _is_move(first_action) or _is_remove(first_action):
+            for key in _slot_keys(first.get("from_panel_id"), first.get("old_covered_slots")):
+                found.append((key, first_time, 0))
+        if _is_move(last_action) or _is_add(last_action):
+            for key in _slot_keys(last.get("to_panel_id"), last.get("new_covered_slots")):
+                found.append((key, last_time, 1))
+        return found
+
+    def split(self):
+        return [_PlanStep([hop]) for hop in self.hops]
+
+
+def compile_placements(operations):
+    """Collapse pending operations into a minimal, dependency-ordered step list.
+
+    Each circuit's hops become one placement from its original slot to its
+    final slot, moves that end where they started are dropped, and a staged
+    spare/space that is added and later removed disappears. Steps are ordered
+    so every slot sees the same vacate/occupy sequence as the staged plan;
+    circuits whose net move would deadlock (a swap through a parking slot)
+    are split back into their staged hops. Returns ``(steps, compiled)``
+    where each step is ``{"placement", "seqs"}`` and ``compiled`` is False
+    when no hop could be collapsed.
+    """
+    chains = {}
+    chain_order = []
+    hop_count = 0
+    for operation in list(operations or []):
+        seq = int(operation.get("seq", 0) or 0)
+        for placement in list(operation.get("placements") or []):
+            circuit_id = int(placement.get("circuit_id", 0) or 0)
+            key = circuit_id if circuit_id != 0 else ("hop", hop_count)
+            if key not in chains:
+                chains[key] = []
+                chain_order.append(key)
+            chains[key].append((hop_count, seq, placement))
+            hop_count += 1
+
+    steps = [_PlanStep(chains[key]) for key in chain_order]
+    while True:
+        ordered, stalled = _order_steps(steps)
+        if ordered is not None:
+            break
+        splittable = [step for step in stalled if len(step.hops) > 1]
+        if not splittable:
+            ordered = sorted([_PlanStep([hop]) for key in chain_order for hop in chains[key]], key=lambda x: x.order)
+            break
+        target = min(splittable, key=lambda x: x.hops[0][0])
+        steps = [item for item in steps if item is not target] + target.split()
+
+    compiled = []
+    for step in ordered:
+        if step.is_noop():
+            continue
+        compiled.append({"placement": step.placement(), "seqs": step.seqs})
+    return compiled, bool(len(compiled) < hop_count)
+
+
+def _order_steps(steps):
+    """Return ``(ordered, None)`` honouring per-slot event order, or ``(None, stalled)`` on a cycle."""
+    events_by_slot = {}
+    for step in steps:
+        for key, time_value, rank in step.events():
+            events_by_slot.setdefault(key, []).append((time_value, rank, step))
+
+    dependents = dict((id(step), []) for step in steps)
+    blockers = dict((id(step), set()) for step in steps)
+    for events in events_by_slot.values():
+        events.sort(key=lambda x: (x[0], x[1]))
+        for idx in range(1, len(events)):
+            before = events[idx - 1][2]
+            after = events[idx][2]
+            if before is after or id(before) in blockers[id(after)]:
+                continue
+            blockers[id(after)].add(id(before))
+            dependents[id(before)].append(after)
+
+    indegree = dict((id(step), len(blockers[id(step)])) for step in steps)
+    ready = sorted([step for step in steps if indegree[id(step)] == 0], key=lambda x: x.order)
+    ordered = []
+    while ready:
+        step = ready.pop(0)
+        ordered.append(step)
+        released = []
+        for dependent in dependents[id(step)]:
+            indegree[id(dependent)] -= 1
+            if indegree[id(dependent)] == 0:
+                released.append(dependent)
+        if released:
+            ready = sorted(ready + released, key=lambda x: x.order)
+    if len(ordered) != len(steps):
+        return None, [step for step in steps if indegree[id(step)] > 0]
+    return ordered, None
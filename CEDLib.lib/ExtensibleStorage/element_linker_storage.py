@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Structured Element_Linker payload stored as an Extensible Storage entity on each placed element.
+
+The ``Element_Linker`` text parameter packs ids, the profile keys and the
+placement offsets into one string that has to be parsed with regexes on every
+read. Placements made with the entity option also attach this entity, which keeps
+the same values in typed fields (strings, XYZ points, doubles). Element ids
+are stored as decimal strings so 64-bit ids survive, and every optional
+number or point has a "has value" flag, so a missing value reads back as
+``None`` exactly as the text parser returns it. Readers should try
+``read_payload`` first and only fall back to parsing the text parameter for
+elements placed before the entity existed. ``payload_filter`` returns an
+``ExtensibleStorageFilter`` so collectors can pick up tagged elements without
+touching their parameters.
+"""
+
+from Autodesk.Revit.DB import XYZ
+from Autodesk.Revit.DB.ExtensibleStorage import (
+    AccessLevel,
+    Entity,
+    ExtensibleStorageFilter,
+    Schema,
+    SchemaBuilder,
+)
+from System import Boolean, Double, Guid, String
+
+try:
+    from Autodesk.Revit.DB import SpecTypeId, UnitTypeId
+except Exception:  # pragma: no cover - Revit 2020 and older
+    SpecTypeId = None
+    UnitTypeId = None
+
+# Schemas are immutable once a document holds them: change the GUID whenever the field layout changes.
+SCHEMA_GUID = Guid("3b6e9f0a-2c47-4d8b-a15e-7f4c0d92b8a3")
+SCHEMA_NAME = "CED_ElementLinker2"
+
+STRING_FIELDS = (
+    ("led_id", "LedId"),
+    ("set_id", "SetId"),
+    ("host_name", "HostName"),
+)
+ID_FIELDS = (
+    ("element_id", "ElementId"),
+    ("parent_element_id", "ParentElementId"),
+    ("level_id", "LevelId"),
+)
+DOUBLE_FIELDS = (
+    ("rotation", "Rotation", "HasRotation"),
+    ("parent_rotation", "ParentRotation", "HasParentRotation"),
+)
+XYZ_FIELDS = (
+    ("location", "Location", "HasLocation"),
+    ("parent_location", "ParentLocation", "HasParentLocation"),
+)
+
+_schema_cache = {}
+
+
+def _set_number_spec(field_builder):
+    """Doubles and XYZs need a unit spec; values are stored as plain numbers (feet / degrees)."""
+    if SpecTypeId is not None:
+        field_builder.SetSpec(SpecTypeId.Number)
+        return
+    from Autodesk.Revit.DB import UnitType
+    field_builder.SetUnitType(UnitType.UT_Number)
+
+
+def _number_unit():
+    if UnitTypeId is not None:
+        return UnitTypeId.General
+    from Autodesk.Revit.DB import DisplayUnitType
+    return DisplayUnitType.DUT_GENERAL
+
+
+def _build_schema():
+    builder = SchemaBuilder(SCHEMA_GUID)
+    builder.SetSchemaName(SCHEMA_NAME)
+    builder.SetDocumentation("Typed Element_Linker payload (profile keys, ids and placement offsets).")
+    builder.SetReadAccessLevel(AccessLevel.Public)
+    builder.SetWriteAccessLevel(AccessLevel.Public)
+    for _, field_name in STRING_FIELDS:
+        builder.AddSimpleField(field_name, String)
+    for _, field_name in ID_FIELDS:
+        builder.AddSimpleField(field_name, String)
+    for _, field_name, flag_name in DOUBLE_FIELDS:
+        _set_number_spec(builder.AddSimpleField(field_name, Double))
+        builder.AddSimpleField(flag_name, Boolean)
+    for _, field_name, flag_name in XYZ_FIELDS:
+        _set_number_spec(builder.AddSimpleField(field_name, XYZ))
+        builder.AddSimpleField(flag_name, Boolean)
+    return builder.Finish()
+
+
+def get_schema(create=False):
+    """Return the linker schema, building it when ``create`` is set; ``None`` when it is not loaded."""
+    schema = _schema_cache.get("schema")
+    if schema is not None and schema.IsValidObject:
+        return schema
+    schema = Schema.Lookup(SCHEMA_GUID)
+    if schema is None and create:
+        schema = _build_schema()
+    if schema is not None:
+        _schema_cache["schema"] = schema
+    return schema
+
+
+def payload_filter(inverted=False):
+    """Return an ``ExtensibleStorageFilter`` matching elements that carry the linker entity."""
+    return ExtensibleStorageFilter(SCHEMA_GUID, bool(inverted))
+
+
+def _id_text(value):
+    try:
+        value = int(value)
+    except Exception:
+        return u""
+    return u"{}".format(value) if value >= 0 else u""
+
+
+def _id_value(text):
+    try:
+        return int(text)
+    except Exception:
+        return None
+
+
+def _as_float(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except Exception:
+        return None
+
+
+def _as_xyz(value):
+    if value is None:
+        return None
+    if isinstance(value, XYZ):
+        return value
+    try:
+        return XYZ(float(value[0]), float(value[1]), float(value[2]))
+    except Exception:
+        return None
+
+
+def write_payload(element, payload):
+    """Attach ``payload`` (the ``_parse_linker_payload`` shape) to ``element``; needs an open transaction."""
+    if element is None or not payload:
+        return False
+    schema = get_schema(create=True)
+    if schema is None:
+        return False
+    unit = _number_unit()
+    entity = Entity(schema)
+    for key, field_name in STRING_FIELDS:
+        entity.Set[String](field_name, u"{}".format(payload.get(key) or u""))
+    for key, field_name in ID_FIELDS:
+        entity.Set[String](field_name, _id_text(payload.get(key)))
+    for key, field_name, flag_name in DOUBLE_FIELDS:
+        number = _as_float(payload.get(key))
+        entity.Set[Double](field_name, number if number is not None else 0.0, unit)
+        entity.Set[Boolean](flag_name, number is not None)
+    for key, field_name, flag_name in XYZ_FIELDS:
+        point = _as_xyz(payload.get(key))
+        entity.Set[XYZ](field_name, point or XYZ.Zero, unit)
+        entity.Set[Boolean](flag_name, point is not None)
+    try:
+        element.SetEntity(entity)
+    except Exception:
+        return False
+    return True
+
+
+def read_payload(element, schema=None):
+    """Return the stored payload dict for ``element``, or ``None`` when it has no linker entity."""
+    if element is None:
+        return None
+    schema = schema or get_schema()
+    if schema is None:
+        return None
+    try:
+        entity = element.GetEntity(schema)
+    except Exception:
+        return None
+    if entity is None or not entity.IsValid():
+        return None
+    unit = _number_unit()
+    payload = {}
+    for key, field_name in STRING_FIELDS:
+        payload[key] = (entity.Get[String](field_name) or u"").strip()
+    for key, field_name in ID_FIELDS:
+        payload[key] = _id_value(entity.Get[String](field_name))
+    for key, field_name, flag_name in DOUBLE_FIELDS:
+        if entity.Get[Boolean](flag_name):
+            payload[key] = float(entity.Get[Double](field_name, unit))
+        else:
+            payload[key] = None
+    for key, field_name, flag_name in XYZ_FIELDS:
+        if entity.Get[Boolean](flag_name):
+            point = entity.Get[XYZ](field_name, unit)
+            payload[key] = (point.X, point.Y, point.Z)
+        else:
+            payload[key] = None
+    return payload
+
+
+__all__ = ["SCHEMA_GUID", "get_schema", "payload_filter", "read_payload", "write_payload"]
@@ -1,12 +1,26 @@
 # -*- coding: utf-8 -*-
 """
 Active YAML storage and user settings stored via Revit Extensible Storage.
+
+The payload (history entries + metadata) is written as one zlib-compressed JSON
+document in a byte array field (schema v4), with base64 string chunks as a
+fallback. A small JSON header carries the content hash so reads can skip
+decoding when the session already holds that payload. Older string-chunked
+schemas (v1-v3) are still read and are replaced by v4 on the next write.
 """
 
+import base64
+import copy
+import hashlib
 import json
 import os
 from datetime import datetime
 
+try:
+    import zlib
+except Exception:  # pragma: no cover
+    zlib = None
+
 import System
 import clr
 try:
@@ -49,6 +63,8 @@ except Exception:  # pragma: no cover
     DocumentSynchronizedWithCentralEventArgs = None
 
 
+from ExtensibleStorage import profile_journal  # noqa: E402
+
 try:
     from pyrevit import script as _script_logger  # noqa: E402
     _logger = _script_logger.get_logger()
@@ -66,13 +82,23 @@ class ExtensibleStorage(object):
     META_FIELD_NAME = "MetadataJson"
     HISTORY_CHUNKS_FIELD_NAME = "HistoryJsonChunks"
     META_CHUNKS_FIELD_NAME = "MetadataJsonChunks"
-    SCHEMA_VERSION = 3
+    SCHEMA_VERSION = 4
     MAX_ES_STRING = 16 * 1024 * 1024
     CHUNK_SIZE = 8 * 1024 * 1024
 
+    PAYLOAD_HEADER_FIELD_NAME = "PayloadHeader"
+    PAYLOAD_BYTES_FIELD_NAME = "PayloadBytes"
+    PAYLOAD_CHUNKS_FIELD_NAME = "PayloadBase64Chunks"
+    PAYLOAD_FORMAT = "ced-es-payload-1"
+    ENCODING_ZLIB = "zlib"
+    ENCODING_ZLIB_BASE64 = "zlib+base64"
+    ENCODING_BASE64 = "base64"
+    LEGACY_SCHEMA_VERSIONS = (3, 2, 1)
+
     USER_SETTINGS_KEY = "user_settings"
 
     _schema_cache = {}
+    _payload_cache = {}
     _undo_handler_registered = False
     _sync_handler = None
     _datastorage_not_found_logged = False
@@ -196,32 +222,62 @@ class ExtensibleStorage(object):
         return path, normalized, text
 
     @classmethod
-    def update_active_yaml(cls, doc, yaml_path, previous_text, new_text, action, description):
-        if not yaml_path:
-            raise ValueError("Active YAML path is not set.")
+    def get_active_yaml_hash(cls, doc):
+        """Return the ``data_hash`` recorded with the active text, or ``None``."""
         payload = cls._read_storage(doc)
-        meta = payload.setdefault("meta", {})
+        active = payload.get("meta", {}).get("active_yaml") or {}
+        return active.get("data_hash")
+
+    @classmethod
+    def _set_active_text(cls, meta, yaml_path, new_text, data_hash=None):
         meta.pop("base_text", None)
         meta.pop("next_seq", None)
         active = meta.setdefault("active_yaml", {})
         active["path"] = yaml_path
         active["normalized"] = cls._normalize_path(yaml_path)
         active["text"] = new_text or ""
+        if data_hash:
+            active["data_hash"] = data_hash
+        else:
+            active.pop("data_hash", None)
+        return active
+
+    @classmethod
+    def get_journal(cls, doc):
+        """Return the stored payload for journal lookups (entries + ``meta["journal"]``)."""
+        if doc is None:
+            return {"entries": [], "meta": {}}
+        return cls._read_storage(doc)
+
+    @classmethod
+    def update_active_yaml(cls, doc, yaml_path, previous_text, new_text, action, description, data_hash=None, journal_entry=None):
+        """Store ``new_text``, its ``data_hash``, the change metadata and ``journal_entry`` in one transaction."""
+        if not yaml_path:
+            raise ValueError("Active YAML path is not set.")
+        payload = cls._read_storage(doc)
+        meta = payload.setdefault("meta", {})
+        active = cls._set_active_text(meta, yaml_path, new_text, data_hash)
+        last_change = {
+            "action": action or "",
+            "description": description or "",
+            "user": cls._current_user(doc),
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        active["last_change"] = last_change
+        if journal_entry is not None:
+            journal_entry["user"] = last_change["user"]
+            journal_entry["timestamp"] = last_change["timestamp"]
+            last_change["seq"] = profile_journal.append_entry(payload, journal_entry, len(new_text or ""))
         txn_name = action or "YAML Update"
         cls._write_storage(doc, payload, txn_name)
 
     @classmethod
-    def update_active_text_only(cls, doc, yaml_path, new_text):
+    def update_active_text_only(cls, doc, yaml_path, new_text, data_hash=None):
         if doc is None or not yaml_path:
             return
         payload = cls._read_storage(doc)
         meta = payload.setdefault("meta", {})
-        meta.pop("base_text", None)
-        meta.pop("next_seq", None)
-        active = meta.setdefault("active_yaml", {})
-        active["path"] = yaml_path
-        active["normalized"] = cls._normalize_path(yaml_path)
-        active["text"] = new_text or ""
+        cls._set_active_text(meta, yaml_path, new_text, data_hash)
         cls._write_storage(doc, payload, "ACTIVE_YAML_REFRESH")
 
     # ---------------------------------------------------------------------- #
@@ -352,6 +408,44 @@ class ExtensibleStorage(object):
         builder.AddSimpleField("DocGuid", String)
         return builder.Finish()
 
+    @classmethod
+    def _build_schema_v4(cls, doc):
+        builder = SchemaBuilder(_make_doc_guid(doc, version=4))
+        builder.SetSchemaName("{}_v4".format(cls.SCHEMA_NAME))
+        builder.SetDocumentation("Stores active YAML payload and metadata as compressed bytes with a hash header.")
+        builder.AddSimpleField(cls.PAYLOAD_HEADER_FIELD_NAME, String)
+        try:
+            builder.AddArrayField(cls.PAYLOAD_BYTES_FIELD_NAME, System.Byte)
+        except Exception:
+            # Byte arrays unavailable; the base64 chunk field carries the payload.
+            pass
+        builder.AddArrayField(cls.PAYLOAD_CHUNKS_FIELD_NAME, String)
+        builder.AddSimpleField("DocGuid", String)
+        return builder.Finish()
+
+    @classmethod
+    def _payload_schema_and_fields(cls, doc, create=False):
+        """Return ``(schema, header, bytes, chunks, doc_guid)`` fields for v4, or ``None`` when absent."""
+        doc_key = getattr(doc, "Title", "unknown")
+        cache = cls._schema_cache.get(doc_key, {})
+        if cache.get("v4"):
+            return cache["v4"]
+        schema = Schema.Lookup(_make_doc_guid(doc, version=4))
+        if schema is None:
+            if not create:
+                return None
+            schema = cls._build_schema_v4(doc)
+        packed = (
+            schema,
+            schema.GetField(cls.PAYLOAD_HEADER_FIELD_NAME),
+            schema.GetField(cls.PAYLOAD_BYTES_FIELD_NAME),
+            schema.GetField(cls.PAYLOAD_CHUNKS_FIELD_NAME),
+            schema.GetField("DocGuid"),
+        )
+        cache["v4"] = packed
+        cls._schema_cache[doc_key] = cache
+        return packed
+
     @classmethod
     def _pack_schema(cls, schema, version):
         history_field = schema.GetField(cls.HISTORY_FIELD_NAME)
@@ -376,20 +470,6 @@ class ExtensibleStorage(object):
                 return None
         return None
 
-    @classmethod
-    def _write_chunked_field(cls, entity, base_field, chunks_field, value):
-        value = value or ""
-        if chunks_field and len(value) > cls.MAX_ES_STRING:
-            chunks = cls._split_chunks(value, cls.CHUNK_SIZE)
-            cls._set_chunk_list(entity, chunks_field, chunks)
-            if base_field:
-                entity.Set[str](base_field, "")
-            return
-        if chunks_field:
-            cls._set_chunk_list(entity, chunks_field, [])
-        if base_field:
-            entity.Set[str](base_field, value)
-
     @classmethod
     def _split_chunks(cls, text, chunk_size):
         if not text:
@@ -456,8 +536,146 @@ class ExtensibleStorage(object):
             except Exception:
                 pass
 
+    @classmethod
+    def _get_byte_list(cls, entity, bytes_field):
+        if not bytes_field:
+            return None
+        try:
+            from System.Collections.Generic import IList
+        except Exception:
+            IList = None
+        if IList is None:
+            return None
+        try:
+            values = entity.Get[IList[System.Byte]](bytes_field)
+        except Exception:
+            return None
+        if values is None or values.Count == 0:
+            return None
+        try:
+            return bytes(bytearray(Array[System.Byte](values)))
+        except Exception:
+            return bytes(bytearray([int(x) for x in values]))
+
+    @classmethod
+    def _set_byte_list(cls, entity, bytes_field, data):
+        """Store ``data`` in a byte array field; return False when the field cannot take it."""
+        if not bytes_field:
+            return False
+        try:
+            from System.Collections.Generic import IList, List
+        except Exception:
+            return False
+        try:
+            list_obj = List[System.Byte](Array[System.Byte](bytearray(data or b"")))
+            entity.Set[IList[System.Byte]](bytes_field, list_obj)
+            return True
+        except Exception:
+            return False
+
+    # ---------------------------------------------------------------------- #
+    # Payload encoding (schema v4)
+    # ---------------------------------------------------------------------- #
+    @classmethod
+    def _payload_json(cls, payload):
+        return json.dumps(
+            {"entries": payload.get("entries", []), "meta": payload.get("meta", {})},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def _payload_hash(cls, payload_json):
+        return hashlib.sha1(payload_json.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _compress(cls, payload_json):
+        """Return ``(encoding, data)`` for ``payload_json`` as stored bytes."""
+        raw = payload_json.encode("utf-8")
+        if zlib is None:
+            return cls.ENCODING_BASE64, raw
+        return cls.ENCODING_ZLIB, zlib.compress(raw, 6)
+
+    @classmethod
+    def _decompress(cls, encoding, data):
+        if encoding in (cls.ENCODING_ZLIB, cls.ENCODING_ZLIB_BASE64):
+            if zlib is None:
+                raise RuntimeError("zlib is required to read the compressed YAML payload.")
+            data = zlib.decompress(data)
+        return data.decode("utf-8")
+
+    @classmethod
+    def _read_header(cls, entity, header_field):
+        if not header_field:
+            return None
+        try:
+            header = json.loads(entity.Get[str](header_field) or "")
+        except Exception:
+            return None
+        if not isinstance(header, dict) or header.get("format") != cls.PAYLOAD_FORMAT:
+            return None
+        return header
+
+    @classmethod
+    def _stored_payload_hash(cls, doc):
+        """Return the content hash in the v4 header, or ``None`` when no v4 payload is stored."""
+        packed = cls._payload_schema_and_fields(doc)
+        if packed is None:
+            return None
+        schema, header_field, bytes_field, chunks_field, doc_field = packed
+        storage_elem = cls._find_data_storage(doc, schema, doc_field, cls._normalize_guid(doc))
+        if storage_elem is None:
+            return None
+        header = cls._read_header(storage_elem.GetEntity(schema), header_field)
+        return header.get("hash") if header else None
+
     @classmethod
     def _read_storage(cls, doc):
+        payload = cls._read_payload_storage(doc)
+        if payload is not None:
+            return payload
+        return cls._read_legacy_storage(doc)
+
+    @classmethod
+    def _read_payload_storage(cls, doc):
+        """Read the v4 payload; reuse the session copy when the header hash matches it."""
+        packed = cls._payload_schema_and_fields(doc)
+        if packed is None:
+            return None
+        schema, header_field, bytes_field, chunks_field, doc_field = packed
+        needed_guid = cls._normalize_guid(doc)
+        storage_elem = cls._find_data_storage(doc, schema, doc_field, needed_guid)
+        if storage_elem is None:
+            return None
+        entity = storage_elem.GetEntity(schema)
+        if not entity or not entity.IsValid():
+            return None
+        header = cls._read_header(entity, header_field)
+        if header is None:
+            return None
+        content_hash = header.get("hash")
+        cached = cls._payload_cache.get(needed_guid)
+        if cached and content_hash and cached[0] == content_hash:
+            return copy.deepcopy(cached[1])
+        encoding = header.get("encoding")
+        try:
+            if encoding == cls.ENCODING_ZLIB:
+                data = cls._get_byte_list(entity, bytes_field)
+            else:
+                data = base64.b64decode("".join(cls._get_chunk_list(entity, chunks_field) or []))
+            payload = json.loads(cls._decompress(encoding, data or b""))
+        except Exception as ex:
+            cls._log("ExtensibleStorage payload decode failed ({}): {}".format(encoding, ex))
+            return None
+        if not isinstance(payload, dict):
+            return None
+        payload.setdefault("entries", [])
+        payload.setdefault("meta", {})
+        cls._payload_cache[needed_guid] = (content_hash, payload)
+        return copy.deepcopy(payload)
+
+    @classmethod
+    def _read_legacy_storage(cls, doc):
         schema, history_field, meta_field, history_chunks_field, meta_chunks_field, doc_field, version = cls._schema_and_fields(doc)
         payload = {"entries": [], "meta": {}}
         needed_guid = cls._normalize_guid(doc)
@@ -488,17 +706,12 @@ class ExtensibleStorage(object):
 
     @classmethod
     def _write_storage(cls, doc, payload, transaction_name=None):
-        history_json = json.dumps(payload.get("entries", []))
-        meta_json = json.dumps(payload.get("meta", {}))
-        needs_chunking = (
-            len(history_json or "") > cls.MAX_ES_STRING
-            or len(meta_json or "") > cls.MAX_ES_STRING
-        )
-        schema, history_field, meta_field, history_chunks_field, meta_chunks_field, doc_field, version = cls._schema_and_fields_versioned(
-            doc,
-            prefer_chunked=needs_chunking,
-            force_version=3,
-        )
+        payload_json = cls._payload_json(payload)
+        content_hash = cls._payload_hash(payload_json)
+        needed_guid = cls._normalize_guid(doc)
+        if cls._stored_payload_hash(doc) == content_hash:
+            cls._log("ExtensibleStorage write skipped txn={} (payload unchanged)".format(transaction_name or "YAML Change"))
+            return
         if cls._resolve_datastorage_type() is None:
             version = None
             try:
@@ -512,31 +725,64 @@ class ExtensibleStorage(object):
                     db_loaded,
                 )
             )
-        storage_elem = cls._find_data_storage(doc, schema, doc_field, cls._normalize_guid(doc))
+        schema, header_field, bytes_field, chunks_field, doc_field = cls._payload_schema_and_fields(doc, create=True)
+        encoding, data = cls._compress(payload_json)
+        storage_elem = cls._find_data_storage(doc, schema, doc_field, needed_guid)
+        legacy = cls._legacy_storage_entities(doc, needed_guid)
+        if storage_elem is None and legacy:
+            storage_elem = legacy[0][0]
 
         def _apply():
             target_elem = storage_elem
             if target_elem is None:
-                target_elem = cls._get_or_create_data_storage(doc, schema, doc_field, cls._normalize_guid(doc))
+                target_elem = cls._get_or_create_data_storage(doc, schema, doc_field, needed_guid)
             if target_elem is None:
                 raise RuntimeError("DataStorage element is required for ExtensibleStorage writes.")
             entity = target_elem.GetEntity(schema)
             if not entity or not entity.IsValid():
                 entity = Entity(schema)
-            cls._write_chunked_field(entity, history_field, history_chunks_field, history_json)
-            cls._write_chunked_field(entity, meta_field, meta_chunks_field, meta_json)
+            stored_encoding = encoding
+            if encoding == cls.ENCODING_ZLIB and cls._set_byte_list(entity, bytes_field, data):
+                cls._set_chunk_list(entity, chunks_field, [])
+            else:
+                if encoding == cls.ENCODING_ZLIB:
+                    stored_encoding = cls.ENCODING_ZLIB_BASE64
+                encoded = base64.b64encode(data)
+                if not isinstance(encoded, str):
+                    encoded = encoded.decode("ascii")
+                cls._set_chunk_list(entity, chunks_field, cls._split_chunks(encoded, cls.CHUNK_SIZE))
+                cls._set_byte_list(entity, bytes_field, b"")
+            header = {
+                "format": cls.PAYLOAD_FORMAT,
+                "schema_version": cls.SCHEMA_VERSION,
+                "encoding": stored_encoding,
+                "hash": content_hash,
+                "length": len(payload_json),
+                "stored_length": len(data),
+            }
+            entity.Set[str](header_field, json.dumps(header, sort_keys=True))
             if doc_field:
-                entity.Set[str](doc_field, cls._normalize_guid(doc))
+                entity.Set[str](doc_field, needed_guid)
             target_elem.SetEntity(entity)
+            # Migrate: the v4 entity replaces any string-chunked payload from older schemas.
+            for legacy_elem, legacy_schema in legacy:
+                try:
+                    legacy_elem.DeleteEntity(legacy_schema)
+                except Exception as ex:
+                    cls._log("ExtensibleStorage legacy entity cleanup failed: {}".format(ex))
+            return stored_encoding
 
         # Always wrap in our own transaction so Undo stack records it
         t = Transaction(doc, transaction_name or "YAML Change")
         t.Start()
         try:
-            cls._log("ExtensibleStorage write txn={} entries={} active_path={}".format(
+            cls._log("ExtensibleStorage write txn={} entries={} active_path={} bytes={}/{}{}".format(
                 transaction_name or "YAML Change",
                 len(payload.get("entries", [])),
                 (payload.get("meta", {}).get("active_yaml") or {}).get("path"),
+                len(data),
+                len(payload_json),
+                " (migrated legacy storage)" if legacy else "",
             ))
             _apply()
             t.Commit()
@@ -544,6 +790,23 @@ class ExtensibleStorage(object):
             cls._log("ExtensibleStorage write failed: {}".format(ex))
             t.RollBack()
             raise
+        cls._payload_cache[needed_guid] = (content_hash, json.loads(payload_json))
+
+    @classmethod
+    def _legacy_storage_entities(cls, doc, needed_guid):
+        """Return ``[(storage element, schema)]`` holding payloads in pre-v4 schemas."""
+        found = []
+        for version in cls.LEGACY_SCHEMA_VERSIONS:
+            try:
+                schema = Schema.Lookup(_make_doc_guid(doc, version=version))
+            except Exception:
+                schema = None
+            if schema is None:
+                continue
+            storage_elem = cls._find_data_storage(doc, schema, schema.GetField("DocGuid"), needed_guid)
+            if storage_elem is not None:
+                found.append((storage_elem, schema))
+        return found
 
     @classmethod
     def _resolve_datastorage_type(cls):
@@ -732,6 +995,8 @@ def _make_doc_guid(doc, version=1):
 def _make_doc_guid_versioned(doc, version):
     import hashlib
     import uuid
+    if version == 4:
+        return Guid("c3d95e1a-7f42-4b6e-8a0d-5e2b91f4c7a3")
     if version == 3:
         return Guid("4a2f6b98-2b5e-4d1b-9e7e-0c92fd18b6d4")
     title = getattr(doc, "Title", "unknown")
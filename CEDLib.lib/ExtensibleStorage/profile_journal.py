@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+Append-only journal of profile edits stored next to the active snapshot.
+
+Each save records JSON-patch style operations (``add`` / ``remove`` /
+``replace`` with JSON pointer paths) between the previous and the new
+compact canonical profile, plus the inverse operations. The snapshot text
+always holds the latest state; undo and redo replay one entry's operations
+against it instead of reparsing older copies. Entries live in the storage
+payload's ``entries`` list and the undo/redo stacks in ``meta["journal"]``.
+The oldest entries are dropped once the journal outgrows its limits.
+"""
+
+import json
+
+from LogicClasses.copy_on_write import copy_on_write, freeze
+
+JOURNAL_KEY = "journal"
+MAX_ENTRIES = 200
+MAX_JOURNAL_RATIO = 1.0
+MIN_JOURNAL_BYTES = 256 * 1024
+
+KIND_EDIT = "edit"
+KIND_UNDO = "undo"
+KIND_REDO = "redo"
+
+
+# ---------------------------------------------------------------------- #
+# JSON pointer / patch helpers
+# ---------------------------------------------------------------------- #
+def _escape(token):
+    return u"{}".format(token).replace(u"~", u"~0").replace(u"/", u"~1")
+
+
+def _pointer(tokens):
+    return u"".join(u"/" + _escape(token) for token in tokens)
+
+
+def _parse_pointer(pointer):
+    if not pointer:
+        return []
+    return [token.replace(u"~1", u"/").replace(u"~0", u"~") for token in pointer.split(u"/")[1:]]
+
+
+try:
+    _TEXT_TYPES = (str, unicode)  # noqa: F821
+    _INT_TYPES = (int, long)  # noqa: F821
+except NameError:  # Python 3
+    _TEXT_TYPES = (str,)
+    _INT_TYPES = (int,)
+
+
+def _kind(value):
+    """JSON kind of ``value``; bools are not ints here so ``True`` -> ``1`` is a change."""
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, _INT_TYPES):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, _TEXT_TYPES):
+        return "text"
+    if isinstance(value, dict):
+        return "dict"
+    if isinstance(value, (list, tuple)):
+        return "list"
+    return type(value)
+
+
+def _same(old, new):
+    """Deep equality that also requires matching JSON kinds at every level."""
+    if old is new:
+        return True
+    kind = _kind(old)
+    if kind != _kind(new):
+        return False
+    if kind == "dict":
+        if len(old) != len(new):
+            return False
+        for key in old:
+            if key not in new or not _same(old[key], new[key]):
+                return False
+        return True
+    if kind == "list":
+        if len(old) != len(new):
+            return False
+        for old_item, new_item in zip(old, new):
+            if not _same(old_item, new_item):
+                return False
+        return True
+    return old == new
+
+
+def _item_keys(items):
+    """Return the ``id`` of every item, or ``None`` unless all items are dicts with distinct ids."""
+    keys = []
+    for item in items:
+        key = item.get("id") if isinstance(item, dict) else None
+        if key is None or isinstance(key, (dict, list)):
+            return None
+        keys.append(key)
+    if len(set(keys)) != len(keys):
+        return None
+    return keys
+
+
+def _diff_keyed(old, new, old_keys, new_keys, lo, tokens, ops, inverse):
+    """Diff list slices aligned by item id; return False when common ids changed order."""
+    new_set = set(new_keys)
+    old_set = set(old_keys)
+    if [k for k in old_keys if k in new_set] != [k for k in new_keys if k in old_set]:
+        return False
+    old_by_key = dict(zip(old_keys, old))
+    for idx in range(len(old_keys) - 1, -1, -1):
+        if old_keys[idx] not in new_set:
+            path = _pointer(tokens + [lo + idx])
+            ops.append({"op": "remove", "path": path})
+            inverse.append({"op": "add", "path": path, "value": old[idx]})
+    for idx, key in enumerate(new_keys):
+        if key in old_set:
+            _diff(old_by_key[key], new[idx], tokens + [lo + idx], ops, inverse)
+        else:
+            path = _pointer(tokens + [lo + idx])
+            ops.append({"op": "add", "path": path, "value": new[idx]})
+            inverse.append({"op": "remove", "path": path})
+    return True
+
+
+def _diff(old, new, tokens, ops, inverse):
+    if _same(old, new):
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(old.keys()):
+            path = _pointer(tokens + [key])
+            if key in new:
+                _diff(old[key], new[key], tokens + [key], ops, inverse)
+            else:
+                ops.append({"op": "remove", "path": path})
+                inverse.append({"op": "add", "path": path, "value": old[key]})
+        for key in sorted(new.keys()):
+            if key not in old:
+                path = _pointer(tokens + [key])
+                ops.append({"op": "add", "path": path, "value": new[key]})
+                inverse.append({"op": "remove", "path": path})
+        return
+    if isinstance(old, list) and isinstance(new, list):
+        # Trim the common head and tail so one insert or delete stays one operation.
+        lo = 0
+        while lo < len(old) and lo < len(new) and _same(old[lo], new[lo]):
+            lo += 1
+        hi_old, hi_new = len(old), len(new)
+        while hi_old > lo and hi_new > lo and _same(old[hi_old - 1], new[hi_new - 1]):
+            hi_old -= 1
+            hi_new -= 1
+        # Align by item id when possible so an insert or delete does not shift every later item.
+        old_keys = _item_keys(old[lo:hi_old])
+        new_keys = _item_keys(new[lo:hi_new]) if old_keys is not None else None
+        if new_keys is not None and old_keys != new_keys:
+            if _diff_keyed(old[lo:hi_old], new[lo:hi_new], old_keys, new_keys, lo, tokens, ops, inverse):
+                return
+        overlap = min(hi_old, hi_new) - lo
+        for idx in range(lo, lo + overlap):
+            _diff(old[idx], new[idx], tokens + [idx], ops, inverse)
+        for idx in range(hi_old - 1, lo + overlap - 1, -1):
+            path = _pointer(tokens + [idx])
+            ops.append({"op": "remove", "path": path})
+            inverse.append({"op": "add", "path": path, "value": old[idx]})
+        for idx in range(lo + overlap, hi_new):
+            path = _pointer(tokens + [idx])
+            ops.append({"op": "add", "path": path, "value": new[idx]})
+            inverse.append({"op": "remove", "path": path})
+        return
+    path = _pointer(tokens)
+    ops.append({"op": "replace", "path": path, "value": new})
+    inverse.append({"op": "replace", "path": path, "value": old})
+
+
+def diff(old, new):
+    """Return ``(ops, inverse)`` turning ``old`` into ``new`` and back again."""
+    ops = []
+    inverse = []
+    _diff(old, new, [], ops, inverse)
+    inverse.reverse()
+    return ops, inverse
+
+
+def apply_ops(data, ops):
+    """Return a plain copy of ``data`` with ``ops`` applied; ``data`` is left untouched."""
+    root = copy_on_write(data)
+    for op in ops or []:
+        tokens = _parse_pointer(op.get("path"))
+        kind = op.get("op")
+        if not tokens:
+            root = copy_on_write(op.get("value"))
+            continue
+        parent = root
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            idx = int(last)
+            if kind == "add":
+                parent.insert(idx, op.get("value"))
+            elif kind == "remove":
+                del parent[idx]
+            else:
+                parent[idx] = op.get("value")
+        elif kind == "remove":
+            del parent[last]
+        else:
+            parent[last] = op.get("value")
+    return freeze(root)
+
+
+def changed_paths(ops):
+    """Return the distinct paths touched by ``ops`` in first-seen order."""
+    seen = set()
+    paths = []
+    for op in ops or []:
+        path = op.get("path") or "/"
+        if path not in seen:
+            seen.add(path)
+            paths.append(path)
+    return paths
+
+
+# ---------------------------------------------------------------------- #
+# Journal entries
+# ---------------------------------------------------------------------- #
+def make_entry(kind, ops, inverse, parent_hash, new_hash, action=None, description=None, ref_seq=None):
+    """Build an entry; ``seq``, ``user`` and ``timestamp`` are filled in when it is appended."""
+    entry = {
+        "kind": kind,
+        "action": action or "",
+        "description": description or "",
+        "parent_hash": parent_hash,
+        "hash": new_hash,
+        "ops": list(ops or []),
+        "inverse": list(inverse or []),
+    }
+    if ref_seq is not None:
+        entry["ref_seq"] = int(ref_seq)
+    entry["size"] = len(json.dumps(entry["ops"])) + len(json.dumps(entry["inverse"]))
+    return entry
+
+
+def journal_entries(payload):
+    return [entry for entry in (payload or {}).get("entries") or [] if isinstance(entry, dict) and "ops" in entry]
+
+
+def journal_state(payload):
+    meta = (payload or {}).setdefault("meta", {})
+    state = meta.get(JOURNAL_KEY)
+    if not isinstance(state, dict):
+        state = {}
+        meta[JOURNAL_KEY] = state
+    state.setdefault("next_seq", 1)
+    state.setdefault("base_seq", 0)
+    state.setdefault("undo", [])
+    state.setdefault("redo", [])
+    return state
+
+
+def append_entry(payload, entry, snapshot_length=0):
+    """Append ``entry`` to ``payload``, update the undo/redo stacks and compact; return its seq."""
+    state = journal_state(payload)
+    entries = journal_entries(payload)
+    seq = int(state["next_seq"])
+    entry["seq"] = seq
+    state["next_seq"] = seq + 1
+    entries.append(entry)
+    payload["entries"] = entries
+
+    kind = entry.get("kind")
+    if kind == KIND_UNDO:
+        if state["undo"]:
+            state["undo"].pop()
+        state["redo"].append([entry.get("ref_seq"), entry.get("hash")])
+    elif kind == KIND_REDO:
+        if state["redo"]:
+            state["redo"].pop()
+        state["undo"].append([entry.get("ref_seq"), entry.get("hash")])
+    else:
+        state["undo"].append([seq, entry.get("hash")])
+        state["redo"] = []
+    compact(payload, snapshot_length)
+    return seq
+
+
+def compact(payload, snapshot_length=0, max_entries=MAX_ENTRIES, max_ratio=MAX_JOURNAL_RATIO):
+    """Drop the oldest entries while the journal exceeds ``max_entries`` or its byte budget."""
+    state = journal_state(payload)
+    entries = journal_entries(payload)
+    budget = max(int(MIN_JOURNAL_BYTES), int(float(snapshot_length or 0) * float(max_ratio)))
+    total = sum(int(entry.get("size") or 0) for entry in entries)
+    drop = 0
+    while len(entries) - drop > 1 and (len(entries) - drop > int(max_entries) or total > budget):
+        total -= int(entries[drop].get("size") or 0)
+        drop += 1
+    if not drop:
+        return 0
+    state["base_seq"] = int(entries[drop - 1]["seq"])
+    payload["entries"] = entries[drop:]
+    for stack in ("undo", "redo"):
+        state[stack] = [item for item in state[stack] if int(item[0] or 0) > state["base_seq"]]
+    return drop
+
+
+def _entry(payload, seq):
+    for entry in journal_entries(payload):
+        if entry.get("seq") == seq:
+            return entry
+    return None
+
+
+def undo_target(payload, current_hash):
+    """Return the entry to undo from the state ``current_hash``, or ``None``."""
+    state = journal_state(payload)
+    if not state["undo"]:
+        return None
+    seq, expected = state["undo"][-1]
+    if expected != current_hash:
+        return None
+    return _entry(payload, seq)
+
+
+def redo_target(payload, current_hash):
+    """Return the entry to redo from the state ``current_hash``, or ``None``."""
+    state = journal_state(payload)
+    if not state["redo"]:
+        return None
+    seq, expected = state["redo"][-1]
+    if expected != current_hash:
+        return None
+    return _entry(payload, seq)
+
+
+def entries_since(payload, seq=0):
+    """Return ``[{seq, kind, action, description, user, timestamp, paths}]`` for entries after ``seq``."""
+    changes = []
+    for entry in journal_entries(payload):
+        if int(entry.get("seq") or 0) <= int(seq or 0):
+            continue
+        changes.append({
+            "seq": entry.get("seq"),
+            "kind": entry.get("kind"),
+            "action": entry.get("action"),
+            "description": entry.get("description"),
+            "user": entry.get("user"),
+            "timestamp": entry.get("timestamp"),
+            "ref_seq": entry.get("ref_seq"),
+            "paths": changed_paths(entry.get("ops")),
+        })
+    return changes
@@ -1,15 +1,36 @@
 # -*- coding: utf-8 -*-
 """
 Helpers for working with the active YAML stored inside Extensible Storage.
+
+Saves store the compact canonical JSON form (see ``profile_schema.compact_profile_data``);
+seeded files are kept as the raw YAML text until the first save.
+
+The parsed data of the stored text is cached per path and text hash. Loads
+hand out copy-on-write views of it and saves cache a frozen copy that shares
+every branch the caller did not touch.
+
+Every save also appends a delta entry to the profile journal
+(``profile_journal``), which backs undo/redo and change listings.
 """
 
-import json
+import hashlib
 import io
+import json
 
 from pyrevit import revit, script
 
-from LogicClasses.profile_schema import load_data_from_text, dump_data_to_string  # noqa: E402
+from LogicClasses.copy_on_write import copy_on_write, freeze  # noqa: E402
+from LogicClasses.profile_schema import (  # noqa: E402
+    COMPACT_FORMAT,
+    COMPACT_FORMAT_KEY,
+    compact_profile_data,
+    compact_profile_to_json,
+    dump_data_to_compact_json,
+    expand_profile_data,
+    load_data_from_text,
+)
 from ExtensibleStorage import ExtensibleStorage  # noqa: E402
+from ExtensibleStorage import profile_journal  # noqa: E402
 
 _ACTIVE_CACHE = None
 _LED_DEBUG_ID = "SET-002-LED-002"
@@ -68,18 +89,45 @@ def load_active_yaml_text(doc=None):
     return path, text
 
 
+def _text_hash(text):
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+def _cached_data(normalized, text_hash):
+    if not _ACTIVE_CACHE:
+        return None
+    if _ACTIVE_CACHE.get("normalized") != normalized or _ACTIVE_CACHE.get("text_hash") != text_hash:
+        return None
+    return _ACTIVE_CACHE.get("data")
+
+
+def _canonical_profile(text, path, text_hash):
+    """Return the compact canonical form of the stored ``text``."""
+    if _ACTIVE_CACHE and _ACTIVE_CACHE.get("text_hash") == text_hash and _ACTIVE_CACHE.get("compact"):
+        return _ACTIVE_CACHE["compact"]
+    stripped = (text or "").lstrip()
+    if stripped.startswith("{"):
+        try:
+            loaded = json.loads(stripped)
+        except ValueError:
+            loaded = None
+        if isinstance(loaded, dict) and loaded.get(COMPACT_FORMAT_KEY) == COMPACT_FORMAT:
+            return loaded
+    return compact_profile_data(load_data_from_text(_sanitize_hash_keys(text or ""), path))
+
+
 def load_active_yaml_data(doc=None):
     global _ACTIVE_CACHE
     path, text = load_active_yaml_text(doc)
-    sanitized_text = _sanitize_hash_keys(text or "")
     normalized = ExtensibleStorage._normalize_path(path)
-    if _ACTIVE_CACHE and _ACTIVE_CACHE.get("normalized") == normalized:
-        cached = _ACTIVE_CACHE.get("data")
-        if cached:
-            data = json.loads(json.dumps(cached))
-            logger = script.get_logger()
-            logger.info("[YAML Storage] loaded equipment definitions (cached): %s", [eq.get("name") or eq.get("id") for eq in data.get("equipment_definitions") or [] if isinstance(eq, dict)])
-            return path, data
+    text_hash = _text_hash(text)
+    cached = _cached_data(normalized, text_hash)
+    if cached:
+        data = copy_on_write(cached)
+        logger = script.get_logger()
+        logger.info("[YAML Storage] loaded equipment definitions (cached): %s", [eq.get("name") or eq.get("id") for eq in data.get("equipment_definitions") or [] if isinstance(eq, dict)])
+        return path, data
+    sanitized_text = _sanitize_hash_keys(text or "")
     try:
         data = load_data_from_text(sanitized_text, path)
     except Exception:
@@ -90,9 +138,10 @@ def load_active_yaml_data(doc=None):
         except Exception:
             pass
         raise
+    _ACTIVE_CACHE = {"normalized": normalized, "text_hash": text_hash, "data": data}
     logger = script.get_logger()
     logger.info("[YAML Storage] loaded equipment definitions: %s | snippet=%s", [eq.get("name") or eq.get("id") for eq in data.get("equipment_definitions") or [] if isinstance(eq, dict)], _extract_led_snippet(text))
-    return path, data
+    return path, copy_on_write(data)
 
 
 def save_active_yaml_data(doc, data, action, description):
@@ -101,26 +150,87 @@ def save_active_yaml_data(doc, data, action, description):
     if doc is None:
         raise RuntimeError("No active document detected.")
     path, text = load_active_yaml_text(doc)
-    new_text = dump_data_to_string(data)
+    frozen = freeze(data)
+    compact = compact_profile_data(frozen)
+    new_text = compact_profile_to_json(compact)
     logger = script.get_logger()
     snippet = _extract_led_snippet(new_text)
     logger.info("[YAML Storage] saving action=%s len=%s snippet=%s", action, len(new_text or ""), snippet)
     if new_text == text:
         return
-    ExtensibleStorage.update_active_yaml(doc, path, text, new_text, action, description)
-    ExtensibleStorage.update_active_text_only(doc, path, new_text)
+    text_hash = _text_hash(text)
+    data_hash = _text_hash(new_text)
+    ops, inverse = profile_journal.diff(_canonical_profile(text, path, text_hash), compact)
+    entry = profile_journal.make_entry(profile_journal.KIND_EDIT, ops, inverse, text_hash, data_hash, action, description)
+    ExtensibleStorage.update_active_yaml(doc, path, text, new_text, action, description, data_hash=data_hash, journal_entry=entry)
+    _ACTIVE_CACHE = {
+        "normalized": ExtensibleStorage._normalize_path(path),
+        "text_hash": data_hash,
+        "data": frozen,
+        "compact": compact,
+    }
+
+
+def _replay_journal(doc, kind):
+    """Apply the next undo or redo entry of the journal; return its seq or ``None``."""
+    global _ACTIVE_CACHE
+    doc = _get_doc(doc)
+    if doc is None:
+        raise RuntimeError("No active document detected.")
+    path, text = load_active_yaml_text(doc)
+    text_hash = _text_hash(text)
+    payload = ExtensibleStorage.get_journal(doc)
+    if kind == profile_journal.KIND_UNDO:
+        target = profile_journal.undo_target(payload, text_hash)
+    else:
+        target = profile_journal.redo_target(payload, text_hash)
+    if target is None:
+        return None
+    if kind == profile_journal.KIND_UNDO:
+        ops, inverse = target.get("inverse"), target.get("ops")
+    else:
+        ops, inverse = target.get("ops"), target.get("inverse")
+    compact = profile_journal.apply_ops(_canonical_profile(text, path, text_hash), ops)
+    new_text = compact_profile_to_json(compact)
+    data_hash = _text_hash(new_text)
+    action = "YAML {0}: {1}".format(kind.capitalize(), target.get("action") or target.get("seq"))
+    entry = profile_journal.make_entry(
+        kind, ops, inverse, text_hash, data_hash, action, target.get("description"), ref_seq=target.get("seq")
+    )
+    ExtensibleStorage.update_active_yaml(doc, path, text, new_text, action, target.get("description"), data_hash=data_hash, journal_entry=entry)
     _ACTIVE_CACHE = {
         "normalized": ExtensibleStorage._normalize_path(path),
-        "data": json.loads(json.dumps(data)),
+        "text_hash": data_hash,
+        "data": expand_profile_data(compact),
+        "compact": compact,
     }
+    return target.get("seq")
+
+
+def undo_active_yaml_change(doc=None):
+    """Undo the latest journaled profile change; return the undone seq or ``None``."""
+    return _replay_journal(doc, profile_journal.KIND_UNDO)
+
+
+def redo_active_yaml_change(doc=None):
+    """Redo the latest undone profile change; return the redone seq or ``None``."""
+    return _replay_journal(doc, profile_journal.KIND_REDO)
+
+
+def list_active_yaml_changes(doc=None, since_seq=0):
+    """Return journal summaries (seq, kind, action, user, timestamp, paths) after ``since_seq``."""
+    doc = _get_doc(doc)
+    if doc is None:
+        return []
+    return profile_journal.entries_since(ExtensibleStorage.get_journal(doc), since_seq)
 
 
 def refresh_active_yaml_snapshot(doc, yaml_path, data):
     doc = _get_doc(doc)
     if doc is None:
         raise RuntimeError("No active document detected.")
-    new_text = dump_data_to_string(data)
-    ExtensibleStorage.update_active_text_only(doc, yaml_path, new_text)
+    new_text = dump_data_to_compact_json(freeze(data))
+    ExtensibleStorage.update_active_text_only(doc, yaml_path, new_text, data_hash=_text_hash(new_text))
 
 
 def seed_active_yaml(doc, yaml_path, raw_text):
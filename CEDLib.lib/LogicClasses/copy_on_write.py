@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Copy-on-write views over cached profile data.
+
+``copy_on_write(data)`` returns a shallow dict/list copy whose nested dicts and
+lists are copied only when they are reached through the view, so edits never
+touch the cached tree and untouched branches stay shared with it.
+``freeze(value)`` turns an edited view back into plain containers, copying
+only the branches the view copied and sharing the rest.
+"""
+
+import copy
+
+
+def _is_container(value):
+    return isinstance(value, (dict, list))
+
+
+class CopyOnWriteDict(dict):
+    """Dict view over ``base``; nested containers from ``base`` are copied on first access."""
+
+    def __init__(self, base):
+        dict.__init__(self, base)
+        self._shared = set(id(v) for v in dict.values(self) if _is_container(v))
+
+    def _own(self, key, value):
+        if id(value) not in self._shared or isinstance(value, (CopyOnWriteDict, CopyOnWriteList)):
+            return value
+        owned = copy_on_write(value)
+        dict.__setitem__(self, key, owned)
+        return owned
+
+    def __getitem__(self, key):
+        return self._own(key, dict.__getitem__(self, key))
+
+    def __iter__(self):
+        return iter(list(dict.keys(self)))
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            dict.__setitem__(self, key, default)
+        return self[key]
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            dict.pop(self, key)
+            return value
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        key = next(iter(dict.keys(self)))
+        return key, self.pop(key)
+
+    def items(self):
+        return [(key, self[key]) for key in list(dict.keys(self))]
+
+    def values(self):
+        return [self[key] for key in list(dict.keys(self))]
+
+    def iteritems(self):
+        return iter(self.items())
+
+    def itervalues(self):
+        return iter(self.values())
+
+    def copy(self):
+        return CopyOnWriteDict(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(freeze(self), memo)
+
+
+class CopyOnWriteList(list):
+    """List view over ``base``; nested containers from ``base`` are copied on first access."""
+
+    def __init__(self, base):
+        list.__init__(self, base)
+        self._shared = set(id(v) for v in list.__iter__(self) if _is_container(v))
+
+    def _own(self, index, value):
+        if id(value) not in self._shared or isinstance(value, (CopyOnWriteDict, CopyOnWriteList)):
+            return value
+        owned = copy_on_write(value)
+        list.__setitem__(self, index, owned)
+        return owned
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self._own(index, list.__getitem__(self, index))
+
+    def __getslice__(self, start, stop):
+        # Python 2 routes ``view[a:b]`` here; build the slice explicitly so it does not recurse.
+        return self.__getitem__(slice(max(0, start), max(0, stop)))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __reversed__(self):
+        for index in range(len(self) - 1, -1, -1):
+            yield self[index]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def pop(self, index=-1):
+        value = self[index]
+        list.pop(self, index)
+        return value
+
+    def copy(self):
+        return CopyOnWriteList(self)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(freeze(self), memo)
+
+
+def copy_on_write(value):
+    """Return a copy-on-write view of ``value`` (scalars are returned unchanged)."""
+    if isinstance(value, dict):
+        return CopyOnWriteDict(value)
+    if isinstance(value, list):
+        return CopyOnWriteList(value)
+    return value
+
+
+def freeze(value):
+    """Return ``value`` as plain dicts/lists, sharing branches a view never handed out."""
+    if isinstance(value, CopyOnWriteDict):
+        frozen = {}
+        for key, item in dict.items(value):
+            frozen[key] = item if id(item) in value._shared else freeze(item)
+        return frozen
+    if isinstance(value, CopyOnWriteList):
+        return [item if id(item) in value._shared else freeze(item) for item in list.__iter__(value)]
+    if _is_container(value):
+        return copy.deepcopy(value)
+    return value
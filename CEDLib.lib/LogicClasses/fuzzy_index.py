@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Token / trigram inverted index that shortlists candidates for fuzzy matching.
+
+Scoring every candidate with ``difflib.SequenceMatcher`` is quadratic in
+practice (rows x candidates). ``FuzzyIndex`` keeps posting lists of each
+candidate's normalized tokens and character trigrams, ranks candidates by
+trigram Dice overlap plus a per-shared-token bonus, and hands only the top-k
+(plus any required positions) to the expensive scorer. Shortlists are
+returned in insertion order so ties resolve exactly as a full scan would.
+"""
+
+DEFAULT_TOP_K = 25
+DEFAULT_TOKEN_WEIGHT = 0.03
+# Trigrams carried by more than this share of the candidates barely separate
+# them; they still count towards set sizes but are not walked when ranking.
+COMMON_TRIGRAM_SHARE = 0.5
+
+
+def trigrams(text):
+    """Return the padded character trigrams of ``text`` (short strings still get some)."""
+    if not text:
+        return set()
+    padded = "^^" + text + "$"
+    return set(padded[idx:idx + 3] for idx in range(len(padded) - 2))
+
+
+class FuzzyIndex(object):
+    """Items indexed by normalized text trigrams and tokens."""
+
+    def __init__(self):
+        self.items = []
+        self._trigram_sets = []
+        self._by_trigram = {}
+        self._by_token = {}
+        self._by_text = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item, text, tokens=None):
+        """Index ``item`` under its normalized ``text`` and ``tokens``; return its position."""
+        position = len(self.items)
+        grams = trigrams(text)
+        self.items.append(item)
+        self._trigram_sets.append(grams)
+        for gram in grams:
+            self._by_trigram.setdefault(gram, []).append(position)
+        for token in set(tokens or ()):
+            self._by_token.setdefault(token, []).append(position)
+        if text:
+            self._by_text.setdefault(text, []).append(position)
+        return position
+
+    def shortlist(self, text, tokens=None, top_k=DEFAULT_TOP_K, token_weight=DEFAULT_TOKEN_WEIGHT, required=None):
+        """Return candidate positions in insertion order: the ``top_k`` best overlaps, exact texts and ``required``."""
+        total = len(self.items)
+        if total <= int(top_k):
+            return list(range(total))
+        grams = trigrams(text)
+        common_limit = max(1, int(total * COMMON_TRIGRAM_SHARE))
+        shared = {}
+        for gram in grams:
+            postings = self._by_trigram.get(gram)
+            if not postings or len(postings) > common_limit:
+                continue
+            for position in postings:
+                shared[position] = shared.get(position, 0) + 1
+        token_hits = {}
+        for token in set(tokens or ()):
+            for position in self._by_token.get(token, ()):
+                token_hits[position] = token_hits.get(position, 0) + 1
+
+        ranked = []
+        for position in set(shared) | set(token_hits):
+            size = len(grams) + len(self._trigram_sets[position])
+            dice = (2.0 * shared.get(position, 0) / float(size)) if size else 0.0
+            ranked.append((dice + token_weight * token_hits.get(position, 0), position))
+        ranked.sort(key=lambda entry: (-entry[0], entry[1]))
+
+        picked = set(position for _, position in ranked[:int(top_k)])
+        picked.update(self._by_text.get(text, ()))
+        picked.update(required or ())
+        return sorted(picked)
+
+    def best(self, text, score_fn, tokens=None, top_k=DEFAULT_TOP_K, token_weight=DEFAULT_TOKEN_WEIGHT, required=None):
+        """Return ``(item, score)`` with the highest ``score_fn(item)`` among the shortlist (first wins ties)."""
+        best_item = None
+        best_score = 0.0
+        for position in self.shortlist(text, tokens, top_k, token_weight, required):
+            item = self.items[position]
+            score = score_fn(item)
+            if score > best_score:
+                best_score = score
+                best_item = item
+        return best_item, best_score
+
+
+__all__ = ["FuzzyIndex", "trigrams"]
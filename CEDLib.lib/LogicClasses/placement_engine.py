@@ -30,11 +30,26 @@ from Autodesk.Revit.DB import (
     TagMode,
     TagOrientation,
     ElementId,
+    ElementFilter,
+    FamilyInstanceFilter,
+    ElementMulticategoryFilter,
+    ElementParameterFilter,
+    LogicalOrFilter,
+    ParameterElement,
+    ParameterFilterRuleFactory,
 )
 from System import Enum
+from System.Collections.Generic import List
 
 from LogicClasses.csv_helpers import feet_inch_to_inches
+from LogicClasses.spatial_hash import SpatialHash
 from LogicClasses.tag_utils import tag_key_from_dict
+from Snippets import revit_helpers
+
+try:
+    from ExtensibleStorage import element_linker_storage
+except Exception:  # pragma: no cover - structured linker storage unavailable
+    element_linker_storage = None
 
 try:
     basestring
@@ -42,6 +57,7 @@ except NameError:  # Python 3 fallback
     basestring = str
 
 ELEMENT_LINKER_PARAM_NAMES = ("Element_Linker", "Element_Linker Parameter")
+DUPLICATE_TOLERANCE_FT = 0.02
 SAFE_HASH = u"\uff03"
 PARENT_PARAMETER_PATTERN = re.compile(
     r'^\s*parent_parameter\s*:\s*(?:"([^"]+)"|\'([^\']+)\')\s*$',
@@ -53,10 +69,42 @@ SIBLING_PARAMETER_PATTERN = re.compile(
 )
 
 
-def _parse_linker_payload(payload_text):
-    if not payload_text:
-        return {}
-    text = str(payload_text)
+LINKER_PAYLOAD_PATTERN = re.compile(
+    r"(Linked Element Definition ID|Set Definition ID|Host Name|Parent_location|Location XYZ \(ft\)|"
+    r"Rotation \(deg\)|Parent Rotation \(deg\)|Parent ElementId|LevelId|"
+    r"ElementId|FacingOrientation)\s*:\s*"
+)
+LINKER_PAYLOAD_CACHE_SIZE = 50000
+_LINKER_PAYLOAD_CACHE = {}
+
+
+def _payload_int(value):
+    try:
+        return int(value)
+    except Exception:
+        return None
+
+
+def _payload_float(value):
+    try:
+        return float(value)
+    except Exception:
+        return None
+
+
+def _payload_xyz(value):
+    if not value:
+        return None
+    parts = [p.strip() for p in value.split(",")]
+    if len(parts) != 3:
+        return None
+    try:
+        return tuple(float(p) for p in parts)
+    except Exception:
+        return None
+
+
+def _parse_linker_payload_text(text):
     entries = {}
     if "\n" in text:
         for raw_line in text.splitlines():
@@ -66,12 +114,7 @@ def _parse_linker_payload(payload_text):
             key, _, remainder = line.partition(":")
             entries[key.strip()] = remainder.strip()
     else:
-        pattern = re.compile(
-            r"(Linked Element Definition ID|Set Definition ID|Host Name|Parent_location|Location XYZ \(ft\)|"
-            r"Rotation \(deg\)|Parent Rotation \(deg\)|Parent ElementId|LevelId|"
-            r"ElementId|FacingOrientation)\s*:\s*"
-        )
-        matches = list(pattern.finditer(text))
+        matches = list(LINKER_PAYLOAD_PATTERN.finditer(text))
         for idx, match in enumerate(matches):
             key = match.group(1)
             start = match.end()
@@ -79,43 +122,47 @@ def _parse_linker_payload(payload_text):
             value = text[start:end].strip().rstrip(",")
             entries[key] = value.strip(" ,")
 
-    def _as_int(value):
-        try:
-            return int(value)
-        except Exception:
-            return None
-
-    def _as_float(value):
-        try:
-            return float(value)
-        except Exception:
-            return None
-
-    def _as_xyz(value):
-        if not value:
-            return None
-        parts = [p.strip() for p in value.split(",")]
-        if len(parts) != 3:
-            return None
-        try:
-            return tuple(float(p) for p in parts)
-        except Exception:
-            return None
-
     return {
         "led_id": (entries.get("Linked Element Definition ID", "") or "").strip(),
         "set_id": (entries.get("Set Definition ID", "") or "").strip(),
         "host_name": (entries.get("Host Name", "") or "").strip(),
-        "parent_location": _as_xyz(entries.get("Parent_location", "")),
-        "level_id": _as_int(entries.get("LevelId", "")),
-        "element_id": _as_int(entries.get("ElementId", "")),
-        "parent_element_id": _as_int(entries.get("Parent ElementId", "")),
-        "location": _as_xyz(entries.get("Location XYZ (ft)", "")),
-        "rotation": _as_float(entries.get("Rotation (deg)", "")),
-        "parent_rotation": _as_float(entries.get("Parent Rotation (deg)", "")),
+        "parent_location": _payload_xyz(entries.get("Parent_location", "")),
+        "level_id": _payload_int(entries.get("LevelId", "")),
+        "element_id": _payload_int(entries.get("ElementId", "")),
+        "parent_element_id": _payload_int(entries.get("Parent ElementId", "")),
+        "location": _payload_xyz(entries.get("Location XYZ (ft)", "")),
+        "rotation": _payload_float(entries.get("Rotation (deg)", "")),
+        "parent_rotation": _payload_float(entries.get("Parent Rotation (deg)", "")),
     }
 
 
+def _parse_linker_payload(payload_text):
+    """Parse an Element_Linker string; results are cached per raw string and returned as copies."""
+    if not payload_text:
+        return {}
+    text = str(payload_text)
+    cached = _LINKER_PAYLOAD_CACHE.get(text)
+    if cached is None:
+        cached = _parse_linker_payload_text(text)
+        if len(_LINKER_PAYLOAD_CACHE) >= LINKER_PAYLOAD_CACHE_SIZE:
+            _LINKER_PAYLOAD_CACHE.clear()
+        _LINKER_PAYLOAD_CACHE[text] = cached
+    return dict(cached)
+
+
+def _xyz_tuple(value):
+    if value is None:
+        return None
+    try:
+        return (float(value.X), float(value.Y), float(value.Z))
+    except Exception:
+        pass
+    try:
+        return (float(value[0]), float(value[1]), float(value[2]))
+    except Exception:
+        return None
+
+
 def _format_xyz(vec):
     if not vec:
         return ""
@@ -172,6 +219,140 @@ def _build_linker_payload(
     return ", ".join(parts).strip()
 
 
+_SIBLING_INDEXES = {}
+
+
+def _has_value_rule(param_id):
+    create = getattr(ParameterFilterRuleFactory, "CreateHasValueParameterRule", None)
+    if create is not None:
+        return create(param_id)
+    try:
+        return ParameterFilterRuleFactory.CreateNotEqualsRule(param_id, "")
+    except Exception:
+        # Revit 2022 and older take a case-sensitivity flag.
+        return ParameterFilterRuleFactory.CreateNotEqualsRule(param_id, "", True)
+
+
+def _id_value(value):
+    try:
+        return value.IntegerValue
+    except Exception:
+        pass
+    try:
+        return int(value)
+    except Exception:
+        return None
+
+
+def _is_valid_element(element):
+    try:
+        return bool(element.IsValidObject)
+    except Exception:
+        return False
+
+
+def _level_elevation(level):
+    """Return a level's elevation from the internal origin (what ``Location.Point`` uses), or ``None``."""
+    if level is None:
+        return None
+    for attr in ("ProjectElevation", "Elevation"):
+        try:
+            value = getattr(level, attr, None)
+        except Exception:
+            value = None
+        if value is not None:
+            return float(value)
+    return None
+
+
+def _category_filter(category_ids):
+    if category_ids is None:
+        return None
+    return ElementMulticategoryFilter(List[ElementId]([ElementId(x) for x in category_ids]))
+
+
+def invalidate_sibling_index(doc=None):
+    """Drop the session sibling index of ``doc`` (of every document when omitted)."""
+    if doc is None:
+        _SIBLING_INDEXES.clear()
+        return
+    _SIBLING_INDEXES.pop(revit_helpers.get_document_key(doc), None)
+
+
+def note_sibling_index_changes(args):
+    """Queue the linker-category elements a DocumentChanged event touched for a payload re-read."""
+    if not _SIBLING_INDEXES:
+        return
+    try:
+        index = _SIBLING_INDEXES.get(revit_helpers.get_document_key(args.GetDocument()))
+    except Exception:
+        invalidate_sibling_index()
+        return
+    if index is None:
+        return
+    try:
+        for elem_id in list(args.GetDeletedElementIds() or []):
+            index.remove(elem_id.IntegerValue)
+        category_filter = _category_filter(index.category_ids)
+        if category_filter is None:
+            touched = list(args.GetAddedElementIds() or []) + list(args.GetModifiedElementIds() or [])
+        else:
+            touched = list(args.GetAddedElementIds(category_filter) or []) + list(
+                args.GetModifiedElementIds(category_filter) or []
+            )
+        index.dirty.update([elem_id.IntegerValue for elem_id in touched])
+    except Exception:
+        invalidate_sibling_index(index.doc)
+
+
+class _SiblingIndex(object):
+    """Linked elements of one document by LED id, kept for the session.
+
+    The first build scans the document; later builds only re-read the
+    elements queued in ``dirty`` by ``note_sibling_index_changes``.
+    """
+
+    def __init__(self, doc, category_ids):
+        self.doc = doc
+        self.category_ids = category_ids
+        self.records = {}
+        self.by_led = {}
+        self.dirty = set()
+        self.scanned = False
+
+    def covers(self, doc, category_ids):
+        try:
+            if not self.doc.IsValidObject or not self.doc.Equals(doc):
+                return False
+        except Exception:
+            return False
+        if self.category_ids is None:
+            return True
+        return category_ids is not None and category_ids <= self.category_ids
+
+    def put(self, elem_id, element, payload):
+        self.remove(elem_id)
+        record = {"id": elem_id, "element": element, "payload": payload or {}}
+        self.records[elem_id] = record
+        led_id = record["payload"].get("led_id")
+        if led_id:
+            self.by_led.setdefault(led_id, []).append(record)
+
+    def remove(self, elem_id):
+        record = self.records.pop(elem_id, None)
+        if record is None:
+            return
+        led_id = record["payload"].get("led_id")
+        bucket = self.by_led.get(led_id)
+        if bucket and record in bucket:
+            bucket.remove(record)
+            if not bucket:
+                self.by_led.pop(led_id, None)
+
+    def records_for(self, led_id):
+        return list(self.by_led.get(led_id) or [])
+
+
 class PlaceElementsEngine(object):
     def __init__(
         self,
@@ -184,6 +365,9 @@ class PlaceElementsEngine(object):
         max_tag_distance_feet=None,
         transaction_name="Place Elements (YAML)",
         apply_recorded_level=True,
+        skip_duplicates=False,
+        duplicate_tolerance_feet=DUPLICATE_TOLERANCE_FT,
+        write_linker_entity=False,
     ):
         self.doc = doc
         self.repo = repo
@@ -194,6 +378,10 @@ class PlaceElementsEngine(object):
         self.max_tag_distance_feet = max_tag_distance_feet
         self.transaction_name = transaction_name or "Place Elements (YAML)"
         self.apply_recorded_level = bool(apply_recorded_level)
+        self.skip_duplicates = bool(skip_duplicates)
+        self.skipped_duplicates = 0
+        self._duplicate_index = SpatialHash(duplicate_tolerance_feet or DUPLICATE_TOLERANCE_FT)
+        self.write_linker_entity = bool(write_linker_entity)
         self._init_symbol_map()
         self._init_group_map()
         self._init_text_note_types()
@@ -203,6 +391,7 @@ class PlaceElementsEngine(object):
         """Map 'Family : Type' to FamilySymbol."""
         self.symbol_label_map = {}
         self.symbol_label_map_by_category = {}
+        self.family_category_ids = {}
         self._activated_symbols = set()
         symbols = list(FilteredElementCollector(self.doc).OfClass(FamilySymbol).ToElements())
         for sym in symbols:
@@ -220,6 +409,8 @@ class PlaceElementsEngine(object):
                 label = u"{} : {}".format(fam_name, type_name)
                 self.symbol_label_map[label] = sym
                 cat = getattr(sym, "Category", None)
+                if cat is not None:
+                    self.family_category_ids.setdefault(fam_name.strip().lower(), set()).add(cat.Id.IntegerValue)
                 cat_name = getattr(cat, "Name", None) if cat else None
                 if cat_name:
                     key = (label.strip().lower(), cat_name.strip().lower())
@@ -862,6 +1053,8 @@ class PlaceElementsEngine(object):
         self._group_fail_error = []
         self._group_fail_error_msgs = []
 
+        self._sibling_linker_index = None
+
         t = Transaction(self.doc, self.transaction_name)
         t.Start()
 
@@ -940,6 +1133,7 @@ class PlaceElementsEngine(object):
                     linked_def = self.repo.definition_for_label(canonical_name, label)
                     if not linked_def:
                         continue
+                    skipped_before = self.skipped_duplicates
                     placed = self._place_one(
                         linked_def,
                         base_loc,
@@ -967,6 +1161,8 @@ class PlaceElementsEngine(object):
                                 except Exception:
                                     tags = []
                         # identification logging removed
+                    elif self.skipped_duplicates > skipped_before:
+                        continue
                     else:
                         try:
                             from pyrevit import script
@@ -985,6 +1181,8 @@ class PlaceElementsEngine(object):
         except Exception:
             self.default_level = fallback_level
             t.RollBack()
+            # Elements registered during the run no longer exist.
+            invalidate_sibling_index(self.doc)
             raise
 
         # Persist identification log sorted by equipment_id
@@ -993,6 +1191,7 @@ class PlaceElementsEngine(object):
             "total_rows": total_rows,
             "rows_with_coords": rows_with_coords,
             "rows_with_mapping": rows_with_mapping,
+            "skipped_duplicates": self.skipped_duplicates,
             "group_notfound": len(self._group_fail_notfound),
             "group_errors": len(self._group_fail_error),
             "group_missing_labels": list(self._group_fail_notfound),
@@ -1087,6 +1286,18 @@ class PlaceElementsEngine(object):
             if gtype:
                 is_group = True
 
+        duplicate_key = None
+        recorded_level = None
+        if self.skip_duplicates:
+            duplicate_key = self._duplicate_key(label, family, type_name, is_group, gtype)
+            if duplicate_key is not None:
+                if self.apply_recorded_level:
+                    recorded_level = self._recorded_level(linked_def)
+                predicted = self._predict_placed_point(duplicate_key, loc, offset[2], recorded_level)
+                if self._is_duplicate(duplicate_key, predicted):
+                    self.skipped_duplicates += 1
+                    return False
+
         tags = placement.get_tags() if placement else []
         text_notes = placement.get_text_notes() if placement else []
 
@@ -1105,8 +1316,14 @@ class PlaceElementsEngine(object):
                 parent_element_id,
             )
         if instance:
+            level_changed = False
             if self.apply_recorded_level:
-                self._apply_recorded_level(instance, linked_def)
+                level_changed = self._apply_recorded_level(instance, linked_def)
+            if duplicate_key is not None:
+                placed_loc = self._predict_placed_point(
+                    duplicate_key, loc, offset[2], recorded_level if level_changed else None
+                )
+                self._duplicate_index.add(duplicate_key, placed_loc, _id_value(instance.Id))
             if abs(final_rot_deg) > 1e-6:
                 self._rotate_instance(instance, loc, final_rot_deg)
             self._update_element_linker_parameter(
@@ -1126,6 +1343,74 @@ class PlaceElementsEngine(object):
             return True
         return False
 
+    def _duplicate_key(self, label, family_name, type_name, is_group, gtype=None):
+        """Return ``("symbol" | "group", type id)`` for what ``_place_one`` would place, or ``None``."""
+        if is_group:
+            if gtype is None:
+                gtype, _ = self._find_group_type(label, family_name, type_name)
+            return ("group", _id_value(gtype.Id)) if gtype is not None else None
+        symbol = self.symbol_label_map.get(label)
+        if not symbol and family_name and type_name:
+            symbol = self.symbol_label_map.get(u"{} : {}".format(family_name, type_name))
+        return ("symbol", _id_value(symbol.Id)) if symbol is not None else None
+
+    def _is_duplicate(self, duplicate_key, location):
+        """True when an instance of the same type already sits within the duplicate tolerance."""
+        if not self._duplicate_index.has_key(duplicate_key):
+            self._load_existing_instances(duplicate_key)
+        return self._duplicate_index.contains(duplicate_key, location)
+
+    def _predict_placed_point(self, duplicate_key, loc, z_offset_feet, recorded_level=None):
+        """Return where ``_place_one`` puts an instance requested at ``loc``, without creating it.
+
+        ``loc`` already has negative Z lifted to 1 ft. Model family instances
+        sit on the placement level at ``z_offset_feet`` (or at the height of
+        ``loc`` above it when there is no offset), and a recorded level keeps
+        that offset from the new level. Groups and annotation symbols stay
+        at ``loc``.
+        """
+        kind, type_id = duplicate_key
+        if kind != "symbol":
+            return loc
+        try:
+            symbol = self.doc.GetElement(ElementId(type_id))
+        except Exception:
+            symbol = None
+        if symbol is None or self._is_annotation_symbol(symbol):
+            return loc
+        base_elevation = _level_elevation(self._placement_level())
+        if base_elevation is None:
+            return loc
+        if abs(z_offset_feet) > 1e-6:
+            offset_from_level = z_offset_feet
+        else:
+            offset_from_level = loc.Z - base_elevation
+        target_elevation = _level_elevation(recorded_level)
+        if target_elevation is None:
+            target_elevation = base_elevation
+        return XYZ(loc.X, loc.Y, target_elevation + offset_from_level)
+
+    def _load_existing_instances(self, duplicate_key):
+        """Add the model's existing instances of one symbol or group type to the duplicate index."""
+        self._duplicate_index.add_key(duplicate_key)
+        kind, type_id = duplicate_key
+        try:
+            if kind == "symbol":
+                elements = FilteredElementCollector(self.doc).WherePasses(
+                    FamilyInstanceFilter(self.doc, ElementId(type_id))
+                )
+            else:
+                elements = [
+                    group for group in FilteredElementCollector(self.doc).OfClass(Group)
+                    if _id_value(group.GetTypeId()) == type_id
+                ]
+        except Exception:
+            elements = []
+        for elem in elements:
+            point = getattr(getattr(elem, "Location", None), "Point", None)
+            if point is not None:
+                self._duplicate_index.add(duplicate_key, point, _id_value(elem.Id))
+
     def _find_group_type(self, label, family_name, type_name):
         """Case-insensitive matching of possible keys to a model group type (and attached detail)."""
         candidates = []
@@ -1235,6 +1520,15 @@ class PlaceElementsEngine(object):
                 pass
             return None
 
+    def _is_annotation_symbol(self, symbol):
+        cat = getattr(symbol, "Category", None)
+        return bool(cat and getattr(cat, "Name", None) == "Generic Annotations")
+
+    def _placement_level(self):
+        if self.default_level is None:
+            self.default_level = FilteredElementCollector(self.doc).OfClass(Level).FirstElement()
+        return self.default_level
+
     def _activate_symbol(self, symbol):
         if symbol is None:
             return False
@@ -1270,12 +1564,8 @@ class PlaceElementsEngine(object):
         if not self._activate_symbol(symbol):
             return None
 
-        cat = getattr(symbol, "Category", None)
-        is_generic_annotation = cat and getattr(cat, "Name", None) == "Generic Annotations"
-        level = self.default_level
-        if level is None:
-            level = FilteredElementCollector(self.doc).OfClass(Level).FirstElement()
-            self.default_level = level
+        is_generic_annotation = self._is_annotation_symbol(symbol)
+        level = self._placement_level()
         if level is None:
             return None
 
@@ -1332,38 +1622,53 @@ class PlaceElementsEngine(object):
                 ids.append(value)
         return ids
 
-    def _existing_tag_for_host(self, host_instance, symbol_id, view_obj):
-        if not host_instance or not symbol_id or not view_obj:
-            return False
+    def _view_tag_index(self, view_obj):
+        """Return ``{tagged element id: [(tag type id, tag)]}`` for ``view_obj``, collected once per view."""
+        indexes = getattr(self, "_view_tag_indexes", None)
+        if indexes is None:
+            indexes = {}
+            self._view_tag_indexes = indexes
+        view_key = _id_value(view_obj.Id)
+        index = indexes.get(view_key)
+        if index is not None:
+            return index
+        index = {}
         try:
             tags = FilteredElementCollector(self.doc, view_obj.Id).OfClass(IndependentTag)
         except Exception:
             tags = []
-        if not tags:
-            return False
+        for tag in tags:
+            self._index_tag(index, tag)
+        indexes[view_key] = index
+        return index
+
+    def _index_tag(self, index, tag):
         try:
-            host_id_val = host_instance.Id.IntegerValue
+            type_id = _id_value(tag.GetTypeId())
         except Exception:
-            host_id_val = None
-        for tag in tags:
-            try:
-                if tag.GetTypeId() != symbol_id:
-                    continue
-            except Exception:
-                continue
-            if host_id_val is None:
-                continue
-            for tagged_id in self._tagged_element_ids(tag):
-                try:
-                    tagged_val = tagged_id.IntegerValue
-                except Exception:
-                    try:
-                        tagged_val = int(tagged_id)
-                    except Exception:
-                        tagged_val = None
-                if tagged_val is not None and tagged_val == host_id_val:
-                    return True
-        return False
+            return
+        for tagged_id in self._tagged_element_ids(tag):
+            tagged_val = _id_value(tagged_id)
+            if tagged_val is not None:
+                index.setdefault(tagged_val, []).append((type_id, tag))
+
+    def _register_view_tag(self, view_obj, tag):
+        if view_obj is None or tag is None:
+            return
+        self._index_tag(self._view_tag_index(view_obj), tag)
+
+    def _existing_tag_for_host(self, host_instance, symbol_id, view_obj):
+        """Return the tag of type ``symbol_id`` already on ``host_instance`` in ``view_obj``, or ``None``."""
+        if not host_instance or not symbol_id or not view_obj:
+            return None
+        host_id_val = _id_value(getattr(host_instance, "Id", None))
+        if host_id_val is None:
+            return None
+        type_id = _id_value(symbol_id)
+        for tag_type_id, tag in self._view_tag_index(view_obj).get(host_id_val) or []:
+            if tag_type_id == type_id and _is_valid_element(tag):
+                return tag
+        return None
 
     def _place_tags(self, tag_defs, host_instance, base_loc, final_rot_deg):
         if not tag_defs:
@@ -1536,10 +1841,15 @@ class PlaceElementsEngine(object):
                     if is_tag_family:
                         if not view_obj or not host_instance:
                             continue
-                        if self._existing_tag_for_host(host_instance, symbol.Id, view_obj):
+                        existing_tag = self._existing_tag_for_host(host_instance, symbol.Id, view_obj)
+                        if existing_tag is not None:
+                            # Reuse the host's tag of this type: refresh its values, keep its placement.
+                            if is_keynote_def and keynote_value not in (None, ""):
+                                self._apply_keynote_value_to_tag(existing_tag, keynote_value, keynote_text, logger)
+                            self._apply_parameters(existing_tag, parameters)
                             if logger and is_keynote_def:
                                 logger.info(
-                                    "[Place Elements] Keynote skipped: tag already exists for host (%s).",
+                                    "[Place Elements] Keynote reused: tag already exists for host (%s).",
                                     label,
                                 )
                             continue
@@ -1634,6 +1944,7 @@ class PlaceElementsEngine(object):
                                     except Exception:
                                         pass
                         instance = independent
+                        self._register_view_tag(view_obj, independent)
                     elif is_annotation_family:
                         if not view_obj or (hasattr(view_obj, "ViewType") and view_obj.ViewType == ViewType.ThreeD):
                             continue
@@ -2085,6 +2396,13 @@ class PlaceElementsEngine(object):
     def _get_linker_payload_from_element(self, element):
         if not element:
             return {}
+        if element_linker_storage is not None:
+            try:
+                payload = element_linker_storage.read_payload(element)
+            except Exception:
+                payload = None
+            if payload:
+                return payload
         payload_text = ""
         for name in ELEMENT_LINKER_PARAM_NAMES:
             try:
@@ -2108,31 +2426,120 @@ class PlaceElementsEngine(object):
             return {}
         return _parse_linker_payload(payload_text)
 
-    def _build_sibling_index(self):
-        index = {}
+    def _sibling_category_ids(self):
+        """Categories of the profile's families (plus model groups); ``None`` means unrestricted."""
+        family_names = getattr(self.repo, "family_names", None)
+        category_names = getattr(self.repo, "category_names", None)
+        if family_names is None or category_names is None:
+            return None
+        ids = set([int(BuiltInCategory.OST_IOSModelGroups)])
+        for family in family_names():
+            ids.update(self.family_category_ids.get(family) or [])
+        wanted = set(category_names())
+        if wanted:
+            try:
+                for cat in self.doc.Settings.Categories:
+                    if (cat.Name or "").strip().lower() in wanted:
+                        ids.add(cat.Id.IntegerValue)
+            except Exception:
+                pass
+        return frozenset(ids)
+
+    def _linker_parameter_filter(self):
+        """OR of has-value rules on the Element_Linker project parameters, or ``None`` when none is bound."""
+        filters = []
         try:
-            collector = FilteredElementCollector(self.doc).WhereElementIsNotElementType()
+            for param_elem in FilteredElementCollector(self.doc).OfClass(ParameterElement):
+                if param_elem.Name in ELEMENT_LINKER_PARAM_NAMES:
+                    filters.append(ElementParameterFilter(_has_value_rule(param_elem.Id)))
         except Exception:
-            collector = []
-        for elem in collector:
+            return None
+        if not filters:
+            return None
+        if len(filters) == 1:
+            return filters[0]
+        return LogicalOrFilter(List[ElementFilter](filters))
+
+    def _linked_element_ids(self, category_ids):
+        """Return ``{id: (ElementId, has_entity)}`` for elements that may carry a linker payload."""
+        base_filters = []
+        if category_ids is not None:
+            base_filters.append(_category_filter(category_ids))
+
+        def _collect(extra_filters):
+            collector = FilteredElementCollector(self.doc).WhereElementIsNotElementType()
+            for element_filter in base_filters + extra_filters:
+                collector = collector.WherePasses(element_filter)
+            return collector.ToElementIds()
+
+        found = {}
+        text_filters = []
+        if element_linker_storage is not None and element_linker_storage.get_schema() is not None:
+            for elem_id in _collect([element_linker_storage.payload_filter()]):
+                found[elem_id.IntegerValue] = (elem_id, True)
+            text_filters.append(element_linker_storage.payload_filter(inverted=True))
+        param_filter = self._linker_parameter_filter()
+        if param_filter is not None:
+            text_filters.append(param_filter)
+        for elem_id in _collect(text_filters):
+            found.setdefault(elem_id.IntegerValue, (elem_id, False))
+        return found
+
+    def _read_sibling_payload(self, elem, has_entity, schema):
+        payload = None
+        if has_entity:
+            try:
+                payload = element_linker_storage.read_payload(elem, schema)
+            except Exception:
+                payload = None
+        if not payload:
             payload = self._get_linker_payload_from_element(elem)
-            led_id = payload.get("led_id") if payload else None
-            if not led_id:
-                continue
-            try:
-                elem_id = elem.Id.IntegerValue
-            except Exception:
-                elem_id = None
-            record = {"id": elem_id, "element": elem, "payload": payload}
-            index.setdefault(led_id, []).append(record)
+        return payload
+
+    def _build_sibling_index(self):
+        """Return the session sibling index, scanning the document only when it is new.
+
+        An index that already covers the profile's categories only re-reads
+        the elements DocumentChanged queued since the last run; a profile
+        that needs more categories rebuilds it over the union of both.
+        """
+        category_ids = self._sibling_category_ids()
+        key = revit_helpers.get_document_key(self.doc)
+        index = _SIBLING_INDEXES.get(key)
+        if index is None or not index.covers(self.doc, category_ids):
+            if index is not None and index.category_ids is not None and category_ids is not None:
+                category_ids = category_ids | index.category_ids
+            index = _SiblingIndex(self.doc, category_ids)
+            _SIBLING_INDEXES[key] = index
+        schema = element_linker_storage.get_schema() if element_linker_storage is not None else None
+        if not index.scanned:
+            try:
+                found = self._linked_element_ids(index.category_ids)
+            except Exception:
+                found = {}
+            for elem_id, (element_id, has_entity) in found.items():
+                elem = self.doc.GetElement(element_id)
+                if elem is None:
+                    continue
+                index.put(elem_id, elem, self._read_sibling_payload(elem, has_entity, schema))
+            index.scanned = True
+            index.dirty.clear()
+        elif index.dirty:
+            for elem_id in list(index.dirty):
+                elem = self.doc.GetElement(ElementId(elem_id))
+                payload = self._read_sibling_payload(elem, schema is not None, schema) if elem is not None else None
+                if payload and payload.get("led_id"):
+                    index.put(elem_id, elem, payload)
+                else:
+                    index.remove(elem_id)
+            index.dirty.clear()
         self._sibling_linker_index = index
         return index
 
     def _register_sibling_payload(self, element, payload):
         if not element or not payload:
             return
-        led_id = payload.get("led_id")
-        if not led_id:
+        if not payload.get("led_id"):
             return
         index = getattr(self, "_sibling_linker_index", None)
         if index is None:
@@ -2140,13 +2547,8 @@ class PlaceElementsEngine(object):
         try:
             elem_id = element.Id.IntegerValue
         except Exception:
-            elem_id = None
-        records = index.setdefault(led_id, [])
-        if elem_id is not None:
-            for record in records:
-                if record.get("id") == elem_id:
-                    return
-        records.append({"id": elem_id, "element": element, "payload": payload})
+            return
+        index.put(elem_id, element, payload)
 
     def _resolve_sibling_element(self, sibling_led_id, parent_element_id=None, set_id=None, exclude_element=None):
         if not sibling_led_id:
@@ -2154,7 +2556,7 @@ class PlaceElementsEngine(object):
         index = getattr(self, "_sibling_linker_index", None)
         if index is None:
             index = self._build_sibling_index()
-        records = list(index.get(sibling_led_id, []) or [])
+        records = [record for record in index.records_for(sibling_led_id) if _is_valid_element(record.get("element"))]
         if not records:
             return None
         exclude_id = None
@@ -2961,6 +3363,18 @@ class PlaceElementsEngine(object):
         facing = getattr(instance, "FacingOrientation", None)
         ckt_circuit_number = self._get_linker_param_value(instance, "CKT_Circuit Number_CEDT")
         ckt_panel = self._get_linker_param_value(instance, "CKT_Panel_CEDT")
+        fields = {
+            "led_id": (led_id or "").strip(),
+            "set_id": (set_id or "").strip(),
+            "host_name": (host_name or "").strip(),
+            "parent_location": _xyz_tuple(parent_location) if parent_location else None,
+            "level_id": level_id,
+            "element_id": element_id,
+            "parent_element_id": _payload_int(parent_element_id) if parent_element_id not in (None, "") else None,
+            "location": _xyz_tuple(location) if location else None,
+            "rotation": float(rotation_deg or 0.0),
+            "parent_rotation": float(parent_rotation_deg or 0.0),
+        }
         payload = _build_linker_payload(
             led_id=led_id,
             set_id=set_id,
@@ -2976,27 +3390,37 @@ class PlaceElementsEngine(object):
             ckt_circuit_number=ckt_circuit_number,
             ckt_panel=ckt_panel,
         )
-        if self._set_element_linker_param(instance, payload):
+        # The text parameter stays as the user-visible copy; the entity, when enabled, is what readers prefer.
+        stored = self._set_element_linker_param(instance, payload)
+        if self.write_linker_entity and element_linker_storage is not None:
             try:
-                self._register_sibling_payload(instance, _parse_linker_payload(payload))
+                stored = element_linker_storage.write_payload(instance, fields) or stored
+            except Exception:
+                pass
+        if stored:
+            try:
+                self._register_sibling_payload(instance, fields)
             except Exception:
                 pass
 
-    def _apply_recorded_level(self, instance, linked_def):
-        if not instance or not linked_def:
-            return
+    def _recorded_level(self, linked_def):
+        """Return the level element recorded in the linker template of ``linked_def``, or ``None``."""
         template = self._get_linker_template(linked_def)
-        if not template:
-            return
-        level_id_val = template.get("level_id")
+        level_id_val = template.get("level_id") if template else None
         if not level_id_val:
-            return
+            return None
         try:
-            level_element = self.doc.GetElement(ElementId(int(level_id_val)))
+            return self.doc.GetElement(ElementId(int(level_id_val))) or None
         except Exception:
-            level_element = None
+            return None
+
+    def _apply_recorded_level(self, instance, linked_def):
+        """Set the instance level to the one recorded in its linker template; True when set."""
+        if not instance or not linked_def:
+            return False
+        level_element = self._recorded_level(linked_def)
         if not level_element:
-            return
+            return False
         level_id = level_element.Id
         level_param_names = (
             "INSTANCE_LEVEL_PARAM",
@@ -3016,9 +3440,10 @@ class PlaceElementsEngine(object):
                 continue
             try:
                 param.Set(level_id)
-                return
+                return True
             except Exception:
                 continue
+        return False
 
 
-__all__ = ["PlaceElementsEngine"]
+__all__ = ["PlaceElementsEngine", "invalidate_sibling_index", "note_sibling_index_changes"]
@@ -4,9 +4,17 @@ ProfileRepository
 -----------------
 Loads profileData.yaml into EquipmentDefinition objects and exposes lookup helpers
 keyed by CAD block name.
+
+Profiles are kept as raw dicts until a CAD name is first looked up, then
+expanded into EquipmentDefinition / LinkedElementDefinition objects once.
+Secondary indexes (family:type, tag family, parameter key) are built from the
+raw dicts on first use, and repositories loaded from a file are cached per
+profile content hash for the session.
 """
 
+import io
 import os
+from collections import OrderedDict
 
 from LogicClasses.EquipmentDefinition import EquipmentDefinition
 from LogicClasses.LinkedElementSet import LinkedElementSet
@@ -14,9 +22,147 @@ from LogicClasses.LinkedElementDefinition import LinkedElementDefinition
 from LogicClasses.PlacementRule import PlacementRule
 
 try:
-    from .profile_schema import equipment_defs_to_legacy, load_data
+    from .profile_schema import _content_hash, equipment_defs_to_legacy, load_data_from_text
 except Exception:  # pragma: no cover
-    from LogicClasses.profile_schema import equipment_defs_to_legacy, load_data  # type: ignore
+    from LogicClasses.profile_schema import _content_hash, equipment_defs_to_legacy, load_data_from_text  # type: ignore
+
+REPOSITORY_CACHE_SIZE = 4
+
+_REPOSITORY_CACHE = OrderedDict()
+
+
+def _inch_to_ft(val):
+    try:
+        return float(val) / 12.0
+    except Exception:
+        return 0.0
+
+
+def _offset_dict_to_tuple(data):
+    if not isinstance(data, dict):
+        return None
+    return (
+        _inch_to_ft(data.get("x_inches", 0.0) or 0.0),
+        _inch_to_ft(data.get("y_inches", 0.0) or 0.0),
+        _inch_to_ft(data.get("z_inches", 0.0) or 0.0),
+    )
+
+
+def _normalize_keynote_family(value):
+    if not value:
+        return ""
+    text = str(value)
+    if ":" in text:
+        text = text.split(":", 1)[0]
+    return "".join([ch for ch in text.lower() if ch.isalnum()])
+
+
+def _is_ga_keynote_symbol(family_name):
+    return _normalize_keynote_family(family_name) == "gakeynotesymbolced"
+
+
+def _is_builtin_keynote_tag(tag_data):
+    family = tag_data.get("family_name") or tag_data.get("family") or ""
+    category = tag_data.get("category_name") or tag_data.get("category") or ""
+    if _is_ga_keynote_symbol(family):
+        return False
+    fam_text = (family or "").lower()
+    cat_text = (category or "").lower()
+    if "keynote tags" in cat_text:
+        return True
+    if "keynote tag" in fam_text:
+        return True
+    return False
+
+
+def _profile_cad_name(prof):
+    if not isinstance(prof, dict):
+        return ""
+    return (prof.get("cad_name") or prof.get("equipment_def_id") or "").strip()
+
+
+def _split_label(label):
+    """Split "Family : Type" gracefully; labels without a colon are type-only."""
+    if ":" in label:
+        fam_part, type_part = label.split(":", 1)
+        return fam_part.strip(), type_part.strip()
+    return None, label
+
+
+def _instance_config(type_entry):
+    inst_cfg = type_entry.get("instance_config")
+    if not isinstance(inst_cfg, dict):
+        inst_cfg = {}
+    return inst_cfg
+
+
+def _tag_sources(inst_cfg):
+    tag_sources = []
+    tag_sources.extend(inst_cfg.get("tags") or [])
+    tag_sources.extend(inst_cfg.get("keynotes") or [])
+    return [tag for tag in tag_sources if isinstance(tag, dict) and not _is_builtin_keynote_tag(tag)]
+
+
+def _tag_defs(inst_cfg):
+    tag_defs = []
+    for tag_data in _tag_sources(inst_cfg):
+        offsets_dict = tag_data.get("offsets") or {}
+        if not isinstance(offsets_dict, dict):
+            offsets_dict = {}
+
+        leader_elbow = _offset_dict_to_tuple(tag_data.get("leader_elbow"))
+        leader_end = _offset_dict_to_tuple(tag_data.get("leader_end"))
+        tag_defs.append({
+            "family": tag_data.get("family_name") or tag_data.get("family"),
+            "type": tag_data.get("type_name") or tag_data.get("type"),
+            "category": tag_data.get("category_name") or tag_data.get("category"),
+            "parameters": tag_data.get("parameters") or {},
+            "offset": (
+                _inch_to_ft(offsets_dict.get("x_inches", 0.0) or 0.0),
+                _inch_to_ft(offsets_dict.get("y_inches", 0.0) or 0.0),
+                _inch_to_ft(offsets_dict.get("z_inches", 0.0) or 0.0),
+            ),
+            "rotation_deg": float(offsets_dict.get("rotation_deg", 0.0) or 0.0),
+            "leader_elbow": leader_elbow,
+            "leader_end": leader_end,
+        })
+    return tag_defs
+
+
+def _text_note_defs(inst_cfg):
+    text_note_defs = []
+    for note_data in inst_cfg.get("text_notes") or []:
+        if not isinstance(note_data, dict):
+            continue
+        offsets_dict = note_data.get("offsets") or {}
+        if not isinstance(offsets_dict, dict):
+            offsets_dict = {}
+        leader_defs = []
+        for leader in note_data.get("leaders") or []:
+            if not isinstance(leader, dict):
+                continue
+            leader_defs.append(dict(leader))
+        text_note_defs.append({
+            "text": note_data.get("text") or "",
+            "type_name": note_data.get("type_name"),
+            "offset": (
+                _inch_to_ft(offsets_dict.get("x_inches", 0.0) or 0.0),
+                _inch_to_ft(offsets_dict.get("y_inches", 0.0) or 0.0),
+                _inch_to_ft(offsets_dict.get("z_inches", 0.0) or 0.0),
+            ),
+            "rotation_deg": float(offsets_dict.get("rotation_deg", 0.0) or 0.0),
+            "width": _inch_to_ft(note_data.get("width_inches", 0.0) or 0.0),
+            "leaders": leader_defs,
+        })
+    return text_note_defs
+
+
+def _index_key(value):
+    return (value or "").strip().lower()
+
+
+def clear_repository_cache():
+    _REPOSITORY_CACHE.clear()
 
 
 class ProfileRepository(object):
@@ -25,33 +171,77 @@ class ProfileRepository(object):
     exposes lookup helpers keyed by CAD name.
     """
 
-    def __init__(self, equipment_definitions):
+    def __init__(self, equipment_definitions=None, profiles=None):
         self._by_cad = {}
         self._label_map = {}
         self._anchors_by_cad = {}
+        self._pending = {}
+        self._indexes = None
 
-        for eq_def in equipment_definitions:
+        for eq_def in equipment_definitions or []:
             cad_name = eq_def.get_equipment_def_id()
             if not cad_name:
                 continue
-            self._by_cad[cad_name] = eq_def
-            labels = {}
-            for linked_set in eq_def.get_linked_sets() or []:
-                for linked_def in linked_set.get_elements() or []:
-                    lbl = linked_def.get_element_def_id()
-                    if not lbl:
-                        continue
-                    if getattr(linked_def, "is_parent_anchor", lambda: False)():
-                        self._anchors_by_cad.setdefault(cad_name, []).append(linked_def)
-                        continue
-                    base_lbl = lbl
-                    unique_lbl = base_lbl
-                    idx = 2
-                    while unique_lbl in labels:
-                        unique_lbl = u"{} #{}".format(base_lbl, idx)
-                        idx += 1
-                    labels[unique_lbl] = linked_def
-            self._label_map[cad_name] = labels
+            self._add_definition(cad_name, eq_def)
+        for prof in profiles or []:
+            cad_name = _profile_cad_name(prof)
+            if not cad_name:
+                continue
+            self._pending[cad_name] = prof
+            self._by_cad.pop(cad_name, None)
+
+    def _add_definition(self, cad_name, eq_def):
+        self._pending.pop(cad_name, None)
+        self._by_cad[cad_name] = eq_def
+        labels = {}
+        anchors = []
+        for linked_set in eq_def.get_linked_sets() or []:
+            for linked_def in linked_set.get_elements() or []:
+                lbl = linked_def.get_element_def_id()
+                if not lbl:
+                    continue
+                if getattr(linked_def, "is_parent_anchor", lambda: False)():
+                    anchors.append(linked_def)
+                    continue
+                base_lbl = lbl
+                unique_lbl = base_lbl
+                idx = 2
+                while unique_lbl in labels:
+                    unique_lbl = u"{} #{}".format(base_lbl, idx)
+                    idx += 1
+                labels[unique_lbl] = linked_def
+        self._label_map[cad_name] = labels
+        if anchors:
+            self._anchors_by_cad[cad_name] = anchors
+        else:
+            self._anchors_by_cad.pop(cad_name, None)
+
+    def _ensure(self, cad_name):
+        """Expand the raw profile for ``cad_name`` on first access."""
+        prof = self._pending.get(cad_name)
+        if prof is None:
+            return
+        eq_def = self._parse_profile(prof)
+        if eq_def is None:
+            self._pending.pop(cad_name, None)
+            return
+        self._add_definition(cad_name, eq_def)
+
+    @classmethod
+    def from_profiles(cls, profiles):
+        """Build a lazily expanded repository from legacy profile dicts."""
+        return cls(profiles=[p for p in (profiles or []) if isinstance(p, dict)])
+
+    @classmethod
+    def from_data(cls, data, content_hash=None):
+        """Build from loaded profile data; reuse the session cache when ``content_hash`` is given."""
+        cached = cls._cached(content_hash)
+        if cached is not None:
+            return cached
+        equipment_defs = [d for d in ((data or {}).get("equipment_definitions") or []) if isinstance(d, dict)]
+        repo = cls.from_profiles(equipment_defs_to_legacy(equipment_defs))
+        cls._store(content_hash, repo)
+        return repo
 
     @classmethod
     def from_file(cls, data_path=None):
@@ -59,11 +249,29 @@ class ProfileRepository(object):
         path = data_path or os.path.join(base_dir, "profileData.yaml")
         if not os.path.exists(path):
             return cls([])
-        data = load_data(path)
-        equipment_defs = [d for d in (data.get("equipment_definitions") or []) if isinstance(d, dict)]
-        profiles = equipment_defs_to_legacy(equipment_defs)
-        eq_defs = cls._parse_profiles(profiles)
-        return cls(eq_defs)
+        with io.open(path, "r", encoding="utf-8") as handle:
+            raw = handle.read()
+        content_hash = _content_hash(raw)
+        cached = cls._cached(content_hash)
+        if cached is not None:
+            return cached
+        return cls.from_data(load_data_from_text(raw, path), content_hash=content_hash)
+
+    @staticmethod
+    def _cached(content_hash):
+        if not content_hash or content_hash not in _REPOSITORY_CACHE:
+            return None
+        repo = _REPOSITORY_CACHE.pop(content_hash)
+        _REPOSITORY_CACHE[content_hash] = repo
+        return repo
+
+    @staticmethod
+    def _store(content_hash, repo):
+        if not content_hash:
+            return
+        _REPOSITORY_CACHE[content_hash] = repo
+        while len(_REPOSITORY_CACHE) > REPOSITORY_CACHE_SIZE:
+            _REPOSITORY_CACHE.popitem(last=False)
 
     @staticmethod
     def _parse_profiles(profiles):
@@ -76,189 +284,175 @@ class ProfileRepository(object):
         for prof in profiles:
             if not isinstance(prof, dict):
                 continue
-            cad_name = (prof.get("cad_name") or prof.get("equipment_def_id") or "").strip()
-            if not cad_name:
+            eq_def = ProfileRepository._parse_profile(prof)
+            if eq_def is not None:
+                eq_defs.append(eq_def)
+        return eq_defs
+
+    @staticmethod
+    def _parse_profile(prof):
+        cad_name = _profile_cad_name(prof)
+        if not cad_name:
+            return None
+
+        linked_defs = []
+        for type_entry in prof.get("types") or []:
+            if not isinstance(type_entry, dict):
                 continue
+            led_id = type_entry.get("led_id")
+            set_id = type_entry.get("set_id")
+            label = (type_entry.get("label") or "").strip()
+            if not label:
+                continue
+            family_name, type_name = _split_label(label)
+
+            inst_cfg = _instance_config(type_entry)
+            params = inst_cfg.get("parameters")
+            if not isinstance(params, dict):
+                params = {}
+            offsets = inst_cfg.get("offsets")
+            if not isinstance(offsets, list) or not offsets:
+                offsets = [{}]
+            offsets = [off if isinstance(off, dict) else {} for off in offsets]
+
+            tag_defs = _tag_defs(inst_cfg)
+            text_note_defs = _text_note_defs(inst_cfg)
+
+            is_group_flag = bool(type_entry.get("is_group")) or (type_entry.get("category_name") == "Model Groups")
+
+            for idx, off in enumerate(offsets):
+                placement = PlacementRule(
+                    offset_xyz=(
+                        float(off.get("x_inches", 0.0)) / 12.0,
+                        float(off.get("y_inches", 0.0)) / 12.0,
+                        float(off.get("z_inches", 0.0)) / 12.0,
+                    ),
+                    rotation_degrees=float(off.get("rotation_deg", 0.0)),
+                    placement_mode="group" if is_group_flag else None,
+                    tags=tag_defs,
+                    text_notes=text_note_defs,
+                )
+                element_def_id = label if idx == 0 else u"{} #{}".format(label, idx + 1)
+                led = LinkedElementDefinition(
+                    element_def_id=element_def_id,
+                    category=type_entry.get("category_name"),
+                    family=family_name,
+                    type_name=type_name,
+                    placement=placement,
+                    static_params=params,
+                    dynamic_params=None,
+                    allow_recreate=False,
+                    is_optional=False,
+                    is_parent_anchor=bool(type_entry.get("is_parent_anchor")),
+                )
+                if led_id:
+                    setattr(led, "_ced_led_id", led_id)
+                if set_id:
+                    setattr(led, "_ced_set_id", set_id)
+                linked_defs.append(led)
 
-            linked_defs = []
+        linked_set = LinkedElementSet(
+            set_def_id=cad_name,
+            name=cad_name,
+            elements=linked_defs,
+        )
+        return EquipmentDefinition(
+            equipment_def_id=cad_name,
+            name=cad_name,
+            linked_sets=[linked_set],
+        )
+
+    # ------------------------------------------------------------------
+    # Secondary indexes
+    # ------------------------------------------------------------------
+    def _ensure_indexes(self):
+        if self._indexes is not None:
+            return self._indexes
+        indexes = {"family_type": {}, "family": {}, "category": {}, "tag_family": {}, "parameter": {}}
+
+        def _add(name, key, cad_name):
+            if key:
+                indexes[name].setdefault(key, set()).add(cad_name)
+
+        for cad_name, prof in self._pending.items():
             for type_entry in prof.get("types") or []:
                 if not isinstance(type_entry, dict):
                     continue
-                led_id = type_entry.get("led_id")
-                set_id = type_entry.get("set_id")
                 label = (type_entry.get("label") or "").strip()
                 if not label:
                     continue
-                # Split "Family : Type" gracefully
-                if ":" in label:
-                    fam_part, type_part = label.split(":", 1)
-                    family_name = fam_part.strip()
-                    type_name = type_part.strip()
-                else:
-                    family_name = None
-                    type_name = label
-
-                inst_cfg = type_entry.get("instance_config")
-                if not isinstance(inst_cfg, dict):
-                    inst_cfg = {}
+                family_name, type_name = _split_label(label)
+                _add("family_type", (_index_key(family_name), _index_key(type_name)), cad_name)
+                _add("family", _index_key(family_name), cad_name)
+                _add("category", _index_key(type_entry.get("category_name")), cad_name)
+                inst_cfg = _instance_config(type_entry)
+                for tag in _tag_sources(inst_cfg):
+                    _add("tag_family", _index_key(tag.get("family_name") or tag.get("family")), cad_name)
                 params = inst_cfg.get("parameters")
-                if not isinstance(params, dict):
-                    params = {}
-                offsets = inst_cfg.get("offsets")
-                if not isinstance(offsets, list) or not offsets:
-                    offsets = [{}]
-                offsets = [off if isinstance(off, dict) else {} for off in offsets]
-
-                def _inch_to_ft(val):
-                    try:
-                        return float(val) / 12.0
-                    except Exception:
-                        return 0.0
-
-                def _offset_dict_to_tuple(data):
-                    if not isinstance(data, dict):
-                        return None
-                    return (
-                        _inch_to_ft(data.get("x_inches", 0.0) or 0.0),
-                        _inch_to_ft(data.get("y_inches", 0.0) or 0.0),
-                        _inch_to_ft(data.get("z_inches", 0.0) or 0.0),
-                    )
-
-                tag_defs = []
-                tag_sources = []
-                tag_sources.extend(inst_cfg.get("tags") or [])
-                tag_sources.extend(inst_cfg.get("keynotes") or [])
-                def _normalize_keynote_family(value):
-                    if not value:
-                        return ""
-                    text = str(value)
-                    if ":" in text:
-                        text = text.split(":", 1)[0]
-                    return "".join([ch for ch in text.lower() if ch.isalnum()])
-
-                def _is_ga_keynote_symbol(family_name):
-                    return _normalize_keynote_family(family_name) == "gakeynotesymbolced"
-
-                def _is_builtin_keynote_tag(tag_data):
-                    family = tag_data.get("family_name") or tag_data.get("family") or ""
-                    category = tag_data.get("category_name") or tag_data.get("category") or ""
-                    if _is_ga_keynote_symbol(family):
-                        return False
-                    fam_text = (family or "").lower()
-                    cat_text = (category or "").lower()
-                    if "keynote tags" in cat_text:
-                        return True
-                    if "keynote tag" in fam_text:
-                        return True
-                    return False
-                for tag_data in tag_sources:
-                    if not isinstance(tag_data, dict):
-                        continue
-                    if _is_builtin_keynote_tag(tag_data):
-                        continue
-                    offsets_dict = tag_data.get("offsets") or {}
-                    if not isinstance(offsets_dict, dict):
-                        offsets_dict = {}
-
-                    leader_elbow = _offset_dict_to_tuple(tag_data.get("leader_elbow"))
-                    leader_end = _offset_dict_to_tuple(tag_data.get("leader_end"))
-                    tag_defs.append({
-                        "family": tag_data.get("family_name") or tag_data.get("family"),
-                        "type": tag_data.get("type_name") or tag_data.get("type"),
-                        "category": tag_data.get("category_name") or tag_data.get("category"),
-                        "parameters": tag_data.get("parameters") or {},
-                        "offset": (
-                            _inch_to_ft(offsets_dict.get("x_inches", 0.0) or 0.0),
-                            _inch_to_ft(offsets_dict.get("y_inches", 0.0) or 0.0),
-                            _inch_to_ft(offsets_dict.get("z_inches", 0.0) or 0.0),
-                        ),
-                        "rotation_deg": float(offsets_dict.get("rotation_deg", 0.0) or 0.0),
-                        "leader_elbow": leader_elbow,
-                        "leader_end": leader_end,
-                    })
-
-                text_note_defs = []
-                for note_data in inst_cfg.get("text_notes") or []:
-                    if not isinstance(note_data, dict):
-                        continue
-                    offsets_dict = note_data.get("offsets") or {}
-                    if not isinstance(offsets_dict, dict):
-                        offsets_dict = {}
-                    leader_defs = []
-                    for leader in note_data.get("leaders") or []:
-                        if not isinstance(leader, dict):
-                            continue
-                        leader_defs.append(dict(leader))
-                    text_note_defs.append({
-                        "text": note_data.get("text") or "",
-                        "type_name": note_data.get("type_name"),
-                        "offset": (
-                            _inch_to_ft(offsets_dict.get("x_inches", 0.0) or 0.0),
-                            _inch_to_ft(offsets_dict.get("y_inches", 0.0) or 0.0),
-                            _inch_to_ft(offsets_dict.get("z_inches", 0.0) or 0.0),
-                        ),
-                        "rotation_deg": float(offsets_dict.get("rotation_deg", 0.0) or 0.0),
-                        "width": _inch_to_ft(note_data.get("width_inches", 0.0) or 0.0),
-                        "leaders": leader_defs,
-                    })
-
-                is_group_flag = bool(type_entry.get("is_group")) or (type_entry.get("category_name") == "Model Groups")
-
-                for idx, off in enumerate(offsets):
-                    placement = PlacementRule(
-                        offset_xyz=(
-                            float(off.get("x_inches", 0.0)) / 12.0,
-                            float(off.get("y_inches", 0.0)) / 12.0,
-                            float(off.get("z_inches", 0.0)) / 12.0,
-                        ),
-                        rotation_degrees=float(off.get("rotation_deg", 0.0)),
-                        placement_mode="group" if is_group_flag else None,
-                        tags=tag_defs,
-                        text_notes=text_note_defs,
-                    )
-                    element_def_id = label if idx == 0 else u"{} #{}".format(label, idx + 1)
-                    led = LinkedElementDefinition(
-                        element_def_id=element_def_id,
-                        category=type_entry.get("category_name"),
-                        family=family_name,
-                        type_name=type_name,
-                        placement=placement,
-                        static_params=params,
-                        dynamic_params=None,
-                        allow_recreate=False,
-                        is_optional=False,
-                        is_parent_anchor=bool(type_entry.get("is_parent_anchor")),
-                    )
-                    if led_id:
-                        setattr(led, "_ced_led_id", led_id)
-                    if set_id:
-                        setattr(led, "_ced_set_id", set_id)
-                    linked_defs.append(led)
-
-            linked_set = LinkedElementSet(
-                set_def_id=cad_name,
-                name=cad_name,
-                elements=linked_defs,
-            )
-            eq_def = EquipmentDefinition(
-                equipment_def_id=cad_name,
-                name=cad_name,
-                linked_sets=[linked_set],
-            )
-            eq_defs.append(eq_def)
-        return eq_defs
+                for key in (params.keys() if isinstance(params, dict) else []):
+                    _add("parameter", _index_key(key), cad_name)
+        for cad_name, eq_def in self._by_cad.items():
+            for linked_set in eq_def.get_linked_sets() or []:
+                for linked_def in linked_set.get_elements() or []:
+                    family_name = linked_def.get_family()
+                    _add("family_type", (_index_key(family_name), _index_key(linked_def.get_type())), cad_name)
+                    _add("family", _index_key(family_name), cad_name)
+                    _add("category", _index_key(linked_def.get_category()), cad_name)
+                    placement = linked_def.get_placement()
+                    for tag in (placement.get_tags() if placement is not None else None) or []:
+                        if isinstance(tag, dict):
+                            _add("tag_family", _index_key(tag.get("family")), cad_name)
+                    for key in (linked_def.get_static_params() or {}).keys():
+                        _add("parameter", _index_key(key), cad_name)
+        self._indexes = indexes
+        return indexes
+
+    def cad_names_for_family_type(self, family_name, type_name=None):
+        """Return CAD names with a linked element of ``family_name`` (and ``type_name`` when given)."""
+        indexes = self._ensure_indexes()
+        if type_name is None:
+            found = indexes["family"].get(_index_key(family_name))
+        else:
+            found = indexes["family_type"].get((_index_key(family_name), _index_key(type_name)))
+        return sorted(found or [])
+
+    def family_names(self):
+        """Return the lowercased family names used by any linked element."""
+        return sorted(self._ensure_indexes()["family"].keys())
 
+    def category_names(self):
+        """Return the lowercased category names used by any linked element."""
+        return sorted(self._ensure_indexes()["category"].keys())
+
+    def cad_names_for_tag_family(self, tag_family):
+        """Return CAD names whose linked elements place a tag of ``tag_family``."""
+        return sorted(self._ensure_indexes()["tag_family"].get(_index_key(tag_family)) or [])
+
+    def cad_names_for_parameter(self, parameter_name):
+        """Return CAD names whose linked elements set ``parameter_name``."""
+        return sorted(self._ensure_indexes()["parameter"].get(_index_key(parameter_name)) or [])
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
     def cad_names(self):
-        return sorted(self._by_cad.keys())
+        return sorted(set(self._by_cad.keys()) | set(self._pending.keys()))
+
+    def definition_for_cad(self, cad_name):
+        self._ensure(cad_name)
+        return self._by_cad.get(cad_name)
 
     def labels_for_cad(self, cad_name):
+        self._ensure(cad_name)
         return list((self._label_map.get(cad_name) or {}).keys())
 
     def definition_for_label(self, cad_name, label):
+        self._ensure(cad_name)
         return (self._label_map.get(cad_name) or {}).get(label)
 
     def anchor_definitions_for_cad(self, cad_name):
+        self._ensure(cad_name)
         return list(self._anchors_by_cad.get(cad_name, []))
 
 
-__all__ = ["ProfileRepository"]
+__all__ = ["ProfileRepository", "clear_repository_cache"]
@@ -4,9 +4,13 @@ Helpers for working with the profileData.yaml equipment_definitions schema.
 """
 
 import copy
+import hashlib
 import io
 import json
 import os
+import re
+import time
+from collections import OrderedDict
 try:
     from collections.abc import Mapping
 except ImportError:
@@ -35,6 +39,16 @@ except Exception:  # pragma: no cover - IronPython fallback
         yaml = None
 
 ELEMENT_LINKER_PARAM_NAMES = ("Element_Linker", "Element_Linker Parameter")
+BACKEND_JSON = "json"
+BACKEND_YAMLDOTNET = "yamldotnet"
+BACKEND_PYYAML_C = "pyyaml_c"
+BACKEND_PYYAML = "pyyaml"
+BACKEND_PYREVIT_YAML = "pyrevit_yaml"
+BACKEND_SIMPLE = "simple"
+PARSE_CACHE_SIZE = 4
+COMPACT_FORMAT = "ced-compact-1"
+COMPACT_FORMAT_KEY = "profile_format"
+PARAMETER_DEFAULTS_KEY = "parameter_defaults"
 ESCAPED_QUOTE_KEYS = ("label", "type_name")
 
 
@@ -171,42 +185,220 @@ def _to_python(value):
     return value
 
 
-def _yaml_load(raw_text, source_path):
-    """
-    Attempt to load YAML regardless of whether the module exposes safe_* helpers.
-    Returns (data, error).
-    """
-    if not yaml:
-        return None, None
+_EMPTY_CONTAINER_KEY = re.compile(r"^[ \t]*(?:\{\}|\[\]):", re.M)
+# Rewrites for old saves; each mirrors how _simple_yaml_parse reads the line.
+_PLACEHOLDER_LINE = re.compile(r"^([ \t]*)(\{\}|\[\]):?[ \t]*$", re.M)
+_BLOCK_SCALAR = re.compile(r"^( *)([^ \n-][^:\n]*):[ \t]+[|>][-+0-9]*[ \t]*\n((?:\1 [^\n]*\n|[ \t]*\n)*)", re.M)
+_CHILDLESS_ENTRY = re.compile(r"^( *)(-|[^ \n#-][^:\n]*:)[ \t]*$(?!\n(?:[ \t]*\n)*\1  )", re.M)
+_DOUBLE_QUOTED_VALUE = re.compile(r'^( *(?:- |[^ \n#"\'-][^:\n]*: ))"(.*)"[ \t]*$', re.M)
+_PLAIN_NULL = set(["", "~", "null", "Null", "NULL"])
+_PLAIN_TRUE = set(["true", "True", "TRUE", "yes", "Yes", "YES", "on", "On", "ON"])
+_PLAIN_FALSE = set(["false", "False", "FALSE", "no", "No", "NO", "off", "Off", "OFF"])
+_PLAIN_INT = re.compile(r"^[-+]?(0|[1-9][0-9_]*)$")
+_PLAIN_FLOAT = re.compile(r"^[-+]?([0-9][0-9_]*)?\.[0-9_]*([eE][-+]?[0-9]+)?$")
+
+
+def _resolve_plain_scalar(text):
+    """Resolve an unquoted YAML scalar the way PyYAML's SafeLoader does for the common tags."""
+    if text in _PLAIN_NULL:
+        return None
+    if text in _PLAIN_TRUE:
+        return True
+    if text in _PLAIN_FALSE:
+        return False
+    if _PLAIN_INT.match(text):
+        return int(text.replace("_", ""))
+    if _PLAIN_FLOAT.match(text) and text not in (".", "-.", "+."):
+        return float(text.replace("_", ""))
+    lowered = text.lower()
+    if lowered in (".inf", "+.inf"):
+        return float("inf")
+    if lowered == "-.inf":
+        return float("-inf")
+    if lowered == ".nan":
+        return float("nan")
+    return text
+
+
+def _has_empty_container_keys(raw_text):
+    """Return True when older saves left ``{}:``/``[]:`` keys, which strict parsers reject as written."""
+    if "{}:" not in raw_text and "[]:" not in raw_text:
+        return False
+    return _EMPTY_CONTAINER_KEY.search(raw_text) is not None
+
+
+def _flatten_block_scalar(match):
+    """Rewrite ``key: |`` plus its indented lines the way the simple parser reads them: ``'|'`` then sibling keys."""
+    indent, key, body = match.group(1), match.group(2), match.group(3)
+    lines = ["{0}{1}: '|'".format(indent, key)]
+    content = [line for line in body.splitlines() if line.strip()]
+    if content:
+        shift = len(content[0]) - len(content[0].lstrip(" ")) - len(indent)
+        for line in content:
+            stripped = line.strip()
+            if stripped.startswith("-") or ":" not in stripped or len(line) - len(line.lstrip(" ")) - len(indent) < shift:
+                raise ValueError("unsupported block scalar line: {0}".format(stripped))
+            lines.append(line[shift:])
+    return "\n".join(lines) + "\n"
+
+
+def _single_quote_raw_string(match):
+    """Single-quote a double-quoted value so backslashes and inner quotes stay verbatim, as in the simple parser."""
+    inner = match.group(2)
+    if "\\" not in inner and '"' not in inner:
+        return match.group(0)
+    return "{0}'{1}'".format(match.group(1), inner.replace("'", "''"))
 
-    # pyRevit coreutils yaml exposes load_as_dict/dump_dict that take file paths.
-    if hasattr(yaml, "load_as_dict"):
-        try:
-            loaded = yaml.load_as_dict(source_path) or {}
-            return _to_python(loaded), None
-        except Exception as ex:
-            return None, ex
 
-    loader = getattr(yaml, "safe_load", None) or getattr(yaml, "load", None)
-    if loader is None:
-        return None, AttributeError("yaml module does not expose load/safe_load")
+def _rewrite_empty_container_keys(raw_text):
+    """Rewrite an old save with ``{}:``/``[]:`` keys so strict parsers return the simple parser's shape.
 
+    Returns ``None`` when the text holds a construct the rewrite cannot reproduce.
+    """
+    text = _PLACEHOLDER_LINE.sub(r'\1"\2":', raw_text)
     try:
-        return loader(raw_text) or {}, None
-    except TypeError:
-        loader_cls = (
-            getattr(yaml, "SafeLoader", None)
-            or getattr(yaml, "CSafeLoader", None)
-            or getattr(yaml, "Loader", None)
+        text = _BLOCK_SCALAR.sub(_flatten_block_scalar, text)
+    except ValueError:
+        return None
+    text = _CHILDLESS_ENTRY.sub(r"\1\2 {}", text)
+    return _DOUBLE_QUOTED_VALUE.sub(_single_quote_raw_string, text)
+
+
+def _detect_yamldotnet():
+    """Return YamlDotNet entry points when the assembly can be loaded, else ``None``."""
+    try:
+        import clr  # type: ignore
+    except Exception:
+        return None
+    try:
+        clr.AddReference("YamlDotNet")
+    except Exception:
+        # pyRevit loads its bundled copy; the import below finds it.
+        pass
+    try:
+        from System import Decimal as NetDecimal  # type: ignore
+        from System.IO import StringReader  # type: ignore
+        from YamlDotNet.Core import ScalarStyle  # type: ignore
+        from YamlDotNet.RepresentationModel import (  # type: ignore
+            YamlMappingNode,
+            YamlScalarNode,
+            YamlSequenceNode,
+            YamlStream,
         )
-        try:
-            if loader_cls:
-                return loader(raw_text, Loader=loader_cls) or {}, None
-            return loader(raw_text) or {}, None
-        except Exception as ex:
-            return None, ex
-    except Exception as ex:
-        return None, ex
+    except Exception:
+        return None
+    deserializer = None
+    try:
+        from YamlDotNet.Serialization import DeserializerBuilder  # type: ignore
+
+        builder = DeserializerBuilder()
+        # Plain scalars are only typed when this option exists (YamlDotNet 11+);
+        # without it every scalar would come back as a string.
+        typed = getattr(builder, "WithAttemptingUnquotedStringTypeDeserialization", None)
+        if typed is not None:
+            deserializer = typed().Build()
+    except Exception:
+        deserializer = None
+    return {
+        "deserializer": deserializer,
+        "decimal": NetDecimal,
+        "reader": StringReader,
+        "plain_style": ScalarStyle.Plain,
+        "mapping": YamlMappingNode,
+        "scalar": YamlScalarNode,
+        "sequence": YamlSequenceNode,
+        "stream": YamlStream,
+    }
+
+
+_YAMLDOTNET = _detect_yamldotnet()
+
+
+def _net_key(key):
+    if isinstance(key, basestring):
+        return key
+    if NetIDictionary is not None and isinstance(key, NetIDictionary) and key.Count == 0:
+        return "{}"
+    return str(key)
+
+
+def _net_to_python(value, decimal_type=None):
+    """Bulk-convert the .NET dictionaries/lists built by the YamlDotNet deserializer."""
+    if value is None or isinstance(value, basestring):
+        return value
+    if NetIDictionary is not None and isinstance(value, NetIDictionary):
+        converted = {}
+        for key in value.Keys:
+            converted[_net_key(key)] = _net_to_python(value[key], decimal_type)
+        return converted
+    if NetIEnumerable is not None and isinstance(value, NetIEnumerable):
+        return [_net_to_python(item, decimal_type) for item in value]
+    if decimal_type is not None and isinstance(value, decimal_type):
+        return float(value)
+    return value
+
+
+def _yaml_node_to_python(node, api):
+    """Convert a YamlDotNet representation node, typing plain scalars only."""
+    if isinstance(node, api["scalar"]):
+        if node.Style == api["plain_style"]:
+            return _resolve_plain_scalar(node.Value or "")
+        return node.Value
+    if isinstance(node, api["mapping"]):
+        converted = {}
+        for pair in node.Children:
+            key = _yaml_node_to_python(pair.Key, api)
+            converted[key if isinstance(key, basestring) else str(key)] = _yaml_node_to_python(pair.Value, api)
+        return converted
+    if isinstance(node, api["sequence"]):
+        return [_yaml_node_to_python(item, api) for item in node.Children]
+    return None
+
+
+def _yamldotnet_load(raw_text):
+    api = _YAMLDOTNET
+    if api["deserializer"] is not None:
+        loaded = api["deserializer"].Deserialize(api["reader"](raw_text))
+        return _net_to_python(loaded, api["decimal"]) or {}
+    stream = api["stream"]()
+    stream.Load(api["reader"](raw_text))
+    if stream.Documents.Count == 0:
+        return {}
+    return _yaml_node_to_python(stream.Documents[0].RootNode, api) or {}
+
+
+def _pyyaml_c_load(raw_text):
+    return yaml.load(raw_text, Loader=yaml.CSafeLoader) or {}
+
+
+def _pyyaml_load(raw_text):
+    return yaml.safe_load(raw_text) or {}
+
+
+def _detect_backends():
+    """Return available YAML backends in preference order (JSON is handled separately)."""
+    backends = []
+    if _YAMLDOTNET is not None:
+        backends.append(BACKEND_YAMLDOTNET)
+    if yaml is not None and getattr(yaml, "CSafeLoader", None) is not None:
+        backends.append(BACKEND_PYYAML_C)
+    if yaml is not None and getattr(yaml, "safe_load", None) is not None:
+        backends.append(BACKEND_PYYAML)
+    if yaml is not None and hasattr(yaml, "load_as_dict"):
+        backends.append(BACKEND_PYREVIT_YAML)
+    backends.append(BACKEND_SIMPLE)
+    return tuple(backends)
+
+
+_BACKENDS = _detect_backends()
+# Backends that parse the text strictly and so need _rewrite_empty_container_keys on old saves.
+_REWRITE_BACKENDS = (BACKEND_YAMLDOTNET, BACKEND_PYYAML_C, BACKEND_PYYAML)
+_COMPILED_BACKENDS = (BACKEND_YAMLDOTNET, BACKEND_PYYAML_C)
+
+
+def available_yaml_backends():
+    """Return the YAML backends detected at import, fastest first."""
+    return list(_BACKENDS)
 
 
 def _parse_scalar(token):
@@ -286,6 +478,8 @@ def _simple_yaml_parse(raw_text):
 
 
 def _sanitize_hash_keys(raw_text):
+    if "#" not in raw_text:
+        return raw_text
     sanitized_lines = []
     for raw_line in raw_text.splitlines():
         line = raw_line
@@ -340,39 +534,156 @@ def load_data(path):
     if not os.path.exists(path):
         return {"equipment_definitions": []}
     with io.open(path, "r", encoding="utf-8") as f:
-        raw = _sanitize_hash_keys(f.read())
+        raw = f.read()
     return load_data_from_text(raw, path)
 
 
-def load_data_from_text(raw_text, source_label="<memory>"):
+_PARSE_CACHE = OrderedDict()
+_LAST_LOAD_INFO = {}
+
+
+def _copy_tree(value):
+    """Copy nested dicts/lists; scalars are shared."""
+    if isinstance(value, dict):
+        return dict((key, _copy_tree(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return [_copy_tree(item) for item in value]
+    return value
+
+
+def _content_hash(raw_text):
+    try:
+        text = raw_text.encode("utf-8")
+    except Exception:
+        text = raw_text
+    return hashlib.sha1(text).hexdigest()
+
+
+def clear_parse_cache():
+    _PARSE_CACHE.clear()
+
+
+def get_last_load_info():
+    """Return ``{backend, elapsed_ms, cached, chars}`` for the most recent ``load_data_from_text`` call."""
+    return dict(_LAST_LOAD_INFO)
+
+
+def _log_load(backend, elapsed_ms, cached, chars, source_label):
+    _LAST_LOAD_INFO.clear()
+    _LAST_LOAD_INFO.update({"backend": backend, "elapsed_ms": elapsed_ms, "cached": cached, "chars": chars})
+    try:
+        from pyrevit import script  # type: ignore
+
+        logger = script.get_logger()
+    except Exception:
+        import logging
+
+        logger = logging.getLogger(__name__)
+    try:
+        logger.debug(
+            "[Profile YAML] %s parsed via %s%s in %.1f ms (%s chars)",
+            source_label,
+            backend,
+            " (cache)" if cached else "",
+            elapsed_ms,
+            chars,
+        )
+    except Exception:
+        pass
+
+
+def _parse_with_backend(backend, raw, source_label):
+    if backend == BACKEND_YAMLDOTNET:
+        return _yamldotnet_load(raw)
+    if backend == BACKEND_PYYAML_C:
+        return _pyyaml_c_load(raw)
+    if backend == BACKEND_PYYAML:
+        return _pyyaml_load(raw)
+    if backend == BACKEND_PYREVIT_YAML:
+        # pyRevit's wrapper only reads from a file path.
+        if not source_label or not os.path.isfile(source_label):
+            return None
+        return _to_python(yaml.load_as_dict(source_label) or {})
+    if backend == BACKEND_SIMPLE:
+        return _simple_yaml_parse(raw)
+    raise ValueError("Unknown YAML backend: {}".format(backend))
+
+
+def _parse_raw(raw, source_label, backends):
+    """Return ``(data, backend)`` from the first backend yielding a mapping; raise the first error otherwise."""
+    first_error = None
+    for backend in backends:
+        try:
+            loaded = _parse_with_backend(backend, raw, source_label)
+        except Exception as ex:
+            if first_error is None:
+                first_error = ex
+            continue
+        if isinstance(loaded, Mapping):
+            return dict(loaded), backend
+    if first_error is not None:
+        raise first_error
+    raise ValueError("profile data could not be parsed as YAML and does not look like JSON.")
+
+
+def load_data_from_text(raw_text, source_label="<memory>", backend=None, use_cache=True):
+    """Parse profile text through the fastest available backend.
+
+    Results are cached by content hash and returned as copies. ``backend``
+    forces one backend (see ``available_yaml_backends``).
+    """
+    started = time.time()
     raw = _sanitize_hash_keys(raw_text or "")
+    cache_key = None
+    if use_cache:
+        cache_key = (_content_hash(raw), backend)
+        cached = _PARSE_CACHE.get(cache_key)
+        if cached is not None:
+            _PARSE_CACHE.pop(cache_key)
+            _PARSE_CACHE[cache_key] = cached
+            data = _copy_tree(cached[0])
+            _log_load(cached[1], (time.time() - started) * 1000.0, True, len(raw), source_label)
+            return data
+    data, used_backend = _load_data_uncached(raw, source_label, backend)
+    if cache_key is not None:
+        _PARSE_CACHE[cache_key] = (_copy_tree(data), used_backend)
+        while len(_PARSE_CACHE) > PARSE_CACHE_SIZE:
+            _PARSE_CACHE.popitem(last=False)
+    _log_load(used_backend, (time.time() - started) * 1000.0, False, len(raw), source_label)
+    return data
+
+
+def _load_data_uncached(raw, source_label, backend=None):
     stripped = raw.lstrip()
-    if stripped.startswith("{") or stripped.startswith("["):
+    if backend in (None, BACKEND_JSON) and (stripped.startswith("{") or stripped.startswith("[")):
         try:
-            return _cleanup_empty_maps(_normalize_escaped_quotes(json.loads(raw or "{}")))
+            loaded = json.loads(raw or "{}")
         except Exception:
-            pass
-    data = None
-    yaml_error = None
-    if yaml:
-        loaded, yaml_error = _yaml_load(raw, source_label)
-        if isinstance(loaded, Mapping):
-            data = dict(loaded)
-
-    if data is None:
-        if yaml_error:
-            # Attempt fallback parser before surfacing error
+            loaded = None
+        if isinstance(loaded, Mapping) and loaded.get(COMPACT_FORMAT_KEY) == COMPACT_FORMAT:
+            return expand_profile_data(loaded), BACKEND_JSON
+        if loaded is not None:
+            return _cleanup_empty_maps(_normalize_escaped_quotes(loaded)), BACKEND_JSON
+    forced = backend not in (None, BACKEND_JSON)
+    backends = [backend] if forced else list(_BACKENDS)
+    if _has_empty_container_keys(raw):
+        # Strict parsers read the rewritten text; the simple parser and pyRevit's path reader keep the original.
+        strict = [name for name in backends if name in (_REWRITE_BACKENDS if forced else _COMPILED_BACKENDS)]
+        rewritten = _rewrite_empty_container_keys(raw) if strict else None
+        if rewritten is not None:
             try:
-                alt_data = _simple_yaml_parse(raw)
-                if isinstance(alt_data, Mapping):
-                    data = dict(alt_data)
+                data, used_backend = _parse_raw(rewritten, source_label, strict)
+                return _finish_loaded_data(data, raw, source_label), used_backend
             except Exception:
-                pass
-            if data is None:
-                raise yaml_error
-        else:
-            raise ValueError("profile data could not be parsed as YAML and does not look like JSON.")
+                if forced:
+                    raise
+        if not forced:
+            backends = [BACKEND_SIMPLE]
+    data, used_backend = _parse_raw(raw, source_label, backends)
+    return _finish_loaded_data(data, raw, source_label), used_backend
+
 
+def _finish_loaded_data(data, raw, source_label):
     data = _cleanup_empty_maps(_normalize_escaped_quotes(data))
 
     if "equipment_definitions" in data:
@@ -433,6 +744,99 @@ def dump_data_to_string(data):
     return json.dumps(payload, indent=2)
 
 
+def _collapse_empty_containers(value):
+    """Drop ``{}``/``[]`` placeholder keys and collapse maps left empty to ``{}`` (``[]`` for list placeholders)."""
+    if isinstance(value, Mapping):
+        if value and all(_is_empty_map_key(key) or key == "[]" for key in value.keys()):
+            collapsed = [_collapse_empty_containers(item) for item in value.values()]
+            if all(item in ({}, [], None) for item in collapsed):
+                return [] if all(key == "[]" for key in value.keys()) else {}
+        cleaned = {}
+        for key, item in value.items():
+            if _is_empty_map_key(key) or key == "[]":
+                continue
+            cleaned[key] = _collapse_empty_containers(item)
+        return cleaned
+    if isinstance(value, list):
+        return [_collapse_empty_containers(item) for item in value]
+    return value
+
+
+def _iter_linked_element_definitions(equipment_def):
+    for linked_set in equipment_def.get("linked_sets") or []:
+        if not isinstance(linked_set, Mapping):
+            continue
+        for led in linked_set.get("linked_element_definitions") or []:
+            if isinstance(led, Mapping):
+                yield led
+
+
+def _factor_parameter_defaults(equipment_def):
+    """Move parameter values shared by every linked element of ``equipment_def`` into ``parameter_defaults``."""
+    leds = list(_iter_linked_element_definitions(equipment_def))
+    if len(leds) < 2:
+        return
+    blocks = [led.get("parameters") for led in leds]
+    if not all(isinstance(block, Mapping) and block for block in blocks):
+        return
+    shared = {}
+    for key, value in blocks[0].items():
+        if isinstance(value, (Mapping, list)):
+            continue
+        if all(key in block and block[key] == value and type(block[key]) is type(value) for block in blocks[1:]):
+            shared[key] = value
+    if not shared:
+        return
+    for led in leds:
+        led["parameters"] = dict((key, value) for key, value in led["parameters"].items() if key not in shared)
+    equipment_def[PARAMETER_DEFAULTS_KEY] = shared
+
+
+def compact_profile_data(data):
+    """Return a canonical compact copy of profile ``data``.
+
+    Empty-map placeholder chains are dropped and parameter values repeated
+    on every linked element of an equipment definition move into that
+    definition's ``parameter_defaults``. ``expand_profile_data`` reverses it.
+    """
+    defs = []
+    for eq in (data or {}).get("equipment_definitions") or []:
+        if not isinstance(eq, Mapping):
+            continue
+        compacted = _collapse_empty_containers(_normalize_escaped_quotes(_copy_tree(dict(eq))))
+        _factor_parameter_defaults(compacted)
+        defs.append(compacted)
+    return {COMPACT_FORMAT_KEY: COMPACT_FORMAT, "equipment_definitions": defs}
+
+
+def expand_profile_data(compact):
+    """Return regular profile data from ``compact_profile_data`` output."""
+    defs = []
+    for eq in (compact or {}).get("equipment_definitions") or []:
+        if not isinstance(eq, Mapping):
+            continue
+        shared = eq.get(PARAMETER_DEFAULTS_KEY)
+        expanded = _copy_tree(dict(eq)) if shared else dict(eq)
+        expanded.pop(PARAMETER_DEFAULTS_KEY, None)
+        if shared:
+            for led in _iter_linked_element_definitions(expanded):
+                params = dict(shared)
+                params.update(led.get("parameters") or {})
+                led["parameters"] = params
+        defs.append(expanded)
+    return {"equipment_definitions": defs}
+
+
+def compact_profile_to_json(compact):
+    """Serialize ``compact_profile_data`` output (sorted keys, no whitespace)."""
+    return json.dumps(compact, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def dump_data_to_compact_json(data):
+    """Serialize profile ``data`` to the compact canonical JSON form (sorted keys, no whitespace)."""
+    return compact_profile_to_json(compact_profile_data(data))
+
+
 def equipment_defs_to_legacy(equipment_defs):
     legacy = []
     for eq in equipment_defs or []:
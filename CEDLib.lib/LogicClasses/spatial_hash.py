@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Uniform-grid spatial hash for tolerance matching of insertion points.
+
+Points are bucketed per key (usually a family symbol id) into cubic cells
+whose edge equals the tolerance, so every stored point within the tolerance
+of a query lies in the query's cell or one of its 26 neighbours. Queries and
+insertions cost O(1) on average however many points are stored, and a point
+just across a cell boundary is still matched.
+"""
+
+import math
+
+NEIGHBOR_OFFSETS = tuple(
+    (dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+)
+
+
+def point_coords(point):
+    """Return ``(x, y, z)`` floats from an ``XYZ``-like object or a 2/3-item sequence."""
+    try:
+        return (float(point.X), float(point.Y), float(point.Z))
+    except AttributeError:
+        pass
+    values = list(point) + [0.0]
+    return (float(values[0]), float(values[1]), float(values[2]))
+
+
+class SpatialHash(object):
+    """Points grouped by key and grid cell; matches are within ``tolerance`` (Euclidean)."""
+
+    def __init__(self, tolerance):
+        tolerance = float(tolerance)
+        if tolerance <= 0.0:
+            raise ValueError("tolerance must be positive")
+        self.tolerance = tolerance
+        self._tolerance_sq = tolerance * tolerance
+        self._cells = {}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _cell(self, x, y, z):
+        size = self.tolerance
+        return (int(math.floor(x / size)), int(math.floor(y / size)), int(math.floor(z / size)))
+
+    def has_key(self, key):
+        """True once ``key`` has been added, even when it holds no points."""
+        return key in self._cells
+
+    def add_key(self, key):
+        self._cells.setdefault(key, {})
+
+    def add(self, key, point, item=None):
+        """Insert ``point`` under ``key``; ``item`` is returned by ``find`` (e.g. an element id)."""
+        x, y, z = point_coords(point)
+        self._cells.setdefault(key, {}).setdefault(self._cell(x, y, z), []).append((x, y, z, item))
+        self._count += 1
+
+    def find(self, key, point):
+        """Return ``(item, distance)`` of the nearest point under ``key`` within tolerance, or ``None``."""
+        cells = self._cells.get(key)
+        if not cells:
+            return None
+        x, y, z = point_coords(point)
+        cx, cy, cz = self._cell(x, y, z)
+        found = False
+        best = None
+        best_sq = self._tolerance_sq
+        for dx, dy, dz in NEIGHBOR_OFFSETS:
+            for px, py, pz, item in cells.get((cx + dx, cy + dy, cz + dz)) or ():
+                dist_sq = (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2
+                if dist_sq <= best_sq:
+                    found = True
+                    best = item
+                    best_sq = dist_sq
+        if not found:
+            return None
+        return best, math.sqrt(best_sq)
+
+    def contains(self, key, point):
+        return self.find(key, point) is not None
+
+
+__all__ = ["SpatialHash", "point_coords"]
@@ -5,7 +5,7 @@ from pyrevit import script, forms, DB
 
 from CEDElectrical.Application.services.move_circuits_to_panel_service import \
     move_circuits_to_panel as _move_circuits_to_panel_service
-from CEDElectrical.Infrastructure.Revit.repositories import distribution_equipment_repository as de_repo
+from CEDElectrical.Application.services import panel_compatibility_index
 from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repository as ps_repo
 from Snippets import revit_helpers
 
@@ -194,53 +194,18 @@ def get_panel_dist_system(panel, doc, debug=False):
 
 def get_compatible_panels(selected_circuit, all_panels, doc):
     """Return panels that can accept the circuit voltage/pole configuration."""
-    circuit_voltage, circuit_poles = ps_repo.get_circuit_voltage_poles(selected_circuit)
-    if circuit_poles is None:
-        try:
-            poles_param = selected_circuit.get_Parameter(BuiltInParameter.RBS_ELEC_NUMBER_OF_POLES)
-            if poles_param and poles_param.HasValue:
-                circuit_poles = int(poles_param.AsInteger())
-        except Exception:
-            circuit_poles = None
-    if circuit_voltage is None:
-        try:
-            voltage_param = selected_circuit.get_Parameter(BuiltInParameter.RBS_ELEC_VOLTAGE)
-            if voltage_param and voltage_param.HasValue:
-                circuit_voltage = float(voltage_param.AsDouble())
-        except Exception:
-            circuit_voltage = None
-    if circuit_poles is None:
-        return []
-
-    target_poles = int(max(1, circuit_poles))
-    tolerance = 1.0
-    compatible_panels = []
-
-    for panel in list(all_panels or []):
-        model = de_repo.build_distribution_equipment(doc, panel, schedule_view=None)
-        options = list(getattr(model, "branch_circuit_options", []) or [])
-        matched = False
-        for option in options:
-            try:
-                opt_poles = int(option.get("poles", 0) or 0)
-            except Exception:
-                opt_poles = 0
-            opt_voltage = option.get("voltage")
-            if opt_poles != target_poles:
-                continue
-            if circuit_voltage is None or opt_voltage is None:
-                matched = True
-                break
-            try:
-                if abs(float(opt_voltage) - float(circuit_voltage)) <= float(tolerance):
-                    matched = True
-                    break
-            except Exception:
-                continue
-        if matched:
-            compatible_panels.append(panel)
+    index = panel_compatibility_index.get_compatibility_index(doc, panels=all_panels)
+    return list(index.compatible_panels(selected_circuit) or [])
+
+
+def get_common_compatible_panels(circuits, all_panels, doc, refresh=True, require_capacity=False):
+    """Return panels compatible with every circuit, reading each panel once through the compatibility index.
+
+    ``require_capacity`` also drops panels without free slots for the circuits moving in.
+    """
+    index = panel_compatibility_index.get_compatibility_index(doc, panels=all_panels, refresh=refresh)
+    return list(index.common_compatible_panels(circuits, require_capacity=require_capacity) or [])
 
-    return compatible_panels
 
 
 def get_circuit_data(circuit):
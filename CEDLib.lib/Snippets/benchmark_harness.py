@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Shared timing, legacy-vs-new equality checks and report output for the UnitTests/*_benchmark.py scripts.
+
+Every benchmark runs the legacy path and the new path on the same inputs,
+checks that both give the same result with ``assert_same`` before printing any
+timing, and reports through ``report``.
+"""
+
+import time
+
+from pyrevit import script
+
+
+def timed(fn, iterations=1):
+    """Run ``fn`` ``iterations`` times; return ``(ms per run, last result)``."""
+    iterations = int(max(1, iterations))
+    started = time.time()
+    result = None
+    for _ in range(iterations):
+        result = fn()
+    return (time.time() - started) * 1000.0 / float(iterations), result
+
+
+def assert_same(label, legacy, new):
+    """Raise ``AssertionError`` when the new path's result differs from the legacy path's."""
+    if legacy != new:
+        raise AssertionError("{0}: new path result differs from the legacy path.".format(label))
+
+
+def speedup(legacy_ms, new_ms):
+    return "{0:.1f}x".format(legacy_ms / new_ms) if new_ms else "-"
+
+
+def report(output, title, notes, rows, columns):
+    """Print ``rows`` (when there are any) under a ``## title`` heading, after each line of ``notes``."""
+    if output is None:
+        output = script.get_output()
+    output.print_md("## {0}".format(title))
+    for note in list(notes or []):
+        output.print_md(note)
+    if rows:
+        output.print_table(rows, columns)
@@ -157,3 +157,23 @@ def get_family_symbol_name(element, doc=None, fallback=""):
         except Exception:
             pass
     return fallback
+
+
+def get_document_key(doc):
+    """Return the key session caches file a document under: its path, or its title while unsaved."""
+    if doc is None:
+        return ""
+    try:
+        return doc.PathName or doc.Title or ""
+    except Exception:
+        return ""
+
+
+def is_valid_object(item):
+    """Return True while a Revit API object (document, element, view) is still usable."""
+    if item is None:
+        return False
+    try:
+        return bool(item.IsValidObject)
+    except Exception:
+        return False
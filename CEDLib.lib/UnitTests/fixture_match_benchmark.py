@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Unit-test utility: time full SequenceMatcher scans vs the token/trigram shortlist used by Let There Be Light auto-match."""
+
+import random
+import re
+from difflib import SequenceMatcher
+
+from LogicClasses.fuzzy_index import DEFAULT_TOKEN_WEIGHT, FuzzyIndex
+from Snippets.benchmark_harness import assert_same, report, speedup, timed
+
+SCENARIOS = (
+    # label, host symbols, source fixture types
+    ("100 sources x 400 hosts", 400, 100),
+    ("400 sources x 1500 hosts", 1500, 400),
+)
+TOP_K = 25
+MIN_SCORE = 0.60
+FAMILIES = (
+    "Downlight Recessed", "Downlight Surface", "Linear Pendant", "Linear Recessed", "Troffer",
+    "Wall Sconce", "Cove Strip", "Exit Sign", "Wall Pack", "Track Head", "High Bay", "Step Light",
+)
+SIZES = ("2in", "4in", "6in", "2x2", "2x4", "1x4", "4ft", "8ft")
+CCTS = ("2700K", "3000K", "3500K", "4000K")
+LUMENS = ("800lm", "1000lm", "1500lm", "2500lm", "4000lm")
+
+
+def _compact_norm(value):
+    return re.sub(r"[^a-z0-9]+", "", (value or "").lower())
+
+
+def _tokens(value):
+    text = re.sub(r"[^a-z0-9]+", " ", (value or "").lower()).strip()
+    return set([token for token in text.split(" ") if token])
+
+
+class FakeOption(object):
+    def __init__(self, family_name, type_name, type_mark):
+        self.label = u"{} : {}".format(family_name, type_name)
+        self.type_mark_norm = _compact_norm(type_mark)
+        text = u"{} {} {}".format(family_name, type_name, type_mark)
+        self.search_text_norm = _compact_norm(text)
+        self.tokens = _tokens(text)
+
+
+def _fake_options(count, rng):
+    options = []
+    for idx in range(int(count)):
+        family = u"CED {}".format(rng.choice(FAMILIES))
+        type_name = u"{} {} {} V{}".format(rng.choice(SIZES), rng.choice(CCTS), rng.choice(LUMENS), idx)
+        options.append(FakeOption(family, type_name, u"{}{}".format(chr(65 + idx % 26), idx // 26 + 1)))
+    return options
+
+
+def _fake_sources(options, count, rng):
+    """Source labels: exact mark hits, trimmed host labels and typo'd variants."""
+    sources = []
+    for idx in range(int(count)):
+        option = rng.choice(options)
+        words = option.label.replace(":", " ").split()
+        kind = idx % 3
+        if kind == 0:
+            text = u"LUMINAIRE {} {}".format(option.type_mark_norm.upper(), " ".join(words[1:3]))
+        elif kind == 1:
+            text = " ".join(w for w in words if rng.random() > 0.3)
+        else:
+            text = " ".join(words)
+            pos = rng.randrange(len(text))
+            text = text[:pos] + text[pos + 1:]
+        sources.append((_compact_norm(text), _tokens(text), kind == 0))
+    return sources
+
+
+def _scorer(source_norm, source_tokens):
+    """Same score as ``FixtureMatcher._best_similarity``: ratio plus a bonus per shared token."""
+    def _score(option):
+        ratio = SequenceMatcher(None, source_norm, option.search_text_norm).ratio()
+        return ratio + DEFAULT_TOKEN_WEIGHT * len(source_tokens.intersection(option.tokens))
+    return _score
+
+
+def _full_scan(options, sources):
+    labels = []
+    for source_norm, source_tokens, _ in sources:
+        score_fn = _scorer(source_norm, source_tokens)
+        best_option, best_score = None, 0.0
+        for option in options:
+            score = score_fn(option)
+            if score > best_score:
+                best_option, best_score = option, score
+        labels.append(best_option.label if best_option is not None and best_score >= MIN_SCORE else "")
+    return labels
+
+
+def _indexed(options, sources):
+    index = FuzzyIndex()
+    mark_positions = {}
+    for option in options:
+        position = index.add(option, option.search_text_norm, option.tokens)
+        mark_positions.setdefault(option.type_mark_norm, []).append(position)
+    labels = []
+    for source_norm, source_tokens, _ in sources:
+        required = []
+        for token in source_tokens:
+            required.extend(mark_positions.get(token, []))
+        best_option, best_score = index.best(
+            source_norm, _scorer(source_norm, source_tokens), tokens=source_tokens, top_k=TOP_K, required=required
+        )
+        labels.append(best_option.label if best_option is not None and best_score >= MIN_SCORE else "")
+    return labels
+
+
+def run(output=None):
+    """Check the shortlist picks the full-scan label for every type mark source, then print timings.
+
+    Only type mark hits are guaranteed to match: the mark's hosts are always
+    on the shortlist. Fuzzy sources can lose their best host to the top-k cut,
+    so their agreement is reported, not asserted.
+    """
+    rows = []
+    for index, scenario in enumerate(SCENARIOS):
+        label, host_count, source_count = scenario
+        rng = random.Random(index + 1)
+        options = _fake_options(host_count, rng)
+        sources = _fake_sources(options, source_count, rng)
+        full_ms, full_labels = timed(lambda: _full_scan(options, sources))
+        indexed_ms, indexed_labels = timed(lambda: _indexed(options, sources))
+        marks = [idx for idx, source in enumerate(sources) if source[2]]
+        assert_same(
+            "{0} (type mark sources)".format(label),
+            [full_labels[idx] for idx in marks],
+            [indexed_labels[idx] for idx in marks],
+        )
+        others = [idx for idx, source in enumerate(sources) if not source[2]]
+        agreed = sum(1 for idx in others if full_labels[idx] == indexed_labels[idx])
+        rows.append([
+            label,
+            "{0:.0f}".format(full_ms),
+            "{0:.0f}".format(indexed_ms),
+            speedup(full_ms, indexed_ms),
+            sum(1 for matched in indexed_labels if matched),
+            len(marks),
+            "{0}/{1}".format(agreed, len(others)),
+        ])
+
+    report(
+        output,
+        "Fixture Auto-Match Benchmark",
+        ["Synthetic host labels and source rows; shortlist top-{0} by token/trigram overlap.".format(TOP_K)],
+        rows,
+        ["Scenario", "Full scan ms", "Shortlist ms", "Speedup", "Matched sources", "Type mark sources", "Same pick (fuzzy)"],
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Unit-test utility: time per-circuit slot scans vs the whole-batch move planner for 100+ circuit moves.
+
+The planner applies circuits largest first, so its first-fit plan is checked
+against the per-circuit scan run in the planner's apply order, and it must
+never place fewer circuits than the scan in selection order.
+"""
+
+import random
+
+from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repository as ps_repo
+from CEDElectrical.Model.panel_move_planner import STRATEGY_BACKTRACK, SlotOccupancy, plan_moves
+from Snippets.benchmark_harness import assert_same, report, timed
+
+ITERATIONS = 3
+SCENARIOS = (
+    # label, max_slot, sort_mode, occupied_every, circuit_count
+    ("Panelboard across, 84 slots, 40 moves", 84, ps_repo.SORT_MODE_PANELBOARD_ACROSS, 0, 40),
+    ("One column, 240 slots, 120 moves", 240, ps_repo.SORT_MODE_PANELBOARD_ONE_COLUMN, 7, 120),
+    ("One column, 420 slots, 200 moves", 420, ps_repo.SORT_MODE_PANELBOARD_ONE_COLUMN, 5, 200),
+    ("One column, 240 slots, 150 moves (over capacity)", 240, ps_repo.SORT_MODE_PANELBOARD_ONE_COLUMN, 3, 150),
+)
+
+
+def _fake_option(max_slot, sort_mode):
+    slots = [int(x) for x in ps_repo.get_slot_order(int(max_slot), sort_mode)]
+    return {
+        "max_slot": int(max_slot),
+        "sort_mode": sort_mode,
+        "slot_limits": {"valid_slots": list(slots), "all_slots": list(slots), "invalid_slots": []},
+    }
+
+
+def _fake_batch(max_slot, occupied_every, circuit_count, seed):
+    rng = random.Random(int(seed))
+    free_slots = set([s for s in range(1, int(max_slot) + 1) if not occupied_every or s % int(occupied_every) != 0])
+    requests = [(100000 + idx, rng.choice((1, 1, 1, 2, 3))) for idx in range(int(circuit_count))]
+    return free_slots, requests
+
+
+def _legacy_plan(option, free_slots, requests):
+    """Per-circuit scan as done before the planner: every circuit rescans every start slot."""
+    available = set(free_slots)
+    slot_order = ps_repo.get_option_slot_order(option, include_excess=False)
+    placed = {}
+    for key, poles in requests:
+        for start in slot_order:
+            covered = ps_repo.get_slot_span_slots_for_option(option, int(start), int(poles), require_valid=True)
+            if covered and all(int(slot) in available for slot in covered):
+                available.difference_update(covered)
+                placed[key] = (int(start), tuple([int(slot) for slot in covered]))
+                break
+    return placed
+
+
+def _planner_plan(option, free_slots, requests):
+    def _span(start, poles):
+        return ps_repo.get_slot_span_slots_for_option(option, int(start), int(poles), require_valid=True)
+
+    occupancy = SlotOccupancy(ps_repo.get_option_slot_order(option, include_excess=False), free_slots, _span)
+    return plan_moves(requests, occupancy)
+
+
+def _check_plan(label, option, free_slots, requests, plan):
+    """Compare the plan with the per-circuit scan; raise ``AssertionError`` on any difference."""
+    if plan.placed_count < len(_legacy_plan(option, free_slots, requests)):
+        raise AssertionError("{0}: planner placed fewer circuits than the per-circuit scan.".format(label))
+    if plan.strategy == STRATEGY_BACKTRACK:
+        taken = []
+        for key in plan.order:
+            taken.extend(plan.assignment(key)[1])
+        if len(taken) != len(set(taken)) or not set(taken).issubset(set(free_slots)):
+            raise AssertionError("{0}: backtracking plan overlaps or uses occupied slots.".format(label))
+        return
+    assert_same(label, _legacy_plan(option, free_slots, plan.requests), plan.assignments)
+
+
+def run(output=None):
+    """Check each plan against the per-circuit scan, then print legacy vs planner timing and outcomes."""
+    rows = []
+    for index, scenario in enumerate(SCENARIOS):
+        label, max_slot, sort_mode, occupied_every, circuit_count = scenario
+        option = _fake_option(max_slot, sort_mode)
+        free_slots, requests = _fake_batch(max_slot, occupied_every, circuit_count, seed=index + 1)
+        legacy_ms, legacy_placed = timed(lambda: _legacy_plan(option, free_slots, requests), ITERATIONS)
+        planner_ms, plan = timed(lambda: _planner_plan(option, free_slots, requests), ITERATIONS)
+        _check_plan(label, option, free_slots, requests, plan)
+        rows.append([
+            label,
+            "{0:.1f}".format(legacy_ms),
+            int(len(legacy_placed)),
+            "{0:.1f}".format(planner_ms),
+            int(plan.placed_count),
+            plan.strategy,
+            plan.summary() or "Complete plan",
+        ])
+
+    report(
+        output,
+        "Move Circuits Plan Benchmark",
+        ["{0} iterations per scenario; legacy rows scan in selection order, the planner sorts by pole count.".format(ITERATIONS)],
+        rows,
+        ["Scenario", "Legacy ms", "Legacy placed", "Planner ms", "Planner placed", "Strategy", "Report"],
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Unit-test utility: benchmark per-slot cell lookups vs the shared SlotCellMap on fake switchboards."""
+
+from pyrevit import DB
+
+from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repository as ps_repo
+from Snippets.benchmark_harness import assert_same, report, timed
+
+SLOT_COUNT = 84
+HEADER_ROWS = 2
+BODY_COLUMNS = 12
+CIRCUIT_COLUMNS = (3, 4, 5)
+ITERATIONS = 5
+
+
+class _FakeDocument(object):
+    Title = "SlotCellMap Benchmark"
+    PathName = ""
+
+
+class _FakeBody(object):
+    def __init__(self, rows, cols):
+        self.NumberOfRows = int(rows)
+        self.NumberOfColumns = int(cols)
+
+
+class _FakeTable(object):
+    def __init__(self, slots, body):
+        self.NumberOfSlots = int(slots)
+        self.ScheduleType = ps_repo.PSTYPE_SWITCHBOARD
+        self._body = body
+
+    def GetSectionData(self, section):
+        return self._body
+
+
+class FakeSwitchboardView(object):
+    """Switchboard-shaped PanelScheduleView stand-in that counts API calls.
+
+    One body row per slot after a short header; every column of a slot row
+    maps back to the slot, while GetCellsBySlotNumber only reports the phase
+    columns. GetCellsBySlotNumber answers with the tuple-return overload, so
+    the out-ref binding is tried and rejected the way IronPython does it.
+    """
+
+    def __init__(self, view_id, slots=SLOT_COUNT, occupied_every=3):
+        self.Id = DB.ElementId(int(view_id))
+        self.Document = _FakeDocument()
+        self.slots = int(slots)
+        self._table = _FakeTable(self.slots, _FakeBody(self.slots + HEADER_ROWS, BODY_COLUMNS))
+        self._occupied = set([s for s in range(1, self.slots + 1) if s % int(occupied_every) == 1])
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = int(self.calls.get(name, 0)) + 1
+
+    def reset_calls(self):
+        self.calls = {}
+
+    @property
+    def total_calls(self):
+        return int(sum(self.calls.values()))
+
+    def GetTableData(self):
+        self._count("GetTableData")
+        return self._table
+
+    def GetTemplate(self):
+        self._count("GetTemplate")
+        return DB.ElementId.InvalidElementId
+
+    def GetSlotNumberByCell(self, row, col):
+        self._count("GetSlotNumberByCell")
+        slot = int(row) - HEADER_ROWS + 1
+        if slot < 1 or slot > self.slots:
+            return 0
+        return slot
+
+    def GetCellsBySlotNumber(self, slot, *refs):
+        self._count("GetCellsBySlotNumber")
+        if refs:
+            raise TypeError("out-ref overload not bound")
+        row = int(slot) + HEADER_ROWS - 1
+        return ([row] * len(CIRCUIT_COLUMNS), list(CIRCUIT_COLUMNS))
+
+    def GetCircuitIdByCell(self, row, col):
+        self._count("GetCircuitIdByCell")
+        slot = int(row) - HEADER_ROWS + 1
+        if slot in self._occupied and int(col) == CIRCUIT_COLUMNS[1]:
+            return DB.ElementId(100000 + slot)
+        return DB.ElementId.InvalidElementId
+
+
+def _legacy_cells(view, slot):
+    """Per-slot lookup as done before SlotCellMap: API call plus one slot check per cell."""
+    raw = view.GetCellsBySlotNumber(int(slot))
+    pairs = []
+    if isinstance(raw, tuple) and len(raw) >= 2:
+        for idx in range(int(min(len(raw[0]), len(raw[1])))):
+            pairs.append((int(raw[0][idx]), int(raw[1][idx])))
+    filtered = []
+    for row, col in pairs:
+        if int(view.GetSlotNumberByCell(row, col) or 0) == int(slot):
+            filtered.append((row, col))
+    return sorted(set(filtered))
+
+
+def _legacy_ordered_cells(view):
+    """Legacy PanelScheduleManager path: layout context pass, then a second lookup per slot."""
+    col_counts = {}
+    for slot in range(1, view.slots + 1):
+        for row, col in _legacy_cells(view, slot):
+            cid = view.GetCircuitIdByCell(row, col)
+            if cid is None or cid == DB.ElementId.InvalidElementId:
+                continue
+            col_counts[int(col)] = int(col_counts.get(int(col), 0)) + 1
+    preferred = [pair[0] for pair in sorted(col_counts.items(), key=lambda x: (-int(x[1]), int(x[0])))]
+    priority = dict((int(col), idx) for idx, col in enumerate(preferred))
+    result = {}
+    for slot in range(1, view.slots + 1):
+        cells = _legacy_cells(view, slot)
+        cells.sort(key=lambda pair: (int(priority.get(int(pair[1]), 999999)), int(pair[1]), int(pair[0])))
+        result[int(slot)] = cells
+    return result
+
+
+def _map_ordered_cells(view, refresh):
+    slot_map = ps_repo.get_slot_cell_map(view, refresh=refresh)
+    return dict((int(slot), slot_map.ordered_cells(slot)) for slot in range(1, view.slots + 1))
+
+
+def _measure(label, view, fn):
+    view.reset_calls()
+    elapsed_ms, result = timed(fn, ITERATIONS)
+    calls = int(view.total_calls / ITERATIONS)
+    return [label, "{0:.2f}".format(elapsed_ms), calls, dict(view.calls)], result
+
+
+def run(output=None, view_count=10):
+    """Check both map passes return the legacy cells, then print timing and API call counts per strategy."""
+    rows = []
+    for index in range(int(view_count)):
+        view = FakeSwitchboardView(900000 + index)
+        legacy_row, legacy = _measure("Legacy per-slot", view, lambda: _legacy_ordered_cells(view))
+        cold_row, cold = _measure("SlotCellMap (rebuilt)", view, lambda: _map_ordered_cells(view, True))
+        warm_row, warm = _measure("SlotCellMap (shared)", view, lambda: _map_ordered_cells(view, False))
+        assert_same("{0} (rebuilt)".format(view.Id.IntegerValue), legacy, cold)
+        assert_same("{0} (shared)".format(view.Id.IntegerValue), legacy, warm)
+        if index == 0:
+            rows.extend([legacy_row, cold_row, warm_row])
+
+    report(
+        output,
+        "SlotCellMap Benchmark",
+        [
+            "{0} fake switchboards | {1} slots | {2} body columns | {3} iterations".format(
+                int(view_count), SLOT_COUNT, BODY_COLUMNS, ITERATIONS
+            )
+        ],
+        [[r[0], r[1], r[2], ", ".join(["{0}={1}".format(k, int(v / ITERATIONS)) for k, v in sorted(r[3].items())])] for r in rows],
+        ["Strategy", "ms / pass", "API calls / pass", "Calls by method"],
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Unit-test utility: time the two-write vs single-write active profile save on a multi-MB checkpoint."""
+
+import copy
+import glob
+import io
+import json
+import os
+
+from ExtensibleStorage import ExtensibleStorage
+from ExtensibleStorage import yaml_store
+from LogicClasses import profile_schema
+from LogicClasses.copy_on_write import copy_on_write, freeze
+from Snippets.benchmark_harness import assert_same, report, timed
+
+CHECKPOINT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "OLD CHECKPOINTS"))
+TARGET_BYTES = 2 * 1024 * 1024
+ITERATIONS = 3
+YAML_PATH = "C:/Profiles/profileData.yaml"
+
+
+class FakeStorage(object):
+    """Stands in for the DataStorage entity: every write reads, serializes and compresses the payload."""
+
+    def __init__(self):
+        self.payload = {"entries": [], "meta": {}}
+        self.writes = 0
+        self.stored_bytes = 0
+        self.active_text = None
+
+    def _write(self, payload):
+        encoding, data = ExtensibleStorage._compress(ExtensibleStorage._payload_json(payload))
+        self.payload = payload
+        self.writes += 1
+        self.stored_bytes = len(data)
+
+    def update_active_yaml(self, yaml_path, new_text, action, description, data_hash=None):
+        payload = copy.deepcopy(self.payload)
+        active = ExtensibleStorage._set_active_text(payload["meta"], yaml_path, new_text, data_hash)
+        active["last_change"] = {"action": action or "", "description": description or ""}
+        self._write(payload)
+        self.active_text = new_text
+
+    def update_active_text_only(self, yaml_path, new_text, data_hash=None):
+        payload = copy.deepcopy(self.payload)
+        ExtensibleStorage._set_active_text(payload["meta"], yaml_path, new_text, data_hash)
+        self._write(payload)
+        self.active_text = new_text
+
+
+def _profile_path(target_bytes=TARGET_BYTES):
+    """Return the smallest checkpoint of at least ``target_bytes`` (or the largest one)."""
+    paths = sorted(glob.glob(os.path.join(CHECKPOINT_DIR, "*.yaml")), key=os.path.getsize)
+    for path in paths:
+        if os.path.getsize(path) >= int(target_bytes):
+            return path
+    return paths[-1] if paths else None
+
+
+def _edit(data, step):
+    defs = data.get("equipment_definitions") or []
+    if defs:
+        defs[step % len(defs)]["name"] = "Benchmark Edit {0}".format(step)
+
+
+def _two_write_save(storage, cached, step):
+    """Save path before the change: JSON round-trip copy, two storage writes, JSON round-trip cache."""
+    data = json.loads(json.dumps(cached))
+    _edit(data, step)
+    new_text = profile_schema.dump_data_to_compact_json(data)
+    storage.update_active_yaml(YAML_PATH, new_text, "Benchmark", "two writes")
+    storage.update_active_text_only(YAML_PATH, new_text)
+    return json.loads(json.dumps(data))
+
+
+def _single_write_save(storage, cached, step):
+    data = copy_on_write(cached)
+    _edit(data, step)
+    frozen = freeze(data)
+    new_text = profile_schema.dump_data_to_compact_json(frozen)
+    storage.update_active_yaml(YAML_PATH, new_text, "Benchmark", "single write", data_hash=yaml_store._text_hash(new_text))
+    return frozen
+
+
+def _measure(label, save_fn, data):
+    storage = FakeStorage()
+    state = {"cached": data, "step": 0}
+
+    def _save():
+        state["cached"] = save_fn(storage, state["cached"], state["step"])
+        state["step"] += 1
+
+    elapsed_ms, _ = timed(_save, ITERATIONS)
+    row = [label, "{0:.0f}".format(elapsed_ms), storage.writes, "{0:.0f}".format(storage.stored_bytes / 1024.0)]
+    return row, (storage.active_text, state["cached"])
+
+
+def run(output=None, target_bytes=TARGET_BYTES):
+    """Check both save paths store the same text and cache the same data, then print save latency and writes."""
+    path = _profile_path(target_bytes)
+    if not path:
+        report(output, "Active Profile Save Benchmark", ["No checkpoint profiles found under `{0}`.".format(CHECKPOINT_DIR)], [], None)
+        return
+    with io.open(path, "r", encoding="utf-8") as handle:
+        raw = handle.read()
+    data = profile_schema.load_data_from_text(raw, path, use_cache=False)
+
+    two_write_row, two_write_saved = _measure("Two writes + JSON copies", _two_write_save, data)
+    single_write_row, single_write_saved = _measure("Single write + copy-on-write", _single_write_save, data)
+    assert_same(os.path.basename(path), two_write_saved, single_write_saved)
+    report(
+        output,
+        "Active Profile Save Benchmark",
+        [
+            "`{0}` ({1:.0f} KB) | {2} saves per path, one definition edited per save".format(
+                os.path.basename(path), len(raw) / 1024.0, ITERATIONS
+            )
+        ],
+        [two_write_row, single_write_row],
+        ["Save path", "ms per save", "Storage writes", "Stored KB"],
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Unit-test utility: time each detected YAML backend and the parse cache on the OLD CHECKPOINTS profiles.
+
+Every strict backend that parses a file must return the same data as the
+tiered load, and the cached reload the same data again. Old corrupted saves
+with ``{}:``/``[]:`` keys are rewritten so strict backends match the simple
+parser on them. The simple parser differs from the strict backends on other
+files, so for it only the equipment definitions are compared.
+"""
+
+import glob
+import hashlib
+import io
+import os
+
+from LogicClasses import profile_schema
+from Snippets.benchmark_harness import assert_same, report, timed
+
+CHECKPOINT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "OLD CHECKPOINTS"))
+MAX_FILES = 6
+
+
+def _checkpoint_files(max_files=MAX_FILES):
+    """Return the largest distinct checkpoint files (copies with identical content are skipped)."""
+    paths = sorted(glob.glob(os.path.join(CHECKPOINT_DIR, "*.yaml")), key=os.path.getsize, reverse=True)
+    seen = set()
+    files = []
+    for path in paths:
+        with io.open(path, "rb") as handle:
+            digest = hashlib.sha1(handle.read()).hexdigest()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        files.append(path)
+        if max_files and len(files) >= int(max_files):
+            break
+    return files
+
+
+def _timed_load(raw, path, backend=None, use_cache=False):
+    """Return ``(ms, data, error)``; ``data`` is None when the backend could not parse ``raw``."""
+    errors = []
+
+    # Only pyRevit's reader needs the real path; any other label next to a checkpoint
+    # lets the loader write its diagnostics file into the data folder.
+    label = path if backend == profile_schema.BACKEND_PYREVIT_YAML else "<memory>"
+
+    def _load():
+        try:
+            return profile_schema.load_data_from_text(raw, label, backend=backend, use_cache=use_cache)
+        except Exception as ex:
+            errors.append("{0}".format(ex).splitlines()[0][:80])
+            return None
+
+    elapsed, data = timed(_load)
+    return elapsed, data, errors[0] if errors else ""
+
+
+def _definition_names(data):
+    return [(entry.get("id"), entry.get("name")) for entry in (data.get("equipment_definitions") or [])]
+
+
+def _definition_count(data):
+    return len(data.get("equipment_definitions") or []) if data is not None else "-"
+
+
+def run(output=None, max_files=MAX_FILES):
+    """Check every backend and the cached reload parse each checkpoint like the tiered loader, then print load times."""
+    backends = profile_schema.available_yaml_backends()
+    rows = []
+    for path in _checkpoint_files(max_files):
+        with io.open(path, "r", encoding="utf-8") as handle:
+            raw = handle.read()
+        name = os.path.basename(path)
+        size_kb = "{0:.0f}".format(len(raw) / 1024.0)
+        profile_schema.clear_parse_cache()
+        tiered_ms, tiered, tiered_error = _timed_load(raw, path, use_cache=True)
+        picked = profile_schema.get_last_load_info().get("backend") or "-"
+        cached_ms, cached, cached_error = _timed_load(raw, path, use_cache=True)
+        assert_same("{0} (cached)".format(name), tiered, cached)
+        for backend in backends:
+            elapsed, data, error = _timed_load(raw, path, backend=backend)
+            if data is not None and tiered is not None:
+                if backend == profile_schema.BACKEND_SIMPLE:
+                    assert_same("{0} ({1})".format(name, backend), _definition_names(tiered), _definition_names(data))
+                else:
+                    assert_same("{0} ({1})".format(name, backend), tiered, data)
+            rows.append([name, size_kb, backend, "{0:.0f}".format(elapsed), _definition_count(data), error])
+        rows.append([name, size_kb, "tiered ({0})".format(picked), "{0:.0f}".format(tiered_ms), _definition_count(tiered), tiered_error])
+        rows.append([name, size_kb, "tiered, cached", "{0:.0f}".format(cached_ms), _definition_count(cached), cached_error])
+
+    report(
+        output,
+        "Profile YAML Load Benchmark",
+        ["Detected backends (preference order): {0}".format(", ".join(backends))],
+        rows,
+        ["Profile", "KB", "Backend", "ms", "Definitions", "Error"],
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""Unit-test utility: benchmark per-slot SPARE/SPACE adds vs the free-slot-run planner on fake panelboards.
+
+The per-slot path calls ``add_spare_default``/``add_space_default`` once per
+slot (cell lookup, add, invalidate, resolve each time); the planner issues
+the whole plan through ``add_specials_default`` from one slot-map read and
+resolves the added circuits from the cells it already looked up.
+The run checks that both fill the same slots with the same kinds.
+"""
+
+from pyrevit import DB
+
+from CEDElectrical.Application.services.spare_space_planner import issue_plan_adds, plan_panel_adds
+from CEDElectrical.Infrastructure.Revit.repositories import panel_schedule_repository as ps_repo
+from CEDElectrical.Model.panel_schedule_enums import PanelSpecialKind as SpecialKind
+from CEDElectrical.Model.panel_schedule_enums import PanelUiMode as UiMode
+from Snippets.benchmark_harness import assert_same, report, timed
+
+SLOT_COUNT = 84
+HEADER_ROWS = 2
+BODY_COLUMNS = 6
+SLOT_COLUMNS = (1, 4)
+PANEL_COUNT = 30
+OCCUPIED_EVERY = 5
+
+
+class _FakeDocument(object):
+    Title = "Spare/Space Benchmark"
+    PathName = ""
+
+
+class _FakeBody(object):
+    def __init__(self, rows, cols):
+        self.NumberOfRows = int(rows)
+        self.NumberOfColumns = int(cols)
+
+
+class _FakeTable(object):
+    def __init__(self, slots, body):
+        self.NumberOfSlots = int(slots)
+        self._body = body
+
+    def GetSectionData(self, section):
+        return self._body
+
+
+class FakePanelboardView(object):
+    """Two-column panelboard PanelScheduleView stand-in that counts API calls.
+
+    Odd slots sit in the left circuit column and even slots in the right one,
+    one body row per slot pair. AddSpare/AddSpace mark the slot occupied and
+    GetCircuitIdByCell reports a circuit id for occupied slots.
+    """
+
+    def __init__(self, view_id, slots=SLOT_COUNT, occupied_every=OCCUPIED_EVERY):
+        self.Id = DB.ElementId(int(view_id))
+        self.Document = _FakeDocument()
+        self.slots = int(slots)
+        self._table = _FakeTable(self.slots, _FakeBody(int((self.slots + 1) / 2) + HEADER_ROWS, BODY_COLUMNS))
+        self.occupied = dict((s, "circuit") for s in range(1, self.slots + 1) if s % int(occupied_every) == 0)
+        self.calls = {}
+
+    def _count(self, name):
+        self.calls[name] = int(self.calls.get(name, 0)) + 1
+
+    @property
+    def total_calls(self):
+        return int(sum(self.calls.values()))
+
+    def _slot_at(self, row, col):
+        if int(col) not in SLOT_COLUMNS:
+            return 0
+        slot = (int(row) - HEADER_ROWS) * 2 + (1 if int(col) == SLOT_COLUMNS[0] else 2)
+        if int(row) < HEADER_ROWS or slot > self.slots:
+            return 0
+        return slot
+
+    def _cell_of(self, slot):
+        return int((int(slot) - 1) / 2) + HEADER_ROWS, SLOT_COLUMNS[0] if int(slot) % 2 == 1 else SLOT_COLUMNS[1]
+
+    def GetTableData(self):
+        self._count("GetTableData")
+        return self._table
+
+    def GetTemplate(self):
+        self._count("GetTemplate")
+        return DB.ElementId.InvalidElementId
+
+    def GetSlotNumberByCell(self, row, col):
+        self._count("GetSlotNumberByCell")
+        return self._slot_at(row, col)
+
+    def GetCellsBySlotNumber(self, slot, *refs):
+        self._count("GetCellsBySlotNumber")
+        if refs:
+            raise TypeError("out-ref overload not bound")
+        row, col = self._cell_of(slot)
+        return ([row], [col])
+
+    def GetCircuitIdByCell(self, row, col):
+        self._count("GetCircuitIdByCell")
+        slot = self._slot_at(row, col)
+        if slot in self.occupied:
+            return DB.ElementId(200000 + slot)
+        return DB.ElementId.InvalidElementId
+
+    def _add(self, name, kind, row, col):
+        self._count(name)
+        slot = self._slot_at(row, col)
+        if slot <= 0 or slot in self.occupied:
+            return False
+        self.occupied[slot] = kind
+        return True
+
+    def AddSpare(self, row, col):
+        return self._add("AddSpare", SpecialKind.SPARE, row, col)
+
+    def AddSpace(self, row, col):
+        return self._add("AddSpace", SpecialKind.SPACE, row, col)
+
+
+def _fake_option(view):
+    slots = [int(x) for x in ps_repo.get_slot_order(int(view.slots), ps_repo.SORT_MODE_PANELBOARD_ACROSS)]
+    return {
+        "panel_id": int(ps_repo._idval(view.Id)),
+        "schedule_view": view,
+        "schedule_type": None,
+        "max_slot": int(view.slots),
+        "sort_mode": ps_repo.SORT_MODE_PANELBOARD_ACROSS,
+        "slot_limits": {"valid_slots": list(slots), "all_slots": list(slots), "invalid_slots": []},
+    }
+
+
+class FakeManager(object):
+    """``PanelScheduleManager`` add surface for one fake view: look up cells, add, resolve the circuit."""
+
+    def __init__(self, view):
+        self.view = view
+
+    def _place(self, kind, cells):
+        method = self.view.AddSpare if kind == SpecialKind.SPARE else self.view.AddSpace
+        for row, col in cells:
+            if method(row, col):
+                return
+
+    def _resolve(self, panel_id, panel_slot, cells):
+        circuit_id = 0
+        for row, col in cells:
+            cid = self.view.GetCircuitIdByCell(row, col)
+            if cid != DB.ElementId.InvalidElementId:
+                circuit_id = int(ps_repo._idval(cid))
+                break
+        return {"panel_id": int(panel_id), "slot": int(panel_slot), "circuit_id": circuit_id}
+
+    def _add(self, kind, panel_id, panel_slot):
+        self._place(kind, ps_repo.get_cells_by_slot_number(self.view, panel_slot))
+        ps_repo.invalidate_slot_cell_map(self.view, slots=[panel_slot])
+        return self._resolve(panel_id, panel_slot, ps_repo.get_cells_by_slot_number(self.view, panel_slot))
+
+    def add_specials_default(self, panel_id, adds, unlock=True, apply_switchboard_default_poles=True):
+        slot_map = ps_repo.get_slot_cell_map(self.view)
+        planned = [(int(slot), kind, slot_map.cells(slot)) for slot, kind in adds]
+        for slot, kind, cells in planned:
+            self._place(kind, cells)
+        results = [self._resolve(panel_id, slot, cells) for slot, _, cells in planned]
+        ps_repo.invalidate_slot_cell_map(self.view, slots=[x[0] for x in planned])
+        return results
+
+    def add_spare_default(self, panel_id, panel_slot, unlock=True, apply_switchboard_default_poles=True):
+        return self._add(SpecialKind.SPARE, panel_id, panel_slot)
+
+    def add_space_default(self, panel_id, panel_slot, unlock=True, apply_switchboard_default_poles=True):
+        return self._add(SpecialKind.SPACE, panel_id, panel_slot)
+
+
+def _legacy_add(view, option, mode):
+    """Per-slot path as done before the planner: free slots odds-then-evens, kinds in that order."""
+    manager = FakeManager(view)
+    slot_order = ps_repo.get_option_slot_order(option, include_excess=False)
+    free = [int(x) for x in slot_order if int(x) not in view.occupied]
+    slots = [x for x in free if x % 2 == 1] + [x for x in free if x % 2 == 0]
+    mode_key = UiMode.normalize_for_add(mode, default=UiMode.SPACE)
+    spare_count = len(slots) if mode_key == UiMode.SPARE else 0 if mode_key == UiMode.SPACE else int((len(slots) + 1) / 2)
+    filled = {}
+    for idx, slot in enumerate(slots):
+        if idx < spare_count:
+            result = manager.add_spare_default(option["panel_id"], slot)
+            filled[slot] = SpecialKind.SPARE
+        else:
+            result = manager.add_space_default(option["panel_id"], slot)
+            filled[slot] = SpecialKind.SPACE
+        if not int(result.get("circuit_id", 0) or 0):
+            filled.pop(slot)
+    return filled
+
+
+def _planner_add(view, option, mode):
+    plan = plan_panel_adds(option, mode, view.occupied.keys())
+    filled = {}
+    for result in issue_plan_adds(FakeManager(view), plan):
+        if int(result.get("circuit_id", 0) or 0):
+            filled[int(result["slot"])] = plan.kinds[int(result["slot"])]
+    return filled
+
+
+def _measure(label, fn, mode, panel_count, base_id):
+    views = [FakePanelboardView(base_id + idx) for idx in range(int(panel_count))]
+    ps_repo.invalidate_slot_cell_map()
+    elapsed_ms, filled = timed(lambda: [fn(view, _fake_option(view), mode) for view in views])
+    added = sum(len(x) for x in filled)
+    calls = {}
+    for view in views:
+        for name, count in view.calls.items():
+            calls[name] = int(calls.get(name, 0)) + int(count)
+    return [label, mode, "{0:.1f}".format(elapsed_ms), int(added), int(sum(calls.values())), calls], filled
+
+
+def run(output=None, panel_count=PANEL_COUNT):
+    """Check both paths fill the same slots with the same kinds, then print timing and API call counts."""
+    rows = []
+    base_id = 700000
+    for mode in (UiMode.SPARE, UiMode.SPACE, UiMode.BOTH):
+        legacy_row, legacy_filled = _measure("Legacy per-slot", _legacy_add, mode, panel_count, base_id)
+        base_id += 1000
+        planner_row, planner_filled = _measure("Free-slot runs", _planner_add, mode, panel_count, base_id)
+        base_id += 1000
+        assert_same(mode, legacy_filled, planner_filled)
+        rows.extend([legacy_row, planner_row])
+
+    report(
+        output,
+        "Spare/Space Bulk Add Benchmark",
+        [
+            "{0} fake panelboards | {1} slots | every {2}th slot occupied".format(
+                int(panel_count), SLOT_COUNT, OCCUPIED_EVERY
+            )
+        ],
+        [
+            [r[0], r[1], r[2], r[3], r[4], ", ".join(["{0}={1}".format(k, int(v)) for k, v in sorted(r[5].items())])]
+            for r in rows
+        ],
+        ["Strategy", "Mode", "Total ms", "Added", "API calls", "Calls by method"],
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Unit-test utility: time per-host tag scans vs the per-view tag index used by PlaceElementsEngine._place_tags."""
+
+import random
+
+from LogicClasses.placement_engine import PlaceElementsEngine
+from Snippets.benchmark_harness import assert_same, report, speedup, timed
+
+SCENARIOS = (
+    # label, host count, existing tags in view, tag types
+    ("250 hosts, 500 tags", 250, 500, 4),
+    ("1000 hosts, 2000 tags", 1000, 2000, 6),
+    ("1500 hosts, 3000 tags", 1500, 3000, 8),
+)
+TYPE_ID_BASE = 900000
+
+
+class FakeId(object):
+    def __init__(self, value):
+        self.IntegerValue = int(value)
+
+
+class FakeTag(object):
+    IsValidObject = True
+
+    def __init__(self, type_id, host_id):
+        self._type_id = FakeId(type_id)
+        self._host_ids = [FakeId(host_id)]
+
+    def GetTypeId(self):
+        return self._type_id
+
+    def GetTaggedLocalElementIds(self):
+        return self._host_ids
+
+
+class FakeElement(object):
+    def __init__(self, elem_id):
+        self.Id = FakeId(elem_id)
+
+
+def _fake_view(host_count, tag_count, type_count, seed):
+    rng = random.Random(int(seed))
+    hosts = [FakeElement(1000 + idx) for idx in range(int(host_count))]
+    tags = [
+        FakeTag(TYPE_ID_BASE + rng.randrange(int(type_count)), 1000 + rng.randrange(int(host_count) * 2))
+        for _ in range(int(tag_count))
+    ]
+    requests = [(host, FakeId(TYPE_ID_BASE + rng.randrange(int(type_count)))) for host in hosts]
+    return FakeElement(1), tags, requests
+
+
+def _engine():
+    # Only the tag helpers are exercised, so the Revit-bound constructor is skipped.
+    return PlaceElementsEngine.__new__(PlaceElementsEngine)
+
+
+def _legacy_scan(engine, tags, requests):
+    """Per-host scan as done before the index: every host walks every tag in the view."""
+    found = []
+    for host, symbol_id in requests:
+        host_id_val = host.Id.IntegerValue
+        hit = False
+        for tag in tags:
+            if tag.GetTypeId().IntegerValue != symbol_id.IntegerValue:
+                continue
+            for tagged_id in engine._tagged_element_ids(tag):
+                if tagged_id.IntegerValue == host_id_val:
+                    hit = True
+                    break
+            if hit:
+                break
+        found.append(hit)
+    return found
+
+
+def _indexed_lookup(engine, view, tags, requests):
+    index = {}
+    for tag in tags:
+        engine._index_tag(index, tag)
+    engine._view_tag_indexes = {view.Id.IntegerValue: index}
+    return [engine._existing_tag_for_host(host, symbol_id, view) is not None for host, symbol_id in requests]
+
+
+def run(output=None):
+    """Check both lookups flag the same hosts as already tagged, then print timings per scenario."""
+    engine = _engine()
+    rows = []
+    for index, scenario in enumerate(SCENARIOS):
+        label, host_count, tag_count, type_count = scenario
+        view, tags, requests = _fake_view(host_count, tag_count, type_count, seed=index + 1)
+        legacy_ms, legacy_found = timed(lambda: _legacy_scan(engine, tags, requests))
+        indexed_ms, indexed_found = timed(lambda: _indexed_lookup(engine, view, tags, requests))
+        assert_same(label, legacy_found, indexed_found)
+        rows.append([
+            label,
+            "{0:.1f}".format(legacy_ms),
+            "{0:.1f}".format(indexed_ms),
+            speedup(legacy_ms, indexed_ms),
+            sum(1 for hit in indexed_found if hit),
+        ])
+
+    report(
+        output,
+        "Placement Tag Dedup Benchmark",
+        ["Synthetic view: every host asks whether a tag of one type already tags it."],
+        rows,
+        ["Scenario", "Per-host scan ms", "View index ms", "Speedup", "Already tagged hosts"],
+    )
+
+
+if __name__ == "__main__":
+    run()
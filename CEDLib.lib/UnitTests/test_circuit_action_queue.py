@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for CEDElectrical.Model.circuit_action_queue (plain Python 2/3, no Revit needed)."""
+
+import os
+import sys
+import unittest
+
+LIB_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if LIB_ROOT not in sys.path:
+    sys.path.insert(0, LIB_ROOT)
+
+from CEDElectrical.Model.circuit_action_queue import (  # noqa: E402
+    CircuitActionQueue,
+    dependent_circuit_ids,
+)
+
+NEUTRAL = "set_neutral_and_recalculate"
+IG = "set_ig_and_recalculate"
+BREAKER = "autosize_breaker_and_recalculate"
+MARK = "mark_existing_and_recalculate"
+
+
+def _route(actions):
+    return [(action["operation_key"], action["options"].get("mode"), action["circuit_ids"]) for action in actions]
+
+
+class CircuitActionQueueOrderTests(unittest.TestCase):
+    def test_mixed_actions_keep_staging_order(self):
+        queue = CircuitActionQueue()
+        queue.stage(MARK, {"circuit_id": 1, "mode": "new"}, {"mode": "new"})
+        queue.stage(NEUTRAL, {"circuit_id": 2, "include": 1}, {"mode": "add"})
+        queue.stage(BREAKER, {"circuit_id": 3, "rating": 30.0}, {"allow_15a": False})
+        queue.stage(NEUTRAL, {"circuit_id": 4, "include": 0}, {"mode": "remove"})
+        self.assertEqual(
+            _route(queue.actions()),
+            [(MARK, "new", [1]), (NEUTRAL, "add", [2]), (BREAKER, None, [3]), (NEUTRAL, "remove", [4])],
+        )
+
+    def test_consecutive_entries_with_same_options_share_one_action(self):
+        queue = CircuitActionQueue()
+        queue.stage(IG, {"circuit_id": 1, "include": 1}, {"mode": "add"})
+        queue.stage(IG, {"circuit_id": 2, "include": 1}, {"mode": "add"})
+        queue.stage(IG, {"circuit_id": 3, "include": 0}, {"mode": "remove"})
+        actions = queue.actions()
+        self.assertEqual(_route(actions), [(IG, "add", [1, 2]), (IG, "remove", [3])])
+        self.assertEqual([row["circuit_id"] for row in actions[0]["options"]["updates"]], [1, 2])
+
+    def test_interleaved_modes_are_not_merged_across_a_different_step(self):
+        queue = CircuitActionQueue()
+        queue.stage(MARK, {"circuit_id": 1, "mode": "existing"}, {"mode": "existing"})
+        queue.stage(MARK, {"circuit_id": 2, "mode": "new"}, {"mode": "new"})
+        queue.stage(MARK, {"circuit_id": 3, "mode": "existing"}, {"mode": "existing"})
+        self.assertEqual(
+            _route(queue.actions()),
+            [(MARK, "existing", [1]), (MARK, "new", [2]), (MARK, "existing", [3])],
+        )
+
+    def test_restaging_a_circuit_moves_it_to_its_latest_step(self):
+        queue = CircuitActionQueue()
+        queue.stage(NEUTRAL, {"circuit_id": 1, "include": 1}, {"mode": "add"})
+        queue.stage(NEUTRAL, {"circuit_id": 2, "include": 1}, {"mode": "add"})
+        queue.stage(NEUTRAL, {"circuit_id": 1, "include": 0}, {"mode": "remove"})
+        actions = queue.actions()
+        self.assertEqual(_route(actions), [(NEUTRAL, "add", [2]), (NEUTRAL, "remove", [1])])
+        self.assertEqual(actions[1]["options"]["updates"], [{"circuit_id": 1, "include": 0}])
+        self.assertEqual(len(queue), 2)
+
+    def test_unstage_and_invalid_ids(self):
+        queue = CircuitActionQueue()
+        self.assertFalse(queue.stage(NEUTRAL, {"circuit_id": 0}))
+        self.assertFalse(queue.stage("", {"circuit_id": 5}))
+        queue.stage(NEUTRAL, {"circuit_id": "5", "include": 1}, {"mode": "add"})
+        self.assertEqual(queue.circuit_ids(), [5])
+        queue.unstage(5)
+        self.assertEqual(queue.actions(), [])
+
+    def test_actions_do_not_share_state_with_the_queue(self):
+        queue = CircuitActionQueue()
+        options = {"mode": "add"}
+        queue.stage(NEUTRAL, {"circuit_id": 1, "include": 1}, options)
+        queue.actions()[0]["options"]["updates"].append({"circuit_id": 9})
+        self.assertEqual(options, {"mode": "add"})
+        self.assertEqual(queue.circuit_ids(), [1])
+
+
+class DependentCircuitTests(unittest.TestCase):
+    def _refreshes(self, actions):
+        # Mirrors the composite operation: each action re-reads circuits earlier actions changed.
+        changed = set()
+        refreshes = []
+        for action in actions:
+            refreshes.append(dependent_circuit_ids(action["circuit_ids"], changed))
+            changed.update(action["circuit_ids"])
+        return refreshes
+
+    def test_same_circuit_under_several_keys_keeps_each_step(self):
+        queue = CircuitActionQueue()
+        queue.stage(MARK, {"circuit_id": 1, "mode": "new"}, {"mode": "new"})
+        queue.stage(NEUTRAL, {"circuit_id": 1, "include": 1}, {"mode": "add"})
+        queue.stage(MARK, {"circuit_id": 1, "mode": "existing"}, {"mode": "existing"})
+        self.assertEqual(_route(queue.actions()), [(NEUTRAL, "add", [1]), (MARK, "existing", [1])])
+        self.assertEqual(queue.circuit_ids(), [1])
+
+    def test_later_action_on_changed_circuit_needs_refresh(self):
+        # Mark-new rewrites circuit 1, so the neutral step touching it must re-read it first.
+        queue = CircuitActionQueue()
+        queue.stage(MARK, {"circuit_id": 1, "mode": "new"}, {"mode": "new"})
+        queue.stage(BREAKER, {"circuit_id": 2, "rating": 20.0})
+        queue.stage(NEUTRAL, {"circuit_id": 1, "include": 1}, {"mode": "add"})
+        queue.stage(NEUTRAL, {"circuit_id": 3, "include": 1}, {"mode": "add"})
+        actions = queue.actions()
+        self.assertEqual(_route(actions), [(MARK, "new", [1]), (BREAKER, None, [2]), (NEUTRAL, "add", [1, 3])])
+        self.assertEqual(self._refreshes(actions), [[], [], [1]])
+
+    def test_independent_actions_need_no_refresh(self):
+        queue = CircuitActionQueue()
+        queue.stage(BREAKER, {"circuit_id": 1, "rating": 20.0})
+        queue.stage(IG, {"circuit_id": 2, "include": 0}, {"mode": "remove"})
+        self.assertEqual(self._refreshes(queue.actions()), [[], []])
+
+    def test_dependent_ids_are_unique_ints_in_request_order(self):
+        self.assertEqual(dependent_circuit_ids([3, 1, "2", 1], set([1, 2])), [1, 2])
+        self.assertEqual(dependent_circuit_ids([1, 2], []), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
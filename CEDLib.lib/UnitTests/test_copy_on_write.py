@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for LogicClasses.copy_on_write (plain Python 2/3, no Revit needed)."""
+
+import os
+import sys
+import unittest
+
+LIB_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if LIB_ROOT not in sys.path:
+    sys.path.insert(0, LIB_ROOT)
+
+from LogicClasses.copy_on_write import copy_on_write, freeze  # noqa: E402
+
+
+class CopyOnWriteSliceTests(unittest.TestCase):
+    def setUp(self):
+        self.base = {"e": [{"n": 1}, {"n": 2}, {"n": 3}]}
+        self.view = copy_on_write(self.base)
+
+    def test_slices_match_plain_list(self):
+        items = self.view["e"]
+        self.assertEqual(items[1:], [{"n": 2}, {"n": 3}])
+        self.assertEqual(items[:2], [{"n": 1}, {"n": 2}])
+        self.assertEqual(items[-2:], [{"n": 2}, {"n": 3}])
+        self.assertEqual(items[::2], [{"n": 1}, {"n": 3}])
+        self.assertEqual(items[5:], [])
+
+    def test_sliced_items_are_owned_copies(self):
+        tail = self.view["e"][1:]
+        tail[0]["n"] = 20
+        self.assertEqual(self.base["e"][1]["n"], 2)
+        self.assertEqual(freeze(self.view)["e"][1]["n"], 20)
+
+
+class CopyOnWriteEditTests(unittest.TestCase):
+    def test_edits_leave_base_untouched_and_share_the_rest(self):
+        base = {"a": {"x": 1}, "b": {"y": [1, 2]}}
+        view = copy_on_write(base)
+        view["a"]["x"] = 2
+        frozen = freeze(view)
+        self.assertEqual(base["a"]["x"], 1)
+        self.assertEqual(frozen["a"]["x"], 2)
+        self.assertIs(frozen["b"], base["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
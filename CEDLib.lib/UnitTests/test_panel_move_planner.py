@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for CEDElectrical.Model.panel_move_planner (plain Python 2/3, no Revit needed)."""
+
+import os
+import sys
+import unittest
+
+LIB_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Import the module directly: the CEDElectrical.Model package __init__ needs the Revit API.
+for _path in (LIB_ROOT, os.path.join(LIB_ROOT, "CEDElectrical", "Model")):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import panel_move_planner as planner  # noqa: E402
+
+
+def _occupancy(slot_count, taken=()):
+    def _span(start, poles):
+        if start + poles - 1 > slot_count:
+            return []
+        return list(range(start, start + poles))
+
+    free = [slot for slot in range(1, slot_count + 1) if slot not in set(taken)]
+    return planner.SlotOccupancy(range(1, slot_count + 1), free, _span)
+
+
+class PlanOrderTests(unittest.TestCase):
+    def test_selection_order_breaks_pole_count_ties(self):
+        requests = [("a", 1), ("b", 3), ("c", 1), ("d", 2), ("e", 3), ("f", 1)]
+        plan = planner.plan_moves(requests, _occupancy(12))
+        self.assertTrue(plan.feasible)
+        self.assertEqual(plan.order, ["b", "e", "d", "a", "c", "f"])
+        self.assertEqual(plan.assignment("a")[0], 9)
+        self.assertEqual(plan.assignment("c")[0], 10)
+        self.assertEqual(plan.assignment("f")[0], 11)
+
+    def test_occupancy_is_not_modified(self):
+        occupancy = _occupancy(6, taken=(2,))
+        planner.plan_moves([("a", 2), ("b", 1)], occupancy)
+        self.assertEqual(occupancy.free, set([1, 3, 4, 5, 6]))
+
+
+class PlanFeasibilityTests(unittest.TestCase):
+    def test_larger_circuits_are_placed_first(self):
+        # In selection order the 2-pole circuit would take 1-2 and strand the 3-pole one.
+        plan = planner.plan_moves([("two", 2), ("three", 3)], _occupancy(6, taken=(4,)))
+        self.assertTrue(plan.feasible)
+        self.assertEqual(plan.strategy, planner.STRATEGY_FIRST_FIT)
+        self.assertEqual(plan.assignment("three")[0], 1)
+        self.assertEqual(plan.assignment("two")[0], 5)
+
+    def test_leftovers_get_a_reason(self):
+        plan = planner.plan_moves([("a", 3), ("b", 3)], _occupancy(4))
+        self.assertFalse(plan.feasible)
+        self.assertEqual(plan.order, ["a"])
+        self.assertEqual(plan.strategy, planner.STRATEGY_PARTIAL)
+        self.assertTrue(plan.reason("b"))
+        self.assertIn("1 of 2", plan.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
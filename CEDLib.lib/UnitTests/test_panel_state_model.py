@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for CEDElectrical.Model.panel_state_model (plain Python 2/3, no Revit needed)."""
+
+import os
+import sys
+import unittest
+
+LIB_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if LIB_ROOT not in sys.path:
+    sys.path.insert(0, LIB_ROOT)
+
+from CEDElectrical.Model.panel_state_model import (  # noqa: E402
+    PanelRowIndex,
+    PanelStateModel,
+    compile_placements,
+)
+
+
+def _slots(start, poles):
+    return list(range(start, start + poles)) if start else []
+
+
+def _move(circuit_id, old_slot, new_slot, from_panel=1, to_panel=1, poles=1):
+    return {
+        "action": "move",
+        "circuit_id": circuit_id,
+        "from_panel_id": from_panel,
+        "to_panel_id": to_panel,
+        "old_slot": old_slot,
+        "new_slot": new_slot,
+        "old_covered_slots": _slots(old_slot, poles),
+        "new_covered_slots": _slots(new_slot, poles),
+    }
+
+
+def _add(circuit_id, slot, panel=1, kind="spare"):
+    return {
+        "action": "add_" + kind,
+        "circuit_id": circuit_id,
+        "from_panel_id": panel,
+        "to_panel_id": panel,
+        "old_slot": 0,
+        "new_slot": slot,
+        "old_covered_slots": [],
+        "new_covered_slots": [slot],
+    }
+
+
+def _remove(circuit_id, slot, panel=1, kind="spare"):
+    return {
+        "action": "remove_" + kind,
+        "circuit_id": circuit_id,
+        "from_panel_id": panel,
+        "to_panel_id": panel,
+        "old_slot": slot,
+        "new_slot": 0,
+        "old_covered_slots": [slot],
+        "new_covered_slots": [],
+    }
+
+
+def _op(seq, *placements):
+    return {"seq": seq, "placements": list(placements)}
+
+
+def _route(steps):
+    return [
+        (
+            step["placement"]["circuit_id"],
+            step["placement"].get("old_slot"),
+            step["placement"].get("new_slot"),
+        )
+        for step in steps
+    ]
+
+
+class CompileChainTests(unittest.TestCase):
+    def test_single_move_is_not_compiled(self):
+        steps, compiled = compile_placements([_op(1, _move(10, 1, 5))])
+        self.assertEqual(_route(steps), [(10, 1, 5)])
+        self.assertEqual(steps[0]["seqs"], [1])
+        self.assertFalse(compiled)
+
+    def test_chain_collapses_to_one_net_move(self):
+        steps, compiled = compile_placements([
+            _op(1, _move(10, 1, 5)),
+            _op(2, _move(10, 5, 7)),
+        ])
+        self.assertEqual(_route(steps), [(10, 1, 7)])
+        self.assertEqual(steps[0]["seqs"], [1, 2])
+        self.assertEqual(steps[0]["placement"]["old_covered_slots"], [1])
+        self.assertEqual(steps[0]["placement"]["new_covered_slots"], [7])
+        self.assertTrue(compiled)
+
+    def test_cross_panel_chain_keeps_origin_and_final_panel(self):
+        steps, _ = compile_placements([
+            _op(1, _move(10, 1, 3, from_panel=1, to_panel=2)),
+            _op(2, _move(10, 3, 5, from_panel=2, to_panel=3)),
+        ])
+        placement = steps[0]["placement"]
+        self.assertEqual(placement["from_panel_id"], 1)
+        self.assertEqual(placement["to_panel_id"], 3)
+        self.assertFalse(placement["same_panel"])
+
+
+class CompileRoundTripTests(unittest.TestCase):
+    def test_move_back_to_origin_is_dropped(self):
+        steps, compiled = compile_placements([
+            _op(1, _move(10, 1, 5)),
+            _op(2, _move(10, 5, 1)),
+        ])
+        self.assertEqual(steps, [])
+        self.assertTrue(compiled)
+
+    def test_round_trip_through_another_panel_is_dropped(self):
+        steps, _ = compile_placements([
+            _op(1, _move(10, 1, 3, from_panel=1, to_panel=2)),
+            _op(2, _move(10, 3, 1, from_panel=2, to_panel=1)),
+        ])
+        self.assertEqual(steps, [])
+
+    def test_round_trip_to_a_different_pole_span_is_kept(self):
+        steps, _ = compile_placements([
+            _op(1, _move(10, 1, 5, poles=2)),
+            _op(2, _move(10, 5, 3, poles=2)),
+        ])
+        self.assertEqual(_route(steps), [(10, 1, 3)])
+
+
+class CompileSwapTests(unittest.TestCase):
+    def test_swap_through_parking_slot_splits_parked_circuit(self):
+        # A parks in 40, B takes A's slot, A takes B's slot: the net moves deadlock.
+        steps, compiled = compile_placements([
+            _op(1, _move(10, 1, 40)),
+            _op(2, _move(20, 3, 1)),
+            _op(3, _move(10, 40, 3)),
+        ])
+        self.assertEqual(_route(steps), [(10, 1, 40), (20, 3, 1), (10, 40, 3)])
+        self.assertEqual([step["seqs"] for step in steps], [[1], [2], [3]])
+        self.assertFalse(compiled)
+
+    def test_vacate_runs_before_a_later_occupant(self):
+        # A's net move is ordered by its last hop, but B needs slot 1 that A vacates first.
+        steps, compiled = compile_placements([
+            _op(1, _move(10, 1, 5)),
+            _op(2, _move(20, 8, 1)),
+            _op(3, _move(10, 5, 6)),
+        ])
+        self.assertEqual(_route(steps), [(10, 1, 6), (20, 8, 1)])
+        self.assertTrue(compiled)
+
+    def test_independent_steps_keep_staged_order(self):
+        steps, _ = compile_placements([
+            _op(1, _move(10, 1, 5)),
+            _op(2, _move(20, 2, 6)),
+            _op(3, _move(30, 3, 7)),
+        ])
+        self.assertEqual([route[0] for route in _route(steps)], [10, 20, 30])
+
+
+class CompileAddRemoveTests(unittest.TestCase):
+    def test_staged_spare_added_then_removed_disappears(self):
+        steps, compiled = compile_placements([
+            _op(1, _add(-1, 9)),
+            _op(2, _remove(-1, 9)),
+        ])
+        self.assertEqual(steps, [])
+        self.assertTrue(compiled)
+
+    def test_staged_spare_added_then_moved_is_one_add(self):
+        steps, _ = compile_placements([
+            _op(1, _add(-1, 9)),
+            _op(2, _move(-1, 9, 11)),
+        ])
+        self.assertEqual(len(steps), 1)
+        placement = steps[0]["placement"]
+        self.assertEqual(placement["action"], "add_spare")
+        self.assertEqual(placement["new_covered_slots"], [11])
+        self.assertEqual(placement["old_covered_slots"], [])
+
+    def test_existing_spare_moved_then_removed_removes_from_origin(self):
+        steps, _ = compile_placements([
+            _op(1, _move(50, 4, 6)),
+            _op(2, _remove(50, 6)),
+        ])
+        self.assertEqual(len(steps), 1)
+        placement = steps[0]["placement"]
+        self.assertEqual(placement["action"], "remove_spare")
+        self.assertEqual(placement["old_covered_slots"], [4])
+
+    def test_circuit_moves_into_slot_of_removed_spare(self):
+        steps, _ = compile_placements([
+            _op(1, _remove(50, 4)),
+            _op(2, _move(10, 1, 4)),
+        ])
+        self.assertEqual([step["placement"]["action"] for step in steps], ["remove_spare", "move"])
+
+
+def _row(key, kind, slot, poles=1):
+    return {"row_key": key, "kind": kind, "slot": slot, "covered_slots": _slots(slot, poles)}
+
+
+def _covered(row):
+    return row.get("covered_slots")
+
+
+class PanelStateModelUndoTests(unittest.TestCase):
+    def setUp(self):
+        self.model = PanelStateModel()
+        self.rows = self.model.load(
+            1,
+            [_row("c10", "circuit", 1), _row("e3", "empty", 3), _row("c20", "circuit", 5, poles=2)],
+            slot_order=[1, 3, 5, 6],
+        )
+
+    def _stage_move(self, key, new_slot):
+        index = PanelRowIndex(self.model.rows(1), _covered)
+        row = index.by_key(key)
+        index.remove(row)
+        index.remove(index.at(new_slot))
+        row = dict(row, slot=new_slot, covered_slots=[new_slot])
+        index.add(row)
+
+    def _layout(self):
+        return sorted([(row["row_key"], row["slot"]) for row in self.model.rows(1)])
+
+    def test_restore_returns_rows_to_snapshot(self):
+        before = self.model.snapshot([1])
+        self._stage_move("c10", 3)
+        self.assertEqual(self._layout(), [("c10", 3), ("c20", 5)])
+        self.model.restore(before)
+        self.assertEqual(self._layout(), [("c10", 1), ("c20", 5), ("e3", 3)])
+
+    def test_snapshot_is_not_changed_by_later_staging(self):
+        before = self.model.snapshot([1])
+        self._stage_move("c10", 3)
+        self.assertEqual(sorted([row["row_key"] for row in before[1]]), ["c10", "c20", "e3"])
+
+    def test_undo_steps_restore_in_reverse(self):
+        first = self.model.snapshot([1])
+        self._stage_move("c10", 3)
+        second = self.model.snapshot([1])
+        self._stage_move("c20", 1)
+        self.model.restore(second)
+        self.assertEqual(self._layout(), [("c10", 3), ("c20", 5)])
+        self.model.restore(first)
+        self.assertEqual(self._layout(), [("c10", 1), ("c20", 5), ("e3", 3)])
+
+    def test_reset_returns_to_loaded_rows(self):
+        self._stage_move("c10", 3)
+        self.model.reset()
+        self.assertEqual(self._layout(), [("c10", 1), ("c20", 5), ("e3", 3)])
+
+    def test_snapshot_ignores_unloaded_panels(self):
+        self.assertEqual(list(self.model.snapshot([1, 2]).keys()), [1])
+
+    def test_next_slot_after_follows_slot_order(self):
+        self.assertEqual(self.model.next_slot_after(1, 3), 5)
+        self.assertEqual(self.model.next_slot_after(1, 6), 0)
+
+    def test_discard_drops_cached_transferability(self):
+        calls = []
+
+        def _evaluate(row):
+            calls.append(row["circuit_id"])
+            return {"ok": True}
+
+        row = {"circuit_id": 10, "poles": 1}
+        self.model.transferability(row, 2, _evaluate)
+        self.model.transferability(row, 2, _evaluate)
+        self.assertEqual(calls, [10])
+        self.model.discard(1)
+        self.model.transferability(row, 2, _evaluate)
+        self.assertEqual(calls, [10, 10])
+
+
+if __name__ == "__main__":
+    unittest.main()
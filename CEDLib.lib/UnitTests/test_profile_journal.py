@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for ExtensibleStorage.profile_journal diff / apply_ops (plain Python 2/3, no Revit needed)."""
+
+import json
+import os
+import random
+import sys
+import unittest
+
+LIB_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Import the module directly: the ExtensibleStorage package __init__ needs the Revit API.
+for _path in (LIB_ROOT, os.path.join(LIB_ROOT, "ExtensibleStorage")):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+import profile_journal  # noqa: E402
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True)
+
+
+def _random_value(rng, depth=0):
+    roll = rng.random()
+    if depth < 3 and roll < 0.25:
+        return dict(("k{0}".format(rng.randrange(6)), _random_value(rng, depth + 1)) for _ in range(rng.randrange(4)))
+    if depth < 3 and roll < 0.45:
+        count = rng.randrange(5)
+        if rng.random() < 0.5:
+            return [{"id": "i{0}".format(idx), "v": _random_value(rng, depth + 1)} for idx in rng.sample(range(8), count)]
+        return [_random_value(rng, depth + 1) for _ in range(count)]
+    return rng.choice([0, 1, True, False, None, 1.5, "a", "b", ""])
+
+
+class DiffApplyTests(unittest.TestCase):
+    def assertRoundTrip(self, old, new):
+        ops, inverse = profile_journal.diff(old, new)
+        self.assertEqual(_canonical(profile_journal.apply_ops(old, ops)), _canonical(new))
+        self.assertEqual(_canonical(profile_journal.apply_ops(new, inverse)), _canonical(old))
+        return ops
+
+    def test_bool_int_changes_inside_containers_are_kept(self):
+        self.assertTrue(self.assertRoundTrip({"a": 1}, {"a": True}))
+        self.assertTrue(self.assertRoundTrip([0, {"b": False}], [0, {"b": 0}]))
+
+    def test_identical_data_has_no_ops(self):
+        data = {"equipment_definitions": [{"id": "x", "params": {"a": 1}}]}
+        self.assertEqual(profile_journal.diff(data, json.loads(json.dumps(data))), ([], []))
+
+    def test_keyed_list_insert_is_one_operation(self):
+        old = {"defs": [{"id": "a"}, {"id": "b"}, {"id": "c"}]}
+        new = {"defs": [{"id": "a"}, {"id": "x"}, {"id": "b"}, {"id": "c"}]}
+        ops = self.assertRoundTrip(old, new)
+        self.assertEqual(ops, [{"op": "add", "path": "/defs/1", "value": {"id": "x"}}])
+
+    def test_pointer_escaping(self):
+        self.assertRoundTrip({"a/b": {"c~d": 1}}, {"a/b": {"c~d": 2}})
+
+    def test_random_round_trips(self):
+        rng = random.Random(20261018)
+        for _ in range(3000):
+            self.assertRoundTrip(_random_value(rng), _random_value(rng))
+
+    def test_apply_ops_leaves_input_untouched(self):
+        old = {"a": {"b": [1, 2]}}
+        ops, _ = profile_journal.diff(old, {"a": {"b": [1, 3]}})
+        profile_journal.apply_ops(old, ops)
+        self.assertEqual(old, {"a": {"b": [1, 2]}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for LogicClasses.profile_schema loader parity on the OLD CHECKPOINTS profiles (plain Python 2/3, no Revit needed)."""
+
+import glob
+import hashlib
+import io
+import os
+import sys
+import unittest
+
+LIB_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if LIB_ROOT not in sys.path:
+    sys.path.insert(0, LIB_ROOT)
+
+from LogicClasses import profile_schema  # noqa: E402
+
+CHECKPOINT_DIR = os.path.join(LIB_ROOT, "OLD CHECKPOINTS")
+
+
+def _distinct_checkpoints():
+    """Return ``(name, text)`` for each checkpoint, skipping copies with identical content."""
+    seen = set()
+    files = []
+    for path in sorted(glob.glob(os.path.join(CHECKPOINT_DIR, "*.yaml"))):
+        with io.open(path, "rb") as handle:
+            payload = handle.read()
+        digest = hashlib.sha1(payload).hexdigest()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        files.append((os.path.basename(path), payload.decode("utf-8")))
+    return files
+
+
+def _load(raw, backend=None):
+    # "<memory>" keeps the loader from writing its diagnostics file next to the checkpoint.
+    return profile_schema.load_data_from_text(raw, "<memory>", backend=backend, use_cache=False)
+
+
+COMPILED = [name for name in profile_schema.available_yaml_backends() if name in profile_schema._COMPILED_BACKENDS]
+
+
+class EmptyContainerKeyParityTests(unittest.TestCase):
+    def assertLoadsLikeSimpleParser(self, raw, label):
+        tiered = _load(raw)
+        used = profile_schema.get_last_load_info().get("backend")
+        self.assertEqual(tiered, _load(raw, profile_schema.BACKEND_SIMPLE), label)
+        if COMPILED:
+            self.assertIn(used, COMPILED, label)
+
+    def test_checkpoints_with_empty_container_keys_load_like_simple_parser(self):
+        checked = 0
+        for name, raw in _distinct_checkpoints():
+            if not profile_schema._has_empty_container_keys(raw):
+                continue
+            checked += 1
+            self.assertLoadsLikeSimpleParser(raw, name)
+        if not checked:
+            self.skipTest("no checkpoint with {}:/[]: keys found")
+
+    def test_nested_empty_container_keys_keep_simple_parser_shape(self):
+        raw = "text_notes:\n  []:\n    {}:\n      {}\nname: Panel\n"
+        self.assertLoadsLikeSimpleParser(raw, "nested")
+
+    def test_block_scalars_and_raw_strings_keep_simple_parser_shape(self):
+        raw = (
+            "parameters:\n"
+            "  {}:\n"
+            "    {}\n"
+            "  Element_Linker Parameter: |\n"
+            "    Set Definition ID: SET-005\n"
+            "    FacingOrientation:\n"
+            "  Empty Linker: |\n"
+            "  type_name: \"Text : 3/32\\\\\" Arial\"\n"
+            "  label: \"plain\"\n"
+            "items:\n"
+            "  -\n"
+            "  -\n"
+            "    id: A\n"
+        )
+        self.assertLoadsLikeSimpleParser(raw, "block scalars")
+
+    def test_unsupported_block_scalar_falls_back_to_simple_parser(self):
+        raw = "{}:\n  {}\nnotes: |\n  - first\n  - second\n"
+        self.assertIsNone(profile_schema._rewrite_empty_container_keys(raw))
+        self.assertEqual(_load(raw), _load(raw, profile_schema.BACKEND_SIMPLE))
+        self.assertEqual(profile_schema.get_last_load_info().get("backend"), profile_schema.BACKEND_SIMPLE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Unit tests for LogicClasses.spatial_hash (plain Python 2/3, no Revit needed)."""
+
+import os
+import sys
+import unittest
+
+LIB_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if LIB_ROOT not in sys.path:
+    sys.path.insert(0, LIB_ROOT)
+
+from LogicClasses.spatial_hash import SpatialHash, point_coords  # noqa: E402
+
+TOLERANCE = 0.02
+
+
+class _Point(object):
+    def __init__(self, x, y, z):
+        self.X = x
+        self.Y = y
+        self.Z = z
+
+
+class SpatialHashToleranceTests(unittest.TestCase):
+    def setUp(self):
+        self.index = SpatialHash(TOLERANCE)
+
+    def test_matches_point_just_across_a_cell_boundary(self):
+        # 0.0199 and 0.0201 fall in neighbouring cells but are 0.0002 ft apart.
+        self.index.add("sym", (0.0199, 5.0, 1.0), "a")
+        self.assertEqual(self.index.find("sym", (0.0201, 5.0, 1.0))[0], "a")
+
+    def test_matches_across_negative_boundaries(self):
+        self.index.add("sym", (-0.0001, -0.0001, -0.0001), "a")
+        self.assertTrue(self.index.contains("sym", (0.0001, 0.0001, 0.0001)))
+
+    def test_distance_just_inside_tolerance_matches(self):
+        self.index.add("sym", (1.0, 0.0, 0.0), "a")
+        self.assertTrue(self.index.contains("sym", (1.0 + TOLERANCE * 0.999, 0.0, 0.0)))
+
+    def test_distance_beyond_tolerance_does_not_match(self):
+        self.index.add("sym", (1.0, 0.0, 0.0), "a")
+        self.assertFalse(self.index.contains("sym", (1.0 + TOLERANCE * 1.01, 0.0, 0.0)))
+
+    def test_tolerance_is_euclidean_not_per_axis(self):
+        # Each axis is within tolerance, the diagonal is not.
+        offset = TOLERANCE * 0.9
+        self.index.add("sym", (0.0, 0.0, 0.0), "a")
+        self.assertFalse(self.index.contains("sym", (offset, offset, offset)))
+
+    def test_z_difference_alone_breaks_the_match(self):
+        self.index.add("sym", (3.0, 4.0, 1.0), "a")
+        self.assertFalse(self.index.contains("sym", (3.0, 4.0, 1.5)))
+
+    def test_returns_nearest_item_and_distance(self):
+        self.index.add("sym", (0.0, 0.0, 0.0), "far")
+        self.index.add("sym", (0.015, 0.0, 0.0), "near")
+        item, distance = self.index.find("sym", (0.016, 0.0, 0.0))
+        self.assertEqual(item, "near")
+        self.assertAlmostEqual(distance, 0.001)
+
+    def test_keys_are_independent(self):
+        self.index.add("sym-a", (0.0, 0.0, 0.0), "a")
+        self.assertFalse(self.index.contains("sym-b", (0.0, 0.0, 0.0)))
+
+    def test_incremental_insertion_is_visible_to_later_queries(self):
+        self.assertFalse(self.index.contains("sym", (2.0, 2.0, 0.0)))
+        self.index.add("sym", (2.0, 2.0, 0.0), "placed")
+        self.assertTrue(self.index.contains("sym", (2.005, 2.0, 0.0)))
+        self.assertEqual(len(self.index), 1)
+
+
+class SpatialHashKeyTests(unittest.TestCase):
+    def test_add_key_marks_key_loaded_without_points(self):
+        index = SpatialHash(TOLERANCE)
+        self.assertFalse(index.has_key("sym"))
+        index.add_key("sym")
+        self.assertTrue(index.has_key("sym"))
+        self.assertIsNone(index.find("sym", (0.0, 0.0, 0.0)))
+
+    def test_non_positive_tolerance_is_rejected(self):
+        with self.assertRaises(ValueError):
+            SpatialHash(0)
+
+
+class PointCoordsTests(unittest.TestCase):
+    def test_reads_xyz_objects(self):
+        self.assertEqual(point_coords(_Point(1, 2, 3)), (1.0, 2.0, 3.0))
+
+    def test_two_item_sequences_default_z_to_zero(self):
+        self.assertEqual(point_coords((1, 2)), (1.0, 2.0, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main()